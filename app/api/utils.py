@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Tuple, Type
+
+from bson import ObjectId
+
+from flask import request
+
+from app.api.exceptions import BadRequestException
+from app.models.base import BaseDocument
+from app.models.pagination import Pagination
+from app.models.projection import Projection
+from lib.http_utils import etag_of
+
+PAGINATION_PARAMETERS = ("limit", "after", "sort")
+MAX_IDS = 100
+
+
+def get_projection(document: Type[BaseDocument]) -> Optional[Projection]:
+    """
+    Read the projection requested with the `fields` query parameter, e.g. `?fields=name,slug,media.header_url`.
+
+    :param document: The class of the requested documents.
+    :type document: Type[BaseDocument]
+    :return: The projection, or None if all fields are requested.
+    :rtype: Optional[Projection]
+    :raises BadRequestException: If a requested field is not a field of the document.
+    """
+    try:
+        return Projection.parse(request.args.get("fields"), document)
+    except ValueError as error:
+        raise BadRequestException(str(error))
+
+
+def get_ids(name: str = "ids") -> Optional[List[ObjectId]]:
+    """
+    Read the IDs of the documents requested with the `ids` query parameter, e.g. `?ids=<id>,<id>`.
+
+    :param str name: The name of the query parameter, `ids` if not specified.
+    :return: The IDs, in the order they were requested, or None if the parameter is not given.
+    :rtype: Optional[List[ObjectId]]
+    :raises BadRequestException: If an ID is invalid or more than `MAX_IDS` are requested.
+    """
+    value = request.args.get(name)
+
+    if value is None:
+        return None
+
+    ids = [id_.strip() for id_ in value.split(",") if id_.strip()]
+
+    if len(ids) == 0 or len(ids) > MAX_IDS:
+        raise BadRequestException(f"Between 1 and {MAX_IDS} IDs must be requested.")
+
+    for id_ in ids:
+        if not ObjectId.is_valid(id_):
+            raise BadRequestException(f"Invalid ID \"{id_}\".")
+
+    return [ObjectId(id_) for id_ in ids]
+
+
+def get_pagination(
+        sort_fields: Iterable[str],
+        optional: bool = True,
+        default_limit: int = Pagination.DEFAULT_LIMIT,
+        default_sort: Optional[str] = None
+) -> Optional[Pagination]:
+    """
+    Read the page requested with the `limit`, `after` and `sort` query parameters,
+    e.g. `?limit=50&sort=-created_at&after=<next_cursor of the previous page>`.
+
+    :param sort_fields: The fields that the documents can be sorted by, besides `_id`.
+    :type sort_fields: Iterable[str]
+    :param bool optional: Whether lists are returned whole if none of the parameters is given.
+    :param int default_limit: The number of documents of a page if `limit` is not given.
+    :param default_sort: The sort if `sort` is not given, `_id` if not specified.
+    :type default_sort: Optional[str]
+    :return: The pagination, or None if it is optional and was not requested.
+    :rtype: Optional[Pagination]
+    :raises BadRequestException: If a parameter is invalid.
+    """
+    args = request.args
+
+    if optional and not any(name in args for name in PAGINATION_PARAMETERS):
+        return None
+
+    try:
+        return Pagination.parse(args.get("limit", str(default_limit)), args.get("after"), args.get("sort") or default_sort, sort_fields)
+    except ValueError as error:
+        raise BadRequestException(str(error))
+
+
+def get_validators(
+        documents: Iterable[BaseDocument],
+        *parts: Any,
+        single: bool = False
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Derive the validators of a response with documents, for `respond_conditional`.
+
+    The ETag is derived from the `_id` and `updated_at` of the documents, which every write changes, and the query
+    parameters, so that the projections and pages of the same documents have ETags of their own. Documents read without
+    `updated_at`, e.g. with a projection, are hashed by their content instead.
+    The time of the last modification is only given for a single document that the response depends on alone:
+    a list also changes when one of its documents is deleted, and resolved values change without `updated_at`,
+    so clients that revalidate with `If-Modified-Since` would keep stale data.
+
+    :param documents: The documents of the response.
+    :type documents: Iterable[BaseDocument]
+    :param parts: Anything else the response depends on, e.g. values resolved from other collections, None if absent.
+    :param bool single: Whether the response is a single document rather than a list.
+    :return: The ETag, and the `updated_at` of the document if it's single, has one and there are no parts.
+    :rtype: Tuple[str, Optional[datetime]]
+    """
+    versions = []
+    last_modified = None
+    complete = single and all(part is None for part in parts)
+
+    for document in documents:
+        updated_at = getattr(document, "updated_at", None)
+
+        if updated_at is None:
+            complete = False
+            versions.append(document.to_json())
+            continue
+
+        versions.append((document._id, updated_at))
+        last_modified = updated_at
+
+    etag = etag_of(request.query_string, versions, *parts)
+
+    return etag, last_modified if complete else None
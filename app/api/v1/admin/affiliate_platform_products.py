@@ -4,7 +4,6 @@ from app.api.exceptions import UnprocessableEntityException
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
 from app.models.affiliate_platform_products import AffiliatePlatformProductPatch, AffiliatePlatformProductCreate
-from lib.db_utils import to_json
 from lib.http_utils import respond_success, respond_error
 
 affiliate_platform_products_controller = Blueprint('affiliate_platform_products', __name__, url_prefix='/affiliate_platform_products')
@@ -22,7 +21,7 @@ def get_affiliate_platform_products():
     """
     affiliate_platform_products_model = get_models(current_app).affiliate_platform_products
     affiliate_platform_products_list = affiliate_platform_products_model.get_all()
-    return respond_success(to_json(affiliate_platform_products_list))
+    return respond_success(affiliate_platform_products_list)
 
 
 @affiliate_platform_products_controller.route('/<string:affiliate_platform_product_id>', methods=["GET"])
@@ -38,7 +37,7 @@ def get_affiliate_platform_product_by_id(affiliate_platform_product_id):
     affiliate_platform_products_model = get_models(current_app).affiliate_platform_products
     affiliate_platform_product = affiliate_platform_products_model.get(affiliate_platform_product_id)
     if affiliate_platform_product:
-        return respond_success(affiliate_platform_product.to_json())
+        return respond_success(affiliate_platform_product)
     else:
         return respond_error(f'Affiliate platform product with ID {affiliate_platform_product_id} not found', 404)
 
@@ -58,7 +57,7 @@ def create_affiliate_platform_product():
     try:
         affiliate_platform_product_data = AffiliatePlatformProductCreate(**data)
         new_affiliate_platform_product = affiliate_platform_products_model.create(affiliate_platform_product_data)
-        return respond_success(new_affiliate_platform_product.to_json(), status_code=201)
+        return respond_success(new_affiliate_platform_product, status_code=201)
     except TypeError as e:
         print(e)
         raise UnprocessableEntityException("Invalid data provided.")
@@ -80,7 +79,7 @@ def update_affiliate_platform_product(affiliate_platform_product_id):
     updated_affiliate_platform_product = affiliate_platform_products_model.patch(affiliate_platform_product_id, affiliate_platform_product_patch_data)
 
     if updated_affiliate_platform_product:
-        return respond_success(updated_affiliate_platform_product.to_json())
+        return respond_success(updated_affiliate_platform_product)
     else:
         return respond_error(f'Affiliate platform product with ID {affiliate_platform_product_id} not found', 404)
 
@@ -1,8 +1,8 @@
 from flask import Blueprint, request, current_app
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
-from app.models.affiliate_reviews import AffiliateReviewPatch, AffiliateReviewCreate
-from lib.db_utils import to_json
+from app.api.utils import get_pagination
+from app.models.affiliate_reviews import AffiliateReviewPatch, AffiliateReviewCreate, AffiliateReviewsModel
 from lib.http_utils import respond_success, respond_error
 from app.api.exceptions import UnprocessableEntityException
 
@@ -28,8 +28,14 @@ def get_affiliate_reviews():
     Requires authentication and admin privileges.
     """
     affiliate_reviews_model = get_models(current_app).affiliate_reviews
+    pagination = get_pagination(AffiliateReviewsModel.sort_fields)
+
+    if pagination is not None:
+        page = affiliate_reviews_model.get_page(pagination)
+        return respond_success(page.items, meta=page.meta)
+
     affiliate_reviews_list = affiliate_reviews_model.get_all()
-    return respond_success(to_json(affiliate_reviews_list))
+    return respond_success(affiliate_reviews_list)
 
 
 @affiliate_reviews_controller.route('/<string:review_id>', methods=["GET"])
@@ -45,7 +51,7 @@ def get_affiliate_review_by_id(review_id):
     affiliate_reviews_model = get_models(current_app).affiliate_reviews
     review = affiliate_reviews_model.get(review_id)
     if review:
-        return respond_success(review.to_json())
+        return respond_success(review)
     else:
         return respond_error(f'Affiliate review with ID {review_id} not found', 404)
 
@@ -70,7 +76,7 @@ def create_affiliate_review():
     review_data = AffiliateReviewCreate(**data)
     affiliate_reviews_model = get_models(current_app).affiliate_reviews
     new_review = affiliate_reviews_model.create(review_data)
-    return respond_success(new_review.to_json(), status_code=201)
+    return respond_success(new_review, status_code=201)
 
 
 @affiliate_reviews_controller.route('/<string:review_id>', methods=["PATCH"])
@@ -92,7 +98,7 @@ def update_affiliate_review(review_id):
     affiliate_reviews_model = get_models(current_app).affiliate_reviews
     updated_review = affiliate_reviews_model.patch(review_id, review_patch_data)
     if updated_review:
-        return respond_success(updated_review.to_json())
+        return respond_success(updated_review)
     else:
         return respond_error(f'Affiliate review with ID {review_id} not found', 404)
 
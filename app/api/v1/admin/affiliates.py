@@ -3,8 +3,8 @@ from flask import Blueprint, request, current_app
 from app.api.exceptions import UnprocessableEntityException
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
-from app.models.affiliates import AffiliatePatch, AffiliateCreate
-from lib.db_utils import to_json
+from app.api.utils import get_pagination
+from app.models.affiliates import AffiliatePatch, AffiliateCreate, AffiliatesModel
 from lib.http_utils import respond_success, respond_error
 
 affiliates_controller = Blueprint('affiliates', __name__, url_prefix='/affiliates')
@@ -21,8 +21,14 @@ def get_affiliates():
     Requires authentication and admin privileges.
     """
     affiliates_model = get_models(current_app).affiliates
+    pagination = get_pagination(AffiliatesModel.sort_fields)
+
+    if pagination is not None:
+        page = affiliates_model.get_page(pagination)
+        return respond_success(page.items, meta=page.meta)
+
     affiliates_list = affiliates_model.get_all()
-    return respond_success(to_json(affiliates_list))
+    return respond_success(affiliates_list)
 
 
 @affiliates_controller.route('/<string:affiliate_id>', methods=["GET"])
@@ -38,7 +44,7 @@ def get_affiliate_by_id(affiliate_id):
     affiliates_model = get_models(current_app).affiliates
     affiliate = affiliates_model.get(affiliate_id)
     if affiliate:
-        return respond_success(affiliate.to_json())
+        return respond_success(affiliate)
     else:
         return respond_error(f'Affiliate with ID {affiliate_id} not found', 404)
 
@@ -60,7 +66,7 @@ def create_affiliate():
         new_affiliate = affiliates_model.create(affiliate_data)
     except TypeError:
         raise UnprocessableEntityException("Invalid data provided.")
-    return respond_success(new_affiliate.to_json(), status_code=201)
+    return respond_success(new_affiliate, status_code=201)
 
 
 @affiliates_controller.route('/<string:affiliate_id>', methods=["PATCH"])
@@ -79,7 +85,7 @@ def update_affiliate(affiliate_id):
     updated_affiliate = affiliates_model.patch(affiliate_id, affiliate_patch_data)
 
     if updated_affiliate:
-        return respond_success(updated_affiliate.to_json())
+        return respond_success(updated_affiliate)
     else:
         return respond_error(f'Affiliate with ID {affiliate_id} not found', 404)
 
@@ -1,11 +1,11 @@
 from flask import Blueprint, request, current_app
 
 from app.middlewares import requires_auth, requires_role
-from app.models.operating_systems import OperatingSystemCreate, OperatingSystemPatch
+from app.api.utils import get_pagination
+from app.models.operating_systems import OperatingSystemCreate, OperatingSystemPatch, OperatingSystemsModel
 from app.models import get_models
 from app.api import exceptions as handlers_exceptions
 from lib.http_utils import respond_success, respond_error
-from lib import db_utils
 
 operating_systems_controller = Blueprint(
     'operating-systems', __name__, url_prefix='/operating-systems')
@@ -30,8 +30,13 @@ def get_operating_systems():
     """
 
     operating_systems_model = get_models(current_app).operating_systems
+    pagination = get_pagination(OperatingSystemsModel.sort_fields)
 
-    return respond_success(db_utils.to_json(operating_systems_model.get_all()))
+    if pagination is not None:
+        page = operating_systems_model.get_page(pagination)
+        return respond_success(page.items, meta=page.meta)
+
+    return respond_success(operating_systems_model.get_all())
 
 
 @operating_systems_controller.route('/<string:operating_system_id>', methods=["GET"])
@@ -56,7 +61,7 @@ def get_operating_system_by_id(operating_system_id: str):
     if not operating_system:
         return respond_error(f'The operating system with ID {operating_system_id} was not found.', 404)
 
-    return respond_success(operating_system.to_json())
+    return respond_success(operating_system)
 
 
 @operating_systems_controller.route('/', methods=["POST"])
@@ -86,7 +91,7 @@ def create_operating_system():
     operating_systems_model = get_models(current_app).operating_systems
     created_operating_system = operating_systems_model.create(OperatingSystemCreate(**new_os))
 
-    return respond_success(created_operating_system.to_json(), None, 201)
+    return respond_success(created_operating_system, None, 201)
 
 
 @operating_systems_controller.route('/<string:operating_system_id>', methods=["PATCH"])
@@ -122,7 +127,7 @@ def update_operating_system(operating_system_id: str):
     if result is None:
         return respond_error(f'The operating system with ID {operating_system_id} was not found.', 404)
 
-    return respond_success(result.to_json())
+    return respond_success(result)
 
 
 @operating_systems_controller.route('/<string:operating_system_id>', methods=["DELETE"])
@@ -146,4 +151,4 @@ def delete_operating_system(operating_system_id: str):
     if deleted_operating_system is None:
         return respond_error(f'The operating system with ID {operating_system_id} was not found.', 404)
 
-    return respond_success({"message": f"Operating system id {operating_system_id} successfully deleted", "deleted_os": deleted_operating_system.to_json()})
+    return respond_success({"message": f"Operating system id {operating_system_id} successfully deleted", "deleted_os": deleted_operating_system})
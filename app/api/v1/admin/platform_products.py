@@ -3,8 +3,8 @@ from flask import Blueprint, request, current_app
 from app.api.exceptions import UnprocessableEntityException
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
-from app.models.platform_products import PlatformProductPatch, PlatformProductCreate
-from lib.db_utils import to_json
+from app.api.utils import get_pagination
+from app.models.platform_products import PlatformProductPatch, PlatformProductCreate, PlatformProductsModel
 from lib.http_utils import respond_success, respond_error
 
 platform_products_controller = Blueprint('platform_products', __name__, url_prefix='/platform_products')
@@ -21,8 +21,14 @@ def get_platform_products():
     Requires authentication and admin privileges.
     """
     platform_products_model = get_models(current_app).platform_products
+    pagination = get_pagination(PlatformProductsModel.sort_fields)
+
+    if pagination is not None:
+        page = platform_products_model.get_page(pagination)
+        return respond_success(page.items, meta=page.meta)
+
     platform_products_list = platform_products_model.get_all()
-    return respond_success(to_json(platform_products_list))
+    return respond_success(platform_products_list)
 
 
 @platform_products_controller.route('/<string:platform_product_id>', methods=["GET"])
@@ -38,7 +44,7 @@ def get_platform_product_by_id(platform_product_id):
     platform_products_model = get_models(current_app).platform_products
     platform_product = platform_products_model.get(platform_product_id)
     if platform_product:
-        return respond_success(platform_product.to_json())
+        return respond_success(platform_product)
     else:
         return respond_error(f'Platform product with ID {platform_product_id} not found', 404)
 
@@ -60,7 +66,7 @@ def create_platform_product():
         new_platform_product = platform_products_model.create(platform_product_data)
     except TypeError:
         raise UnprocessableEntityException("Invalid data provided.")
-    return respond_success(new_platform_product.to_json(), status_code=201)
+    return respond_success(new_platform_product, status_code=201)
 
 
 @platform_products_controller.route('/<string:platform_product_id>', methods=["PATCH"])
@@ -79,7 +85,7 @@ def update_platform_product(platform_product_id):
     updated_platform_product = platform_products_model.patch(platform_product_id, platform_product_patch_data)
 
     if updated_platform_product:
-        return respond_success(updated_platform_product.to_json())
+        return respond_success(updated_platform_product)
     else:
         return respond_error(f'Platform product with ID {platform_product_id} not found', 404)
 
@@ -3,8 +3,8 @@ from flask import Blueprint, request, current_app
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
 from app.api import exceptions as handlers_exceptions
-from app.models.platforms import PlatformCreate, PlatformPatch
-from lib import db_utils
+from app.api.utils import get_pagination
+from app.models.platforms import PlatformCreate, PlatformPatch, PlatformsModel
 from lib.http_utils import respond_success, respond_error
 
 platforms_controller = Blueprint(
@@ -36,8 +36,13 @@ def get_platforms():
     """
 
     platforms_model = get_models(current_app).platforms
+    pagination = get_pagination(PlatformsModel.sort_fields)
 
-    return respond_success(db_utils.to_json(platforms_model.get_all()))
+    if pagination is not None:
+        page = platforms_model.get_page(pagination)
+        return respond_success(page.items, meta=page.meta)
+
+    return respond_success(platforms_model.get_all())
 
 
 @platforms_controller.route('/<string:platform_id>', methods=["GET"])
@@ -62,7 +67,7 @@ def get_platform_by_id(platform_id: str):
     if not platform:
         return respond_error(f'The platform with ID {platform_id} was not found.', 404)
 
-    return respond_success(platform.to_json())
+    return respond_success(platform)
 
 
 @platforms_controller.route('/', methods=["POST"])
@@ -92,7 +97,7 @@ def create_platform():
     platforms_model = get_models(current_app).platforms
     created_platform = platforms_model.create(PlatformCreate(**new_platform))
 
-    return respond_success(created_platform.to_json(), None, 201)
+    return respond_success(created_platform, None, 201)
 
 
 @platforms_controller.route('/<string:platform_id>', methods=["PATCH"])
@@ -126,7 +131,7 @@ def update_platform(platform_id: str):
     platforms_model = get_models(current_app).platforms
     result = platforms_model.patch(platform_id, PlatformPatch(**data))
 
-    return respond_success(result.to_json())
+    return respond_success(result)
 
 
 @platforms_controller.route('/<string:platform_id>', methods=["DELETE"])
@@ -150,4 +155,4 @@ def delete_platform(platform_id: str):
     if deleted_platform is None:
         return respond_error(f'The platform with ID {platform_id} was not found.', 404)
 
-    return respond_success({"message": f"Platform id {platform_id} successfully deleted", "deleted_platform": deleted_platform.to_json()})
+    return respond_success({"message": f"Platform id {platform_id} successfully deleted", "deleted_platform": deleted_platform})
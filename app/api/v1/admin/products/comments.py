@@ -4,7 +4,6 @@ from app.api.exceptions import UnprocessableEntityException
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
 from app.models.product_comments import ProductCommentPatch, ProductCommentCreate
-from lib.db_utils import to_json
 from lib.http_utils import respond_success, respond_error
 from .router import products_controller
 
@@ -21,7 +20,7 @@ def get_product_comments(product_id: str):
     """
     product_comments_model = get_models(current_app).product_comments
     product_comments_list = product_comments_model.get_all(product_id)
-    return respond_success(to_json(product_comments_list))
+    return respond_success(product_comments_list)
 
 
 # TODO: discuss removing product_id from the URL
@@ -38,7 +37,7 @@ def get_product_comment_by_id(product_id: str, comment_id: str):
     product_comments_model = get_models(current_app).product_comments
     product_comment = product_comments_model.get(comment_id)
     if product_comment:
-        return respond_success(product_comment.to_json())
+        return respond_success(product_comment)
     else:
         return respond_error(f'Product comment with ID {comment_id} not found', 404)
 
@@ -60,7 +59,7 @@ def create_product_comment(product_id: str):
         new_product_comment = product_comments_model.create(product_comment_data)
     except TypeError:
         raise UnprocessableEntityException("Invalid data provided.")
-    return respond_success(new_product_comment.to_json(), status_code=201)
+    return respond_success(new_product_comment, status_code=201)
 
 
 @products_controller.route('/<string:product_id>/product_comments/<string:comment_id>', methods=["PATCH"])
@@ -79,7 +78,7 @@ def update_product_comment(product_id: str, comment_id: str):
     updated_product_comment = product_comments_model.patch(comment_id, product_comment_patch_data)
 
     if updated_product_comment:
-        return respond_success(updated_product_comment.to_json())
+        return respond_success(updated_product_comment)
     else:
         return respond_error(f'Product comment with ID {comment_id} not found', 404)
 
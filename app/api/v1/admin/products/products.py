@@ -1,28 +1,57 @@
 import dataclasses
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from flask import Blueprint, current_app, request
+from bson import ObjectId
+from flask import Blueprint, current_app, request, stream_with_context
 
 from app.api import exceptions
+from app.api.utils import get_pagination, get_projection
 from app.middlewares import requires_auth, requires_role
 from app.models import exceptions as models_exceptions
 from app.models import get_models
-from app.models.products import Product, ProductCreate, ProductPatch
-from lib.db_utils import to_json
-from lib.http_utils import respond_error, respond_success
+from app.models.products import Product, ProductCreate, ProductPatch, ProductsModel
+from config import app_config
+from lib.http_utils import respond_error, respond_ndjson, respond_stream, respond_success
+from lib.ndjson import Row, chunked, read_ndjson
 from .router import products_controller
 
+MAX_IMPORT_CHUNK_SIZE = 5000
+MAX_BULK_ITEMS = 10000
+
 
 @products_controller.route('/', methods=["GET"])
 @requires_auth
 @requires_role('admin')
 def get_products():
     product_model = get_models(current_app).products
-    products = product_model.get_all()
+    projection = get_projection(Product)
+    pagination = get_pagination(ProductsModel.sort_fields)
+
+    if pagination is not None:
+        page = product_model.get_page(pagination, projection=projection)
+        return respond_success(page.items, meta=page.meta)
+
+    products = product_model.iter_all(projection=projection)
+
+    return respond_stream(products)
 
-    if products is None:
-        raise models_exceptions.NotFoundException(Product.__name__)
 
-    return respond_success(to_json(products))
+@products_controller.route('/cache', methods=["GET"])
+@requires_auth
+@requires_role('admin')
+def get_products_cache():
+    product_model = get_models(current_app).products
+
+    return respond_success(product_model.cache.stats())
+
+
+@products_controller.route('/search-cache', methods=["GET"])
+@requires_auth
+@requires_role('admin')
+def get_products_search_cache():
+    search_results = get_models(current_app).search_results
+
+    return respond_success(search_results.stats())
 
 
 @products_controller.route('/<string:product_id>', methods=["GET"])
@@ -30,12 +59,12 @@ def get_products():
 @requires_role('admin')
 def get_product_by_id(product_id):
     product_model = get_models(current_app).products
-    product = product_model.get(product_id)
+    product = product_model.get(product_id, projection=get_projection(Product))
 
     if product is None:
         raise models_exceptions.NotFoundException(Product.__name__)
 
-    return respond_success(product.to_json())
+    return respond_success(product)
 
 
 @products_controller.route('/slug/<string:slug>', methods=["GET"])
@@ -43,12 +72,12 @@ def get_product_by_id(product_id):
 @requires_role('admin')
 def get_product_by_slug(slug):
     product_model = get_models(current_app).products
-    product = product_model.get_by_slug(slug)
+    product = product_model.get_by_slug(slug, projection=get_projection(Product))
 
     if product is None:
         raise models_exceptions.NotFoundException(Product.__name__)
 
-    return respond_success(product.to_json())
+    return respond_success(product)
 
 
 @products_controller.route('/', methods=["POST"])
@@ -67,11 +96,180 @@ def create_product():
     try:
         created_product = product_model.create(ProductCreate(**data))
 
-        return respond_success(created_product.to_json(), status_code=201)
+        return respond_success(created_product, status_code=201)
     except TypeError:
         raise exceptions.BadRequestException("Bad request.")
 
 
+def _parse_product(value: Any) -> Tuple[Optional[ProductCreate], Optional[str]]:
+    if not isinstance(value, dict):
+        return None, "A product must be a JSON object."
+
+    missing = [field.name for field in dataclasses.fields(ProductCreate) if field.name not in value]
+    if missing:
+        return None, f"Not all required fields are present, missing: {', '.join(missing)}."
+
+    try:
+        return ProductCreate(**value), None
+    except TypeError as error:
+        return None, str(error)
+
+
+def _import_chunk(product_model: ProductsModel, rows: List[Row]) -> Iterator[Dict[str, Any]]:
+    lines, products, reports = [], [], {}
+
+    for row in rows:
+        product, error = (None, row.error) if row.error else _parse_product(row.value)
+
+        if product is None:
+            reports[row.line] = {"line": row.line, "status": "failed", "error": error}
+        else:
+            lines.append(row.line)
+            products.append(product)
+
+    created, errors = product_model.create_many(products)
+
+    for i, (line, product) in enumerate(zip(lines, created)):
+        if i in errors:
+            reports[line] = {"line": line, "status": "failed", "error": errors[i]}
+        else:
+            reports[line] = {"line": line, "status": "created", "_id": str(product._id), "slug": product.slug}
+
+    for row in rows:
+        yield reports[row.line]
+
+
+@products_controller.route('/bulk', methods=["POST"])
+@requires_auth
+@requires_role('admin')
+def import_products():
+    """
+    Create products from an NDJSON body, one product per line, e.g. for a refresh of the whole catalog.
+
+    The body is read while it's uploaded and written in chunks with unordered bulk inserts, so memory use
+    doesn't depend on the size of the body. Send `Content-Encoding: gzip` to upload it compressed.
+    Every product gets a unique slug, derived from its slug or name.
+
+    The response is streamed as NDJSON, with the report of every line of the body on a line of its own, as soon
+    as its chunk is written: `created` with the `_id` and `slug` of the product, or `failed` with the error.
+    A failed line doesn't stop the others.
+
+    :param int chunk_size: Optional number of products written at once, defaults to `PRODUCTS_IMPORT_CHUNK_SIZE`.
+    :raises BadRequestException: If the chunk size is invalid.
+    :return: The reports of the lines in NDJSON format.
+    :rtype: Response
+    """
+    try:
+        chunk_size = int(request.args.get("chunk_size", app_config["PRODUCTS_IMPORT_CHUNK_SIZE"]))
+    except ValueError:
+        raise exceptions.BadRequestException("Chunk size must be an integer.")
+
+    if not 1 <= chunk_size <= MAX_IMPORT_CHUNK_SIZE:
+        raise exceptions.BadRequestException(f"Chunk size must be between 1 and {MAX_IMPORT_CHUNK_SIZE}.")
+
+    product_model = get_models(current_app).products
+    rows = read_ndjson(request.stream, gzipped=request.headers.get("Content-Encoding") == "gzip")
+
+    # the body is read while the response is streamed, the request must outlive the view
+    @stream_with_context
+    def reports():
+        for chunk in chunked(rows, chunk_size):
+            yield from _import_chunk(product_model, chunk)
+
+    return respond_ndjson(reports())
+
+
+def _get_bulk_items() -> List[Any]:
+    items = request.get_json()
+
+    if not isinstance(items, list) or len(items) == 0:
+        raise exceptions.BadRequestException("The request body must be a non-empty array.")
+
+    if len(items) > MAX_BULK_ITEMS:
+        raise exceptions.BadRequestException(f"At most {MAX_BULK_ITEMS} items can be sent at once.")
+
+    return items
+
+
+def _parse_patch(item: Any) -> Tuple[Optional[Tuple[str, ProductPatch]], Optional[str]]:
+    if not isinstance(item, dict) or not ObjectId.is_valid(item.get("id")) or not isinstance(item.get("patch"), dict):
+        return None, "An item must be an object with a valid \"id\" and a \"patch\" object."
+
+    product_update_fields = [field.name for field in dataclasses.fields(ProductPatch)]
+    for key in item["patch"]:
+        if key not in product_update_fields:
+            return None, f'The key "{key}" is not allowed.'
+
+    return (item["id"], ProductPatch(**item["patch"])), None
+
+
+@products_controller.route('/bulk', methods=["PATCH"])
+@requires_auth
+@requires_role('admin')
+def update_products():
+    """
+    Update many products at once, e.g. to re-price or re-tag the catalog.
+
+    The body is an array of `{"id": <product ID>, "patch": <the fields to update>}`. The updates are written
+    with unordered bulk writes, an update that fails doesn't stop the others.
+
+    :raises BadRequestException: If the body is not an array, or has too many items.
+    :return: A report per item, `updated`, `not_found` or `failed` with the error, in the order of the items.
+    :rtype: dict
+    """
+    items = _get_bulk_items()
+    product_model = get_models(current_app).products
+
+    reports: List[Dict[str, Any]] = []
+    updates = []
+    positions = []
+
+    for i, item in enumerate(items):
+        update, error = _parse_patch(item)
+        reports.append({"id": item.get("id") if isinstance(item, dict) else None, "status": "failed", "error": error})
+
+        if update is not None:
+            updates.append(update)
+            positions.append(i)
+
+    products, errors = product_model.patch_many(updates)
+
+    for j, (i, product) in enumerate(zip(positions, products)):
+        if j in errors:
+            reports[i]["error"] = errors[j]
+        else:
+            reports[i] = {"id": reports[i]["id"], "status": "not_found" if product is None else "updated"}
+
+    return respond_success(reports)
+
+
+@products_controller.route('/bulk', methods=["DELETE"])
+@requires_auth
+@requires_role('admin')
+def delete_products():
+    """
+    Delete many products at once.
+
+    The body is an array of the IDs of the products.
+
+    :raises BadRequestException: If the body is not an array of valid IDs, or has too many items.
+    :return: A report per ID, `deleted` or `not_found`, in the order of the IDs.
+    :rtype: dict
+    """
+    product_ids = _get_bulk_items()
+
+    for product_id in product_ids:
+        if not ObjectId.is_valid(product_id):
+            raise exceptions.BadRequestException(f"Invalid ID \"{product_id}\".")
+
+    deleted = get_models(current_app).products.delete_many(product_ids)
+
+    return respond_success([
+        {"id": product_id, "status": "deleted" if was_deleted else "not_found"}
+        for product_id, was_deleted in zip(product_ids, deleted)
+    ])
+
+
 @products_controller.route('/<string:product_id>', methods=["PATCH"])
 @requires_auth
 @requires_role('admin')
@@ -93,7 +291,7 @@ def update_product(product_id):
         if product is None:
             raise models_exceptions.NotFoundException(Product.__name__)
 
-        return respond_success(product.to_json())
+        return respond_success(product)
     except TypeError:
         raise exceptions.BadRequestException("Bad request.")
 
@@ -20,7 +20,7 @@ def get_product_replies(comment_id: str):
     """
     product_replies_model = get_models(current_app).product_replies
     product_replies_list = product_replies_model.get_all(comment_id)
-    return respond_success([product_reply.to_json() for product_reply in product_replies_list])
+    return respond_success(product_replies_list)
 
 
 # TODO: discuss removing comment_id from the URL
@@ -43,7 +43,7 @@ def get_product_reply_by_id(comment_id: str, reply_id: str):
     product_replies_model = get_models(current_app).product_replies
     product_reply = product_replies_model.get(reply_id)
     if product_reply:
-        return respond_success(product_reply.to_json())
+        return respond_success(product_reply)
     else:
         return respond_error(f'Product reply with ID {reply_id} not found', 404)
 
@@ -69,7 +69,7 @@ def create_product_reply(comment_id: str):
         new_product_reply = product_replies_model.create(product_reply_data)
     except TypeError:
         raise UnprocessableEntityException("Invalid data provided.")
-    return respond_success(new_product_reply.to_json(), status_code=201)
+    return respond_success(new_product_reply, status_code=201)
 
 
 @comments_controller.route('/<string:comment_id>/product_replies/<string:reply_id>', methods=["PATCH"])
@@ -92,7 +92,7 @@ def update_product_reply(comment_id: str, reply_id: str):
     updated_product_reply = product_replies_model.patch(reply_id, product_reply_patch_data)
 
     if updated_product_reply:
-        return respond_success(updated_product_reply.to_json())
+        return respond_success(updated_product_reply)
     else:
         return respond_error(f'Product reply with ID {reply_id} not found', 404)
 
@@ -2,12 +2,13 @@ from bson import ObjectId
 from flask import Blueprint, request, current_app
 from pymongo import ReturnDocument
 
+from app.api.utils import get_pagination, get_projection
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
+from app.models.profiles import Profile, ProfilesModel
 from app.services import get_services
 from config.constants import FirebaseRole
-from lib import db_utils
-from lib.http_utils import respond_success, respond_error
+from lib.http_utils import respond_success, respond_error, respond_stream
 
 profiles_controller = Blueprint('profiles', __name__, url_prefix='/profiles')
 
@@ -33,9 +34,16 @@ def get_profiles():
     :rtype: Response
     """
     profile_model = get_models(current_app).profiles
-    profiles = profile_model.get_all()
+    projection = get_projection(Profile)
+    pagination = get_pagination(ProfilesModel.sort_fields)
 
-    return respond_success(db_utils.to_json(profiles))
+    if pagination is not None:
+        page = profile_model.get_page(pagination, projection=projection)
+        return respond_success(page.items, meta=page.meta)
+
+    profiles = profile_model.iter_all(projection=projection)
+
+    return respond_stream(profiles)
 
 
 @profiles_controller.route('/<string:profile_id>', methods=["PATCH"])
@@ -38,7 +38,7 @@ def create_service_profile():
         permissions=data.get("permissions", [])
     ))
 
-    return respond_success(service_profile.to_json())
+    return respond_success(service_profile)
 
 
 @service_profiles_controller.route('/<string:profile_id>', methods=["PATCH"])
@@ -58,4 +58,4 @@ def delete_service_profile(profile_id: str):
     if profile is None:
         return respond_error("No such profile", 400)
 
-    return respond_success(profile.to_json())
+    return respond_success(profile)
@@ -3,10 +3,10 @@ from validator import rules as R, validate
 
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models
-from app.models.tags import TagCreate, TagPatch
+from app.models.tags import Tag, TagCreate, TagPatch, TagsModel
 from lib.http_utils import respond_error, respond_success
-from lib import db_utils
 from app.api.exceptions import UnprocessableEntityException
+from app.api.utils import get_pagination, get_projection
 
 tags_controller = Blueprint('tags', __name__, url_prefix='/tags')
 
@@ -29,9 +29,17 @@ def get_tags():
     :rtype: Response
     """
 
-    tags = get_models(current_app).tags.get_all()
+    tags_model = get_models(current_app).tags
+    projection = get_projection(Tag)
+    pagination = get_pagination(TagsModel.sort_fields)
 
-    return respond_success(db_utils.to_json(tags))
+    if pagination is not None:
+        page = tags_model.get_page(pagination, projection=projection)
+        return respond_success(page.items, meta=page.meta)
+
+    tags = tags_model.get_all(projection=projection)
+
+    return respond_success(tags)
 
 
 @tags_controller.route('/<string:tag_id>', methods=["GET"])
@@ -52,12 +60,12 @@ def get_tag_by_id(tag_id):
 
     try:
         tags =  get_models(current_app).tags
-        tag = tags.get(tag_id)
+        tag = tags.get(tag_id, projection=get_projection(Tag))
 
         if tag is None:
             raise IndexError(f'The tag with ID {tag_id} was not found.')
 
-        return respond_success(tag.to_json())
+        return respond_success(tag)
 
     except IndexError:
         return respond_error(f'The tag with ID {tag_id} was not found.', 404)
@@ -100,7 +108,7 @@ def create_tag():
 
     created_tag = tags.create(TagCreate(validated_data["name"]))
 
-    return respond_success(created_tag.to_json(), status_code=201)
+    return respond_success(created_tag, status_code=201)
 
 
 @tags_controller.route('/<string:tag_id>', methods=["PATCH"])
@@ -136,7 +144,7 @@ def update_tag(tag_id):
     if updated_tag is None:
         return respond_error(f'The tag with ID {tag_id} was not found.', 404)
 
-    return respond_success(updated_tag.to_json())
+    return respond_success(updated_tag)
 
 
 @tags_controller.route('/<string:tag_id>', methods=["DELETE"])
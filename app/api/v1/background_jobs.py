@@ -2,11 +2,11 @@ from flask import Blueprint, request, current_app, g
 
 from app.middlewares import requires_auth, requires_role
 from app.models import get_models, exceptions as models_exceptions
-from app.models.background_jobs import BackgroundJob, BackgroundJobCreate, BackgroundJobPatch, EventCreate
+from app.api.utils import get_pagination
+from app.models.background_jobs import BackgroundJob, BackgroundJobCreate, BackgroundJobPatch, BackgroundJobsModel, EventCreate
 from config import app_config
 from config.constants import FirebaseRole
-from lib.http_utils import respond_success
-from lib import db_utils
+from lib.http_utils import respond_success, respond_stream
 import app.api.exceptions as exceptions
 
 background_jobs_controller = Blueprint(
@@ -42,7 +42,7 @@ def get_background_job(background_job_id: str):
     if background_job.created_by != g.get("payload").get(f"{app_config['FB_NAMESPACE']}/profile_id"):
         raise models_exceptions.ForbiddenException()
 
-    return respond_success(background_job.to_json())
+    return respond_success(background_job)
 
 
 @background_jobs_controller.route('/', methods=["GET"])
@@ -55,9 +55,16 @@ def get_all_background_jobs():
     :return: The requested background jobs in JSON format.
     :rtype: dict
     """
-    jobs = get_models(current_app).background_jobs.get_all()
+    background_jobs_model = get_models(current_app).background_jobs
+    pagination = get_pagination(BackgroundJobsModel.sort_fields)
 
-    return respond_success(db_utils.to_json(jobs))
+    if pagination is not None:
+        page = background_jobs_model.get_page(pagination)
+        return respond_success(page.items, meta=page.meta)
+
+    jobs = background_jobs_model.iter_all()
+
+    return respond_stream(jobs)
 
 
 @background_jobs_controller.route('/', methods=["POST"])
@@ -83,7 +90,7 @@ def create_background_job():
         background_job = background_job_model.create(
             BackgroundJobCreate(**data, created_by=g.get("payload").get(f"{app_config['FB_NAMESPACE']}/profile_id")))
 
-        return respond_success(background_job.to_json(), status_code=201)
+        return respond_success(background_job, status_code=201)
     except ValueError as e:
         raise exceptions.BadRequestException(str(e))
 
@@ -107,21 +114,15 @@ def update_background_job(background_job_id: str):
         raise exceptions.BadRequestException("No valid fields are present")
 
     background_job_model = get_models(current_app).background_jobs
-
-    background_job = get_models(
-        current_app).background_jobs.get(background_job_id)
-    if background_job is None:
-        raise models_exceptions.NotFoundException(BackgroundJob.__name__)
-    if background_job.created_by != g.get("payload").get(f"{app_config['FB_NAMESPACE']}/profile_id"):
-        raise models_exceptions.ForbiddenException()
+    invoker_id = g.get("payload").get(f"{app_config['FB_NAMESPACE']}/profile_id")
 
     try:
         background_job = background_job_model.patch(
-            background_job_id, BackgroundJobPatch(**data))
+            background_job_id, BackgroundJobPatch(**data), created_by=invoker_id)
         if background_job is None:
             raise models_exceptions.NotFoundException(BackgroundJob.__name__)
 
-        return respond_success(background_job.to_json())
+        return respond_success(background_job)
     except ValueError as e:
         raise exceptions.BadRequestException(str(e))
     except TypeError:
@@ -148,19 +149,14 @@ def create_background_job_event(background_job_id: str):
         raise exceptions.BadRequestException(
             "Not all required fields are present")
 
-    background_job = get_models(
-        current_app).background_jobs.get(background_job_id)
-    if background_job is None:
-        raise models_exceptions.NotFoundException(BackgroundJob.__name__)
-    if background_job.created_by != g.get("payload").get(f"{app_config['FB_NAMESPACE']}/profile_id"):
-        raise models_exceptions.ForbiddenException()
+    invoker_id = g.get("payload").get(f"{app_config['FB_NAMESPACE']}/profile_id")
 
     try:
         background_job = get_models(current_app).background_jobs.add_event(
-            background_job_id, EventCreate(**data))
+            background_job_id, EventCreate(**data), created_by=invoker_id)
         if background_job is None:
             raise models_exceptions.NotFoundException(BackgroundJob.__name__)
 
-        return respond_success(background_job.to_json())
+        return respond_success(background_job)
     except ValueError as e:
         raise exceptions.BadRequestException(str(e))
@@ -33,7 +33,7 @@ def logins():
     try:
         identity = logins_model.login(email, password)
 
-        return respond_success(identity.to_json())
+        return respond_success(identity)
     except InvalidLoginCredentialsException as error:
         return respond_error('Wrong email or password.', 403)
     except Exception as error:
@@ -67,7 +67,7 @@ def logins_m2m():
         if token is None:
             return respond_error("Client id or client secret is incorrect", 401)
 
-        return respond_success(token.to_json())
+        return respond_success(token)
     except Exception as error:
         return respond_error(str(error), 500)
 
@@ -94,6 +94,6 @@ def exchange_refresh_token():
     try:
         identity = logins_model.exchange_refresh_token(refresh_token)
 
-        return respond_success(identity.to_json())
+        return respond_success(identity)
     except Exception as error:
         return respond_error(str(error), 500)
@@ -1,8 +1,10 @@
 from flask import Blueprint, request, current_app
 
+from app.api.utils import get_pagination, get_validators
 from app.models import get_models
+from app.models.platforms import PlatformsModel
 from app.services import get_services
-from lib.http_utils import respond_success, respond_error
+from lib.http_utils import respond_conditional, respond_error
 
 platforms_controller = Blueprint(
     'platforms', __name__, url_prefix='/platforms')
@@ -15,11 +17,17 @@ def get_platforms():
 
     The function fetches platforms that are enabled from the database.
 
-    :return: A list of enabled platforms or an error message.
+    :return: A list of enabled platforms, 304 if the client has it already, or an error message.
     :rtype: Response
     """
 
     platforms_model = get_models(current_app).platforms
+    pagination = get_pagination(PlatformsModel.sort_fields)
+
+    if pagination is not None:
+        page = platforms_model.get_page(pagination)
+        return respond_conditional(page.items, *get_validators(page.items, page.meta), meta=page.meta)
+
     all_platforms = platforms_model.get_all()
 
-    return respond_success(all_platforms)
+    return respond_conditional(all_platforms, *get_validators(all_platforms))
@@ -1,13 +1,46 @@
 from flask import Blueprint, current_app
 
+from app.api.exceptions import BadRequestException
+from app.api.utils import get_ids, get_projection, get_validators
 from app.models.products import Product
-from lib.http_utils import respond_success
+from lib.http_utils import respond_conditional
 
 from app.models import get_models, exceptions as models_exceptions
 
 products_controller = Blueprint('products', __name__, url_prefix='/products')
 
 
+@products_controller.route('/', methods=["GET"])
+def get_products():
+    """
+    Retrieve products by their IDs, e.g. to hydrate a page of search results in one request.
+
+    The products are returned in the order of the IDs. IDs of products that don't exist are listed
+    in the `missing` field of the meta.
+
+    :param str ids: Comma-separated list of the IDs of the products.
+    :param str fields: Optional comma-separated list of the fields to return.
+    :return: The requested products in JSON format, or 304 if the client has them already.
+    :raises BadRequestException: If the IDs are missing or invalid.
+    :rtype: dict
+    """
+
+    product_ids = get_ids()
+
+    if product_ids is None:
+        raise BadRequestException("The IDs of the products must be requested with \"ids\".")
+
+    products = get_models(current_app).products.get_many(product_ids, projection=get_projection(Product))
+
+    # names of the tags are resolved on read, renaming a tag changes the response but not the products
+    etag, last_modified = get_validators(
+        products.items,
+        [(getattr(product, "genres", None), getattr(product, "categories", None)) for product in products.items]
+    )
+
+    return respond_conditional(products.items, etag, last_modified, meta=products.meta)
+
+
 @products_controller.route('/<string:product_slug>', methods=["GET"])
 def get_product_by_slug(product_slug: str):
     """
@@ -17,16 +50,25 @@ def get_product_by_slug(product_slug: str):
     A slug is a human-readable, URL-friendly unique identifier for a product.
 
     :param str product_slug: The slug of the product to retrieve.
-    :return: The requested product in JSON format.
+    :param str fields: Optional comma-separated list of the fields to return.
+    :return: The requested product in JSON format, or 304 if the client has it already.
     :raises NotFoundException: If the product with the given slug does not exist.
     :rtype: dict
     """
 
     product_model = get_models(current_app).products
-    product = product_model.get_by_slug(product_slug)
+    product = product_model.get_by_slug(product_slug, projection=get_projection(Product))
 
     if product is None:
         raise models_exceptions.NotFoundException(Product.__name__)
 
-    return respond_success(product.to_json())
+    # names of the tags are resolved on read, renaming a tag changes the response but not the product
+    etag, last_modified = get_validators(
+        [product],
+        getattr(product, "genres", None),
+        getattr(product, "categories", None),
+        single=True
+    )
+
+    return respond_conditional(product, etag, last_modified)
 
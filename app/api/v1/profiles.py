@@ -1,5 +1,7 @@
 from flask import Blueprint, request, g, current_app
 
+from app.api.exceptions import BadRequestException
+from app.api.utils import get_ids, get_projection
 from app.middlewares import requires_auth
 from config import app_config
 from lib.http_utils import respond_error, respond_success
@@ -10,6 +12,31 @@ from app.models.profiles import Profile, ProfileCreate
 profiles_controller = Blueprint('profiles', __name__, url_prefix='/profiles')
 
 
+@profiles_controller.route('/', methods=["GET"])
+def get_profiles():
+    """
+    Retrieve user profiles by their IDs, e.g. to show the authors of a page of comments in one request.
+
+    The profiles are returned in the order of the IDs. IDs of profiles that don't exist are listed
+    in the `missing` field of the meta.
+
+    :param str ids: Comma-separated list of the IDs of the profiles.
+    :param str fields: Optional comma-separated list of the fields to return.
+    :raises BadRequestException: If the IDs are missing or invalid.
+    :return: The requested profiles in JSON format.
+    :rtype: dict
+    """
+
+    profile_ids = get_ids()
+
+    if profile_ids is None:
+        raise BadRequestException("The IDs of the profiles must be requested with \"ids\".")
+
+    profiles = get_models(current_app).profiles.get_many(profile_ids, projection=get_projection(Profile))
+
+    return respond_success(profiles.items, profiles.meta)
+
+
 @profiles_controller.route('/<string:profile_id>', methods=["GET"])
 def get_profile(profile_id: str):
     """
@@ -19,18 +46,19 @@ def get_profile(profile_id: str):
     The function raises an exception if the profile is not found.
 
     :param str profile_id: The unique identifier of the profile to be retrieved.
+    :param str fields: Optional comma-separated list of the fields to return.
     :raises NotFoundException: If the profile with the given ID does not exist.
     :return: The requested profile in JSON format.
     :rtype: dict
     """
 
     profile_model = get_models(current_app).profiles
-    profile = profile_model.get(profile_id)
+    profile = profile_model.get(profile_id, projection=get_projection(Profile))
 
     if profile is None:
         raise models_exceptions.NotFoundException(Profile.__name__)
 
-    return respond_success(profile.to_json())
+    return respond_success(profile)
 
 
 @profiles_controller.route('/', methods=["POST"])
@@ -62,7 +90,7 @@ def create_profile():
 
     profile = profile_model.create(profile_data)
 
-    return respond_success(profile.to_json(), None, 201)
+    return respond_success(profile, None, 201)
 
 
 @profiles_controller.route('/<string:profile_id>', methods=["PATCH"])
@@ -133,4 +161,4 @@ def get_authenticated_profile():
     if profile is None:
         raise models_exceptions.NotFoundException(Profile.__name__)
 
-    return respond_success(profile.to_json())
+    return respond_success(profile)
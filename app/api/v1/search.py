@@ -1,110 +1,289 @@
+from typing import Any, Dict, List, Optional, Tuple
+
 from flask import Blueprint, current_app, request
 from math import ceil
-import re
 
 from lib.http_utils import respond_success
+from app.api.exceptions import BadRequestException
+from app.api.utils import get_ids, get_pagination, get_projection
+from app.models import ModelsExtension, get_models
+from app.models.pagination import Pagination, find_page
+from app.models.product_cards import ProductCard, ProductCardsModel
+from app.models.product_search import ProductSearchModel, SearchFilters
+from app.models.products import Product, ProductsModel
+from app.models.projection import Projection
 from app.services import get_services
 
 search_controller = Blueprint('search', __name__, url_prefix='/search')
 
+COUNT_MODES = ("exact", "approx", "none")
+SEARCH_MODES = ("database", "memory")
+MAX_FILTER_VALUES = 20
+MAX_SUGGESTIONS = 20
+
 
 @search_controller.route('/', methods=["GET"])
 def search():
     """
-    Execute a search query on the products collection with pagination and aggregation.
+    Execute a search query on the products collection with pagination.
 
-    This endpoint performs a search operation on the products collection based on a query parameter.
-    It supports pagination and applies an aggregation pipeline for retrieving product details along with their associated genres.
-    The search is case-insensitive and matches any part of the product name.
-    Pagination details such as page number, limit per page, and total count are included in the response metadata.
+    Every word of the query must be found in a product, regardless of case and accents. The products are sorted by
+    relevance, best first, unless another sort is requested, and have the names of their genres and categories.
+    The `next_cursor` of the response metadata is passed as `after` to read the next page. The response metadata
+    also has the page number, the limit per page, the total count and the page count, which are null with
+    `count=none`. With `count=approx`, the matches are counted up to a limit, and `total_count_exact` is false
+    if the count stopped there.
+    With `mode=memory`, a query matches whole words and the beginnings of words of the name, short description,
+    developers, publishers, genres and categories of the products, instead of any part of their name and short
+    description, and its matches are always counted exactly.
+    A product matches a filter with several values if it has any of them, and must match all of the filters.
+    With `facets`, the matches are also counted by the values of the given facets, in `facets` of the response
+    metadata, each of them with all of the filters but its own. `facet_counts_exact` is false if not all of the
+    matches were counted.
+    Results may be cached for a short time, until a product or a tag is written.
 
-    :param int page: The page number for pagination, defaults to 1 if not specified.
+    :param int page: The page number for pagination, defaults to 1 if not specified, ignored with `after`.
     :param str query: The search query string, defaults to an empty string if not specified.
     :param int limit: The number of items per page, defaults to 15 if not specified.
+    :param str after: The cursor of the page, i.e. the `next_cursor` of the previous page.
+    :param str sort: The sort of the products, `_id`, `name` or `created_at`, prefixed with `-` for descending order.
+        `-score` sorts by relevance to the query and is the default when there is one.
+    :param str fields: Optional comma-separated list of the product fields to return.
+    :param str view: `cards` to return the cards of the products, the products themselves if not specified.
+    :param str count: How to count the matches, `exact`, `approx` or `none`, defaults to `exact`.
+    :param str mode: Where a query is searched, `database` or `memory`, defaults to `database`.
+    :param str genres: Optional comma-separated list of the IDs of genres, the products have any of.
+    :param str categories: Optional comma-separated list of the IDs of categories, the products have any of.
+    :param str platforms_os: Optional comma-separated list of operating systems, e.g. `windows,linux`.
+    :param str supported_languages: Optional comma-separated list of languages, e.g. `English,German`.
+    :param str platforms: Optional comma-separated list of the stores the products are sold on, e.g. `steam`.
+    :param str is_free: Optional `true` or `false`.
+    :param int required_age: The age of the user, products that require an older one are left out.
+    :param int price_min: The lowest final price, in cents of `currency`.
+    :param int price_max: The highest final price, in cents of `currency`.
+    :param str currency: The currency of the price filter and facet, defaults to `USD`.
+    :param str facets: Optional comma-separated list of the facets to count, out of `genres`, `categories`,
+        `platforms_os`, `supported_languages`, `platforms`, `is_free`, `required_age` and `price`.
     :return: A dictionary containing the list of matching products and pagination metadata.
     :rtype: dict
+    :raises BadRequestException: If a parameter is invalid.
     """
 
     page = request.args.get("page", 1, type=int)
-    query = request.args.get("query", "")
-    limit = request.args.get("limit", 15, type=int)
-
-    db = get_services(current_app).db.connection
-    products = db["products"]
-
-    aggregation_pipeline = [
-        {
-            '$match': {
-                'name': {'$regex': re.compile(f'(?i)({query})')}
-            }
-        },
-        {
-            '$facet': {
-                'items': [
-                    {'$skip': (page - 1) * limit},
-                    {'$limit': limit},
-                    {
-                        '$lookup': {
-                            'from': 'tags',
-                            'let': {'genreIds': '$genres'},
-                            'pipeline': [
-                                {'$match': {'$expr': {'$in': ['$_id', '$$genreIds']}}},
-                                {'$project': {'name': 1, '_id': 0}}
-                            ],
-                            'as': 'genres'
-                        }
-                    },
-                    {
-                        '$lookup': {
-                            'from': 'tags',
-                            'let': {'categoryIds': '$categories'},
-                            'pipeline': [
-                                {'$match': {'$expr': {'$in': ['$_id', '$$categoryIds']}}},
-                                {'$project': {'name': 1, '_id': 0}}
-                            ],
-                            'as': 'categories'
-                        }
-                    },
-                    {
-                        '$addFields': {
-                            'genres': {
-                                '$reduce': {
-                                    'input': '$genres',
-                                    'initialValue': [],
-                                    'in': {'$concatArrays': ['$$value', ['$$this.name']]}
-                                }
-                            },
-                            'categories': {
-                                '$reduce': {
-                                    'input': '$categories',
-                                    'initialValue': [],
-                                    'in': {'$concatArrays': ['$$value', ['$$this.name']]}
-                                }
-                            }
-                        }
-                    }
-                ],
-                'count': [{'$count': "count"}]
-            }
-        }
-    ]
-
-    result = (*products.aggregate(aggregation_pipeline),)
-
-    data, count = result[0].values()
-    count = count[0].get("count", 0) if len(count) != 0 else 0
-
-    for item in data:
-        item["_id"] = str(item["_id"])
+    if page < 1:
+        raise BadRequestException("Page must be at least 1.")
+
+    count_mode = request.args.get("count", "exact")
+    if count_mode not in COUNT_MODES:
+        raise BadRequestException(f"Count must be one of {', '.join(COUNT_MODES)}.")
+
+    mode = request.args.get("mode", "database")
+    if mode not in SEARCH_MODES:
+        raise BadRequestException(f"Mode must be one of {', '.join(SEARCH_MODES)}.")
+
+    filters = _get_filters()
+    facet_names = _get_facet_names()
+
+    cards = request.args.get("view") == "cards"
+    projection = get_projection(ProductCard if cards else Product)
+    models = get_models(current_app)
+    query_words = models.product_search.parse(request.args.get("query", ""))
+
+    if query_words:
+        pagination = get_pagination(
+            ProductSearchModel.sort_fields,
+            optional=False,
+            default_limit=15,
+            default_sort=ProductSearchModel.default_sort
+        )
+    else:
+        pagination = get_pagination(
+            ProductCardsModel.sort_fields if cards else ProductsModel.sort_fields,
+            optional=False,
+            default_limit=15
+        )
+
+    # the words of the query are normalized, so that queries that differ in case, accents or punctuation share results
+    query = " ".join(query_words)
+    key = (
+        query, mode if query_words or filters.selected() or facet_names else None, cards, count_mode, page,
+        pagination.limit, pagination.sort, pagination.after, tuple(projection.fields) if projection else None,
+        filters, facet_names
+    )
+    data, meta = models.search_results.get_or_load(
+        query, key, lambda: _search(
+            models, query_words, filters, facet_names, pagination, page, count_mode, mode, cards, projection
+        )
+    )
+
+    return respond_success(data, meta=meta)
+
+
+def _search(
+        models: ModelsExtension,
+        query_words: List[str],
+        filters: SearchFilters,
+        facet_names: Tuple[str, ...],
+        pagination: Pagination,
+        page: int,
+        count_mode: str,
+        mode: str,
+        cards: bool,
+        projection: Optional[Projection]
+) -> Tuple[List[Any], Dict[str, Any]]:
+    limit = pagination.limit
+    skip = (page - 1) * limit if pagination.after is None else 0
+
+    if mode == "memory" and (query_words or filters.selected()):
+        if query_words:
+            include = models.product_catalog.matcher(filters) if filters.selected() else None
+            result, matches = models.product_index.search(query_words, pagination, skip=skip, include=include)
+        else:
+            result, matches = models.product_catalog.find_page(filters, pagination, skip=skip)
+        count = matches if count_mode != "none" else None
+        count_exact = count is not None
+
+        data = (models.product_cards if cards else models.products).get_many(result.items, projection).items
+    elif query_words or filters.selected():
+        product_search_model = models.product_search
+
+        result = product_search_model.find_page(query_words, pagination, skip=skip, filters=filters)
+        count_limit = product_search_model.approx_count_limit if count_mode == "approx" else 0
+        count = product_search_model.count(query_words, count_limit, filters) if count_mode != "none" else None
+        count_exact = count is not None and (count_limit == 0 or count < count_limit)
+
+        # the products of the page are read by their IDs, in the order of the search
+        data = (models.product_cards if cards else models.products).get_many(result.items, projection).items
+    elif cards:
+        product_cards_model = models.product_cards
+
+        result = product_cards_model.find_page({}, pagination, projection, skip=skip)
+        count = product_cards_model.count({}) if count_mode != "none" else None
+        count_exact = count is not None
+
+        data = result.items
+    else:
+        db = get_services(current_app).db.connection
+        products_model = models.products
+        products = db[products_model.collection]
+
+        result = find_page(products, {}, pagination, products_model.resolve_tags, projection, skip=skip)
+        count = products.estimated_document_count() if count_mode != "none" else None
+        count_exact = count is not None
+
+        data = result.items
+
+        for item in data:
+            item["_id"] = str(item["_id"])
 
     meta = {
         "total_count": count,
+        "total_count_exact": count_exact,
         "items_per_page": limit,
         "items_on_page": len(data),
-        "page_count": ceil(count / limit),
-        "page": page
+        "page_count": ceil(count / limit) if count is not None else None,
+        "page": page,
+        "next_cursor": result.next_cursor
     }
 
-    return respond_success(data, meta=meta)
+    if facet_names:
+        if mode == "memory":
+            keys = models.product_index.match(query_words) if query_words else None
+            facets, facets_exact = models.product_catalog.facets(filters, facet_names, keys)
+        else:
+            facets, facets_exact = models.product_search.facets(query_words, filters, facet_names)
+
+        tag_names = models.tags.names.get()
+
+        for name in ("genres", "categories"):
+            for value in facets.get(name, []):
+                value["name"] = tag_names.get(value["value"])
+
+        meta["facets"] = facets
+        meta["facet_counts_exact"] = facets_exact
+
+    return data, meta
+
+
+def _get_list(name: str) -> Tuple[str, ...]:
+    values = tuple(value.strip() for value in request.args.get(name, "").split(",") if value.strip())
+
+    if len(values) > MAX_FILTER_VALUES:
+        raise BadRequestException(f"At most {MAX_FILTER_VALUES} values of {name} can be given.")
+
+    return values
+
+
+def _get_amount(name: str) -> Optional[int]:
+    value = request.args.get(name)
+
+    if value is None:
+        return None
+
+    try:
+        amount = int(value)
+    except ValueError:
+        raise BadRequestException(f"{name} must be an integer.")
+
+    if amount < 0:
+        raise BadRequestException(f"{name} must not be negative.")
+
+    return amount
+
+
+def _get_filters() -> SearchFilters:
+    is_free = request.args.get("is_free")
+    if is_free not in (None, "true", "false"):
+        raise BadRequestException("is_free must be true or false.")
+
+    return SearchFilters(
+        genres=tuple(get_ids("genres") or ()),
+        categories=tuple(get_ids("categories") or ()),
+        platforms_os=_get_list("platforms_os"),
+        supported_languages=_get_list("supported_languages"),
+        platforms=_get_list("platforms"),
+        is_free=None if is_free is None else is_free == "true",
+        required_age=_get_amount("required_age"),
+        price_min=_get_amount("price_min"),
+        price_max=_get_amount("price_max"),
+        currency=request.args.get("currency", "USD").upper()
+    )
+
+
+def _get_facet_names() -> Tuple[str, ...]:
+    names = _get_list("facets")
+
+    for name in names:
+        if name not in ProductSearchModel.facet_names:
+            raise BadRequestException(f"Facets must be some of {', '.join(ProductSearchModel.facet_names)}.")
+
+    return tuple(dict.fromkeys(names))
+
+
+@search_controller.route('/suggest', methods=["GET"])
+def suggest():
+    """
+    Suggest products for what was typed so far in a search box.
+
+    Products are suggested when their name, their name from one of its words onwards, or their slug starts with
+    the prefix, regardless of case and accents. The most popular products, those with the most comments, come first.
+    The suggestions are read from the in-memory index of the worker, `ProductIndex`, without a query to the
+    database, so they can be requested on every keystroke.
+
+    :param str prefix: What was typed so far, e.g. `grand th`.
+    :param int limit: The number of suggestions, between 1 and 20, defaults to 10.
+    :return: The `_id`, `name` and `slug` of the suggested products, empty without a prefix.
+    :rtype: dict
+    :raises BadRequestException: If the limit is invalid.
+    """
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        raise BadRequestException("Limit must be an integer.")
+
+    if not 1 <= limit <= MAX_SUGGESTIONS:
+        raise BadRequestException(f"Limit must be between 1 and {MAX_SUGGESTIONS}.")
 
+    suggestions = get_models(current_app).product_index.suggest(request.args.get("prefix", ""), limit)
 
+    return respond_success(suggestions)
@@ -1,8 +1,9 @@
 from flask import Blueprint, current_app
 
+from app.api.utils import get_pagination, get_projection, get_validators
 from app.models import get_models
-from lib import db_utils
-from lib.http_utils import respond_success
+from app.models.tags import Tag, TagsModel
+from lib.http_utils import respond_conditional
 
 tags_controller = Blueprint(
     'tags', __name__, url_prefix='/tags')
@@ -15,9 +16,18 @@ def get_tags():
 
     It retrieves all tags from the database.
 
-    :return: A success response with the list of all tags.
+    :return: A success response with the list of all tags, or 304 if the client has it already.
     :rtype: dict
     """
-    tags = get_models(current_app).tags.get_all()
+    tags_model = get_models(current_app).tags
+    projection = get_projection(Tag)
+    pagination = get_pagination(TagsModel.sort_fields)
 
-    return respond_success(db_utils.to_json(tags))
\ No newline at end of file
+    if pagination is not None:
+        page = tags_model.get_page(pagination, projection=projection)
+        return respond_conditional(page.items, *get_validators(page.items, page.meta), meta=page.meta)
+
+    # the validators need every tag, which is fine for a list as short as the one of tags
+    tags = tags_model.get_all(projection=projection)
+
+    return respond_conditional(tags, *get_validators(tags))
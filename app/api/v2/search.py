@@ -1,13 +1,12 @@
 import json
 
-from bson import ObjectId
 from flask import Blueprint, request, current_app
 import requests
 
+from app.models.batch import find_many
 from app.models.products import Product
 from app.services import get_services
 from lib.http_utils import respond_success, respond_error
-from lib.db_utils import to_json
 
 search_controller = Blueprint('search_v2', __name__, url_prefix='/search')
 
@@ -39,25 +38,19 @@ def search():
         return respond_error("Failed to fetch data from Elasticsearch.", response.status_code)
 
     product_ids = response.json()
-    product_object_ids = [ObjectId(id_) for id_ in product_ids]
 
     db = get_services(current_app).db.connection
     products_collection = db["products"]
 
-    aggregation_pipeline = [
-        {'$match': {'_id': {'$in': product_object_ids}}},
-        {'$lookup': {
-            'from': 'tags',
-            'localField': 'genres',
-            'foreignField': '_id',
-            'as': 'genres'
-        }},
-        {'$unset': 'genres._id'}
-    ]
+    # products keep the order of relevance of the search results
+    products = find_many(products_collection, product_ids, lambda product: product)
 
-    products_cursor = products_collection.aggregate(aggregation_pipeline)
+    # genres are substituted with the whole documents of the tags they refer to, without their IDs, as the $lookup
+    # of the tags did, with a single read of the tags of all products instead of a lookup per product
+    genre_ids = list({tag_id for product in products.items for tag_id in product.get('genres', [])})
+    tags = {tag.pop('_id'): tag for tag in db["tags"].find({'_id': {'$in': genre_ids}})} if genre_ids else {}
 
-    # Create Product instances from the documents and convert to JSON
-    products = to_json(products_cursor)
-
-    return respond_success(products)
+    return respond_success([
+        {**product, 'genres': [tags[tag_id] for tag_id in product.get('genres', []) if tag_id in tags]}
+        for product in products.items
+    ])
@@ -3,6 +3,7 @@ from os import environ as env
 from flask import Flask
 
 from config import app_config
+from lib.json_provider import BSONJSONProvider
 
 
 def configure_app(app: Flask):
@@ -10,3 +11,5 @@ def configure_app(app: Flask):
 
     app.secret_key = env.get("APP_SECRET_KEY")
     app.url_map.strict_slashes = False
+
+    app.json = BSONJSONProvider(app)
@@ -3,6 +3,7 @@ from flask import Flask
 from app.models import AffiliatesModel, AffiliateReviewsModel, PlatformProductsModel, AffiliatePlatformProductsModel, \
     ProductCommentsModel, ProductRepliesModel
 from config import app_config
+from lib.cache import Cache
 
 app = Flask(__name__)
 
@@ -19,6 +20,11 @@ def main(app: Flask):
         ProfilesModel,
         OperatingSystemsModel,
         ProductsModel,
+        ProductCardsModel,
+        ProductIndex,
+        ProductCatalog,
+        ProductSearchModel,
+        SearchResults,
         LoginsModel,
         TagsModel,
         PlatformsModel,
@@ -51,23 +57,49 @@ def main(app: Flask):
 
     profiles_model = ProfilesModel(db=db, firebase=firebase)
     service_profiles_model = ServiceProfilesModel(db=db, firebase=firebase)
+    product_cards_model = ProductCardsModel(db=db)
+    product_search_model = ProductSearchModel(
+        db=db,
+        counts=Cache(app_config["SEARCH_COUNTS_CACHE_SIZE"], app_config["SEARCH_COUNTS_CACHE_TTL"])
+    )
+    tags_model = TagsModel(db=db, cards=product_cards_model)
+    search_results = SearchResults(
+        tags=tags_model.names,
+        cache=Cache(app_config["SEARCH_RESULTS_CACHE_SIZE"], app_config["SEARCH_RESULTS_CACHE_TTL"])
+    )
+    product_catalog = ProductCatalog(db=db, max_age=app_config["PRODUCT_CATALOG_MAX_AGE"])
+    product_index = ProductIndex(db=db, tags=tags_model.names, max_age=app_config["PRODUCT_INDEX_MAX_AGE"])
     models = ModelsExtension(
         affiliates=AffiliatesModel(db=db),
         affiliate_reviews=AffiliateReviewsModel(db=db),
         profiles=profiles_model,
-        products=ProductsModel(db=db),
+        products=ProductsModel(
+            db=db,
+            tags=tags_model,
+            cards=product_cards_model,
+            search=product_search_model,
+            cache=Cache(app_config["PRODUCTS_CACHE_SIZE"], app_config["PRODUCTS_CACHE_TTL"]),
+            results=search_results,
+            catalog=product_catalog,
+            index=product_index
+        ),
+        product_cards=product_cards_model,
+        product_search=product_search_model,
+        product_index=product_index,
+        product_catalog=product_catalog,
+        search_results=search_results,
         product_comments=ProductCommentsModel(db=db),
         product_replies=ProductRepliesModel(db=db),
         platforms=PlatformsModel(db=db),
         platform_products=PlatformProductsModel(db=db),
-        affiliate_platform_products=AffiliatePlatformProductsModel(db=db),
+        affiliate_platform_products=AffiliatePlatformProductsModel(db=db, cards=product_cards_model),
         operating_systems=OperatingSystemsModel(db=db),
         logins=LoginsModel(
             firebase=firebase,
             profiles=profiles_model,
             service_profiles=service_profiles_model
         ),
-        tags=TagsModel(db=db),
+        tags=tags_model,
         background_jobs=BackgroundJobsModel(db=db),
         service_profiles=service_profiles_model
     )
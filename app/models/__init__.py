@@ -13,6 +13,11 @@ from .operating_systems import OperatingSystemsModel
 from .profiles import ProfilesModel
 from .logins import LoginsModel
 from .products import ProductsModel
+from .product_cards import ProductCardsModel
+from .product_catalog import ProductCatalog
+from .product_index import ProductIndex
+from .product_search import ProductSearchModel
+from .search_results import SearchResults
 from .tags import TagsModel
 from .background_jobs import BackgroundJobsModel
 from .service_profiles import ServiceProfilesModel
@@ -27,6 +32,11 @@ class ModelsExtension:
 
     profiles: ProfilesModel
     products: ProductsModel
+    product_cards: ProductCardsModel
+    product_search: ProductSearchModel
+    product_index: ProductIndex
+    product_catalog: ProductCatalog
+    search_results: SearchResults
     platforms: PlatformsModel
     platform_products: PlatformProductsModel
     affiliate_platform_products: AffiliatePlatformProductsModel
@@ -46,6 +56,11 @@ class ModelsExtension:
         affiliates: AffiliatesModel,
         affiliate_reviews: AffiliateReviewsModel,
         products: ProductsModel,
+        product_cards: ProductCardsModel,
+        product_search: ProductSearchModel,
+        product_index: ProductIndex,
+        product_catalog: ProductCatalog,
+        search_results: SearchResults,
         profiles: ProfilesModel,
         platforms: PlatformsModel,
         platform_products: PlatformProductsModel,
@@ -61,6 +76,11 @@ class ModelsExtension:
         self.affiliates = affiliates
         self.affiliate_reviews = affiliate_reviews
         self.products = products
+        self.product_cards = product_cards
+        self.product_search = product_search
+        self.product_index = product_index
+        self.product_catalog = product_catalog
+        self.search_results = search_results
         self.profiles = profiles
         self.platforms = platforms
         self.platform_products = platform_products
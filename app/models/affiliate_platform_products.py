@@ -7,9 +7,10 @@ from .exceptions import NotFoundException
 
 
 from dataclasses import dataclass
-from typing import Optional, List, Union, Dict
+from typing import Optional, List, Union, Dict, Iterable
 from bson import ObjectId
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
 from datetime import datetime
 
 from .price import Price
@@ -17,6 +18,7 @@ from .promotions import Promotion
 from .products import Product
 
 from .affiliates import AffiliatesModel
+from .product_cards import ProductCardsModel
 from .products import ProductsModel
 
 
@@ -95,14 +97,18 @@ class AffiliatePlatformProductPatch(Serializable):
 class AffiliatePlatformProductsModel:
     db: Database
     collection: str = "affiliate_platform_products"
+    cards: ProductCardsModel
 
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, cards: ProductCardsModel) -> None:
         """
         Initializes the AffiliatePlatformProductsModel with a database instance.
 
         :param Database db: The database instance used to interact with the affiliate_platform_products collection.
+        :param ProductCardsModel cards: The read model of the cards of the products, whose best offers are updated
+            with affiliate platform products.
         """
         self.db = db
+        self.cards = cards
 
     def get(self, affiliate_platform_product_id: str):
         """
@@ -154,24 +160,50 @@ class AffiliatePlatformProductsModel:
 
         return affiliate_platform_product_object
 
+    def get_many(self, affiliate_platform_product_ids: Iterable[Union[str, ObjectId]]) -> Batch[AffiliatePlatformProduct]:
+        """
+        Retrieve affiliate platform products by their IDs with a single query, without their affiliate and product.
+
+        :param affiliate_platform_product_ids: The IDs of the affiliate platform products.
+        :type affiliate_platform_product_ids: Iterable[Union[str, ObjectId]]
+        :return: The affiliate platform products in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[AffiliatePlatformProduct]
+        """
+        return find_many(
+            self.db.connection[self.collection],
+            affiliate_platform_product_ids,
+            lambda item: AffiliatePlatformProduct(**item)
+        )
+
     def get_all(self) -> List[AffiliatePlatformProduct]:
         """
         Retrieve all affiliate platform products from the database along with
         their related Affiliate and Product details.
 
+        The referenced affiliates and products are read with one query per collection, not one per item.
+
         :return: A list of AffiliatePlatformProduct objects representing all the items in the database with affiliate and product data.
         :rtype: list[AffiliatePlatformProduct]
         """
-        affiliate_platform_products = self.db.connection[self.collection].find()
+        items = [AffiliatePlatformProduct(**item) for item in self.db.connection[self.collection].find()]
 
-        results = []
-        for item in affiliate_platform_products:
-            item = AffiliatePlatformProduct(**item)
-            affiliate_id = item.affiliate_id
-            product_id = item.product_id
+        # raw documents are kept, an invalid one only fails the items that refer to it
+        affiliates = find_many(
+            self.db.connection[AffiliatesModel.collection],
+            (item.affiliate_id for item in items),
+            lambda data: data
+        )
+        products = find_many(
+            self.db.connection[ProductsModel.collection],
+            (item.product_id for item in items),
+            lambda data: data
+        )
+        affiliates_by_id = {affiliate["_id"]: affiliate for affiliate in affiliates.items}
+        products_by_id = {product["_id"]: product for product in products.items}
 
-            affiliate = self.db.connection[AffiliatesModel.collection].find_one({"_id": ObjectId(affiliate_id)})
-            product = self.db.connection[ProductsModel.collection].find_one({"_id": ObjectId(product_id)})
+        for item in items:
+            affiliate = affiliates_by_id.get(ObjectId(item.affiliate_id))
+            product = products_by_id.get(ObjectId(item.product_id))
 
             if affiliate and product:
                 try:
@@ -180,9 +212,7 @@ class AffiliatePlatformProductsModel:
                 except:
                     print(f'<WARN>: Some of the referenced objects are invalid for AffiliatePlatformProduct with _id {item._id}')
 
-            results.append(item)
-
-        return results if results else []
+        return items
 
     def create(self, input_data: AffiliatePlatformProductCreate) -> AffiliatePlatformProduct:
         """
@@ -194,6 +224,8 @@ class AffiliatePlatformProductsModel:
         """
         affiliate_platform_product_data = AffiliatePlatformProduct(**input_data.to_json()).to_bson()
         self.db.connection[self.collection].insert_one(affiliate_platform_product_data)
+        self.cards.update_offers(affiliate_platform_product_data["product_id"])
+
         return AffiliatePlatformProduct(**affiliate_platform_product_data)
 
     def put(self, affiliate_platform_product: AffiliatePlatformProduct) -> AffiliatePlatformProduct:
@@ -206,6 +238,8 @@ class AffiliatePlatformProductsModel:
         :rtype: AffiliatePlatformProduct
         """
         self.db.connection[self.collection].insert_one(affiliate_platform_product.to_bson())
+        self.cards.update_offers(affiliate_platform_product.product_id)
+
         return affiliate_platform_product
 
     def patch(self, affiliate_platform_product_id: str, input_data: AffiliatePlatformProductPatch) -> AffiliatePlatformProduct:
@@ -218,19 +252,38 @@ class AffiliatePlatformProductsModel:
         :rtype: AffiliatePlatformProduct
         :raises NotFoundException: If the item is not found.
         """
-        update_data = {k: v for k, v in input_data.to_json().items() if v is not None}
+        update_data = {k: v for k, v in input_data.to_bson().items() if v is not None}
 
         if not update_data:
             raise ValueError("No valid fields provided for update.")
 
-        updated_affiliate_platform_product = self.db.connection[self.collection].find_one_and_update(
-            {"_id": ObjectId(affiliate_platform_product_id)},
+        # the IDs are stored as ObjectIds, whatever the patch was built from
+        for field in ("affiliate_id", "platform_product_id", "product_id"):
+            if field in update_data:
+                update_data[field] = ObjectId(update_data[field])
+
+        collection = self.db.connection[self.collection]
+        affiliate_platform_product_filter = {"_id": ObjectId(affiliate_platform_product_id)}
+
+        # an offer that moves to another product leaves the card of its previous product, which is read beforehand
+        previous = None
+        if "product_id" in update_data:
+            previous = collection.find_one(affiliate_platform_product_filter, {"product_id": 1})
+
+        updated_affiliate_platform_product = collection.find_one_and_update(
+            affiliate_platform_product_filter,
             {"$set": update_data},
             return_document=ReturnDocument.AFTER
         )
 
         if updated_affiliate_platform_product:
-            return AffiliatePlatformProduct(**updated_affiliate_platform_product)
+            updated = AffiliatePlatformProduct(**updated_affiliate_platform_product)
+
+            self.cards.update_offers(updated.product_id)
+            if previous is not None and previous["product_id"] != updated.product_id:
+                self.cards.update_offers(previous["product_id"])
+
+            return updated
         else:
             raise NotFoundException(AffiliatePlatformProduct.__name__)
 
@@ -248,6 +301,9 @@ class AffiliatePlatformProductsModel:
         )
 
         if affiliate_platform_product:
-            return AffiliatePlatformProduct(**affiliate_platform_product)
+            deleted = AffiliatePlatformProduct(**affiliate_platform_product)
+            self.cards.update_offers(deleted.product_id)
+
+            return deleted
         else:
             raise NotFoundException(AffiliatePlatformProduct.__name__)
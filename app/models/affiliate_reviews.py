@@ -4,8 +4,10 @@ from .exceptions import NotFoundException
 
 from bson import ObjectId
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Iterable, Union
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
 
 
 class AffiliateReview(BaseDocument):
@@ -57,6 +59,7 @@ class AffiliateReviewsModel:
 
     db: Database
     collection: str = "affiliate_reviews"
+    sort_fields = ("created_at",)
 
     def __init__(self, db: Database) -> None:
         """
@@ -79,6 +82,17 @@ class AffiliateReviewsModel:
             return AffiliateReview(**review_data)
         return None
 
+    def get_many(self, review_ids: Iterable[Union[str, ObjectId]]) -> Batch[AffiliateReview]:
+        """
+        Retrieve affiliate reviews by their IDs with a single query.
+
+        :param review_ids: The IDs of the affiliate reviews.
+        :type review_ids: Iterable[Union[str, ObjectId]]
+        :return: The affiliate reviews in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[AffiliateReview]
+        """
+        return find_many(self.db.connection[self.collection], review_ids, lambda item: AffiliateReview(**item))
+
     def get_all(self) -> List[AffiliateReview]:
         """
         Retrieve all affiliate reviews from the database.
@@ -89,6 +103,16 @@ class AffiliateReviewsModel:
         reviews = [AffiliateReview(**item) for item in self.db.connection[self.collection].find()]
         return reviews if reviews else []
 
+    def get_page(self, pagination: Pagination) -> Page[AffiliateReview]:
+        """
+        Retrieve a page of affiliate reviews, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :return: The page of AffiliateReview objects.
+        :rtype: Page[AffiliateReview]
+        """
+        return find_page(self.db.connection[self.collection], {}, pagination, lambda item: AffiliateReview(**item))
+
     def create(self, input_data: AffiliateReviewCreate) -> AffiliateReview:
         """
         Create a new affiliate review in the database.
@@ -4,9 +4,11 @@ from .exceptions import NotFoundException
 
 
 from dataclasses import dataclass
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Iterable
 from bson import ObjectId
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
 from datetime import datetime
 
 
@@ -70,6 +72,7 @@ class AffiliatePatch(Serializable):
 class AffiliatesModel:
     db: Database
     collection: str = "affiliates"
+    sort_fields = ("created_at", "name")
 
     def __init__(self, db: Database) -> None:
         """
@@ -97,6 +100,17 @@ class AffiliatesModel:
         else:
             return None
 
+    def get_many(self, affiliate_ids: Iterable[Union[str, ObjectId]]) -> Batch[Affiliate]:
+        """
+        Retrieve affiliates by their IDs with a single query.
+
+        :param affiliate_ids: The IDs of the affiliates.
+        :type affiliate_ids: Iterable[Union[str, ObjectId]]
+        :return: The affiliates in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[Affiliate]
+        """
+        return find_many(self.db.connection[self.collection], affiliate_ids, lambda item: Affiliate(**item))
+
     def get_all(self) -> List[Affiliate]:
         """
         Retrieve all affiliates from the database.
@@ -110,6 +124,16 @@ class AffiliatesModel:
         affiliates = [Affiliate(**item) for item in self.db.connection[self.collection].find()]
         return affiliates if affiliates else []
 
+    def get_page(self, pagination: Pagination) -> Page[Affiliate]:
+        """
+        Retrieve a page of affiliates, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :return: The page of Affiliate objects.
+        :rtype: Page[Affiliate]
+        """
+        return find_page(self.db.connection[self.collection], {}, pagination, lambda item: Affiliate(**item))
+
     def create(self, input_data: AffiliateCreate) -> Affiliate:
         """
         Create a new affiliate in the database.
@@ -1,12 +1,15 @@
 import datetime
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
 
 from bson import ObjectId
 from pymongo import ReturnDocument
 
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.exceptions import ForbiddenException
+from app.models.pagination import Page, Pagination, find_page
 from app.services import Database
 
 from .event import Event, EventCreate
@@ -67,6 +70,7 @@ class BackgroundJobsPermissions(Enum):
 class BackgroundJobsModel:
     db: Database
     collection: str = "background_jobs"
+    sort_fields = ("created_at",)
 
     def __init__(self, db: Database) -> None:
         self.db = db
@@ -84,6 +88,26 @@ class BackgroundJobsModel:
 
         return background_jobs
 
+    def get_page(self, pagination: Pagination) -> Page[BackgroundJob]:
+        """
+        Retrieve a page of background jobs, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :return: The page of BackgroundJob objects.
+        :rtype: Page[BackgroundJob]
+        """
+        return find_page(self.db.connection[self.collection], {}, pagination, lambda item: BackgroundJob(**item))
+
+    def iter_all(self) -> Iterator[BackgroundJob]:
+        """
+        Iterate over all background jobs in the database without loading them all at once.
+        :return: An iterator of the background jobs data.
+        :rtype: Iterator[BackgroundJob]
+        """
+        cursor = self.db.connection[self.collection].find()
+
+        return (BackgroundJob(**background_job) for background_job in cursor)
+
     def get(self, background_job_id: str):
         """
         Get a background job from the database.
@@ -99,6 +123,17 @@ class BackgroundJobsModel:
         if background_job is not None:
             return BackgroundJob(**background_job)
 
+    def get_many(self, background_job_ids: Iterable[Union[str, ObjectId]]) -> Batch[BackgroundJob]:
+        """
+        Retrieve background jobs by their IDs with a single query.
+
+        :param background_job_ids: The IDs of the background jobs.
+        :type background_job_ids: Iterable[Union[str, ObjectId]]
+        :return: The background jobs in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[BackgroundJob]
+        """
+        return find_many(self.db.connection[self.collection], background_job_ids, lambda item: BackgroundJob(**item))
+
     def create(self, input_data: BackgroundJobCreate):
         """
         Create a new background job in the database with a new ID.
@@ -116,39 +151,70 @@ class BackgroundJobsModel:
 
         return background_job
 
-    def patch(self, background_job_id: str, input_data: BackgroundJobPatch):
+    @staticmethod
+    def _query(background_job_id: str, created_by: Optional[str]) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"_id": ObjectId(background_job_id)}
+
+        # ownership is checked by the write itself, instead of reading the job beforehand
+        if created_by is not None:
+            query["created_by"] = created_by
+
+        return query
+
+    def _find_missed(self, background_job_id: str, created_by: Optional[str]) -> Optional[Dict[str, Any]]:
+        # a write matched no job, it's only read again to tell why
+        background_job = self.db.connection[self.collection].find_one(
+            {"_id": ObjectId(background_job_id)}, {"type": 1, "created_by": 1})
+
+        if background_job is not None and created_by is not None and background_job["created_by"] != created_by:
+            raise ForbiddenException()
+
+        return background_job
+
+    def patch(self, background_job_id: str, input_data: BackgroundJobPatch, created_by: Optional[str] = None):
         """
-        Update a background job in the database.
+        Update a background job in the database with a single write.
+
+        The metadata is merged into the stored one, fields of the update that are empty keep their stored value.
         :param background_job_id: The ID of the background job to be updated.
         :type background_job_id: str
         :param input_data: The background job data to be updated.
         :type input_data: BackgroundJobPatch
-        :return: The updated background job data.
+        :param created_by: The ID of the profile that must have created the job, anyone if not specified.
+        :type created_by: Optional[str]
+        :return: The updated background job data, None if the job doesn't exist.
         :rtype: BackgroundJob
+        :raises ForbiddenException: If the job was created by another profile.
+        :raises ValueError: If the status or the metadata are invalid.
         """
-        background_job = self.db.connection[self.collection].find_one(
-            {"_id": ObjectId(background_job_id)})
-        if background_job is None:
-            return None
-
         payload = {key: value for key,
                    value in input_data.to_json().items() if value is not None}
-        if payload.get("metadata") is not None:
-            for key, value in background_job["metadata"].items():
-                if not input_data.to_json()["metadata"].get(key):
-                    payload["metadata"][key] = value
-            payload["metadata"] = JobMetadata.create(background_job["type"],
-                                                     **payload["metadata"]).to_bson()
 
         if payload.get("status") is not None:
             validate_status(payload["status"])
 
-        updated = self.db.connection[self.collection].find_one_and_update({"_id": ObjectId(background_job_id)},
-                                                                          {"$set": payload},
-                                                                          return_document=ReturnDocument.AFTER)
+        query = self._query(background_job_id, created_by)
+        metadata = payload.pop("metadata", None)
+        changes = payload
+
+        if metadata is not None:
+            # only jobs whose type has metadata with all of the fields match
+            query["type"] = {"$in": JobMetadata.types_with_fields(metadata)}
+            changes |= {f"metadata.{key}": value for key, value in metadata.items() if value}
+
+        if changes:
+            updated = self.db.connection[self.collection].find_one_and_update(
+                query, {"$set": changes}, return_document=ReturnDocument.AFTER)
+        else:
+            updated = self.db.connection[self.collection].find_one(query)
+
         if updated is not None:
             return BackgroundJob(**updated)
 
+        background_job = self._find_missed(background_job_id, created_by)
+        if background_job is not None and metadata is not None:
+            raise ValueError(f"Unsupported metadata for job type {background_job['type']}")
+
     def put(self, input_data: BackgroundJob):
         """
         Create a new background job in the database with a new ID.
@@ -184,23 +250,28 @@ class BackgroundJobsModel:
 
         return background_job.deleted_count
 
-    def add_event(self, background_job_id: str, event: EventCreate):
+    def add_event(self, background_job_id: str, event: EventCreate, created_by: Optional[str] = None):
         """
-        Add a new event to the background job.
+        Add a new event to the background job with a single write.
         :param background_job_id: The ID of the background job to be updated.
         :type background_job_id: str
         :param event: The event to be added.
         :type event: EventCreate
-        :return: The updated background job data.
+        :param created_by: The ID of the profile that must have created the job, anyone if not specified.
+        :type created_by: Optional[str]
+        :return: The updated background job data, None if the job doesn't exist.
         :rtype: BackgroundJob
+        :raises ForbiddenException: If the job was created by another profile.
         """
         validate_event_type(event.type)
 
         updated = self.db.connection[self.collection].find_one_and_update(
-            {"_id": ObjectId(background_job_id)},
+            self._query(background_job_id, created_by),
             {"$push": {"events": Event(**event.to_json()).to_bson()}},
             return_document=ReturnDocument.AFTER
         )
 
         if updated is not None:
             return BackgroundJob(**updated)
+
+        self._find_missed(background_job_id, created_by)
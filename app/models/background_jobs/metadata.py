@@ -1,6 +1,6 @@
 from . import Serializable
-from typing import Dict, Type
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Type
+from dataclasses import dataclass, fields
 
 
 class BaseMetadata(Serializable):
@@ -40,3 +40,18 @@ class JobMetadata:
             raise ValueError(f"Unsupported job type: {job_type}")
 
         return metadata(**kwargs)
+
+    @staticmethod
+    def types_with_fields(names: Iterable[str]) -> List[str]:
+        """
+        Finds the job types whose metadata has all of the given fields.
+
+        :param names: The names of the fields.
+        :return: The job types.
+        """
+        names = set(names)
+
+        return [
+            job_type for job_type, metadata in JOB_METADATA.items()
+            if names <= {field.name for field in fields(metadata)}
+        ]
@@ -1,14 +1,57 @@
 import datetime
 import json
+import typing
 from copy import deepcopy
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from bson import ObjectId
 
 from lib.db_utils import Serializable
 
 
-class BaseDocument(Serializable):
+class DocumentMeta(type):
+    """Builds compact document classes from their field schema.
+
+    The fields of a document are declared with class annotations. Every annotated field gets a slot
+    instead of an entry in a per-instance `__dict__`, which keeps lists of documents small.
+    A value assigned to a field in the class body becomes its default, applied in `BaseDocument.__init__`.
+
+    The schema of a class, including the fields of its bases, is available as `__fields__`.
+    """
+
+    def __new__(mcs, name: str, bases: tuple, namespace: Dict[str, Any], **kwargs):
+        annotations = namespace.get("__annotations__", {})
+        inherited: Dict[str, Any] = {}
+        defaults: Dict[str, Any] = {}
+
+        for base in reversed(bases):
+            inherited |= getattr(base, "__fields__", {})
+            defaults |= getattr(base, "__field_defaults__", {})
+
+        fields = {
+            field: annotation for field, annotation in annotations.items()
+            if typing.get_origin(annotation) is not typing.ClassVar and not _is_class_var(annotation)
+        }
+
+        # slots can't coexist with class attributes of the same name
+        for field in fields:
+            if field in namespace:
+                defaults[field] = namespace.pop(field)
+
+        if "__slots__" not in namespace:
+            namespace["__slots__"] = tuple(field for field in fields if field not in inherited)
+
+        namespace["__fields__"] = inherited | fields
+        namespace["__field_defaults__"] = defaults
+
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+def _is_class_var(annotation: Any) -> bool:
+    return isinstance(annotation, str) and annotation.startswith(("ClassVar", "typing.ClassVar"))
+
+
+class BaseDocument(Serializable, metaclass=DocumentMeta):
     _id: ObjectId
     created_at: datetime.datetime
     updated_at: datetime.datetime
@@ -19,12 +62,36 @@ class BaseDocument(Serializable):
     ) -> None:
         super().__init__()
 
+        for field, default in self.__field_defaults__.items():
+            setattr(self, field, default)
+
         now = datetime.datetime.utcnow().replace(microsecond=0)
 
         self._id = kwargs.get("_id", ObjectId())
         self.created_at = kwargs.get("created_at", now)
         self.updated_at = kwargs.get("updated_at", now)
 
+    @classmethod
+    def partial(cls, data: Dict[str, Any]):
+        """
+        Build a document from a part of its fields, e.g. read with a projection.
+
+        `__init__` is not called, so fields keep the values they have in `data` and the missing ones stay unset.
+        Serializers skip unset fields.
+
+        :param data: The fields of the document.
+        :type data: Dict[str, Any]
+        :return: The partial document.
+        :rtype: BaseDocument
+        """
+        document = cls.__new__(cls)
+
+        for field, value in data.items():
+            if field in cls.__fields__:
+                setattr(document, field, value)
+
+        return document
+
     def clone(self):
         copied = deepcopy(self)
         copied._id = ObjectId()
@@ -0,0 +1,70 @@
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar, Union
+
+from bson import ObjectId
+from pymongo.collection import Collection
+
+from app.models.projection import Projection, find
+
+Item = TypeVar("Item")
+
+
+class Batch(Generic[Item]):
+    """
+    Documents read by their IDs, in the order of the IDs, together with the IDs that were not found.
+    """
+
+    items: List[Item]
+    missing: List[ObjectId]
+
+    def __init__(self, items: List[Item], missing: List[ObjectId]) -> None:
+        self.items = items
+        self.missing = missing
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """
+        The meta of a response with the batch.
+
+        :return: The meta.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "items_found": len(self.items),
+            "missing": [str(missing_id) for missing_id in self.missing]
+        }
+
+
+def find_many(
+        collection: Collection,
+        ids: Iterable[Union[str, ObjectId]],
+        build: Callable[[Dict[str, Any]], Item],
+        projection: Optional[Projection] = None
+) -> Batch[Item]:
+    """
+    Find documents of a collection by their IDs with a single `$in` query.
+
+    The documents are returned in the order of the IDs, whatever order the database sends them in.
+    An ID that is requested more than once is returned once, at its first position.
+
+    :param Collection collection: The collection.
+    :param ids: The IDs of the documents.
+    :type ids: Iterable[Union[str, ObjectId]]
+    :param build: Builds an item of the batch from a document.
+    :type build: Callable[[Dict[str, Any]], Item]
+    :param projection: The fields to read, all of them if not specified.
+    :type projection: Optional[Projection]
+    :return: The batch of items.
+    :rtype: Batch[Item]
+    :raises bson.errors.InvalidId: If an ID is not a valid ObjectId.
+    """
+    object_ids = list(dict.fromkeys(ObjectId(id_) for id_ in ids))
+
+    if len(object_ids) == 0:
+        return Batch([], [])
+
+    documents = {data["_id"]: data for data in find(collection, {"_id": {"$in": object_ids}}, projection)}
+
+    return Batch(
+        [build(documents[id_]) for id_ in object_ids if id_ in documents],
+        [id_ for id_ in object_ids if id_ not in documents]
+    )
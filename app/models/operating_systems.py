@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Iterable, Union
 from bson import ObjectId
 from dataclasses import dataclass
 
@@ -6,6 +6,8 @@ from pymongo import ReturnDocument
 
 from app.services import Database
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
 
 from .exceptions import NotFoundException
 
@@ -36,6 +38,7 @@ class OperatingSystemPatch(Serializable):
 class OperatingSystemsModel:
     db: Database
     collection: str = "operating_systems"
+    sort_fields = ("name",)
 
     def __init__(self, db: Database) -> None:
         self.db = db
@@ -57,6 +60,17 @@ class OperatingSystemsModel:
         if operating_system is not None:
             return OperatingSystem(**operating_system)
 
+    def get_many(self, operating_system_ids: Iterable[Union[str, ObjectId]]) -> Batch[OperatingSystem]:
+        """
+        Retrieve operating systems by their IDs with a single query.
+
+        :param operating_system_ids: The IDs of the operating systems.
+        :type operating_system_ids: Iterable[Union[str, ObjectId]]
+        :return: The operating systems in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[OperatingSystem]
+        """
+        return find_many(self.db.connection[self.collection], operating_system_ids, lambda item: OperatingSystem(**item))
+
     def get_all(self):
         """
         Retrieve all operating systems.
@@ -71,6 +85,16 @@ class OperatingSystemsModel:
 
         return operating_systems
 
+    def get_page(self, pagination: Pagination) -> Page[OperatingSystem]:
+        """
+        Retrieve a page of operating systems, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :return: The page of OperatingSystem objects.
+        :rtype: Page[OperatingSystem]
+        """
+        return find_page(self.db.connection[self.collection], {}, pagination, lambda item: OperatingSystem(**item))
+
     def create(self, input_data: OperatingSystemCreate):
         """
         Create a new operating system entry.
@@ -0,0 +1,242 @@
+import base64
+import binascii
+from typing import Any, Callable, Dict, Generic, Iterable, List, Mapping, Optional, Tuple, TypeVar
+
+import bson
+from bson import ObjectId
+from pymongo.collection import Collection
+
+from app.models.projection import Projection
+
+Item = TypeVar("Item")
+
+
+class Pagination:
+    """
+    A page of a list of documents, sorted by a field and addressed by the position of the previous page.
+
+    Pages are read with keyset pagination: instead of skipping the documents of previous pages, the query
+    starts right after the `(sort key, _id)` of the last document of the previous page, which is passed
+    around as an opaque cursor. With an index on `(sort key, _id)`, every page costs the same no matter
+    how deep it is.
+
+    Sorts are written as the name of a field, ascending, or prefixed with `-`, descending, e.g. `-created_at`.
+    """
+
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    limit: int
+    sort: str
+    field: str
+    direction: int
+    after: Optional[Tuple[Any, ObjectId]]
+
+    def __init__(self, limit: int = DEFAULT_LIMIT, sort: str = "_id", after: Optional[Tuple[Any, ObjectId]] = None) -> None:
+        """
+        Initialize the Pagination.
+
+        :param int limit: The number of documents of the page.
+        :param str sort: The sort, e.g. `name` or `-created_at`.
+        :param after: The sort key and the ID of the last document of the previous page, None for the first page.
+        :type after: Optional[Tuple[Any, ObjectId]]
+        """
+        self.limit = limit
+        self.sort = sort
+        self.field = sort.removeprefix("-")
+        self.direction = -1 if sort.startswith("-") else 1
+        self.after = after
+
+    @staticmethod
+    def parse(
+            limit: Optional[str],
+            after: Optional[str],
+            sort: Optional[str],
+            sort_fields: Iterable[str]
+    ) -> "Pagination":
+        """
+        Parse the pagination parameters of a request.
+
+        :param limit: The number of documents of the page, defaults to `DEFAULT_LIMIT`.
+        :type limit: Optional[str]
+        :param after: The cursor of the page, None for the first page.
+        :type after: Optional[str]
+        :param sort: The sort, defaults to `_id`.
+        :type sort: Optional[str]
+        :param sort_fields: The fields that the documents can be sorted by, besides `_id`.
+        :type sort_fields: Iterable[str]
+        :return: The pagination.
+        :rtype: Pagination
+        :raises ValueError: If a parameter is invalid.
+        """
+        if limit is None:
+            page_limit = Pagination.DEFAULT_LIMIT
+        else:
+            try:
+                page_limit = int(limit)
+            except ValueError:
+                raise ValueError(f"Limit must be an integer, got \"{limit}\".")
+
+            if not 1 <= page_limit <= Pagination.MAX_LIMIT:
+                raise ValueError(f"Limit must be between 1 and {Pagination.MAX_LIMIT}.")
+
+        if sort is None or sort == "":
+            sort = "_id"
+
+        if sort.removeprefix("-") not in ("_id", *sort_fields):
+            raise ValueError(f"Unknown sort \"{sort}\".")
+
+        if after is None or after == "":
+            return Pagination(page_limit, sort)
+
+        try:
+            cursor = bson.decode(base64.urlsafe_b64decode(after + "=" * (-len(after) % 4)))
+        except (binascii.Error, bson.errors.BSONError, ValueError):
+            raise ValueError("Invalid cursor.")
+
+        if cursor.get("s") != sort or not isinstance(cursor.get("i"), ObjectId) or "v" not in cursor:
+            raise ValueError("Invalid cursor, it was created for another sort.")
+
+        return Pagination(page_limit, sort, (cursor["v"], cursor["i"]))
+
+    def to_query(self) -> Dict[str, Any]:
+        """
+        Convert the position of the page into a Mongo query, that matches the documents after the previous page.
+
+        Null and missing sort keys sort before every other value, but `$gt` and `$lt` never match them, nor
+        match anything when compared with null, so they are matched explicitly: ascending, the documents with
+        a value follow a null key; descending, the documents without a value follow any other key.
+
+        :return: The Mongo query.
+        :rtype: Dict[str, Any]
+        """
+        if self.after is None:
+            return {}
+
+        value, last_id = self.after
+        operator = "$gt" if self.direction == 1 else "$lt"
+
+        if self.field == "_id":
+            return {"_id": {operator: last_id}}
+
+        same_value = {self.field: value, "_id": {operator: last_id}}
+
+        if value is None:
+            if self.direction == 1:
+                return {"$or": [{self.field: {"$ne": None}}, same_value]}
+
+            return same_value
+
+        after_value = [{self.field: {operator: value}}, same_value]
+
+        if self.direction == -1:
+            after_value.append({self.field: None})
+
+        return {"$or": after_value}
+
+    def to_sort(self) -> List[Tuple[str, int]]:
+        """
+        Convert the sort into a Mongo sort, `_id` breaks ties between documents with the same sort key.
+
+        :return: The Mongo sort.
+        :rtype: List[Tuple[str, int]]
+        """
+        if self.field == "_id":
+            return [("_id", self.direction)]
+
+        return [(self.field, self.direction), ("_id", self.direction)]
+
+    def cursor_of(self, data: Mapping[str, Any]) -> str:
+        """
+        Create the cursor of the page that follows a document.
+
+        :param data: The document, as read from the database.
+        :type data: Mapping[str, Any]
+        :return: The opaque cursor.
+        :rtype: str
+        """
+        cursor = bson.encode({"s": self.sort, "v": data.get(self.field), "i": data["_id"]})
+
+        return base64.urlsafe_b64encode(cursor).decode().rstrip("=")
+
+
+class Page(Generic[Item]):
+    """
+    A page of documents together with the cursor of the next page, if there is one.
+    """
+
+    items: List[Item]
+    next_cursor: Optional[str]
+    pagination: Pagination
+
+    def __init__(self, items: List[Item], next_cursor: Optional[str], pagination: Pagination) -> None:
+        self.items = items
+        self.next_cursor = next_cursor
+        self.pagination = pagination
+
+    @property
+    def meta(self) -> Dict[str, Any]:
+        """
+        The pagination meta of a response with the page.
+
+        :return: The meta.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "limit": self.pagination.limit,
+            "sort": self.pagination.sort,
+            "items_on_page": len(self.items),
+            "next_cursor": self.next_cursor
+        }
+
+
+def find_page(
+        collection: Collection,
+        query: Dict[str, Any],
+        pagination: Pagination,
+        build: Callable[[Dict[str, Any]], Item],
+        projection: Optional[Projection] = None,
+        skip: int = 0
+) -> Page[Item]:
+    """
+    Find a page of documents of a collection.
+
+    One more document than the limit is read, to know whether there is a next page.
+
+    :param Collection collection: The collection.
+    :param query: The query.
+    :type query: Dict[str, Any]
+    :param Pagination pagination: The page to read.
+    :param build: Builds an item of the page from a document.
+    :type build: Callable[[Dict[str, Any]], Item]
+    :param projection: The fields to read, all of them if not specified.
+    :type projection: Optional[Projection]
+    :param int skip: The number of documents to skip, only for clients that address pages by their number.
+    :return: The page.
+    :rtype: Page
+    """
+    position = pagination.to_query()
+    if position:
+        query = {"$and": [query, position]} if query else position
+
+    if projection is None:
+        cursor = collection.find(query)
+    else:
+        # the sort key is needed for the cursor, even if it was not requested
+        cursor = collection.find(query, projection.to_mongo() | {pagination.field: 1})
+
+    if skip:
+        cursor = cursor.skip(skip)
+
+    documents = list(cursor.sort(pagination.to_sort()).limit(pagination.limit + 1))
+
+    next_cursor = None
+    if len(documents) > pagination.limit:
+        documents = documents[:pagination.limit]
+        next_cursor = pagination.cursor_of(documents[-1])
+
+    if projection is not None and not projection.includes(pagination.field):
+        for document in documents:
+            document.pop(pagination.field, None)
+
+    return Page([build(document) for document in documents], next_cursor, pagination)
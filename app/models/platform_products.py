@@ -1,4 +1,4 @@
-from typing import Optional, List
+from typing import Optional, List, Iterable, Union
 from bson import ObjectId
 from dataclasses import dataclass
 
@@ -6,6 +6,8 @@ from pymongo import ReturnDocument
 
 from app.services import Database
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
 
 from .price import Price
 from .exceptions import NotFoundException
@@ -47,6 +49,7 @@ class PlatformProductPatch(Serializable):
 class PlatformProductsModel:
     db: Database
     collection: str = "platform_products"
+    sort_fields = ("created_at",)
 
     def __init__(self, db: Database) -> None:
         self.db = db
@@ -69,6 +72,17 @@ class PlatformProductsModel:
         if platform_product is not None:
             return PlatformProduct(**platform_product)
 
+    def get_many(self, platform_product_ids: Iterable[Union[str, ObjectId]]) -> Batch[PlatformProduct]:
+        """
+        Retrieve platform products by their IDs with a single query.
+
+        :param platform_product_ids: The IDs of the platform products.
+        :type platform_product_ids: Iterable[Union[str, ObjectId]]
+        :return: The platform products in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[PlatformProduct]
+        """
+        return find_many(self.db.connection[self.collection], platform_product_ids, lambda item: PlatformProduct(**item))
+
     def get_all(self):
         """
         Retrieve all platform products from the database.
@@ -83,6 +97,16 @@ class PlatformProductsModel:
 
         return platform_products if platform_products else []
 
+    def get_page(self, pagination: Pagination) -> Page[PlatformProduct]:
+        """
+        Retrieve a page of platform products, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :return: The page of PlatformProduct objects.
+        :rtype: Page[PlatformProduct]
+        """
+        return find_page(self.db.connection[self.collection], {}, pagination, lambda item: PlatformProduct(**item))
+
     def create(self, input_data: PlatformProductCreate):
         """
         Create a new platform product in the database.
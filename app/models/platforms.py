@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Iterable, Union
 from bson import ObjectId
 from dataclasses import dataclass
 from slugify import slugify
@@ -7,6 +7,8 @@ from pymongo import ReturnDocument
 
 from app.services import Database
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
 
 from .exceptions import NotFoundException
 
@@ -56,6 +58,7 @@ class PlatformPatch(Serializable):
 class PlatformsModel:
     db: Database
     collection: str = "platforms"
+    sort_fields = ("created_at", "name")
 
     def __init__(self, db: Database) -> None:
         self.db = db
@@ -78,6 +81,17 @@ class PlatformsModel:
         if platform is not None:
             return Platform(**platform)
 
+    def get_many(self, platform_ids: Iterable[Union[str, ObjectId]]) -> Batch[Platform]:
+        """
+        Retrieve platforms by their IDs with a single query.
+
+        :param platform_ids: The IDs of the platforms.
+        :type platform_ids: Iterable[Union[str, ObjectId]]
+        :return: The platforms in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[Platform]
+        """
+        return find_many(self.db.connection[self.collection], platform_ids, lambda item: Platform(**item))
+
     def get_all(self):
         """
         Retrieve all platforms from the database.
@@ -92,6 +106,16 @@ class PlatformsModel:
 
         return platforms if platforms else []
 
+    def get_page(self, pagination: Pagination) -> Page[Platform]:
+        """
+        Retrieve a page of platforms, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :return: The page of Platform objects.
+        :rtype: Page[Platform]
+        """
+        return find_page(self.db.connection[self.collection], {}, pagination, lambda item: Platform(**item))
+
     def create(self, input_data: PlatformCreate):
         """
         Create a new platform in the database.
@@ -164,7 +188,7 @@ class PlatformsModel:
 
         updated_platform = self.db.connection[self.collection].find_one_and_update(
             {"_id": ObjectId(platform_id)},
-            {"$set": update_data},
+            {"$set": update_data, "$currentDate": {"updated_at": True}},
             return_document=ReturnDocument.AFTER
         )
 
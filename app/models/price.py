@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, Iterable, Union
 from bson import ObjectId
 from dataclasses import dataclass
 from slugify import slugify
@@ -7,6 +7,7 @@ from pymongo import ReturnDocument
 
 from app.services import Database
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
 
 from .exceptions import NotFoundException
 
@@ -64,6 +65,17 @@ class PricesModel:
         if price is not None:
             return Price(**price)
 
+    def get_many(self, price_ids: Iterable[Union[str, ObjectId]]) -> Batch[Price]:
+        """
+        Retrieve prices by their IDs with a single query.
+
+        :param price_ids: The IDs of the prices.
+        :type price_ids: Iterable[Union[str, ObjectId]]
+        :return: The prices in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[Price]
+        """
+        return find_many(self.db.connection[self.collection], price_ids, lambda item: Price(**item))
+
     def get_all(self):
         """
         Retrieve all prices from the database.
@@ -0,0 +1,556 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+
+from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
+from app.models.projection import Projection, build_document
+from app.services import Database
+
+# resolves tag IDs to the names of the tags, e.g. `TagNames.resolve`
+ResolveNames = Callable[[Iterable[ObjectId]], List[str]]
+
+
+@dataclass
+class Offer(Serializable):
+    affiliate_platform_product_id: ObjectId
+    affiliate_id: ObjectId
+    buy_page_url: str
+    value: float
+    expires_at: Optional[datetime]
+
+
+class ProductCard(BaseDocument):
+    """
+    The part of a product that listings and search show, denormalized from `products`, `tags` and
+    `affiliate_platform_products`. A card has the `_id` and `created_at` of its product.
+    """
+
+    type: str
+    name: str
+    slug: str
+    short_description: str
+    is_free: bool
+    header_url: Optional[str]
+    price: Dict[str, Any]
+    platforms_os: List[str]
+    release_date: Dict[str, Any]
+    genres: List[str]
+    categories: List[str]
+    genre_ids: List[ObjectId]
+    category_ids: List[ObjectId]
+    best_offers: Dict[str, Offer]
+    offers_expire_at: Optional[datetime]
+
+    def __init__(
+            self,
+            type: str,
+            name: str,
+            slug: str,
+            short_description: str,
+            is_free: bool,
+            header_url: Optional[str],
+            price: Dict[str, Any],
+            platforms_os: List[str],
+            release_date: Dict[str, Any],
+            genres: List[str],
+            categories: List[str],
+            genre_ids: List[ObjectId],
+            category_ids: List[ObjectId],
+            best_offers: Optional[Dict[str, Offer]] = None,
+            offers_expire_at: Optional[datetime] = None,
+            **kwargs
+    ) -> None:
+        super().__init__(**kwargs)
+
+        self.type = type
+        self.name = name
+        self.slug = slug
+        self.short_description = short_description
+        self.is_free = is_free
+        self.header_url = header_url
+        self.price = price
+        self.platforms_os = platforms_os
+        self.release_date = release_date
+        self.genres = genres
+        self.categories = categories
+        self.genre_ids = genre_ids
+        self.category_ids = category_ids
+        self.best_offers = best_offers if best_offers is not None else {}
+        self.offers_expire_at = offers_expire_at
+
+
+def find_offer_candidates(offers: Iterable[Mapping[str, Any]], now: datetime) -> List[Dict[str, Any]]:
+    """
+    List the prices and the promotions that are still valid of the offers of a product, that the best offers are
+    picked from.
+
+    :param offers: The affiliate platform products of the product, as stored in the database.
+    :type offers: Iterable[Mapping[str, Any]]
+    :param datetime now: The current time, in UTC.
+    :return: The candidates, an offer in a currency each, in the order of the offers, prices before promotions.
+    :rtype: List[Dict[str, Any]]
+    """
+    candidates = []
+
+    for offer in offers:
+        values = [(price["currency"], price["value"], None) for price in offer.get("prices") or []]
+        values += [
+            (promotion["currency"], promotion["value"], promotion.get("expires_at"))
+            for promotion in offer.get("promotions") or []
+            if promotion.get("expires_at") is None or promotion["expires_at"] > now
+        ]
+
+        candidates += [
+            {
+                "currency": currency,
+                "affiliate_platform_product_id": offer["_id"],
+                "affiliate_id": offer.get("affiliate_id"),
+                "buy_page_url": offer.get("buy_page_url"),
+                "value": value,
+                "expires_at": expires_at,
+            }
+            for currency, value, expires_at in values
+        ]
+
+    return candidates
+
+
+def pick_best_offers(
+        candidates: Iterable[Mapping[str, Any]],
+        now: datetime
+) -> Tuple[Dict[str, Dict[str, Any]], Optional[datetime]]:
+    """
+    Pick the lowest price of every currency among the candidates that are still valid, see `find_offer_candidates`.
+
+    :param candidates: The candidates.
+    :type candidates: Iterable[Mapping[str, Any]]
+    :param datetime now: The current time, in UTC.
+    :return: The best offer by currency, and the time it stops being valid, if it ever does.
+    :rtype: Tuple[Dict[str, Dict[str, Any]], Optional[datetime]]
+    """
+    best: Dict[str, Dict[str, Any]] = {}
+
+    for candidate in candidates:
+        currency, expires_at = candidate["currency"], candidate["expires_at"]
+
+        if expires_at is not None and expires_at <= now:
+            continue
+        if currency in best and best[currency]["value"] <= candidate["value"]:
+            continue
+
+        best[currency] = {key: value for key, value in candidate.items() if key != "currency"}
+
+    expire_at = min((o["expires_at"] for o in best.values() if o["expires_at"] is not None), default=None)
+
+    return best, expire_at
+
+
+def find_best_offers(
+        offers: Iterable[Mapping[str, Any]],
+        now: datetime
+) -> Tuple[Dict[str, Dict[str, Any]], Optional[datetime]]:
+    """
+    Find the lowest price of every currency among the offers of a product.
+
+    Promotions count until they expire, so the best offers are only valid until the earliest expiry
+    of a promotion that was picked.
+
+    :param offers: The affiliate platform products of the product, as stored in the database.
+    :type offers: Iterable[Mapping[str, Any]]
+    :param datetime now: The current time, in UTC.
+    :return: The best offer by currency, and the time it stops being valid, if it ever does.
+    :rtype: Tuple[Dict[str, Dict[str, Any]], Optional[datetime]]
+    """
+    return pick_best_offers(find_offer_candidates(offers, now), now)
+
+
+def build_card(
+        product: Mapping[str, Any],
+        resolve_names: ResolveNames,
+        offers: Iterable[Mapping[str, Any]],
+        now: datetime
+) -> Dict[str, Any]:
+    """
+    Build the card of a product.
+
+    :param product: The product, as stored in the database.
+    :type product: Mapping[str, Any]
+    :param ResolveNames resolve_names: Resolves the IDs of tags to their names.
+    :param offers: The affiliate platform products of the product, sorted by `_id`.
+    :type offers: Iterable[Mapping[str, Any]]
+    :param datetime now: The current time, in UTC.
+    :return: The card, as stored in the database, without `updated_at`.
+    :rtype: Dict[str, Any]
+    """
+    offer_candidates = find_offer_candidates(offers, now)
+    best_offers, offers_expire_at = pick_best_offers(offer_candidates, now)
+    genre_ids = list(product.get("genres") or [])
+    category_ids = list(product.get("categories") or [])
+
+    return {
+        "_id": product["_id"],
+        "type": product.get("type"),
+        "name": product.get("name"),
+        "slug": product.get("slug"),
+        "short_description": product.get("short_description"),
+        "is_free": product.get("is_free"),
+        "header_url": (product.get("media") or {}).get("header_url"),
+        "price": product.get("price"),
+        "platforms_os": product.get("platforms_os"),
+        "release_date": product.get("release_date"),
+        "genres": resolve_names(genre_ids),
+        "categories": resolve_names(category_ids),
+        "genre_ids": genre_ids,
+        "category_ids": category_ids,
+        "best_offers": best_offers,
+        "offers_expire_at": offers_expire_at,
+        # the best offers are picked from them again on read once a promotion expired, the card isn't written then
+        "offer_candidates": offer_candidates if offers_expire_at is not None else [],
+        "created_at": product.get("created_at"),
+    }
+
+
+class ProductCardsModel:
+    """
+    The `product_cards` read model, which listings and search query instead of joining products, tags and offers.
+
+    Cards are kept up to date by the writes of `ProductsModel`, `TagsModel` and `AffiliatePlatformProductsModel`.
+    Writes made around the models, e.g. by hand, are caught up with `check` and `rebuild`.
+    """
+
+    db: Database
+    collection: str = "product_cards"
+    products_collection: str = "products"
+    offers_collection: str = "affiliate_platform_products"
+    sort_fields = ("created_at", "name")
+
+    # the fields of products and offers that cards are built from
+    product_fields = {
+        field: 1 for field in (
+            "type", "name", "slug", "short_description", "is_free", "media.header_url", "price",
+            "platforms_os", "release_date", "genres", "categories", "created_at"
+        )
+    }
+    offer_fields = {"product_id": 1, "affiliate_id": 1, "buy_page_url": 1, "prices": 1, "promotions": 1}
+
+    # the number of cards written at once by a rebuild
+    batch_size = 1000
+
+    def __init__(self, db: Database, clock: Callable[[], datetime] = datetime.utcnow) -> None:
+        """
+        Initialize the ProductCardsModel.
+
+        :param db: The database instance.
+        :type db: Database
+        :param clock: The clock that the expiry of promotions is checked with, in UTC.
+        :type clock: Callable[[], datetime]
+        """
+        self.db = db
+        self.clock = clock
+
+    def _find_offers(self, product_id: ObjectId) -> List[Dict[str, Any]]:
+        offers = self.db.connection[self.offers_collection].find({"product_id": product_id}, self.offer_fields)
+
+        return list(offers.sort("_id"))
+
+    def save(self, product: Mapping[str, Any], resolve_names: ResolveNames) -> None:
+        """
+        Write the card of a product after a write of the product.
+
+        :param product: The product, as stored in the database.
+        :type product: Mapping[str, Any]
+        :param ResolveNames resolve_names: Resolves the IDs of tags to their names.
+        """
+        now = self.clock()
+        card = build_card(product, resolve_names, self._find_offers(product["_id"]), now)
+
+        self.db.connection[self.collection].replace_one({"_id": card["_id"]}, card | {"updated_at": now}, upsert=True)
+
+    def save_many(self, products: List[Mapping[str, Any]], resolve_names: ResolveNames) -> None:
+        """
+        Write the cards of products after a bulk write of the products, with one read of the offers and one write.
+
+        :param products: The products, as stored in the database.
+        :type products: List[Mapping[str, Any]]
+        :param ResolveNames resolve_names: Resolves the IDs of tags to their names.
+        """
+        if len(products) == 0:
+            return
+
+        now = self.clock()
+        offers = defaultdict(list)
+        product_ids = [product["_id"] for product in products]
+
+        for offer in self.db.connection[self.offers_collection].find(
+                {"product_id": {"$in": product_ids}},
+                self.offer_fields
+        ).sort("_id"):
+            offers[offer["product_id"]].append(offer)
+
+        self.db.connection[self.collection].bulk_write([
+            ReplaceOne(
+                {"_id": product["_id"]},
+                build_card(product, resolve_names, offers[product["_id"]], now) | {"updated_at": now},
+                upsert=True
+            )
+            for product in products
+        ], ordered=False)
+
+    def delete(self, product_id: ObjectId) -> None:
+        """
+        Delete the card of a deleted product.
+
+        :param ObjectId product_id: The ID of the product.
+        """
+        self.db.connection[self.collection].delete_one({"_id": product_id})
+
+    def delete_many(self, product_ids: List[ObjectId]) -> None:
+        """
+        Delete the cards of products after a bulk delete of the products.
+
+        :param List[ObjectId] product_ids: The IDs of the products.
+        """
+        if product_ids:
+            self.db.connection[self.collection].delete_many({"_id": {"$in": product_ids}})
+
+    def update_offers(self, product_id: ObjectId) -> Tuple[Dict[str, Dict[str, Any]], Optional[datetime]]:
+        """
+        Update the best offers of a card after a write of the offers of its product.
+
+        :param ObjectId product_id: The ID of the product.
+        :return: The best offers by currency and the time they stop being valid.
+        :rtype: Tuple[Dict[str, Dict[str, Any]], Optional[datetime]]
+        """
+        now = self.clock()
+        offer_candidates = find_offer_candidates(self._find_offers(product_id), now)
+        best_offers, offers_expire_at = pick_best_offers(offer_candidates, now)
+
+        self.db.connection[self.collection].update_one(
+            {"_id": product_id},
+            {"$set": {
+                "best_offers": best_offers,
+                "offers_expire_at": offers_expire_at,
+                "offer_candidates": offer_candidates if offers_expire_at is not None else [],
+                "updated_at": now
+            }}
+        )
+
+        return best_offers, offers_expire_at
+
+    def update_tag(self, tag_id: ObjectId, resolve_names: ResolveNames) -> int:
+        """
+        Update the names of the genres and categories of the cards that refer to a tag, after a write of the tag.
+
+        :param ObjectId tag_id: The ID of the tag.
+        :param ResolveNames resolve_names: Resolves the IDs of tags to their names, including the written tag.
+        :return: The number of updated cards.
+        :rtype: int
+        """
+        cards = self.db.connection[self.collection].find(
+            {"$or": [{"genre_ids": tag_id}, {"category_ids": tag_id}]},
+            {"genre_ids": 1, "category_ids": 1}
+        )
+        now = self.clock()
+
+        updates = [
+            UpdateOne({"_id": card["_id"]}, {"$set": {
+                "genres": resolve_names(card.get("genre_ids") or []),
+                "categories": resolve_names(card.get("category_ids") or []),
+                "updated_at": now
+            }})
+            for card in cards
+        ]
+
+        if updates:
+            self.db.connection[self.collection].bulk_write(updates, ordered=False)
+
+        return len(updates)
+
+    def _build(self, data: Dict[str, Any], projection: Optional[Projection]) -> ProductCard:
+        expire_at = data.get("offers_expire_at")
+        candidates = data.pop("offer_candidates", None)
+
+        # a promotion expired since the card was written, reads don't write the card, `rebuild` does;
+        # the cards written before the candidates were stored keep the best offers that are still valid
+        if expire_at is not None and expire_at <= self.clock():
+            if candidates is None:
+                candidates = [offer | {"currency": currency} for currency, offer in data.get("best_offers", {}).items()]
+
+            data["best_offers"], data["offers_expire_at"] = pick_best_offers(candidates, self.clock())
+
+        if projection is not None and not projection.includes("offers_expire_at"):
+            data.pop("offers_expire_at", None)
+
+        return build_document(ProductCard, data, projection)
+
+    @staticmethod
+    def _read_projection(projection: Optional[Projection]) -> Optional[Projection]:
+        if projection is not None and projection.includes("best_offers"):
+            # the expiry of the offers is needed to know whether they are still valid, and the candidates to pick
+            # the best offers from again once they aren't
+            return Projection(projection.fields + ["offers_expire_at", "offer_candidates"])
+
+        return projection
+
+    def get_many(
+            self,
+            product_ids: Iterable[Union[str, ObjectId]],
+            projection: Optional[Projection] = None
+    ) -> Batch[ProductCard]:
+        """
+        Retrieve the cards of products by the IDs of the products with a single query.
+
+        :param product_ids: The IDs of the products.
+        :type product_ids: Iterable[Union[str, ObjectId]]
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: The cards in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[ProductCard]
+        """
+        return find_many(
+            self.db.connection[self.collection],
+            product_ids,
+            lambda data: self._build(data, projection),
+            self._read_projection(projection)
+        )
+
+    def find_page(
+            self,
+            query: Dict[str, Any],
+            pagination: Pagination,
+            projection: Optional[Projection] = None,
+            skip: int = 0
+    ) -> Page[ProductCard]:
+        """
+        Find a page of cards, sorted by `_id` or one of `sort_fields`.
+
+        :param query: The query, e.g. on the name of the products.
+        :type query: Dict[str, Any]
+        :param Pagination pagination: The page to read.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :param int skip: The number of cards to skip, only for clients that address pages by their number.
+        :return: The page of cards.
+        :rtype: Page[ProductCard]
+        """
+        return find_page(
+            self.db.connection[self.collection],
+            query,
+            pagination,
+            lambda data: self._build(data, projection),
+            self._read_projection(projection),
+            skip=skip
+        )
+
+    def count(self, query: Dict[str, Any]) -> int:
+        """
+        Count the cards that match a query.
+
+        All of the cards are counted from the metadata of the collection, without reading them.
+
+        :param query: The query.
+        :type query: Dict[str, Any]
+        :return: The number of cards.
+        :rtype: int
+        """
+        if not query:
+            return self.db.connection[self.collection].estimated_document_count()
+
+        return self.db.connection[self.collection].count_documents(query)
+
+    def _expected_cards(self, resolve_names: ResolveNames, now: datetime) -> Iterator[Dict[str, Any]]:
+        # offers are read in the order of their products, alongside the products, through the `product_id` index
+        offers = groupby(
+            self.db.connection[self.offers_collection]
+            .find({"product_id": {"$type": "objectId"}}, self.offer_fields)
+            .sort([("product_id", 1), ("_id", 1)]),
+            key=lambda offer: offer["product_id"]
+        )
+        product_id, product_offers = next(offers, (None, iter(())))
+
+        for product in self.db.connection[self.products_collection].find({}, self.product_fields).sort("_id"):
+            # offers of products that don't exist are skipped
+            while product_id is not None and product_id < product["_id"]:
+                product_id, product_offers = next(offers, (None, iter(())))
+
+            yield build_card(product, resolve_names, list(product_offers) if product_id == product["_id"] else [], now)
+
+    def check(self, resolve_names: ResolveNames) -> Dict[str, List[ObjectId]]:
+        """
+        Compare the cards with the products, tags and offers they are built from.
+
+        Products and cards are both read in the order of their `_id`, and offers in the order of their
+        `product_id`, and compared one by one, so none of the collections is held in memory.
+
+        :param ResolveNames resolve_names: Resolves the IDs of tags to their names.
+        :return: The IDs of the products without a card, of the cards that differ from their product
+            and of the cards without a product.
+        :rtype: Dict[str, List[ObjectId]]
+        """
+        report: Dict[str, List[ObjectId]] = {"missing": [], "stale": [], "orphaned": []}
+
+        expected_cards = self._expected_cards(resolve_names, self.clock())
+        stored_cards = self.db.connection[self.collection].find({}).sort("_id")
+
+        expected = next(expected_cards, None)
+        stored = next(stored_cards, None)
+
+        while expected is not None or stored is not None:
+            if stored is None or (expected is not None and expected["_id"] < stored["_id"]):
+                report["missing"].append(expected["_id"])
+                expected = next(expected_cards, None)
+            elif expected is None or stored["_id"] < expected["_id"]:
+                report["orphaned"].append(stored["_id"])
+                stored = next(stored_cards, None)
+            else:
+                stored.pop("updated_at", None)
+                if stored != expected:
+                    report["stale"].append(stored["_id"])
+
+                expected = next(expected_cards, None)
+                stored = next(stored_cards, None)
+
+        return report
+
+    def rebuild(self, resolve_names: ResolveNames) -> Dict[str, int]:
+        """
+        Write the cards of all products again, and delete the cards without a product.
+
+        :param ResolveNames resolve_names: Resolves the IDs of tags to their names.
+        :return: The number of written and of deleted cards.
+        :rtype: Dict[str, int]
+        """
+        now = self.clock()
+        collection = self.db.connection[self.collection]
+
+        product_ids = set()
+        written = 0
+        batch = []
+
+        for card in self._expected_cards(resolve_names, now):
+            product_ids.add(card["_id"])
+            batch.append(ReplaceOne({"_id": card["_id"]}, card | {"updated_at": now}, upsert=True))
+
+            if len(batch) == self.batch_size:
+                written += len(batch)
+                collection.bulk_write(batch, ordered=False)
+                batch = []
+
+        if batch:
+            written += len(batch)
+            collection.bulk_write(batch, ordered=False)
+
+        orphans = [card["_id"] for card in collection.find({}, {"_id": 1}) if card["_id"] not in product_ids]
+        deleted = 0
+
+        for i in range(0, len(orphans), self.batch_size):
+            deleted += collection.delete_many({"_id": {"$in": orphans[i:i + self.batch_size]}}).deleted_count
+
+        return {"written": written, "deleted": deleted}
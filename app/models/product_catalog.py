@@ -0,0 +1,550 @@
+import bisect
+import time
+from datetime import datetime, timedelta
+from functools import partial
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+
+from app.models.pagination import Page, Pagination
+from app.models.product_search import ProductSearchModel, SearchFilters
+from app.services import Database
+from lib.bitmaps import BitmapColumn, from_mask, to_rows, word_count
+
+
+def _in_thread(function: Callable[[], None]) -> None:
+    Thread(target=function, daemon=True).start()
+
+
+def _milliseconds(value: Optional[datetime]) -> int:
+    # datetimes are stored with the precision of milliseconds, as BSON has it
+    if value is None:
+        return np.iinfo(np.int64).min
+
+    return (value - datetime(1970, 1, 1)) // timedelta(milliseconds=1)
+
+
+class ProductCatalog:
+    """
+    In-process columnar catalog of the fields that products are filtered, faceted and sorted by.
+
+    Every product is a row. Its genres, categories, operating systems, languages, store platforms and whether it's
+    free are kept as bitmaps of rows, one per value, and its final prices, required age and creation time as NumPy
+    arrays by row. Filters are then answered with bitwise operations on bitmaps and vectorized comparisons of arrays,
+    and facets are counted as the set bits of the bitmaps of their values within the matches, without a query to the
+    database. Pages are the rows of the matches with the lowest ranks of the sort, which are computed once per sort
+    after every batch of writes.
+
+    The catalog is built on first use, e.g. by an initializer at the start of a worker, and patched by the writes of
+    `ProductsModel`. Once it's older than `max_age`, the next read starts a refresh in the background, that reads the
+    products written by other processes since the previous refresh, by their `updated_at`, like `ProductIndex`. Rows
+    of deleted products are cleared, and the catalog is built again once they outnumber the rows of products.
+    Refreshes read the database without holding the rows, which they only hold to patch them, and a rebuild fills new
+    rows that replace the current ones once it's done, so reads aren't kept waiting by the database.
+    """
+
+    db: Database
+    collection: str = "products"
+    sort_fields = ("created_at", "name")
+
+    # the fields whose values are kept as bitmaps, `is_free` has the value True or False
+    list_fields = ("genres", "categories", "platforms_os", "supported_languages", "platforms", "is_free")
+    product_fields = {
+        "name": 1, "created_at": 1, "updated_at": 1, "genres": 1, "categories": 1, "platforms_os": 1,
+        "supported_languages": 1, "platforms": 1, "is_free": 1, "required_age": 1, "price": 1
+    }
+
+    price_buckets = ProductSearchModel.price_buckets
+    max_facet_values = ProductSearchModel.max_facet_values
+
+    # the attributes of the rows, set by `_clear` and replaced as a whole by a rebuild
+    row_attributes = (
+        "_rows", "_count", "_capacity", "_documents", "_alive", "_lists", "_ages", "_created_at", "_id_high", "_id_low",
+        "_prices", "_rank_cache"
+    )
+
+    def __init__(
+            self,
+            db: Database,
+            max_age: float = 5,
+            overlap: timedelta = timedelta(seconds=5),
+            clock: Callable[[], float] = time.monotonic,
+            spawn: Callable[[Callable[[], None]], Any] = _in_thread
+    ) -> None:
+        """
+        Initialize the ProductCatalog.
+
+        :param db: The database instance.
+        :type db: Database
+        :param float max_age: Seconds after which the products written since the last refresh are read.
+        :param overlap: How far before the last `updated_at` a refresh reads, for writes that were committed late.
+        :type overlap: timedelta
+        :param clock: The monotonic clock the age of the catalog is measured with.
+        :type clock: Callable[[], float]
+        :param spawn: Runs the refreshes of a catalog that is too old, in a thread of their own if not specified.
+        :type spawn: Callable[[Callable[[], None]], Any]
+        """
+        self.db = db
+        self.max_age = max_age
+        self.overlap = overlap
+        self.clock = clock
+        self.spawn = spawn
+
+        # held while the rows are read or patched, never while the database is read
+        self._lock = Lock()
+        # serializes the refreshes
+        self._refresh_lock = Lock()
+        self._built = False
+        # the writes made while a rebuild reads the products, replayed on the new rows, None unless rebuilding
+        self._pending: Optional[List[Callable[[], None]]] = None
+        self._updated_since: Optional[datetime] = None
+        self._refreshed_at = 0.0
+        self._refreshing = False
+        self._clear()
+
+    def refresh(self) -> None:
+        """
+        Bring the catalog up to date with the products collection, building it if it's not built yet.
+        """
+        with self._refresh_lock:
+            self._refresh()
+
+    def save(self, product: Mapping[str, Any]) -> None:
+        """
+        Patch the row of a product after a write of the product, ignored until the catalog is built.
+
+        :param product: The product, as stored in the database.
+        :type product: Mapping[str, Any]
+        """
+        self.save_many([product])
+
+    def save_many(self, products: List[Mapping[str, Any]]) -> None:
+        """
+        Patch the rows of products after a bulk write of the products, ignored until the catalog is built.
+
+        :param products: The products, as stored in the database.
+        :type products: List[Mapping[str, Any]]
+        """
+        with self._lock:
+            for product in products:
+                if self._built:
+                    self._set(product)
+                if self._pending is not None:
+                    self._pending.append(partial(self._set, product))
+
+    def delete(self, product_id: ObjectId) -> None:
+        """
+        Clear the row of a deleted product.
+
+        :param ObjectId product_id: The ID of the product.
+        """
+        self.delete_many([product_id])
+
+    def delete_many(self, product_ids: List[ObjectId]) -> None:
+        """
+        Clear the rows of products after a bulk delete of the products.
+
+        :param List[ObjectId] product_ids: The IDs of the products.
+        """
+        with self._lock:
+            for product_id in product_ids:
+                self._remove(product_id.binary)
+                if self._pending is not None:
+                    self._pending.append(partial(self._remove, product_id.binary))
+
+    def find_page(self, filters: SearchFilters, pagination: Pagination, skip: int = 0) -> Tuple[Page[ObjectId], int]:
+        """
+        Find a page of the IDs of the products that match filters, refreshing the catalog if it's too old.
+
+        :param SearchFilters filters: The filters.
+        :param Pagination pagination: The page to read, sorted by `_id` or one of `sort_fields`.
+        :param int skip: The number of products to skip, only for clients that address pages by their number.
+        :return: The page of the IDs of the products, and the number of all matching products.
+        :rtype: Tuple[Page[ObjectId], int]
+        """
+        field = pagination.field
+        self._refresh_if_old()
+
+        with self._lock:
+            rows = to_rows(self._match(filters), self._count)
+            order, ranks = self._ranks(field)
+            row_ranks = ranks[rows]
+            count = len(rows)
+
+            if pagination.after is not None:
+                value, last_id = pagination.after
+                after = (self._sort_value(field, value), last_id.binary)
+                key = self._sort_key(field)
+
+                if pagination.direction == 1:
+                    keep = row_ranks >= bisect.bisect_right(order, after, key=key)
+                else:
+                    keep = row_ranks < bisect.bisect_left(order, after, key=key)
+
+                rows, row_ranks = rows[keep], row_ranks[keep]
+
+            # one more product than the limit tells whether there is a next page
+            wanted = skip + pagination.limit + 1
+            if pagination.direction == -1:
+                row_ranks = -row_ranks
+            if len(rows) > wanted:
+                nearest = np.argpartition(row_ranks, wanted - 1)[:wanted]
+                rows, row_ranks = rows[nearest], row_ranks[nearest]
+
+            page = [int(row) for row in rows[np.argsort(row_ranks)][skip:]]
+            next_cursor = None
+
+            if len(page) > pagination.limit:
+                page = page[:pagination.limit]
+                last = self._documents[page[-1]]
+                next_cursor = pagination.cursor_of({field: last[field], "_id": last["_id"]})
+
+            return Page([self._documents[row]["_id"] for row in page], next_cursor, pagination), count
+
+    def matcher(self, filters: SearchFilters) -> Callable[[bytes], bool]:
+        """
+        Match products against filters by their IDs, e.g. the matches of a search of `ProductIndex`, refreshing the
+        catalog if it's too old.
+
+        :param SearchFilters filters: The filters.
+        :return: Whether the product with a binary ID, `ObjectId.binary`, matches the filters, as of now.
+        :rtype: Callable[[bytes], bool]
+        """
+        self._refresh_if_old()
+
+        with self._lock:
+            mask = np.unpackbits(self._match(filters).view(np.uint8), count=self._count, bitorder="little")
+            rows = self._rows
+
+        def matches(key: bytes) -> bool:
+            row = rows.get(key)
+
+            return row is not None and row < len(mask) and bool(mask[row])
+
+        return matches
+
+    def facets(
+            self,
+            filters: SearchFilters,
+            names: Iterable[str],
+            keys: Optional[Iterable[bytes]] = None
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], bool]:
+        """
+        Count the products that match filters by the values of facets, refreshing the catalog if it's too old.
+
+        The products of a facet are counted with all of the filters but its own, as `ProductSearchModel.facets` does.
+
+        :param SearchFilters filters: The filters.
+        :param names: The names of the facets to count, see `ProductSearchModel.facet_names`.
+        :type names: Iterable[str]
+        :param keys: The binary IDs of the products to count among, e.g. the matches of a search, all if not given.
+        :type keys: Optional[Iterable[bytes]]
+        :return: The facets, in the format of `ProductSearchModel.facets`, and whether all products were counted,
+            which they always are.
+        :rtype: Tuple[Dict[str, List[Dict[str, Any]]], bool]
+        """
+        facets = {}
+        self._refresh_if_old()
+
+        with self._lock:
+            within = None
+            if keys is not None:
+                mask = np.zeros(self._count, dtype=bool)
+                mask[[self._rows[key] for key in keys if key in self._rows]] = True
+                within = from_mask(mask, self._words)
+
+            for name in dict.fromkeys(names):
+                bitmap = self._match(filters, exclude=name)
+                if within is not None:
+                    bitmap &= within
+
+                if name in self._lists:
+                    counts = sorted(self._lists[name].counts(bitmap).items(), key=lambda item: -item[1])
+                    facets[name] = [{"value": value, "count": count} for value, count in counts[:self.max_facet_values]]
+                elif name == "required_age":
+                    ages, counts = np.unique(self._ages[to_rows(bitmap, self._count)], return_counts=True)
+                    top = np.argsort(-counts, kind="stable")[:self.max_facet_values]
+                    facets[name] = [{"value": int(ages[i]), "count": int(counts[i])} for i in top]
+                elif name == "price":
+                    facets[name] = self._price_facet(bitmap, filters.currency)
+
+        return facets, True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the catalog.
+
+        :return: The number of products and of rows, the `updated_at` it's up to date with and the seconds since its
+            refresh.
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            return {
+                "products": len(self._rows),
+                "rows": self._count,
+                "updated_since": self._updated_since,
+                "age": self.clock() - self._refreshed_at if self._built else None,
+            }
+
+    def _clear(self) -> None:
+        self._rows: Dict[bytes, int] = {}
+        self._count = 0
+        self._capacity = 64
+        # the `_id` and the values of the sort fields of every row, None for the rows of deleted products
+        self._documents: List[Optional[Dict[str, Any]]] = []
+        self._alive = np.zeros(1, dtype=np.uint64)
+        self._lists: Dict[str, BitmapColumn] = {name: BitmapColumn() for name in self.list_fields}
+        self._ages = np.zeros(self._capacity, dtype=np.int64)
+        self._created_at = np.zeros(self._capacity, dtype=np.int64)
+        # the `_id` of every row as a big-endian number in two parts, that sort as the IDs do
+        self._id_high = np.zeros(self._capacity, dtype=np.uint64)
+        self._id_low = np.zeros(self._capacity, dtype=np.uint64)
+        self._prices: Dict[str, np.ndarray] = {}
+        # the rows in the order of a sort, and the rank of every row in it, by sort field, until the next write
+        self._rank_cache: Dict[str, Tuple[List[int], np.ndarray]] = {}
+
+    @property
+    def _words(self) -> int:
+        return word_count(self._capacity)
+
+    def _grow(self) -> None:
+        self._capacity *= 2
+
+        for name in ("_ages", "_created_at", "_id_high", "_id_low"):
+            column = getattr(self, name)
+            setattr(self, name, np.concatenate([column, np.zeros_like(column)]))
+
+        for currency, column in self._prices.items():
+            self._prices[currency] = np.concatenate([column, np.full_like(column, np.nan)])
+
+        self._alive = np.concatenate([self._alive, np.zeros_like(self._alive)])
+        for column in self._lists.values():
+            column.resize(self._words)
+
+    def _set(self, product: Mapping[str, Any], newer: bool = False) -> None:
+        key = product["_id"].binary
+        row = self._rows.get(key)
+
+        if newer and row is not None and self._documents[row] is not None:
+            # a product read by a refresh doesn't undo a later write of this worker
+            updated_at, row_updated_at = product.get("updated_at"), self._documents[row]["updated_at"]
+            if updated_at is not None and row_updated_at is not None and updated_at < row_updated_at:
+                return
+
+        if row is None:
+            if self._count == self._capacity:
+                self._grow()
+
+            row = self._rows[key] = self._count
+            self._count += 1
+            self._documents.append(None)
+
+        lists = self._lists
+        lists["genres"].set(row, product.get("genres") or [])
+        lists["categories"].set(row, product.get("categories") or [])
+        lists["platforms_os"].set(row, product.get("platforms_os") or [])
+        lists["supported_languages"].set(row, product.get("supported_languages") or [])
+        lists["platforms"].set(row, (product.get("platforms") or {}).keys())
+        lists["is_free"].set(row, [bool(product.get("is_free"))])
+
+        self._ages[row] = product.get("required_age") or 0
+        self._created_at[row] = _milliseconds(product.get("created_at"))
+        self._id_high[row] = int.from_bytes(key[:8], "big")
+        self._id_low[row] = int.from_bytes(key[8:], "big")
+
+        prices = {
+            currency: price["final"] for currency, price in (product.get("price") or {}).items()
+            if isinstance(price, Mapping) and price.get("final") is not None
+        }
+        for currency in prices.keys() - self._prices.keys():
+            self._prices[currency] = np.full(self._capacity, np.nan)
+        for currency, column in self._prices.items():
+            column[row] = prices.get(currency, np.nan)
+
+        self._documents[row] = {
+            "_id": product["_id"], "name": product.get("name") or "", "created_at": product.get("created_at"),
+            "updated_at": product.get("updated_at")
+        }
+        self._alive.view(np.uint8)[row >> 3] |= np.uint8(1 << (row & 7))
+        self._rank_cache.clear()
+
+    def _remove(self, key: bytes) -> None:
+        row = self._rows.pop(key, None)
+
+        if row is not None:
+            for column in self._lists.values():
+                column.set(row, [])
+
+            self._documents[row] = None
+            self._alive.view(np.uint8)[row >> 3] &= ~np.uint8(1 << (row & 7))
+            self._rank_cache.clear()
+
+    def _match(self, filters: SearchFilters, exclude: Optional[str] = None) -> np.ndarray:
+        bitmap = self._alive.copy()
+
+        for name in ("genres", "categories", "platforms_os", "supported_languages", "platforms"):
+            values = getattr(filters, name)
+            if values and name != exclude:
+                bitmap &= self._lists[name].union(values)
+
+        if filters.is_free is not None and exclude != "is_free":
+            bitmap &= self._lists["is_free"].union([filters.is_free])
+
+        if filters.required_age is not None and exclude != "required_age":
+            bitmap &= from_mask(self._ages[:self._count] <= filters.required_age, self._words)
+
+        if (filters.price_min is not None or filters.price_max is not None) and exclude != "price":
+            prices = self._prices.get(filters.currency)
+            if prices is None:
+                return np.zeros_like(bitmap)
+
+            # comparisons with NaN, the price of the products without one in the currency, are false
+            mask = np.ones(self._count, dtype=bool)
+            if filters.price_min is not None:
+                mask &= prices[:self._count] >= filters.price_min
+            if filters.price_max is not None:
+                mask &= prices[:self._count] <= filters.price_max
+
+            bitmap &= from_mask(mask, self._words)
+
+        return bitmap
+
+    def _price_facet(self, bitmap: np.ndarray, currency: str) -> List[Dict[str, Any]]:
+        prices = self._prices.get(currency)
+        if prices is None:
+            return []
+
+        prices = prices[to_rows(bitmap, self._count)]
+        buckets = np.searchsorted(self.price_buckets, prices[~np.isnan(prices)], side="right") - 1
+        counts = np.bincount(buckets[buckets >= 0], minlength=len(self.price_buckets))
+        upper = [*self.price_buckets[1:], None]
+
+        return [
+            {"min": self.price_buckets[i], "max": upper[i], "count": int(counts[i])}
+            for i in np.flatnonzero(counts)
+        ]
+
+    def _sort_key(self, field: str) -> Callable[[int], Tuple[Any, bytes]]:
+        documents = self._documents
+
+        if field == "_id":
+            return lambda row: (documents[row]["_id"].binary, documents[row]["_id"].binary)
+        if field == "created_at":
+            return lambda row: (int(self._created_at[row]), documents[row]["_id"].binary)
+
+        return lambda row: (documents[row][field], documents[row]["_id"].binary)
+
+    def _sort_value(self, field: str, value: Any) -> Any:
+        if field == "_id":
+            return value.binary
+        if field == "created_at":
+            return _milliseconds(value)
+
+        return value
+
+    def _ranks(self, field: str) -> Tuple[List[int], np.ndarray]:
+        cached = self._rank_cache.get(field)
+        if cached is not None:
+            return cached
+
+        live = to_rows(self._alive, self._count)
+        high, low = self._id_high[live], self._id_low[live]
+
+        if field == "_id":
+            order = live[np.lexsort((low, high))]
+        elif field == "created_at":
+            order = live[np.lexsort((low, high, self._created_at[live]))]
+        else:
+            key = self._sort_key(field)
+            order = np.array(sorted(live.tolist(), key=key), dtype=np.int64)
+
+        ranks = np.zeros(self._count, dtype=np.int64)
+        ranks[order] = np.arange(len(order))
+
+        cached = self._rank_cache[field] = (order.tolist(), ranks)
+        return cached
+
+    def _refresh_if_old(self) -> None:
+        # only the first read waits for the catalog, the reads of a catalog that is too old start a refresh of it
+        if not self._built:
+            with self._refresh_lock:
+                if not self._built:
+                    self._refresh()
+        elif self.clock() - self._refreshed_at >= self.max_age and not self._refreshing:
+            self._refreshing = True
+            self.spawn(self._refresh_in_background)
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def _read_until(self, products: Iterable[Mapping[str, Any]]) -> Iterable[Mapping[str, Any]]:
+        # only the products read by a refresh move the watermark, the ones saved by this worker may be newer than
+        # the writes of other workers that weren't read yet
+        for product in products:
+            updated_at = product.get("updated_at")
+            if updated_at is not None and (self._updated_since is None or updated_at > self._updated_since):
+                self._updated_since = updated_at
+
+            yield product
+
+    def _rebuild(self) -> None:
+        products = self.db.connection[self.collection]
+
+        with self._lock:
+            self._pending = []
+
+        try:
+            fresh = ProductCatalog(self.db)
+            self._updated_since = None
+
+            for product in self._read_until(products.find({}, self.product_fields)):
+                fresh._set(product)
+
+            with self._lock:
+                for name in self.row_attributes:
+                    setattr(self, name, getattr(fresh, name))
+                for write in self._pending:
+                    write()
+
+                self._built = True
+        finally:
+            with self._lock:
+                self._pending = None
+
+    def _refresh(self) -> None:
+        products = self.db.connection[self.collection]
+
+        with self._lock:
+            # rows of deleted products are not reused, the catalog is built again once they are the majority
+            rebuild = not self._built or self._count > 2 * len(self._rows)
+
+        if rebuild:
+            self._rebuild()
+        else:
+            query = {}
+            if self._updated_since is not None:
+                query = {"updated_at": {"$gte": self._updated_since - self.overlap}}
+
+            written = list(self._read_until(products.find(query, self.product_fields)))
+            count = products.estimated_document_count()
+
+            with self._lock:
+                for product in written:
+                    self._set(product, newer=True)
+
+                # the products created after this are found by the scan below
+                known = set(self._rows) if count != len(self._rows) else None
+
+            if known is not None:
+                existing = {product["_id"].binary for product in products.find({}, {"_id": 1})}
+
+                with self._lock:
+                    for key in known - existing:
+                        self._remove(key)
+
+        self._refreshed_at = self.clock()
@@ -3,9 +3,10 @@ from app.services import Database
 from .exceptions import NotFoundException
 
 from dataclasses import dataclass
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Iterable
 from bson import ObjectId
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
 from datetime import datetime
 
 
@@ -60,6 +61,17 @@ class ProductCommentsModel:
         comment = self.db.connection[self.collection].find_one({"_id": ObjectId(comment_id)})
         return ProductComment(**comment) if comment else None
 
+    def get_many(self, comment_ids: Iterable[Union[str, ObjectId]]) -> Batch[ProductComment]:
+        """
+        Retrieve product comments by their IDs with a single query.
+
+        :param comment_ids: The IDs of the product comments.
+        :type comment_ids: Iterable[Union[str, ObjectId]]
+        :return: The product comments in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[ProductComment]
+        """
+        return find_many(self.db.connection[self.collection], comment_ids, lambda item: ProductComment(**item))
+
     def get_all(self, product_id: str) -> List[ProductComment]:
         """
         Retrieve all product comments for a specific product from the database.
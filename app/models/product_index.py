@@ -0,0 +1,447 @@
+import heapq
+import time
+from datetime import datetime, timedelta
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from bson import ObjectId
+
+from app.models.pagination import Page, Pagination
+from app.models.tags import TagNames
+from app.services import Database
+from lib.inverted_index import InvertedIndex
+from lib.prefix_index import PrefixIndex
+from lib.search import normalize, words
+
+
+def _in_thread(function: Callable[[], None]) -> None:
+    Thread(target=function, daemon=True).start()
+
+
+class ProductIndex:
+    """
+    In-process inverted index of the searchable text of all products, ranked with BM25.
+
+    The name, short description, developers, publishers and the names of the genres and categories of every
+    product are indexed in memory, so a search ranks and pages through its matches without a query to the database.
+    The index is built on first use, e.g. by an initializer at the start of a worker, and written by the writes of
+    `ProductsModel`, so searches see the writes of their own worker right away. Once it's older than
+    `max_age`, the next search starts a refresh in the background, that reads the products written since the previous
+    refresh, by their `updated_at`, and the products with a tag whose name changed. Deleted products are found when
+    the number of products differs from the number of indexed ones.
+    Refreshes write to a copy of the index, that shares everything it doesn't change, and replace the index with it
+    once they are done, so searches score their matches against a snapshot of the index without waiting for writes.
+
+    The names and slugs of the products are also kept in a prefix index, that suggests the most popular products
+    whose name, a word of their name onwards, or slug starts with what was typed so far. The popularity of a product
+    is the number of its comments, which is counted again once it's older than `popularity_max_age`.
+    """
+
+    db: Database
+    collection: str = "products"
+    comments_collection: str = "product_comments"
+    # `score` is the BM25 relevance of a product to the query, best first with `-score`
+    sort_fields = ("created_at", "name", "score")
+    default_sort = "-score"
+
+    # the weights of the texts of a product, a term in a name counts three times as much as in the description
+    field_weights = {"name": 3.0, "developers": 2.0, "publishers": 2.0, "tags": 1.5, "short_description": 1.0}
+    product_fields = {
+        "name": 1, "slug": 1, "short_description": 1, "developers": 1, "publishers": 1, "genres": 1,
+        "categories": 1, "created_at": 1, "updated_at": 1
+    }
+
+    # longer queries are cut
+    max_query_words = 10
+
+    def __init__(
+            self,
+            db: Database,
+            tags: TagNames,
+            max_age: float = 5,
+            popularity_max_age: float = 300,
+            overlap: timedelta = timedelta(seconds=5),
+            clock: Callable[[], float] = time.monotonic,
+            spawn: Callable[[Callable[[], None]], Any] = _in_thread
+    ) -> None:
+        """
+        Initialize the ProductIndex.
+
+        :param db: The database instance.
+        :type db: Database
+        :param TagNames tags: The names of the tags, that the genres and categories of products are indexed by.
+        :param float max_age: Seconds after which the products written since the last refresh are read.
+        :param float popularity_max_age: Seconds after which the popularity of the products is counted again.
+        :param overlap: How far before the last `updated_at` a refresh reads, for writes that were committed late.
+        :type overlap: timedelta
+        :param clock: The monotonic clock the age of the index is measured with.
+        :type clock: Callable[[], float]
+        :param spawn: Runs the refreshes of an index that is too old, in a thread of their own if not specified.
+        :type spawn: Callable[[Callable[[], None]], Any]
+        """
+        self.db = db
+        self.tags = tags
+        self.max_age = max_age
+        self.popularity_max_age = popularity_max_age
+        self.overlap = overlap
+        self.clock = clock
+        self.spawn = spawn
+
+        # serializes the writers of the index, searches read the latest snapshot without waiting for them
+        self._lock = Lock()
+        # serializes the lookups and writes of the suggestions, every lookup writes their cache
+        self._suggestions_lock = Lock()
+        # the index and the sort keys of the indexed products, by the bytes of their IDs, which hash much faster
+        # than ObjectIds, replaced as a whole by every write, so searches read a consistent snapshot of both
+        self._snapshot: Optional[Tuple[InvertedIndex[bytes], Dict[bytes, Dict[str, Any]]]] = None
+        self._suggestions: PrefixIndex[bytes] = PrefixIndex()
+        self._popularity: Dict[bytes, int] = {}
+        self._popularity_counted_at = 0.0
+        self._tag_names: Dict[ObjectId, str] = {}
+        self._updated_since: Optional[datetime] = None
+        self._refreshed_at = 0.0
+        self._refreshing = False
+
+    def parse(self, query: str) -> List[str]:
+        """
+        Split a search query into the words it's matched by.
+
+        :param str query: The query, as typed by a user.
+        :return: The normalized words, empty if the query has none.
+        :rtype: List[str]
+        """
+        return words(query)[:self.max_query_words]
+
+    def refresh(self) -> None:
+        """
+        Bring the index up to date with the products collection, building it if it's not built yet.
+        """
+        with self._lock:
+            self._refresh()
+
+    def save(self, product: Mapping[str, Any]) -> None:
+        """
+        Index a product again after a write of the product, ignored until the index is built.
+
+        :param product: The product, as stored in the database.
+        :type product: Mapping[str, Any]
+        """
+        self.save_many([product])
+
+    def save_many(self, products: List[Mapping[str, Any]]) -> None:
+        """
+        Index products again after a bulk write of the products, ignored until the index is built.
+
+        :param products: The products, as stored in the database.
+        :type products: List[Mapping[str, Any]]
+        """
+        with self._lock:
+            if self._snapshot is not None:
+                self._write(products)
+
+    def delete(self, product_id: ObjectId) -> None:
+        """
+        Drop a deleted product from the index.
+
+        :param ObjectId product_id: The ID of the product.
+        """
+        self.delete_many([product_id])
+
+    def delete_many(self, product_ids: List[ObjectId]) -> None:
+        """
+        Drop products from the index after a bulk delete of the products.
+
+        :param List[ObjectId] product_ids: The IDs of the products.
+        """
+        with self._lock:
+            if self._snapshot is not None:
+                self._write([], [product_id.binary for product_id in product_ids])
+
+    def search(
+            self,
+            query_words: List[str],
+            pagination: Pagination,
+            skip: int = 0,
+            include: Optional[Callable[[bytes], bool]] = None
+    ) -> Tuple[Page[ObjectId], int]:
+        """
+        Find a page of the IDs of the products that match a search query, refreshing the index if it's too old.
+
+        :param query_words: The normalized words of the query, at least one.
+        :type query_words: List[str]
+        :param Pagination pagination: The page to read, sorted by `_id` or one of `sort_fields`.
+        :param int skip: The number of products to skip, only for clients that address pages by their number.
+        :param include: Whether a match, by its binary ID, is kept, e.g. `ProductCatalog.matcher` of filters,
+            all matches are kept if not specified.
+        :type include: Optional[Callable[[bytes], bool]]
+        :return: The page of the IDs of the products, and the number of all matching products.
+        :rtype: Tuple[Page[ObjectId], int]
+        """
+        field = pagination.field
+        index, sort_keys = self._read()
+
+        scores = index.search(query_words)
+        if include is not None:
+            scores = {key: score for key, score in scores.items() if include(key)}
+
+        # the (sort key, _id) of every match, that pages are sorted and addressed by
+        if field == "score":
+            matches = [(score, key) for key, score in scores.items()]
+        elif field == "_id":
+            matches = [(key, key) for key in scores]
+        else:
+            matches = [(sort_keys[key][field], key) for key in scores]
+
+        if pagination.after is not None:
+            value, last_id = pagination.after
+            after = (value.binary if field == "_id" else value, last_id.binary)
+            matches = [match for match in matches if (match > after if pagination.direction == 1 else match < after)]
+
+        # one more product than the limit tells whether there is a next page
+        select = heapq.nsmallest if pagination.direction == 1 else heapq.nlargest
+        page = select(skip + pagination.limit + 1, matches)[skip:]
+
+        next_cursor = None
+        if len(page) > pagination.limit:
+            page = page[:pagination.limit]
+            value, last_key = page[-1]
+            next_cursor = pagination.cursor_of({
+                field: ObjectId(value) if field == "_id" else value, "_id": ObjectId(last_key)
+            })
+
+        return Page([ObjectId(key) for _, key in page], next_cursor, pagination), len(scores)
+
+    def match(self, query_words: List[str]) -> List[bytes]:
+        """
+        Find the binary IDs, `ObjectId.binary`, of all products that match a search query, refreshing the index
+        if it's too old.
+
+        :param query_words: The normalized words of the query, at least one.
+        :type query_words: List[str]
+        :return: The binary IDs of the products, in no particular order.
+        :rtype: List[bytes]
+        """
+        index, _ = self._read()
+
+        return list(index.search(query_words))
+
+    def suggest(self, prefix: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Suggest the most popular products whose name, a word of their name onwards, or slug starts with a prefix,
+        refreshing the index if it's too old.
+
+        :param str prefix: The prefix, as typed by a user.
+        :param int limit: The maximum number of suggestions.
+        :return: The `_id`, `name` and `slug` of the products, most popular first, the newest first among equally
+            popular ones.
+        :rtype: List[Dict[str, Any]]
+        """
+        self._read()
+
+        with self._suggestions_lock:
+            _, sort_keys = self._snapshot
+            keys = self._suggestions.top(normalize(prefix), limit)
+
+            return [
+                {"_id": ObjectId(key), "name": sort_keys[key]["name"], "slug": sort_keys[key]["slug"]}
+                for key in keys
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the index.
+
+        :return: The number of indexed products, the `updated_at` it's up to date with and the seconds since its
+            refresh.
+        :rtype: Dict[str, Any]
+        """
+        snapshot = self._snapshot
+
+        return {
+            "products": len(snapshot[0]) if snapshot is not None else 0,
+            "updated_since": self._updated_since,
+            "age": self.clock() - self._refreshed_at if snapshot is not None else None,
+        }
+
+    def _read(self) -> Tuple[InvertedIndex[bytes], Dict[bytes, Dict[str, Any]]]:
+        # only the first read waits for the index, the reads of an index that is too old start a refresh of it
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._refresh()
+        elif self.clock() - self._refreshed_at >= self.max_age and not self._refreshing:
+            self._refreshing = True
+            self.spawn(self._refresh_in_background)
+
+        return self._snapshot
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def _texts(self, product: Mapping[str, Any]) -> List[Tuple[str, float]]:
+        weights = self.field_weights
+        tag_ids = [*(product.get("genres") or []), *(product.get("categories") or [])]
+        tags = [self._tag_names[tag_id] for tag_id in tag_ids if tag_id in self._tag_names]
+
+        return [
+            (product.get("name") or "", weights["name"]),
+            (product.get("short_description") or "", weights["short_description"]),
+            *((developer, weights["developers"]) for developer in product.get("developers") or []),
+            *((publisher, weights["publishers"]) for publisher in product.get("publishers") or []),
+            *((tag, weights["tags"]) for tag in tags),
+        ]
+
+    @staticmethod
+    def _suggestion_texts(product: Mapping[str, Any]) -> List[str]:
+        name_words = words(product.get("name") or "")
+
+        return [
+            *(" ".join(name_words[i:]) for i in range(len(name_words))),
+            normalize(product.get("slug") or ""),
+        ]
+
+    @staticmethod
+    def _sort_key(product: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            "name": product.get("name") or "",
+            "slug": product.get("slug") or "",
+            "created_at": product.get("created_at") or datetime.min,
+        }
+
+    def _add(
+            self,
+            index: InvertedIndex[bytes],
+            sort_keys: Dict[bytes, Dict[str, Any]],
+            product: Mapping[str, Any]
+    ) -> None:
+        key = product["_id"].binary
+
+        index.add(key, self._texts(product))
+        sort_keys[key] = self._sort_key(product)
+
+    def _read_until(self, product: Mapping[str, Any]) -> None:
+        updated_at = product.get("updated_at")
+        if updated_at is not None and (self._updated_since is None or updated_at > self._updated_since):
+            self._updated_since = updated_at
+
+    def _count_popularity(self) -> Dict[bytes, int]:
+        comments = self.db.connection[self.comments_collection].aggregate([
+            {"$group": {"_id": "$product_id", "count": {"$sum": 1}}}
+        ])
+        self._popularity_counted_at = self.clock()
+
+        return {item["_id"].binary: item["count"] for item in comments if isinstance(item["_id"], ObjectId)}
+
+    def _build(self, products: Iterable[Mapping[str, Any]]) -> None:
+        index: InvertedIndex[bytes] = InvertedIndex()
+        sort_keys: Dict[bytes, Dict[str, Any]] = {}
+        suggestions: PrefixIndex[bytes] = PrefixIndex()
+
+        for product in products:
+            self._add(index, sort_keys, product)
+            self._read_until(product)
+            key = product["_id"].binary
+            suggestions.set(key, self._suggestion_texts(product), self._popularity.get(key, 0))
+
+        index.apply()
+        suggestions.apply()
+
+        with self._suggestions_lock:
+            self._snapshot = (index, sort_keys)
+            self._suggestions = suggestions
+
+    def _write(
+            self,
+            products: List[Mapping[str, Any]],
+            removed: Iterable[bytes] = (),
+            popularity: Optional[Dict[bytes, int]] = None
+    ) -> None:
+        index, sort_keys = self._snapshot
+        removed = [key for key in removed if key in index]
+
+        # the products that are indexed as they are, e.g. read again by the overlap of refreshes, aren't copied for
+        changed = [
+            product for product in products
+            if not index.indexed(product["_id"].binary, self._texts(product))
+            or sort_keys[product["_id"].binary] != self._sort_key(product)
+        ]
+
+        if changed or removed:
+            index, sort_keys = index.copy(), dict(sort_keys)
+
+            for product in changed:
+                self._add(index, sort_keys, product)
+            for key in removed:
+                index.remove(key)
+                del sort_keys[key]
+
+            index.apply()
+
+        rescored = []
+        if popularity is not None:
+            rescored = [key for key in popularity.keys() | self._popularity.keys()
+                        if popularity.get(key, 0) != self._popularity.get(key, 0)]
+            self._popularity = popularity
+
+        with self._suggestions_lock:
+            for product in products:
+                key = product["_id"].binary
+                self._suggestions.set(key, self._suggestion_texts(product), self._popularity.get(key, 0))
+            for key in removed:
+                self._suggestions.remove(key)
+            for key in rescored:
+                self._suggestions.set_score(key, self._popularity.get(key, 0))
+
+            self._suggestions.apply()
+            self._snapshot = (index, sort_keys)
+
+    def _refresh(self) -> None:
+        products = self.db.connection[self.collection]
+        tag_names = self.tags.get()
+
+        popularity = None
+        if self._snapshot is None or self.clock() - self._popularity_counted_at >= self.popularity_max_age:
+            popularity = self._count_popularity()
+
+        if self._snapshot is None:
+            self._tag_names = dict(tag_names)
+            self._popularity = popularity
+            self._updated_since = None
+            self._build(products.find({}, self.product_fields))
+        else:
+            query = {}
+            if self._updated_since is not None:
+                query = {"updated_at": {"$gte": self._updated_since - self.overlap}}
+
+            written = list(products.find(query, self.product_fields))
+            # only the products read here move the watermark, the ones saved by this worker may be newer than the
+            # writes of other workers that weren't read yet
+            for product in written:
+                self._read_until(product)
+
+            # the products with a tag that was renamed, added or deleted are indexed again with its new name
+            changed_tags = [
+                tag_id for tag_id in tag_names.keys() | self._tag_names.keys()
+                if tag_names.get(tag_id) != self._tag_names.get(tag_id)
+            ]
+            if changed_tags:
+                self._tag_names = dict(tag_names)
+                written += products.find(
+                    {"$or": [{"genres": {"$in": changed_tags}}, {"categories": {"$in": changed_tags}}]},
+                    self.product_fields
+                )
+
+            index, _ = self._snapshot
+            indexed = len(index) + len({product["_id"].binary for product in written} - set(index.keys()))
+            removed = []
+
+            if products.estimated_document_count() != indexed:
+                existing = {product["_id"].binary for product in products.find({}, {"_id": 1})}
+                removed = [key for key in index.keys() if key not in existing]
+
+            self._write(written, removed, popularity)
+
+        self._refreshed_at = self.clock()
@@ -3,9 +3,10 @@ from app.services import Database
 from .exceptions import NotFoundException
 
 from dataclasses import dataclass
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Iterable
 from bson import ObjectId
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
 
 
 class ProductReply(BaseDocument):
@@ -59,6 +60,17 @@ class ProductRepliesModel:
         reply = self.db.connection[self.collection].find_one({"_id": ObjectId(reply_id)})
         return ProductReply(**reply) if reply else None
 
+    def get_many(self, reply_ids: Iterable[Union[str, ObjectId]]) -> Batch[ProductReply]:
+        """
+        Retrieve product replies by their IDs with a single query.
+
+        :param reply_ids: The IDs of the product replies.
+        :type reply_ids: Iterable[Union[str, ObjectId]]
+        :return: The product replies in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[ProductReply]
+        """
+        return find_many(self.db.connection[self.collection], reply_ids, lambda item: ProductReply(**item))
+
     def get_all(self, comment_id: str) -> List[ProductReply]:
         """
         Retrieve all product replies for a specific comment from the database.
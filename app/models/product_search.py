@@ -0,0 +1,497 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from app.models.pagination import Page, Pagination
+from app.services import Database
+from lib.cache import Cache
+from lib.search import GRAM_SIZE, index_grams, normalize, query_grams, words
+
+
+def build_entry(product: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Build the search entry of a product.
+
+    `title` and `text` are normalized and padded with spaces, so that the beginning of a word is
+    found by a space in front of it.
+
+    :param product: The product, as stored in the database.
+    :type product: Mapping[str, Any]
+    :return: The entry, as stored in the database, without `updated_at`.
+    :rtype: Dict[str, Any]
+    """
+    name = product.get("name") or ""
+    description = product.get("short_description") or ""
+    prices = product.get("price") or {}
+
+    return {
+        "_id": product["_id"],
+        "name": name,
+        "created_at": product.get("created_at"),
+        "title": f" {normalize(name)} ",
+        "text": f" {normalize(name)} {normalize(description)} ",
+        "grams": index_grams(f"{name} {description}"),
+        # the fields that searches are filtered and faceted by
+        "genres": product.get("genres") or [],
+        "categories": product.get("categories") or [],
+        "platforms_os": product.get("platforms_os") or [],
+        "supported_languages": product.get("supported_languages") or [],
+        "platforms": list(product.get("platforms") or {}),
+        "is_free": bool(product.get("is_free")),
+        "required_age": product.get("required_age") or 0,
+        "prices": [
+            {"currency": currency, "final": price["final"]}
+            for currency, price in prices.items() if isinstance(price, Mapping) and price.get("final") is not None
+        ],
+    }
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """
+    The filters of a search. A product matches a list filter if it has any of its values, and all of the filters.
+
+    Filters are hashable, so that they are part of the keys of cached counts and results.
+    """
+
+    genres: Tuple[ObjectId, ...] = ()
+    categories: Tuple[ObjectId, ...] = ()
+    platforms_os: Tuple[str, ...] = ()
+    supported_languages: Tuple[str, ...] = ()
+    # the stores a product is sold on, the keys of its `platforms`, e.g. `steam`
+    platforms: Tuple[str, ...] = ()
+    is_free: Optional[bool] = None
+    # the age of the user, products that require an older one don't match
+    required_age: Optional[int] = None
+    # the final price, in cents of `currency`
+    price_min: Optional[int] = None
+    price_max: Optional[int] = None
+    currency: str = "USD"
+
+    def selected(self) -> List[str]:
+        """
+        List the facets that the search is filtered by.
+
+        :return: The names of the facets, see `ProductSearchModel.facet_names`.
+        :rtype: List[str]
+        """
+        selected = [
+            name for name in (
+                "genres", "categories", "platforms_os", "supported_languages", "platforms", "is_free", "required_age"
+            )
+            if getattr(self, name) not in ((), None)
+        ]
+
+        if self.price_min is not None or self.price_max is not None:
+            selected.append("price")
+
+        return selected
+
+    def query(self, exclude: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the Mongo query of the entries that match the filters.
+
+        :param exclude: The facet to leave out, so that the counts of its values don't depend on its own filter.
+        :type exclude: Optional[str]
+        :return: The Mongo query, empty without filters.
+        :rtype: Dict[str, Any]
+        """
+        query: Dict[str, Any] = {}
+
+        for name in ("genres", "categories", "platforms_os", "supported_languages", "platforms"):
+            values = getattr(self, name)
+            if values and name != exclude:
+                query[name] = {"$in": list(values)}
+
+        if self.is_free is not None and exclude != "is_free":
+            query["is_free"] = self.is_free
+
+        if self.required_age is not None and exclude != "required_age":
+            query["required_age"] = {"$lte": self.required_age}
+
+        if (self.price_min is not None or self.price_max is not None) and exclude != "price":
+            final = {}
+            if self.price_min is not None:
+                final["$gte"] = self.price_min
+            if self.price_max is not None:
+                final["$lte"] = self.price_max
+
+            query["prices"] = {"$elemMatch": {"currency": self.currency, "final": final}}
+
+        return query
+
+
+class ProductSearchModel:
+    """
+    The `product_search` read model, the grams of the name and the short description of every product.
+
+    A search reads the entries that have all of the grams of the query through a multikey index, so its cost
+    grows with the number of products that match, not with the size of the catalog.
+    Entries are kept up to date by the writes of `ProductsModel`, writes made around it are caught up with `rebuild`.
+    The total counts of queries are cached for a short time, so paging through the results of a query
+    doesn't count all of its matches again for every page.
+
+    Entries also have the fields that searches are filtered by, see `SearchFilters`, and that the matches of a search
+    are counted by, per value, as facets. All facets are counted by a single aggregation, over at most
+    `max_facet_entries` matches, so that their cost is bounded however large the catalog grows.
+    """
+
+    db: Database
+    counts: Cache[Tuple[str, int, Optional[SearchFilters]], int]
+    collection: str = "product_search"
+    products_collection: str = "products"
+    # `score` is the relevance of an entry to the query, best first with `-score`
+    sort_fields = ("created_at", "name", "score")
+    default_sort = "-score"
+
+    # the fields of products that entries are built from
+    product_fields = {
+        "name": 1, "short_description": 1, "created_at": 1, "genres": 1, "categories": 1, "platforms_os": 1,
+        "supported_languages": 1, "platforms": 1, "is_free": 1, "required_age": 1, "price": 1
+    }
+
+    facet_names = (
+        "genres", "categories", "platforms_os", "supported_languages", "platforms", "is_free", "required_age", "price"
+    )
+    # the lower bounds of the ranges of final prices that the price facet counts, in cents
+    price_buckets = (0, 1, 500, 1000, 2000, 5000)
+    # facets are counted over this many matches at most, and are approximate beyond
+    max_facet_entries = 10000
+    # the number of the most frequent values counted per facet
+    max_facet_values = 20
+
+    # longer queries are cut, every word of a query is checked in every matching entry
+    max_query_words = 10
+
+    # the number of entries written at once by a rebuild
+    batch_size = 1000
+
+    # approximate counts stop at this number of matches
+    approx_count_limit = 1000
+
+    def __init__(
+            self,
+            db: Database,
+            clock: Callable[[], datetime] = datetime.utcnow,
+            counts: Optional[Cache] = None
+    ) -> None:
+        """
+        Initialize the ProductSearchModel.
+
+        :param db: The database instance.
+        :type db: Database
+        :param clock: The clock of `updated_at`, in UTC.
+        :type clock: Callable[[], datetime]
+        :param counts: The cache of the total counts of queries, disabled if not specified.
+        :type counts: Optional[Cache]
+        """
+        self.db = db
+        self.clock = clock
+        self.counts = counts if counts is not None else Cache(maxsize=0, ttl=0)
+
+    def save(self, product: Mapping[str, Any]) -> None:
+        """
+        Write the search entry of a product after a write of the product.
+
+        :param product: The product, as stored in the database.
+        :type product: Mapping[str, Any]
+        """
+        entry = build_entry(product)
+
+        self.db.connection[self.collection].replace_one(
+            {"_id": entry["_id"]}, entry | {"updated_at": self.clock()}, upsert=True)
+        self.counts.clear()
+
+    def save_many(self, products: List[Mapping[str, Any]]) -> None:
+        """
+        Write the search entries of products after a bulk write of the products, with one write.
+
+        :param products: The products, as stored in the database.
+        :type products: List[Mapping[str, Any]]
+        """
+        if len(products) == 0:
+            return
+
+        now = self.clock()
+
+        self.db.connection[self.collection].bulk_write([
+            ReplaceOne({"_id": product["_id"]}, build_entry(product) | {"updated_at": now}, upsert=True)
+            for product in products
+        ], ordered=False)
+        self.counts.clear()
+
+    def delete(self, product_id: ObjectId) -> None:
+        """
+        Delete the search entry of a deleted product.
+
+        :param ObjectId product_id: The ID of the product.
+        """
+        self.db.connection[self.collection].delete_one({"_id": product_id})
+        self.counts.clear()
+
+    def delete_many(self, product_ids: List[ObjectId]) -> None:
+        """
+        Delete the search entries of products after a bulk delete of the products.
+
+        :param List[ObjectId] product_ids: The IDs of the products.
+        """
+        if product_ids:
+            self.db.connection[self.collection].delete_many({"_id": {"$in": product_ids}})
+            self.counts.clear()
+
+    def parse(self, query: str) -> List[str]:
+        """
+        Split a search query into the words it's matched by.
+
+        :param str query: The query, as typed by a user.
+        :return: The normalized words, empty if the query has none.
+        :rtype: List[str]
+        """
+        return words(query)[:self.max_query_words]
+
+    @staticmethod
+    def match(query_words: List[str], filters: Optional[SearchFilters] = None) -> Dict[str, Any]:
+        """
+        Build the Mongo query of the entries that contain all of the words of a search query, and match its filters.
+
+        The grams select the candidates through the index, the words are then checked in the text of
+        each candidate, so that grams found in different words don't make a match.
+
+        :param query_words: The normalized words of the query, none to match the filters only.
+        :type query_words: List[str]
+        :param filters: The filters of the search, if any.
+        :type filters: Optional[SearchFilters]
+        :return: The Mongo query.
+        :rtype: Dict[str, Any]
+        """
+        query = filters.query() if filters is not None else {}
+
+        if query_words:
+            checks = [
+                {"$gte": [{"$indexOfCP": ["$text", word if len(word) >= GRAM_SIZE else f" {word}"]}, 0]}
+                for word in query_words
+            ]
+            query |= {"grams": {"$all": query_grams(query_words)}, "$expr": {"$and": checks}}
+
+        return query
+
+    @staticmethod
+    def score(query_words: List[str]) -> Dict[str, Any]:
+        """
+        Build the expression of the relevance of an entry: the name is the query, starts with it,
+        has a word that starts with it or has it inside, or only the description has the words.
+
+        :param query_words: The normalized words of the query.
+        :type query_words: List[str]
+        :return: The aggregation expression, from 4 for the most relevant entries down to 0.
+        :rtype: Dict[str, Any]
+        """
+        phrase = " ".join(query_words)
+
+        return {"$switch": {
+            "branches": [
+                {"case": {"$eq": ["$title", f" {phrase} "]}, "then": 4},
+                {"case": {"$eq": [{"$indexOfCP": ["$title", f" {phrase}"]}, 0]}, "then": 3},
+                {"case": {"$gt": [{"$indexOfCP": ["$title", f" {phrase}"]}, 0]}, "then": 2},
+                {"case": {"$gte": [{"$indexOfCP": ["$title", phrase]}, 0]}, "then": 1},
+            ],
+            "default": 0
+        }}
+
+    def find_page(
+            self,
+            query_words: List[str],
+            pagination: Pagination,
+            skip: int = 0,
+            filters: Optional[SearchFilters] = None
+    ) -> Page[ObjectId]:
+        """
+        Find a page of the IDs of the products that match a search query.
+
+        :param query_words: The normalized words of the query, none to match the filters only.
+        :type query_words: List[str]
+        :param Pagination pagination: The page to read, sorted by `_id` or one of `sort_fields`, `score` only with
+            words.
+        :param int skip: The number of entries to skip, only for clients that address pages by their number.
+        :param filters: The filters of the search, if any.
+        :type filters: Optional[SearchFilters]
+        :return: The page of the IDs of the products.
+        :rtype: Page[ObjectId]
+        """
+        pipeline: List[Dict[str, Any]] = [{"$match": self.match(query_words, filters)}]
+
+        if pagination.field == "score":
+            pipeline.append({"$addFields": {"score": self.score(query_words)}})
+
+        position = pagination.to_query()
+        if position:
+            pipeline.append({"$match": position})
+
+        pipeline.append({"$sort": dict(pagination.to_sort())})
+        if skip:
+            pipeline.append({"$skip": skip})
+        pipeline += [{"$limit": pagination.limit + 1}, {"$project": {"_id": 1, pagination.field: 1}}]
+
+        entries = list(self.db.connection[self.collection].aggregate(pipeline))
+
+        next_cursor = None
+        if len(entries) > pagination.limit:
+            entries = entries[:pagination.limit]
+            next_cursor = pagination.cursor_of(entries[-1])
+
+        return Page([entry["_id"] for entry in entries], next_cursor, pagination)
+
+    def count(self, query_words: List[str], limit: int = 0, filters: Optional[SearchFilters] = None) -> int:
+        """
+        Count the products that match a search query, through the cache of the counts.
+
+        Counts are cached by the normalized query and the filters, until they expire or a product is written.
+
+        :param query_words: The normalized words of the query, none to match the filters only.
+        :type query_words: List[str]
+        :param int limit: The number of matches to stop counting at, e.g. `approx_count_limit`, all if 0.
+        :param filters: The filters of the search, if any.
+        :type filters: Optional[SearchFilters]
+        :return: The number of products, at most `limit` if it's given.
+        :rtype: int
+        """
+        def load() -> int:
+            options = {"limit": limit} if limit else {}
+
+            return self.db.connection[self.collection].count_documents(self.match(query_words, filters), **options)
+
+        return self.counts.get_or_load((" ".join(query_words), limit, filters), load)
+
+    def facets(
+            self,
+            query_words: List[str],
+            filters: SearchFilters,
+            names: Iterable[str]
+    ) -> Tuple[Dict[str, List[Dict[str, Any]]], bool]:
+        """
+        Count the matches of a search query by the values of facets, with a single aggregation.
+
+        The matches of a facet are counted with all of the filters but its own, so that the counts of its other values
+        tell how many products selecting them as well would add. Only the entries that match all of the filters but
+        at most one are read, up to `max_facet_entries` of them.
+
+        :param query_words: The normalized words of the query, none to count the entries that match the filters.
+        :type query_words: List[str]
+        :param SearchFilters filters: The filters of the search.
+        :param names: The names of the facets to count, see `facet_names`.
+        :type names: Iterable[str]
+        :return: The `value` and `count` of the most frequent values of every facet, most frequent first, the price
+            ranges as `min` and `max` in cents, `max` None for the last one, and whether all matches were counted.
+        :rtype: Tuple[Dict[str, List[Dict[str, Any]]], bool]
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}, True
+
+        # the entries that match the filters of at least one of the facets
+        queries = {name: filters.query(exclude=name) for name in names}
+        distinct = list({repr(query): query for query in queries.values()}.values())
+        match = self.match(query_words) | (distinct[0] if len(distinct) == 1 else {"$or": distinct})
+
+        branches: Dict[str, List[Dict[str, Any]]] = {"scanned": [{"$count": "count"}]}
+        for name in names:
+            branch: List[Dict[str, Any]] = [{"$match": queries[name]}] if len(distinct) > 1 else []
+
+            if name == "price":
+                boundaries = [*self.price_buckets, 2 ** 62]
+                branch += [
+                    {"$unwind": "$prices"},
+                    {"$match": {"prices.currency": filters.currency}},
+                    {"$bucket": {"groupBy": "$prices.final", "boundaries": boundaries, "default": None}},
+                    {"$match": {"_id": {"$ne": None}}},
+                ]
+            else:
+                branch += [
+                    {"$unwind": f"${name}"},
+                    {"$sortByCount": f"${name}"},
+                    {"$limit": self.max_facet_values},
+                ]
+
+            branches[name] = branch
+
+        result = next(self.db.connection[self.collection].aggregate([
+            {"$match": match},
+            {"$limit": self.max_facet_entries},
+            {"$facet": branches},
+        ]))
+
+        scanned = result["scanned"][0]["count"] if result["scanned"] else 0
+        facets = {}
+
+        for name in names:
+            if name == "price":
+                upper = dict(zip(self.price_buckets, [*self.price_buckets[1:], None]))
+                facets[name] = [
+                    {"min": bucket["_id"], "max": upper[bucket["_id"]], "count": bucket["count"]}
+                    for bucket in result[name]
+                ]
+            else:
+                facets[name] = [{"value": bucket["_id"], "count": bucket["count"]} for bucket in result[name]]
+
+        return facets, scanned < self.max_facet_entries
+
+    def needs_rebuild(self) -> bool:
+        """
+        Check whether the entries are behind the products, e.g. right after the collection was created, or after
+        fields were added to the entries.
+
+        Entries of products written around the model are not detected, see `python -m scripts.product_search`.
+
+        :return: True if the number of entries differs from the number of products, or if an entry misses the
+            fields of `build_entry`.
+        :rtype: bool
+        """
+        collection = self.db.connection[self.collection]
+
+        products = self.db.connection[self.products_collection]
+
+        if collection.estimated_document_count() != products.estimated_document_count():
+            return True
+
+        # `platforms` is the latest field of the entries, the entries without it miss the filters too
+        return collection.find_one({"platforms": {"$exists": False}}, {"_id": 1}) is not None
+
+    def rebuild(self) -> Dict[str, int]:
+        """
+        Write the search entries of all products again, and delete the entries without a product.
+
+        :return: The number of written and of deleted entries.
+        :rtype: Dict[str, int]
+        """
+        now = self.clock()
+        collection = self.db.connection[self.collection]
+
+        product_ids = set()
+        written = 0
+        batch = []
+
+        for product in self.db.connection[self.products_collection].find({}, self.product_fields):
+            product_ids.add(product["_id"])
+            batch.append(ReplaceOne({"_id": product["_id"]}, build_entry(product) | {"updated_at": now}, upsert=True))
+
+            if len(batch) == self.batch_size:
+                written += len(batch)
+                collection.bulk_write(batch, ordered=False)
+                batch = []
+
+        if batch:
+            written += len(batch)
+            collection.bulk_write(batch, ordered=False)
+
+        orphans = [entry["_id"] for entry in collection.find({}, {"_id": 1}) if entry["_id"] not in product_ids]
+        deleted = 0
+
+        for i in range(0, len(orphans), self.batch_size):
+            deleted += collection.delete_many({"_id": {"$in": orphans[i:i + self.batch_size]}}).deleted_count
+
+        self.counts.clear()
+
+        return {"written": written, "deleted": deleted}
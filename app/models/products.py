@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+import re
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 from bson import ObjectId
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from slugify import slugify
 
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
+from app.models.projection import Projection, build_document, find, find_one
 from app.services import Database
+from lib.cache import Cache
+
+from .product_cards import ProductCardsModel
+from .product_catalog import ProductCatalog
+from .product_index import ProductIndex
+from .product_search import ProductSearchModel
+from .search_results import SearchResults
+from .tags import TagsModel
 
 
 @dataclass
@@ -181,72 +196,192 @@ class ProductsModel:
     """
 
     db: Database
+    tags: TagsModel
+    cards: ProductCardsModel
+    search: ProductSearchModel
+    cache: Cache[Hashable, Product]
+    results: SearchResults
+    catalog: Optional[ProductCatalog]
+    index: Optional[ProductIndex]
     collection: str = "products"
+    sort_fields = ("created_at", "name")
+    tag_fields = ('genres', 'categories')
+    batch_size = 1000
 
-    def get_aggregation_pipeline(self, query: dict | None = None):
-        if query is None:
-            query = {'$match': {}}
-
-        return [
-            query,
-            {
-                '$lookup': {
-                    'from': 'tags',
-                    'localField': 'genres',
-                    'foreignField': '_id',
-                    'as': 'genres'
-                }
-            },
-            {
-                '$lookup': {
-                    'from': 'tags',
-                    'localField': 'categories',
-                    'foreignField': '_id',
-                    'as': 'categories'
-                }
-            },
-            {
-                '$addFields': {
-                    'genres': {
-                        '$reduce': {
-                            'input': '$genres',
-                            'initialValue': [],
-                            'in': {'$concatArrays': ['$$value', ['$$this.name']]}
-                        }
-                    },
-                    'categories': {
-                        '$reduce': {
-                            'input': '$categories',
-                            'initialValue': [],
-                            'in': {'$concatArrays': ['$$value', ['$$this.name']]}
-                        }
-                    }
-                }
-            }
-        ]
-
-    def __init__(self, db: Database) -> None:
+    def __init__(
+            self,
+            db: Database,
+            tags: TagsModel,
+            cards: ProductCardsModel,
+            search: ProductSearchModel,
+            cache: Optional[Cache] = None,
+            results: Optional[SearchResults] = None,
+            catalog: Optional[ProductCatalog] = None,
+            index: Optional[ProductIndex] = None
+    ) -> None:
         """
         Initialize the ProductsModel.
 
         :param db: The database instance.
         :type db: Database
+        :param tags: The tags model, whose names genres and categories are resolved with.
+        :type tags: TagsModel
+        :param cards: The read model of the cards of the products, which every write of a product updates.
+        :type cards: ProductCardsModel
+        :param search: The search index of the products, which every write of a product updates.
+        :type search: ProductSearchModel
+        :param cache: The read-through cache of the full products read by ID or slug, disabled if not specified.
+            Cached products are shared between requests, so they must not be modified.
+        :type cache: Optional[Cache]
+        :param results: The cache of the results of searches, which every write of a product drops, disabled if not
+            specified.
+        :type results: Optional[SearchResults]
+        :param catalog: The in-memory catalog of the products, which every write of a product patches, if any.
+        :type catalog: Optional[ProductCatalog]
+        :param index: The in-memory search index of the products, which every write of a product updates, if any.
+        :type index: Optional[ProductIndex]
         """
         self.db = db
+        self.tags = tags
+        self.cards = cards
+        self.search = search
+        self.cache = cache if cache is not None else Cache(maxsize=0, ttl=0)
+        self.results = results if results is not None else SearchResults(tags.names)
+        self.catalog = catalog
+        self.index = index
 
-    def get(self, product_id: str) -> Optional[Product]:
+        self._tags_version = tags.names.version
+
+    def resolve_tags(self, product_data: Mapping[str, Any]) -> Mapping[str, Any]:
+        """
+        Replace the tag IDs of the genres and categories of a product with the names of the tags.
+
+        Names are resolved from the in-memory map of `TagsModel`, so products are read without joining the tags.
+
+        :param product_data: The product, as stored in the database.
+        :type product_data: Mapping[str, Any]
+        :return: The product with the names of its tags.
+        :rtype: Mapping[str, Any]
+        """
+        names = {name: self.tags.names.resolve(product_data[name]) for name in self.tag_fields if name in product_data}
+
+        return {**product_data, **names} if names else product_data
+
+    def get_connection(self, lazy: bool = False):
+        """
+        Get the database connection to read products with.
+
+        Lazy reads return products whose embedded documents (media, requirements, price, ...) are
+        kept as `RawBSONDocument` and decoded only when accessed. They pay off for products that are
+        written back to the database, where raw documents are copied as they are, or of which only
+        a few fields are read. Products that are fully serialized are cheaper to read eagerly.
+
+        :param bool lazy: Whether to read documents as raw BSON.
+        :return: The database connection.
+        :rtype: pymongo.database.Database
+        """
+        return self.db.raw_connection if lazy else self.db.connection
+
+    def invalidate(self, product_id: ObjectId, *slugs: str) -> None:
+        """
+        Drop a product from the cache after a write.
+
+        :param ObjectId product_id: The ID of the product.
+        :param str slugs: Slugs that may be cached for the product, besides the ones of its cached copies.
+        """
+        slug_keys = {("slug", slug) for slug in slugs}
+
+        self.cache.invalidate_if(lambda key, product: product._id == product_id or key in slug_keys)
+
+    def _after_write(self, saved: List[Mapping[str, Any]], deleted_ids: Sequence[ObjectId] = ()) -> None:
+        """
+        Bring everything that is derived from the products up to date after a write of products: the cached products,
+        the cards, the search entries, the in-memory catalog and index, if any, and the cached search results.
+
+        :param saved: The written products, as stored in the database.
+        :type saved: List[Mapping[str, Any]]
+        :param deleted_ids: The IDs of the deleted products.
+        :type deleted_ids: Sequence[ObjectId]
+        """
+        product_ids = {product["_id"] for product in saved} | set(deleted_ids)
+        # a product may have been cached as missing by its new slug
+        slug_keys = {("slug", product["slug"]) for product in saved if product.get("slug")}
+        self.cache.invalidate_if(lambda key, product: product._id in product_ids or key in slug_keys)
+
+        if saved:
+            self.cards.save_many(saved, self.tags.names.resolve)
+            self.search.save_many(saved)
+        if deleted_ids:
+            self.cards.delete_many(list(deleted_ids))
+            self.search.delete_many(list(deleted_ids))
+
+        for model in (self.catalog, self.index):
+            if model is not None and saved:
+                model.save_many(saved)
+            if model is not None and deleted_ids:
+                model.delete_many(list(deleted_ids))
+
+        self.results.invalidate()
+
+    def _cached(self, key: Hashable, load: Callable[[], Optional[Product]]) -> Optional[Product]:
+        # cached products carry the names of their tags, so they are dropped once the tags change
+        tags_version = self.tags.names.version
+        if tags_version != self._tags_version:
+            self._tags_version = tags_version
+            self.cache.clear()
+
+        return self.cache.get_or_load(key, load)
+
+    def _find_one(self, query: Dict[str, Any], lazy: bool = False, projection: Optional[Projection] = None):
+        collection = self.get_connection(lazy)[self.collection]
+        product_data = find_one(collection, query, projection)
+
+        if product_data:
+            return build_document(Product, self.resolve_tags(product_data), projection)
+
+    def get(self, product_id: str, lazy: bool = False, projection: Optional[Projection] = None) -> Optional[Product]:
         """
         Retrieve a product by its ID.
 
+        Full products are read through the cache, lazy and projected reads always go to the database.
+
         :param str product_id: The ID of the product to be retrieved.
+        :param bool lazy: Whether to read the product as raw BSON, see `get_connection`.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
         :return: The product data if found.
         :rtype: Optional[Product]
         """
-        pipeline = self.get_aggregation_pipeline({"$match": {"_id": ObjectId(product_id)}})
-        product_data = next(self.db.connection[self.collection].aggregate(pipeline), None)
+        query = {"_id": ObjectId(product_id)}
 
-        if product_data:
-            return Product(**product_data)
+        if lazy or projection is not None:
+            return self._find_one(query, lazy, projection)
+
+        return self._cached(("id", query["_id"]), lambda: self._find_one(query))
+
+    def get_many(
+            self,
+            product_ids: Iterable[Union[str, ObjectId]],
+            projection: Optional[Projection] = None,
+            resolve_tags: bool = True
+    ) -> Batch[Product]:
+        """
+        Retrieve products by their IDs with a single query.
+
+        :param product_ids: The IDs of the products.
+        :type product_ids: Iterable[Union[str, ObjectId]]
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :param bool resolve_tags: Whether genres and categories are the names of the tags, otherwise their IDs.
+        :return: The products in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[Product]
+        """
+        return find_many(
+            self.db.connection[self.collection],
+            product_ids,
+            lambda item: build_document(Product, self.resolve_tags(item) if resolve_tags else item, projection),
+            projection
+        )
 
     def get_all(self):
         """
@@ -259,27 +394,73 @@ class ProductsModel:
         :rtype: list[Product]
         """
 
-        pipeline = self.get_aggregation_pipeline()
-        products = [Product(**item) for item in self.db.connection[self.collection].aggregate(pipeline)]
+        cursor = self.db.connection[self.collection].find({})
+        products = [Product(**self.resolve_tags(item)) for item in cursor]
 
         return products if products else []
 
-    def get_by_slug(self, product_slug: str) -> Optional[Product]:
+    def get_page(self, pagination: Pagination, projection: Optional[Projection] = None) -> Page[Product]:
+        """
+        Retrieve a page of products, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: The page of Product objects.
+        :rtype: Page[Product]
+        """
+        return find_page(
+            self.db.connection[self.collection],
+            {},
+            pagination,
+            lambda item: build_document(Product, self.resolve_tags(item), projection),
+            projection
+        )
+
+    def iter_all(self, projection: Optional[Projection] = None) -> Iterator[Product]:
+        """
+        Iterate over all products in the database.
+
+        Unlike `get_all`, products are built one at a time while the cursor is consumed,
+        so the whole collection is never held in memory.
+
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: An iterator of Product objects representing all the products in the database.
+        :rtype: Iterator[Product]
+        """
+
+        cursor = find(self.db.connection[self.collection], {}, projection)
+
+        return (build_document(Product, self.resolve_tags(item), projection) for item in cursor)
+
+    def get_by_slug(
+            self,
+            product_slug: str,
+            lazy: bool = False,
+            projection: Optional[Projection] = None
+    ) -> Optional[Product]:
         """
         Retrieve a product by its slug.
 
         This method fetches a product from the database based on its unique slug.
         A slug is a human-readable, URL-friendly identifier used to represent a product.
 
+        Full products are read through the cache, lazy and projected reads always go to the database.
+
         :param str product_slug: The slug of the product to be retrieved.
+        :param bool lazy: Whether to read the product as raw BSON, see `get_connection`.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
         :return: The product data if found, otherwise None.
         :rtype: Optional[Product]
         """
-        pipeline = self.get_aggregation_pipeline({"$match": {"slug": product_slug}})
+        query = {"slug": product_slug}
 
-        product_data = next(self.db.connection[self.collection].aggregate(pipeline), None)
-        if product_data:
-            return Product(**product_data)
+        if lazy or projection is not None:
+            return self._find_one(query, lazy, projection)
+
+        return self._cached(("slug", product_slug), lambda: self._find_one(query))
 
     def create(self, input_data: ProductCreate) -> Product:
         """
@@ -291,11 +472,78 @@ class ProductsModel:
         :rtype: Product
         """
         product = Product(**input_data.to_json())
+        product_data = product.to_bson()
 
-        self.db.connection[self.collection].insert_one(product.to_bson())
+        self.db.connection[self.collection].insert_one(product_data)
+        self._after_write([product_data])
 
         return product
 
+    def unique_slugs(self, names: List[str]) -> List[str]:
+        """
+        Create slugs from names that no product has yet, nor any other of the names.
+
+        A slug that is taken gets the lowest free numeric suffix, e.g. `game-2`. Taken slugs are
+        looked up with two queries for all the names: one for the slugs themselves and one for
+        the suffixed variants of the slugs that are taken.
+
+        :param List[str] names: The names or slugs of the products.
+        :return: The slugs, in the order of the names.
+        :rtype: List[str]
+        """
+        collection = self.db.connection[self.collection]
+        bases = [slugify(name) or "product" for name in names]
+
+        taken = {product["slug"] for product in collection.find({"slug": {"$in": list(set(bases))}}, {"slug": 1})}
+        conflicts = {base for base in bases if base in taken} | {base for base in bases if bases.count(base) > 1}
+
+        if conflicts:
+            taken |= {product["slug"] for product in collection.find(
+                {"$or": [{"slug": {"$regex": f"^{re.escape(base)}-[0-9]+$"}} for base in conflicts]},
+                {"slug": 1}
+            )}
+
+        slugs = []
+        for base in bases:
+            slug, suffix = base, 2
+            while slug in taken:
+                slug, suffix = f"{base}-{suffix}", suffix + 1
+
+            taken.add(slug)
+            slugs.append(slug)
+
+        return slugs
+
+    def create_many(self, input_data: List[ProductCreate]) -> Tuple[List[Product], Dict[int, str]]:
+        """
+        Create products with a single unordered bulk insert, giving each of them a unique slug.
+
+        Unlike `create`, a product that can't be written doesn't stop the others.
+
+        :param input_data: The products to be created.
+        :type input_data: List[ProductCreate]
+        :return: The products, in the order of the input, and the errors of the ones that were not created by their index.
+        :rtype: Tuple[List[Product], Dict[int, str]]
+        """
+        if len(input_data) == 0:
+            return [], {}
+
+        products = [Product(**data.to_json()) for data in input_data]
+        for product, slug in zip(products, self.unique_slugs([product.slug or product.name for product in products])):
+            product.slug = slug
+
+        documents = [product.to_bson() for product in products]
+        errors = {}
+
+        try:
+            self.db.connection[self.collection].insert_many(documents, ordered=False)
+        except BulkWriteError as error:
+            errors = {write_error["index"]: write_error["errmsg"] for write_error in error.details["writeErrors"]}
+
+        self._after_write([data for i, data in enumerate(documents) if i not in errors])
+
+        return products, errors
+
     def put(self, product: Product) -> Product:
         """
         Update a product in the database.
@@ -305,13 +553,16 @@ class ProductsModel:
         :return: The updated product data.
         :rtype: Product
         """
+        product_data = product.to_bson()
+
+        self.db.connection[self.collection].insert_one(product_data)
+        self._after_write([product_data])
 
-        self.db.connection[self.collection].insert_one(product.to_bson())
         return product
 
     def patch(self, product_id: str, input_data: ProductPatch) -> Optional[Product]:
         """
-        Update an existing product in the database.
+        Update an existing product in the database, with a single write that returns the updated product.
 
         :param str product_id: The ID of the product to be updated.
         :param input_data: The product data updates.
@@ -321,13 +572,16 @@ class ProductsModel:
         """
         updates = {key: value for key, value in input_data.to_json(
         ).items() if value is not None}  # Filtering out None values
-        self.db.connection[self.collection].update_one(
-            {"_id": ObjectId(product_id)}, {"$set": updates})
-
-        updated_product_data = self.db.connection[self.collection].find_one(
-            {"_id": ObjectId(product_id)})
+        updated_product_data = self.db.connection[self.collection].find_one_and_update(
+            {"_id": ObjectId(product_id)},
+            {"$set": updates, "$currentDate": {"updated_at": True}},
+            return_document=ReturnDocument.AFTER
+        )
         if updated_product_data:
-            return Product(**updated_product_data)
+            self._after_write([updated_product_data])
+            return Product(**self.resolve_tags(updated_product_data))
+
+        self.invalidate(ObjectId(product_id), *([updates["slug"]] if "slug" in updates else []))
         return None
 
     def delete(self, product_id: str) -> int:
@@ -341,4 +595,72 @@ class ProductsModel:
         deletion_result = self.db.connection[self.collection].delete_one(
             {"_id": ObjectId(product_id)}
         )
+        self._after_write([], [ObjectId(product_id)])
+
         return deletion_result.deleted_count
+
+    def patch_many(self, updates: List[Tuple[str, ProductPatch]]) -> Tuple[List[Optional[Product]], Dict[int, str]]:
+        """
+        Update many products, with one unordered bulk write and one read of the updated products per `batch_size` updates.
+
+        :param updates: The IDs of the products and their updates.
+        :type updates: List[Tuple[str, ProductPatch]]
+        :return: The updated products in the order of the updates, None for the ones that don't exist,
+            and the errors of the updates that failed by their index.
+        :rtype: Tuple[List[Optional[Product]], Dict[int, str]]
+        """
+        collection = self.db.connection[self.collection]
+        products: List[Optional[Product]] = []
+        errors: Dict[int, str] = {}
+
+        for start in range(0, len(updates), self.batch_size):
+            batch = [(ObjectId(product_id), input_data) for product_id, input_data in updates[start:start + self.batch_size]]
+            operations = []
+
+            for product_id, input_data in batch:
+                # filtering out None values, as a single patch does
+                changes = {key: value for key, value in input_data.to_json().items() if value is not None}
+                operations.append(UpdateOne({"_id": product_id}, {"$set": changes, "$currentDate": {"updated_at": True}}))
+
+            try:
+                collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as error:
+                errors |= {start + write_error["index"]: write_error["errmsg"] for write_error in error.details["writeErrors"]}
+
+            updated = {product["_id"]: product for product in collection.find({"_id": {"$in": [product_id for product_id, _ in batch]}})}
+
+            self._after_write(list(updated.values()))
+
+            products += [
+                Product(**self.resolve_tags(updated[product_id])) if product_id in updated else None
+                for product_id, _ in batch
+            ]
+
+        return products, errors
+
+    def delete_many(self, product_ids: List[str]) -> List[bool]:
+        """
+        Delete many products, with one read of the existing ones and one delete per `batch_size` IDs.
+
+        A product is reported as deleted only if the delete removed all of the existing products of its batch.
+        Otherwise some of them were deleted by another request in between, and which ones is not known.
+
+        :param List[str] product_ids: The IDs of the products to be deleted.
+        :return: Whether each of the products was deleted, False for the ones that don't exist.
+        :rtype: List[bool]
+        """
+        collection = self.db.connection[self.collection]
+        deleted = []
+
+        for start in range(0, len(product_ids), self.batch_size):
+            batch = [ObjectId(product_id) for product_id in product_ids[start:start + self.batch_size]]
+            existing = [product["_id"] for product in collection.find({"_id": {"$in": batch}}, {"_id": 1})]
+
+            deleted_count = collection.delete_many({"_id": {"$in": existing}}).deleted_count if existing else 0
+
+            found = set(existing)
+            self._after_write([], existing)
+
+            deleted += [deleted_count == len(existing) and product_id in found for product_id in batch]
+
+        return deleted
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Optional, cast
+from typing import Iterable, Iterator, List, Optional, Union, cast
 
 import firebase_admin.auth
 import pymongo.errors
@@ -7,6 +7,9 @@ from bson import ObjectId
 from pymongo import ReturnDocument
 
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
+from app.models.projection import Projection, build_document, find, find_one
 from app.services import Database
 from app.services.firebase import Firebase
 from config import app_config
@@ -62,12 +65,13 @@ class ProfilesModel:
     db: Database
     firebase: Firebase
     collection: str = "profiles"
+    sort_fields = ("created_at", "nickname")
 
     def __init__(self, db: Database, firebase: Firebase) -> None:
         self.db = db
         self.firebase = firebase
 
-    def get(self, profile_id: str):
+    def get(self, profile_id: str, projection: Optional[Projection] = None):
         """
         Retrieve a user profile based on the user ID.
 
@@ -75,14 +79,37 @@ class ProfilesModel:
         If a profile is found, it is returned as a Profile object.
 
         :param str profile_id: The ID of the user whose profile is being retrieved.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
         :return: A Profile object if the user profile is found, otherwise None.
         :rtype: Profile or None
         """
-        profile = self.db.connection[self.collection].find_one(
-            {"_id": ObjectId(profile_id)})
+        profile = find_one(self.db.connection[self.collection], {"_id": ObjectId(profile_id)}, projection)
 
         if profile is not None:
-            return Profile(**profile)
+            return build_document(Profile, profile, projection)
+
+    def get_many(
+            self,
+            profile_ids: Iterable[Union[str, ObjectId]],
+            projection: Optional[Projection] = None
+    ) -> Batch[Profile]:
+        """
+        Retrieve user profiles by their IDs with a single query.
+
+        :param profile_ids: The IDs of the profiles.
+        :type profile_ids: Iterable[Union[str, ObjectId]]
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: The profiles in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[Profile]
+        """
+        return find_many(
+            self.db.connection[self.collection],
+            profile_ids,
+            lambda item: build_document(Profile, item, projection),
+            projection
+        )
 
     def get_all(self):
         """
@@ -97,6 +124,40 @@ class ProfilesModel:
 
         return products if products else []
 
+    def get_page(self, pagination: Pagination, projection: Optional[Projection] = None) -> Page[Profile]:
+        """
+        Retrieve a page of profiles, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: The page of Profile objects.
+        :rtype: Page[Profile]
+        """
+        return find_page(
+            self.db.connection[self.collection],
+            {},
+            pagination,
+            lambda item: build_document(Profile, item, projection),
+            projection
+        )
+
+    def iter_all(self, projection: Optional[Projection] = None) -> Iterator[Profile]:
+        """
+        Iterate over all user profiles in the database.
+
+        Unlike `get_all`, profiles are built one at a time while the cursor is consumed,
+        so the whole collection is never held in memory.
+
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: An iterator of all user profiles in the database.
+        :rtype: Iterator[Profile]
+        """
+        cursor = find(self.db.connection[self.collection], {}, projection)
+
+        return (build_document(Profile, item, projection) for item in cursor)
+
     def find_by_email(self, email: str):
         """
         Retrieve a user profile based on the user's email.
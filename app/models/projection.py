@@ -0,0 +1,140 @@
+from typing import Any, Dict, List, Optional, Set, Type, TypeVar
+
+from pymongo.collection import Collection
+from pymongo.cursor import Cursor
+
+from app.models.base import BaseDocument
+
+Document = TypeVar("Document", bound=BaseDocument)
+
+
+class Projection:
+    """
+    A subset of the fields of a document to read.
+
+    Models turn it into a Mongo projection, so that only the requested fields are sent by the database,
+    and build partial documents from the result. Fields that were not read stay unset and are skipped
+    by the serializers.
+
+    Fields are top-level fields of the document schema, or dot-separated paths inside of them,
+    e.g. `media.header_url`. The `_id` of a document is always read.
+    """
+
+    fields: List[str]
+    roots: Set[str]
+
+    def __init__(self, fields: List[str]) -> None:
+        """
+        Initialize the Projection.
+
+        :param List[str] fields: Paths of the fields to read.
+        """
+        # a path makes every longer path under it redundant, Mongo rejects such collisions
+        paths = sorted(set(fields), key=len)
+        self.fields = [
+            path for i, path in enumerate(paths)
+            if not any(path.startswith(shorter + ".") for shorter in paths[:i])
+        ]
+        self.roots = {path.split(".", 1)[0] for path in self.fields} | {"_id"}
+
+    @staticmethod
+    def parse(value: Optional[str], document: Type[BaseDocument]) -> Optional["Projection"]:
+        """
+        Parse a comma-separated list of fields and validate it against the schema of a document.
+
+        :param value: The list of fields, e.g. `name,slug,media.header_url`.
+        :type value: Optional[str]
+        :param document: The class of the document.
+        :type document: Type[BaseDocument]
+        :return: The projection, or None if no fields were given.
+        :rtype: Optional[Projection]
+        :raises ValueError: If a field is not a field of the document.
+        """
+        if value is None:
+            return None
+
+        fields = [field.strip() for field in value.split(",") if field.strip()]
+        if len(fields) == 0:
+            return None
+
+        for field in fields:
+            segments = field.split(".")
+
+            if segments[0] not in document.__fields__ or any(not s or s.startswith("$") for s in segments):
+                raise ValueError(f"Unknown field \"{field}\" of {document.__name__}.")
+
+        return Projection(fields)
+
+    def includes(self, field: str) -> bool:
+        """
+        Check whether a top-level field is read, fully or partially.
+
+        :param str field: The top-level field.
+        :return: True if the field is read.
+        :rtype: bool
+        """
+        return field in self.roots
+
+    def to_mongo(self) -> Dict[str, Any]:
+        """
+        Convert the projection into a Mongo projection, usable in `find` or a `$project` stage.
+
+        :return: The Mongo projection.
+        :rtype: Dict[str, Any]
+        """
+        return {field: 1 for field in self.fields}
+
+
+def build_document(document: Type[Document], data: Dict[str, Any], projection: Optional[Projection]) -> Document:
+    """
+    Build a document from data read with an optional projection.
+
+    :param document: The class of the document.
+    :type document: Type[BaseDocument]
+    :param data: The data, as read from the database.
+    :type data: Dict[str, Any]
+    :param projection: The projection the data was read with.
+    :type projection: Optional[Projection]
+    :return: A full document without a projection, otherwise a partial one.
+    :rtype: BaseDocument
+    """
+    if projection is None:
+        return document(**data)
+
+    return document.partial(data)
+
+
+def find(collection: Collection, query: Dict[str, Any], projection: Optional[Projection]) -> Cursor:
+    """
+    Find documents of a collection, reading only the fields of a projection if there is one.
+
+    :param Collection collection: The collection.
+    :param query: The query.
+    :type query: Dict[str, Any]
+    :param projection: The fields to read, all of them if not specified.
+    :type projection: Optional[Projection]
+    :return: The cursor.
+    :rtype: Cursor
+    """
+    if projection is None:
+        return collection.find(query)
+
+    return collection.find(query, projection.to_mongo())
+
+
+def find_one(collection: Collection, query: Dict[str, Any], projection: Optional[Projection]) -> Optional[Dict[str, Any]]:
+    """
+    Find a document of a collection, reading only the fields of a projection if there is one.
+
+    :param Collection collection: The collection.
+    :param query: The query.
+    :type query: Dict[str, Any]
+    :param projection: The fields to read, all of them if not specified.
+    :type projection: Optional[Projection]
+    :return: The document if found, otherwise None.
+    :rtype: Optional[Dict[str, Any]]
+    """
+    if projection is None:
+        return collection.find_one(query)
+
+    return collection.find_one(query, projection.to_mongo())
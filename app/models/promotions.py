@@ -1,4 +1,4 @@
-from typing import Optional, Union
+from typing import Optional, Union, Iterable
 from datetime import datetime
 from bson import ObjectId
 from dataclasses import dataclass
@@ -8,6 +8,7 @@ from pymongo import ReturnDocument
 
 from app.services import Database
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
 
 from .exceptions import NotFoundException
 
@@ -70,6 +71,17 @@ class PromotionsModel:
         if promotion is not None:
             return Promotion(**promotion)
 
+    def get_many(self, promotion_ids: Iterable[Union[str, ObjectId]]) -> Batch[Promotion]:
+        """
+        Retrieve promotions by their IDs with a single query.
+
+        :param promotion_ids: The IDs of the promotions.
+        :type promotion_ids: Iterable[Union[str, ObjectId]]
+        :return: The promotions in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[Promotion]
+        """
+        return find_many(self.db.connection[self.collection], promotion_ids, lambda item: Promotion(**item))
+
     def get_all(self):
         """
         Retrieve all promotions from the database.
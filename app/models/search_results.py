@@ -0,0 +1,117 @@
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, Optional, TypeVar
+
+from app.models.tags import TagNames
+from lib.cache import Cache
+
+Value = TypeVar("Value")
+
+
+class SearchResults:
+    """
+    Bounded cache of the results of searches, by the normalized parameters of the search.
+
+    Popular queries, and browsing without a query, are searched with the same parameters over and over, so their
+    pages are answered from memory without a query to the database. The cache is dropped after every write of
+    `ProductsModel`, and once the version of the tag names changes, i.e. after every write of `TagsModel`. A search
+    that was started before a write doesn't cache its result. The offers of the cards, and writes made by other
+    processes, are picked up once the results expire.
+
+    The hits and misses of the `tracked_queries` most searched queries are counted, whatever page of them was read,
+    to tell the hot searches apart.
+    """
+
+    tags: TagNames
+    cache: Cache[Hashable, Any]
+
+    def __init__(self, tags: TagNames, cache: Optional[Cache] = None, tracked_queries: int = 100) -> None:
+        """
+        Initialize the SearchResults.
+
+        :param TagNames tags: The names of the tags, that the results carry.
+        :param cache: The cache of the results, disabled if not specified.
+            Cached results are shared between requests, so they must not be modified.
+        :type cache: Optional[Cache]
+        :param int tracked_queries: The number of the most searched queries whose hits and misses are counted.
+        """
+        self.tags = tags
+        self.cache = cache if cache is not None else Cache(maxsize=0, ttl=0)
+        self.tracked_queries = tracked_queries
+
+        self._tags_version = tags.version
+        self._lock = Lock()
+        # [hits, misses] by query
+        self._queries: Dict[str, List[int]] = {}
+
+    def get_or_load(self, query: str, key: Hashable, load: Callable[[], Value]) -> Value:
+        """
+        Get the cached result of a search, or search and cache it on a miss.
+
+        :param str query: The normalized query, that hits and misses are counted by, empty when browsing.
+        :param key: The normalized parameters of the search, including the query.
+        :type key: Hashable
+        :param load: Searches.
+        :type load: Callable[[], Value]
+        :return: The result of the search.
+        :rtype: Value
+        """
+        if not self.cache.enabled:
+            return load()
+
+        # results carry the names of the tags, so they are dropped once the tags change
+        tags_version = self.tags.version
+        if tags_version != self._tags_version:
+            self._tags_version = tags_version
+            self.cache.clear()
+
+        loaded = False
+
+        def load_and_count() -> Value:
+            nonlocal loaded
+            loaded = True
+            return load()
+
+        result = self.cache.get_or_load(key, load_and_count)
+        self._count(query, hit=not loaded)
+
+        return result
+
+    def invalidate(self) -> None:
+        """
+        Drop all cached results after a write, and the results of the searches that are in progress.
+        """
+        self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Describe the cache and the most searched queries.
+
+        :return: The statistics of the cache, and the hits and misses of the most searched queries, most hit first.
+        :rtype: Dict[str, Any]
+        """
+        with self._lock:
+            queries = sorted(
+                ((query, tuple(counts)) for query, counts in self._queries.items()),
+                key=lambda item: (-item[1][0], -item[1][1], item[0])
+            )
+
+        return {
+            **self.cache.stats(),
+            "queries": [
+                {"query": query, "hits": hits, "misses": misses}
+                for query, (hits, misses) in queries[:self.tracked_queries]
+            ],
+        }
+
+    def _count(self, query: str, hit: bool) -> None:
+        with self._lock:
+            counts = self._queries.get(query)
+            if counts is None:
+                counts = self._queries[query] = [0, 0]
+
+            counts[0 if hit else 1] += 1
+
+            # the least searched queries are dropped once twice as many are counted, so rare queries don't pile up
+            if len(self._queries) > 2 * self.tracked_queries:
+                most_searched = sorted(self._queries.items(), key=lambda item: -sum(item[1]))[:self.tracked_queries]
+                self._queries = dict(most_searched)
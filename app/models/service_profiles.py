@@ -3,11 +3,12 @@ import hmac
 from dataclasses import dataclass
 from enum import Enum
 from hashlib import sha256
-from typing import List
+from typing import Iterable, List, Union
 
 from bson import ObjectId
 
 from app.models.base import BaseDocument
+from app.models.batch import Batch, find_many
 from app.services.database import Database
 from app.services.firebase import Firebase
 from config import app_config
@@ -65,6 +66,17 @@ class ServiceProfilesModel:
 
         return ServiceProfile(**profile)
 
+    def get_many(self, profile_ids: Iterable[Union[str, ObjectId]]) -> Batch[ServiceProfile]:
+        """
+        Retrieve service profiles by their IDs with a single query.
+
+        :param profile_ids: The IDs of the service profiles.
+        :type profile_ids: Iterable[Union[str, ObjectId]]
+        :return: The service profiles in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[ServiceProfile]
+        """
+        return find_many(self.db.connection[self.collection], profile_ids, lambda item: ServiceProfile(**item))
+
     def create(self, input_data: ServiceProfileCreate):
         client_id = ObjectId()
         client_secret = hmac.new(
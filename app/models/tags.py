@@ -1,13 +1,19 @@
+import time
 from dataclasses import dataclass
-from typing import Optional
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
 
 from bson import ObjectId
 from pymongo import ReturnDocument
 
 from app.models.base import BaseDocument, Serializable
+from app.models.batch import Batch, find_many
+from app.models.pagination import Page, Pagination, find_page
+from app.models.projection import Projection, build_document, find, find_one
 from app.services import Database
 
 from .exceptions import NotFoundException
+from .product_cards import ProductCardsModel
 
 
 class Tag(BaseDocument):
@@ -33,14 +39,119 @@ class TagPatch(Serializable):
     name: Optional[str] = None
 
 
+class TagNames:
+    """
+    Versioned in-memory map of tag IDs to tag names.
+
+    Tags are a small and rarely changing collection, so products resolve the names of their genres and categories
+    from this map instead of joining the tags collection on every read. The map is loaded on first use and is
+    invalidated by every write of `TagsModel`, which bumps its version. Writes made by other processes are picked up
+    once the map is older than `max_age`, or earlier, when a product refers to a tag that the map doesn't know.
+
+    :param load: Loads the names of all tags by their IDs.
+    :type load: Callable[[], Dict[ObjectId, str]]
+    :param float max_age: Seconds after which the map is reloaded.
+    :param float min_age: Seconds before which an unknown tag does not trigger a reload.
+    :param clock: The monotonic clock the age of the map is measured with.
+    :type clock: Callable[[], float]
+    """
+
+    version: int
+
+    def __init__(
+        self,
+        load: Callable[[], Dict[ObjectId, str]],
+        max_age: float = 60,
+        min_age: float = 1,
+        clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.version = 0
+
+        self._load = load
+        self._max_age = max_age
+        self._min_age = min_age
+        self._clock = clock
+        self._lock = Lock()
+        self._names: Optional[Dict[ObjectId, str]] = None
+        self._loaded_at = 0.0
+
+    def get(self) -> Dict[ObjectId, str]:
+        """
+        Get the map, loading it if it was invalidated or has expired.
+
+        :return: The names of all tags by their IDs.
+        :rtype: Dict[ObjectId, str]
+        """
+        names = self._names
+
+        if names is not None and self._clock() - self._loaded_at < self._max_age:
+            return names
+
+        with self._lock:
+            if self._names is None or self._clock() - self._loaded_at >= self._max_age:
+                self._reload()
+
+            return self._names
+
+    def resolve(self, tag_ids: Iterable[ObjectId]) -> List[str]:
+        """
+        Resolve the names of tags, in the order of their IDs. Tags that don't exist are left out.
+
+        :param tag_ids: The IDs of the tags.
+        :type tag_ids: Iterable[ObjectId]
+        :return: The names of the tags.
+        :rtype: List[str]
+        """
+        tag_ids = list(tag_ids)
+        names = self.get()
+
+        if any(tag_id not in names for tag_id in tag_ids):
+            with self._lock:
+                # the tag may have been created by another process since the map was loaded
+                if self._names is None or self._clock() - self._loaded_at >= self._min_age:
+                    self._reload()
+
+                names = self._names
+
+        return [names[tag_id] for tag_id in tag_ids if tag_id in names]
+
+    def invalidate(self) -> None:
+        """
+        Drop the map after a write to the tags collection, it is loaded again on next use.
+        """
+        with self._lock:
+            self.version += 1
+            self._names = None
+
+    def _reload(self) -> None:
+        self._names = self._load()
+        self._loaded_at = self._clock()
+
+
 class TagsModel:
     db: Database
     collection: str = "tags"
+    sort_fields = ("name",)
+    names: TagNames
+    cards: ProductCardsModel
 
-    def __init__(self, db: Database) -> None:
+    def __init__(self, db: Database, cards: ProductCardsModel) -> None:
+        """
+        Initialize the TagsModel.
+
+        :param db: The database instance.
+        :type db: Database
+        :param cards: The read model of the cards of the products, whose genres and categories are updated with tags.
+        :type cards: ProductCardsModel
+        """
         self.db = db
+        self.cards = cards
+        self.names = TagNames(self._load_names)
+
+    def _load_names(self) -> Dict[ObjectId, str]:
+        return {tag["_id"]: tag["name"] for tag in self.db.connection[self.collection].find({}, {"name": 1})}
 
-    def get(self, tag_id: str):
+    def get(self, tag_id: str, projection: Optional[Projection] = None):
         """
         Retrieve a tag based on its ID.
 
@@ -48,32 +159,90 @@ class TagsModel:
         If the tag is found, it returns the corresponding Tag object; otherwise, it returns None, indicating the tag does not exist.
 
         :param str tag_id: The unique identifier of the tag.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
         :return: A Tag object if the tag is found, otherwise None.
         :rtype: Tag or None
         """
 
-        tag = self.db.connection[self.collection].find_one({"_id": ObjectId(tag_id)})
+        tag = find_one(self.db.connection[self.collection], {"_id": ObjectId(tag_id)}, projection)
 
         if tag is not None:
-            return Tag(**tag)
+            return build_document(Tag, tag, projection)
         else:
             return None
 
-    def get_all(self):
+    def get_many(self, tag_ids: Iterable[Union[str, ObjectId]], projection: Optional[Projection] = None) -> Batch[Tag]:
+        """
+        Retrieve tags by their IDs with a single query.
+
+        :param tag_ids: The IDs of the tags.
+        :type tag_ids: Iterable[Union[str, ObjectId]]
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: The tags in the order of the IDs, and the IDs that were not found.
+        :rtype: Batch[Tag]
+        """
+        return find_many(
+            self.db.connection[self.collection],
+            tag_ids,
+            lambda item: build_document(Tag, item, projection),
+            projection
+        )
+
+    def get_all(self, projection: Optional[Projection] = None):
         """
         Retrieve all tags from the database.
 
         This method fetches all tags from the database and returns them as a list of Tag objects.
         If there are no tags found, it returns an empty list.
 
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
         :return: A list of Tag objects representing all the tags in the database.
         :rtype: list[Tag]
         """
 
-        tags = [Tag(**item) for item in self.db.connection[self.collection].find()]
+        cursor = find(self.db.connection[self.collection], {}, projection)
+        tags = [build_document(Tag, item, projection) for item in cursor]
 
         return tags if tags else []
 
+    def get_page(self, pagination: Pagination, projection: Optional[Projection] = None) -> Page[Tag]:
+        """
+        Retrieve a page of tags, sorted by `_id` or one of `sort_fields`.
+
+        :param Pagination pagination: The page to read.
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: The page of Tag objects.
+        :rtype: Page[Tag]
+        """
+        return find_page(
+            self.db.connection[self.collection],
+            {},
+            pagination,
+            lambda item: build_document(Tag, item, projection),
+            projection
+        )
+
+    def iter_all(self, projection: Optional[Projection] = None) -> Iterator[Tag]:
+        """
+        Iterate over all tags in the database.
+
+        Unlike `get_all`, tags are built one at a time while the cursor is consumed,
+        so the whole collection is never held in memory.
+
+        :param projection: The fields to read, all of them if not specified.
+        :type projection: Optional[Projection]
+        :return: An iterator of Tag objects representing all the tags in the database.
+        :rtype: Iterator[Tag]
+        """
+
+        cursor = find(self.db.connection[self.collection], {}, projection)
+
+        return (build_document(Tag, item, projection) for item in cursor)
+
     def create(self, input_data: TagCreate):
         """
         Create a new tag in the database.
@@ -89,6 +258,7 @@ class TagsModel:
 
         tag = Tag(**input_data.to_json())
         self.db.connection[self.collection].insert_one(tag.to_bson())
+        self.names.invalidate()
 
         return tag
 
@@ -105,6 +275,9 @@ class TagsModel:
         """
 
         self.db.connection[self.collection].insert_one(tag.to_bson())
+        self.names.invalidate()
+        self.cards.update_tag(tag._id, self.names.resolve)
+
         return tag
 
     def patch(self, tag_id: str, input_data: TagPatch):
@@ -124,9 +297,11 @@ class TagsModel:
 
         updated_tag = self.db.connection[self.collection].find_one_and_update(
             {"_id": ObjectId(tag_id)},
-            {"$set": input_data.to_json()},
+            {"$set": input_data.to_json(), "$currentDate": {"updated_at": True}},
             return_document=ReturnDocument.AFTER
         )
+        self.names.invalidate()
+        self.cards.update_tag(ObjectId(tag_id), self.names.resolve)
 
         if updated_tag is not None:
             return Tag(**updated_tag)
@@ -148,6 +323,8 @@ class TagsModel:
         """
 
         tag = self.db.connection[self.collection].find_one_and_delete({"_id": ObjectId(tag_id)})
+        self.names.invalidate()
+        self.cards.update_tag(ObjectId(tag_id), self.names.resolve)
 
         if tag is not None:
             return Tag(**tag)
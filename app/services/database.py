@@ -1,4 +1,12 @@
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
+from typing import List, Optional
+
 from pymongo import MongoClient
+from pymongo.monitoring import CommandListener
+
+
+RAW_CODEC_OPTIONS = CodecOptions(document_class=RawBSONDocument)
 
 
 class Database:
@@ -11,7 +19,8 @@ class Database:
     def __init__(
         self,
         uri: str,
-        timeoutMS: int = 500
+        timeoutMS: int = 500,
+        event_listeners: Optional[List[CommandListener]] = None
     ) -> None:
         self.__client = MongoClient(
             uri,
@@ -20,6 +29,7 @@ class Database:
             waitQueueTimeoutMS=timeoutMS,
             serverSelectionTimeoutMS=timeoutMS,
             connectTimeoutMS=timeoutMS * 3,
+            event_listeners=event_listeners or [],
         )
 
     @property
@@ -29,3 +39,13 @@ class Database:
     @property
     def connection(self):
         return self.__client.get_default_database()
+
+    @property
+    def raw_connection(self):
+        """
+        The default database, reading documents as `RawBSONDocument`.
+
+        Documents keep their BSON bytes and each embedded document is only decoded when it is accessed,
+        so documents that are mostly passed through are not decoded up front.
+        """
+        return self.__client.get_default_database(codec_options=RAW_CODEC_OPTIONS)
@@ -0,0 +1,2 @@
+from os import environ as env
+env.setdefault("PYTHON_ENV", "test")  # nopep8
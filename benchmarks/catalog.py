@@ -0,0 +1,148 @@
+import argparse
+import gc
+from typing import Any, Dict, List, Mapping
+
+from app.models.pagination import Pagination
+from app.models.product_catalog import ProductCatalog
+from app.models.product_search import SearchFilters
+
+from .documents import product_document
+from .search import ListDatabase, best_of_ms
+
+# Usage
+#
+# $ python -m benchmarks.catalog [options]
+#
+# Options:
+#
+# -n, --products - Number of products, can be repeated, defaults to 10000 and 100000
+# -r, --repeat   - Number of runs of every filter, the best one is reported, defaults to 5
+#
+# Times the build of the in-memory ProductCatalog, and the first page of 15 products of filters of one facet,
+# of several facets and of ranges, with their count, together with all of their facets. The same filters are also
+# matched by a scan of the products in Python, the way they would be without the catalog. A write of a product,
+# and the first page after it, which ranks the products again, are timed as well. No database is needed.
+
+FILTERS: Dict[str, SearchFilters] = {
+    "one genre": SearchFilters(genres=("Indie",)),
+    "several facets": SearchFilters(
+        genres=("Indie", "RPG"), platforms_os=("linux",), supported_languages=("Japanese",), is_free=False
+    ),
+    "ranges": SearchFilters(required_age=12, price_min=500, price_max=1500),
+    "facets and ranges": SearchFilters(categories=("Co-op",), platforms_os=("mac",), required_age=16, price_max=1000),
+}
+
+SORTS = ["-created_at", "name"]
+
+
+def scan(products: List[Mapping[str, Any]], filters: SearchFilters) -> List[Mapping[str, Any]]:
+    """Matches products against filters one by one, as a baseline for the catalog
+
+    Args:
+        products (List[Mapping[str, Any]]): products
+        filters (SearchFilters): filters
+
+    Returns:
+        List[Mapping[str, Any]]: the matching products
+    """
+    def matches(product: Mapping[str, Any]) -> bool:
+        for name in ("genres", "categories", "platforms_os", "supported_languages"):
+            values = getattr(filters, name)
+            if values and not set(values) & set(product[name]):
+                return False
+
+        if filters.is_free is not None and product["is_free"] != filters.is_free:
+            return False
+        if filters.required_age is not None and product["required_age"] > filters.required_age:
+            return False
+
+        final = product["price"][filters.currency]["final"]
+        return (filters.price_min is None or final >= filters.price_min) and \
+            (filters.price_max is None or final <= filters.price_max)
+
+    return [product for product in products if matches(product)]
+
+
+def run(sizes: List[int], repeat: int) -> Dict[str, List[Dict[str, Any]]]:
+    """Times the filters, facets and pages of the catalog
+
+    Args:
+        sizes (List[int]): numbers of products
+        repeat (int): number of runs of every filter
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: the results of the filters, per number of products, filter and sort,
+            and of the writes, per number of products
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {"filters": [], "writes": []}
+
+    for size in sizes:
+        products = [product_document(i) for i in range(size)]
+        catalog = ProductCatalog(ListDatabase(products), max_age=float("inf"))
+
+        gc.collect()
+        build_ms = best_of_ms(catalog.refresh, 1)
+
+        for name, filters in FILTERS.items():
+            for sort in SORTS:
+                pagination = Pagination(15, sort)
+                # the first page of a sort ranks the products, later ones reuse the ranks until a write
+                _, count = catalog.find_page(filters, pagination)
+
+                def first_page_and_facets() -> None:
+                    catalog.find_page(filters, pagination)
+                    catalog.facets(filters, ProductCatalog.list_fields + ("required_age", "price"))
+
+                results["filters"].append({
+                    "products": size,
+                    "filter": name,
+                    "sort": sort,
+                    "matches": count,
+                    "build_ms": build_ms,
+                    "page_ms": best_of_ms(lambda: catalog.find_page(filters, pagination), repeat),
+                    "page_and_facets_ms": best_of_ms(first_page_and_facets, repeat),
+                    "scan_ms": best_of_ms(lambda: scan(products, filters), repeat),
+                })
+
+        written = products[size // 2]
+        genres = [written["genres"], ["Zelda"]]
+        pagination = Pagination(15, "-created_at")
+
+        def write() -> None:
+            # every write changes the genres of the product, which clears and sets its bits
+            genres.reverse()
+            catalog.save(written | {"genres": genres[0]})
+
+        def page_after_write() -> None:
+            write()
+            catalog.find_page(SearchFilters(), pagination)
+
+        results["writes"].append({
+            "products": size,
+            "save_ms": best_of_ms(write, repeat),
+            "page_after_save_ms": best_of_ms(page_after_write, repeat),
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    cli_parser = argparse.ArgumentParser(description='Catalog benchmark, filters, facets and pages of bitmaps')
+    cli_parser.add_argument("-n", "--products", type=int, action="append",
+                            help="number of products, can be repeated, defaults to 10000 and 100000")
+    cli_parser.add_argument("-r", "--repeat", type=int, default=5, help="number of runs of every filter, defaults to 5")
+    args = cli_parser.parse_args()
+
+    all_results = run(args.products or [10000, 100000], args.repeat)
+
+    print(f"{'products':>9}  {'filter':<18}{'sort':<12}{'matches':>8}{'build, ms':>11}{'page, ms':>10}"
+          f"{'+facets, ms':>13}{'scan, ms':>10}")
+    for row in all_results["filters"]:
+        print(
+            f"{row['products']:>9}  {row['filter']:<18}{row['sort']:<12}{row['matches']:>8}{row['build_ms']:>11.0f}"
+            f"{row['page_ms']:>10.2f}{row['page_and_facets_ms']:>13.2f}{row['scan_ms']:>10.2f}"
+        )
+
+    print(f"\n{'products':>9}{'save, ms':>10}{'page after save, ms':>21}")
+    for row in all_results["writes"]:
+        print(f"{row['products']:>9}{row['save_ms']:>10.3f}{row['page_after_save_ms']:>21.2f}")
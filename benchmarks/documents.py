@@ -0,0 +1,295 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from bson import ObjectId
+
+from app.models.product_cards import build_card
+
+# Builders of documents shaped like the ones stored in Mongo.
+# They are deterministic, so results of different runs can be compared.
+
+EPOCH = datetime(2024, 1, 1)
+
+GENRES = ["Action", "Adventure", "Indie", "RPG", "Strategy", "Simulation", "Casual", "Puzzle"]
+CATEGORIES = ["Single-player", "Multi-player", "Co-op", "Steam Achievements", "Full controller support"]
+LANGUAGES = ["English", "German", "French", "Spanish", "Japanese", "Russian", "Portuguese"]
+
+REQUIREMENTS_HTML = (
+    "<strong>Minimum:</strong><br><ul class=\"bb_ul\"><li><strong>OS:</strong> Windows 10<br></li>"
+    "<li><strong>Processor:</strong> Intel Core i5-4460<br></li><li><strong>Memory:</strong> 8 GB RAM<br></li>"
+    "<li><strong>Graphics:</strong> NVIDIA GeForce GTX 960<br></li><li><strong>Storage:</strong> 20 GB</li></ul>"
+)
+
+
+def object_id(seed: int) -> ObjectId:
+    return ObjectId(f"{seed:024x}")
+
+
+def product_document(index: int) -> Dict[str, Any]:
+    """Builds a product as returned by the products aggregation pipeline
+
+    Args:
+        index (int): sequence number of the product
+
+    Returns:
+        Dict[str, Any]: product document
+    """
+    name = f"Benchmark Game {index}"
+    slug = f"benchmark-game-{index}"
+    created_at = EPOCH + timedelta(minutes=index)
+
+    return {
+        "_id": object_id(index + 1),
+        "created_at": created_at,
+        "updated_at": created_at,
+        "type": "game",
+        "name": name,
+        "slug": slug,
+        "required_age": (index * 7) % 19,
+        "short_description": f"{name} is a hand-crafted indie adventure with a lot of secrets.",
+        "detailed_description": "<h1>About</h1><p>" + " ".join([f"{name} paragraph {i}." for i in range(60)]) + "</p>",
+        "is_free": index % 10 == 0,
+        "platforms": {"steam": f"https://store.steampowered.com/app/{index}/"},
+        "price": {
+            "USD": {"currency": "USD", "initial": 1999, "final": 999 + index % 1000, "final_formatted": "$9.99"},
+            "EUR": {"currency": "EUR", "initial": 1799, "final": 899 + index % 1000, "final_formatted": "8,99€"},
+        },
+        "supported_languages": LANGUAGES[:2 + index % (len(LANGUAGES) - 1)],
+        "media": {
+            "header_url": f"https://cdn.example.com/{slug}/header.jpg",
+            "background_url": f"https://cdn.example.com/{slug}/background.jpg",
+            "screenshots": [
+                {
+                    "thumbnail_url": f"https://cdn.example.com/{slug}/screenshot_{i}.600x338.jpg",
+                    "full_url": f"https://cdn.example.com/{slug}/screenshot_{i}.1920x1080.jpg"
+                }
+                for i in range(8)
+            ],
+            "movies": [
+                {
+                    "name": f"Trailer {i}",
+                    "thumbnail_url": f"https://cdn.example.com/{slug}/movie_{i}.jpg",
+                    "formats": {
+                        "webm": {
+                            "px480": f"https://cdn.example.com/{slug}/movie_{i}_480.webm",
+                            "max": f"https://cdn.example.com/{slug}/movie_{i}_max.webm"
+                        },
+                        "mp4": {
+                            "px480": f"https://cdn.example.com/{slug}/movie_{i}_480.mp4",
+                            "max": f"https://cdn.example.com/{slug}/movie_{i}_max.mp4"
+                        }
+                    }
+                }
+                for i in range(3)
+            ]
+        },
+        "requirements": {
+            "windows": {"minimum": {"minimum": REQUIREMENTS_HTML}, "recommended": {"recommended": REQUIREMENTS_HTML}},
+            "mac": {"minimum": {"minimum": REQUIREMENTS_HTML}, "recommended": None},
+            "linux": None
+        },
+        "developers": [f"Studio {index % 97}"],
+        "publishers": [f"Publisher {index % 31}"],
+        "platforms_os": ["windows", "mac", "linux"][:1 + index % 3],
+        "categories": [CATEGORIES[(index + i) % len(CATEGORIES)] for i in range(2)],
+        "genres": [GENRES[(index + i) % len(GENRES)] for i in range(3)],
+        "release_date": {"date": (EPOCH - timedelta(days=index % 3650)).strftime("%d %b, %Y"), "coming_soon": False}
+    }
+
+
+def tag_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "name": GENRES[index % len(GENRES)]
+    }
+
+
+def profile_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "email": f"user{index}@example.com",
+        "nickname": f"user{index}",
+        "display_name": f"User {index}",
+        "photo_url": f"https://cdn.example.com/avatars/{index}.png",
+        "idp_id": f"idp-{index}",
+        "roles": ["User"]
+    }
+
+
+def service_profile_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "idp_id": f"idp-service-{index}",
+        "client_id": f"client-{index}",
+        "client_secret": f"{index:064x}",
+        "permissions": ["read:products", "write:products", "read:profiles"]
+    }
+
+
+def platform_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "name": f"Platform {index}",
+        "slug": f"platform-{index}",
+        "enabled": index % 2 == 0,
+        "icon_url": f"https://cdn.example.com/platforms/{index}.svg",
+        "base_url": f"https://platform{index}.example.com/"
+    }
+
+
+def operating_system_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "name": ["Windows", "macOS", "Linux"][index % 3]
+    }
+
+
+def price_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "currency": ["USD", "EUR"][index % 2],
+        "value": 9.99 + index % 50
+    }
+
+
+def promotion_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "currency": ["USD", "EUR"][index % 2],
+        "value": 2.5 + index % 5,
+        "expires_at": EPOCH + timedelta(days=14)
+    }
+
+
+def platform_product_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "platform_id": index % 8,
+        "prices": [price_document(index * 2 + i) for i in range(2)],
+        "product_page_url": f"https://store.example.com/app/{index}/"
+    }
+
+
+def affiliate_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "name": f"Affiliate {index}",
+        "slug": f"affiliate-{index}",
+        "code": f"AFF{index:06d}",
+        "became_seller_at": EPOCH - timedelta(days=index % 1000),
+        "sales": index * 13 % 10000,
+        "bio": f"Affiliate {index} sells indie games since the early days of digital distribution.",
+        "enabled": True,
+        "logo_url": f"https://cdn.example.com/affiliates/{index}.png"
+    }
+
+
+def affiliate_platform_product_document(index: int) -> Dict[str, Any]:
+    """Builds an affiliate platform product joined with its affiliate and product
+
+    Args:
+        index (int): sequence number of the affiliate platform product
+
+    Returns:
+        Dict[str, Any]: affiliate platform product document
+    """
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "affiliate_id": object_id(index + 2),
+        "platform_product_id": object_id(index + 3),
+        "product_id": object_id(index + 4),
+        "buy_page_url": f"https://affiliate.example.com/buy/{index}",
+        "prices": [price_document(index * 2 + i) for i in range(2)],
+        "promotions": [promotion_document(index)],
+        "affiliate": affiliate_document(index + 1),
+        "product": product_document(index + 3)
+    }
+
+
+def product_card_document(index: int) -> Dict[str, Any]:
+    """Builds the card of a product with two offers
+
+    Args:
+        index (int): sequence number of the product
+
+    Returns:
+        Dict[str, Any]: product card document
+    """
+    product = product_document(index)
+    offers = [affiliate_platform_product_document(index * 2 + i) | {"product_id": product["_id"]} for i in range(2)]
+
+    # genres and categories of the benchmark products are names already
+    return build_card(product, list, offers, EPOCH) | {"updated_at": EPOCH}
+
+
+def affiliate_review_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "profile_id": object_id(index + 2),
+        "affiliate_id": object_id(index + 3),
+        "affiliate_platform_product_id": object_id(index + 4),
+        "rating": index % 5 + 1,
+        "text": f"Review {index}: fast delivery, the key worked right away."
+    }
+
+
+def product_comment_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "profile_id": object_id(index + 2),
+        "product_id": object_id(index + 3),
+        "text": f"Comment {index}: " + "great soundtrack, " * 5
+    }
+
+
+def product_reply_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "profile_id": object_id(index + 2),
+        "comment_id": object_id(index + 3),
+        "text": f"Reply {index}: agreed!"
+    }
+
+
+def background_job_document(index: int) -> Dict[str, Any]:
+    return {
+        "_id": object_id(index + 1),
+        "created_at": EPOCH,
+        "updated_at": EPOCH,
+        "type": "es_seeder",
+        "created_by": f"service-{index % 4}",
+        "metadata": {"match_query": f"benchmark-game-{index}"},
+        "status": "success",
+        "events": [
+            {"type": "info", "message": f"Step {i} of job {index} is done", "date": EPOCH + timedelta(seconds=i)}
+            for i in range(3)
+        ],
+        "message": None,
+        "started_at": EPOCH
+    }
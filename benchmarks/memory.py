@@ -0,0 +1,157 @@
+import argparse
+import gc
+import subprocess
+import sys
+from typing import Any, Callable, Dict, List
+
+from app.models.affiliate_reviews import AffiliateReview
+from app.models.products import Product
+from app.models.profiles import Profile
+from lib.db_utils import get_fields
+
+from .documents import EPOCH, object_id, product_document
+
+# Usage
+#
+# $ python -m benchmarks.memory [options]
+#
+# Options:
+#
+# -n, --documents - Number of documents held in memory, defaults to 100000
+#
+# Compares the resident memory taken by a list of slotted documents with the one taken by the same
+# documents stored in per-instance dicts, the way documents were stored before the field schema.
+# Every measurement runs in a fresh interpreter, so that they don't share allocator state.
+
+
+class DictDocument:
+    """A document that keeps its fields in a per-instance dict"""
+
+    def __init__(self, fields: Dict[str, Any]) -> None:
+        for key, value in fields.items():
+            setattr(self, key, value)
+
+
+def profile(index: int) -> Profile:
+    return Profile(
+        _id=object_id(index + 1),
+        created_at=EPOCH,
+        updated_at=EPOCH,
+        email=f"user{index}@example.com",
+        nickname=f"user{index}",
+        display_name=f"User {index}",
+        photo_url=f"https://cdn.example.com/avatars/{index}.png",
+        idp_id=f"idp-{index}",
+        roles=["User"]
+    )
+
+
+def affiliate_review(index: int) -> AffiliateReview:
+    return AffiliateReview(
+        _id=object_id(index + 1),
+        created_at=EPOCH,
+        updated_at=EPOCH,
+        profile_id=object_id(index + 2),
+        affiliate_id=object_id(index + 3),
+        affiliate_platform_product_id=object_id(index + 4),
+        rating=index % 5 + 1,
+        text=f"Review {index}"
+    )
+
+
+_PRODUCT = product_document(0)
+
+
+def product(index: int) -> Product:
+    # nested values are shared, so that the measurement is about the documents themselves
+    return Product(**(_PRODUCT | {"_id": object_id(index + 1), "name": f"Game {index}", "slug": f"game-{index}"}))
+
+
+BUILDERS: Dict[str, Callable[[int], Any]] = {
+    "Profile": profile,
+    "AffiliateReview": affiliate_review,
+    "Product": product,
+}
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+
+    raise RuntimeError("VmRSS is not available")
+
+
+def measure(document: str, layout: str, documents: int) -> int:
+    """Builds documents and returns the growth of the resident memory, in KiB
+
+    Args:
+        document (str): name of the document class
+        layout (str): "slots" for documents as they are, "dict" for the same fields in per-instance dicts
+        documents (int): number of documents
+
+    Returns:
+        int: RSS growth in KiB
+    """
+    build = BUILDERS[document]
+
+    # builders are warmed up, so that lazily created state is not measured
+    build(0)
+    gc.collect()
+
+    before = rss_kb()
+
+    if layout == "slots":
+        held = [build(i) for i in range(documents)]
+    else:
+        held = [DictDocument(get_fields(build(i))) for i in range(documents)]
+
+    gc.collect()
+    after = rss_kb()
+
+    assert len(held) == documents
+
+    return after - before
+
+
+def run(documents: int) -> List[Dict[str, Any]]:
+    results = []
+
+    for document in BUILDERS:
+        growth = {}
+
+        for layout in ("dict", "slots"):
+            output = subprocess.check_output([
+                sys.executable, "-m", "benchmarks.memory", "--measure", document, layout, "-n", str(documents)
+            ])
+            growth[layout] = int(output)
+
+        results.append({
+            "document": document,
+            "documents": documents,
+            "dict_kb": growth["dict"],
+            "slots_kb": growth["slots"],
+            "bytes_per_document_saved": (growth["dict"] - growth["slots"]) * 1024 / documents,
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    cli_parser = argparse.ArgumentParser(description='Document memory benchmark')
+    cli_parser.add_argument("-n", "--documents", type=int, default=100000,
+                            help="number of documents, defaults to 100000")
+    cli_parser.add_argument("--measure", nargs=2, metavar=("DOCUMENT", "LAYOUT"), help=argparse.SUPPRESS)
+    args = cli_parser.parse_args()
+
+    if args.measure:
+        print(measure(args.measure[0], args.measure[1], args.documents))
+        sys.exit(0)
+
+    print(f"{'document':<18}{'dict, MiB':>12}{'slots, MiB':>13}{'saved, B/doc':>15}")
+    for result in run(args.documents):
+        print(
+            f"{result['document']:<18}{result['dict_kb'] / 1024:>12.1f}{result['slots_kb'] / 1024:>13.1f}"
+            f"{result['bytes_per_document_saved']:>15.0f}"
+        )
@@ -0,0 +1,171 @@
+import argparse
+import gc
+import timeit
+from typing import Any, Dict, Iterator, List, Mapping, Optional
+
+import pymongo
+
+from app.models.pagination import Pagination
+from app.models.product_index import ProductIndex
+from app.models.product_search import ProductSearchModel, build_entry
+from app.models.tags import TagNames
+from app.services import Database
+
+from .documents import CATEGORIES, GENRES, product_document
+
+# Usage
+#
+# $ python -m benchmarks.search [options]
+#
+# Options:
+#
+# -n, --products - Number of products, can be repeated, defaults to 10000 and 100000
+# -r, --repeat   - Number of runs of every query, the best one is reported, defaults to 5
+# --mongo        - URI of a database to also time the aggregation of ProductSearchModel against, e.g. the one
+#                  of `docker run mongo`. The entries are written to a collection of their own, which is dropped
+#                  afterwards.
+#
+# Times the build of the in-memory ProductIndex and the first page of a search, together with its count,
+# for queries that match a single product, a few hundred and all of them, and the suggestions of prefixes,
+# the first time and once cached. Without --mongo, no database is needed.
+
+QUERIES = {
+    "one product": "benchmark game 4242",
+    "developer": "studio 42",
+    "beginning of word": "adv",
+    "every product": "hand crafted indie",
+}
+
+PREFIXES = ["b", "benchmark game 42", "studio", "zelda"]
+
+
+class ListCollection:
+    """The part of a collection that ProductIndex reads, over products held in memory"""
+
+    def __init__(self, products: List[Dict[str, Any]]) -> None:
+        self.products = products
+
+    def find(self, query: Mapping[str, Any], projection: Mapping[str, Any]) -> Iterator[Dict[str, Any]]:
+        return iter(self.products)
+
+    def aggregate(self, pipeline: List[Mapping[str, Any]]) -> Iterator[Dict[str, Any]]:
+        # the comments that popularity is counted from, every seventh product has some
+        return iter({"_id": item["_id"], "count": i % 5 + 1} for i, item in enumerate(self.products) if i % 7 == 0)
+
+    def estimated_document_count(self) -> int:
+        return len(self.products)
+
+
+class ListDatabase:
+    def __init__(self, products: List[Dict[str, Any]]) -> None:
+        collection = ListCollection(products)
+        self.connection = {ProductIndex.collection: collection, ProductIndex.comments_collection: collection}
+
+
+class ScratchSearchModel(ProductSearchModel):
+    collection = "benchmark_product_search"
+
+
+def best_of_ms(function, repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000
+
+
+def product(index: int) -> Dict[str, Any]:
+    # tags are stored by their IDs, the names of the benchmark documents stand in for them
+    document = product_document(index)
+
+    return {field: document[field] for field in (*ProductIndex.product_fields, "_id")}
+
+
+def run(sizes: List[int], repeat: int, mongo: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Times the searches and the suggestions of the in-memory index, and the aggregation if a database is given
+
+    Args:
+        sizes (List[int]): numbers of products
+        repeat (int): number of runs of every query
+        mongo (Optional[str]): URI of the database of the aggregation, None to only time the index
+
+    Returns:
+        Dict[str, List[Dict[str, Any]]]: the results of the searches, per number of products and query,
+            and of the suggestions, per number of products and prefix
+    """
+    tags = TagNames(lambda: {name: name for name in [*GENRES, *CATEGORIES]})
+    pagination = Pagination(15, ProductIndex.default_sort)
+    results: Dict[str, List[Dict[str, Any]]] = {"search": [], "suggest": []}
+
+    for size in sizes:
+        products = [product(i) for i in range(size)]
+        index = ProductIndex(ListDatabase(products), tags, max_age=float("inf"))
+
+        gc.collect()
+        build_ms = best_of_ms(index.refresh, 1)
+
+        search_model = None
+        if mongo is not None:
+            search_model = ScratchSearchModel(Database(mongo, timeoutMS=60000))
+            entries = search_model.db.connection[search_model.collection]
+            entries.drop()
+            entries.insert_many([build_entry(item) for item in products], ordered=False)
+            entries.create_index([("grams", pymongo.ASCENDING)])
+
+        for name, query in QUERIES.items():
+            query_words = index.parse(query)
+            _, count = index.search(query_words, pagination)
+
+            result = {
+                "products": size,
+                "query": name,
+                "matches": count,
+                "index_build_ms": build_ms,
+                "index_ms": best_of_ms(lambda: index.search(query_words, pagination), repeat),
+                "aggregation_ms": None,
+            }
+
+            if search_model is not None:
+                result["aggregation_ms"] = best_of_ms(lambda: (
+                    search_model.find_page(query_words, pagination), search_model.count(query_words)
+                ), repeat)
+
+            results["search"].append(result)
+
+        for prefix in PREFIXES:
+            cold_ms = best_of_ms(lambda: index.suggest(prefix, 10), 1)
+
+            results["suggest"].append({
+                "products": size,
+                "prefix": prefix,
+                "suggestions": len(index.suggest(prefix, 10)),
+                "cold_ms": cold_ms,
+                "cached_ms": best_of_ms(lambda: index.suggest(prefix, 10), repeat),
+            })
+
+        if search_model is not None:
+            search_model.db.connection.drop_collection(search_model.collection)
+
+    return results
+
+
+if __name__ == "__main__":
+    cli_parser = argparse.ArgumentParser(description='Search benchmark, in-memory index against the aggregation')
+    cli_parser.add_argument("-n", "--products", type=int, action="append",
+                            help="number of products, can be repeated, defaults to 10000 and 100000")
+    cli_parser.add_argument("-r", "--repeat", type=int, default=5, help="number of runs of every query, defaults to 5")
+    cli_parser.add_argument("--mongo", help="URI of the database to time the aggregation against")
+    args = cli_parser.parse_args()
+
+    print(f"{'products':>9}  {'query':<18}{'matches':>8}{'build, ms':>11}{'index, ms':>11}{'aggregation, ms':>17}")
+    all_results = run(args.products or [10000, 100000], args.repeat, args.mongo)
+
+    for row in all_results["search"]:
+        aggregation = f"{row['aggregation_ms']:.2f}" if row["aggregation_ms"] is not None else "-"
+        print(
+            f"{row['products']:>9}  {row['query']:<18}{row['matches']:>8}{row['index_build_ms']:>11.0f}"
+            f"{row['index_ms']:>11.2f}{aggregation:>17}"
+        )
+
+    print(f"\n{'products':>9}  {'prefix':<20}{'suggestions':>12}{'cold, ms':>10}{'cached, ms':>12}")
+    for row in all_results["suggest"]:
+        print(
+            f"{row['products']:>9}  {row['prefix']:<20}{row['suggestions']:>12}{row['cold_ms']:>10.3f}"
+            f"{row['cached_ms']:>12.3f}"
+        )
@@ -0,0 +1,174 @@
+import argparse
+import timeit
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from bson import ObjectId
+
+from app.models.products import Product
+from lib import db_utils
+from lib.db_utils import Serializable, get_fields
+
+from .documents import product_document
+
+# Usage
+#
+# $ python -m benchmarks.serialization [options]
+#
+# Options:
+#
+# -n, --documents - Number of products serialized per round
+# -r, --repeat    - Number of rounds, the best one is reported
+#
+# Compares the serializer plans of lib.db_utils with the recursive functions they replaced.
+
+
+##
+# The recursive functions that were used before serializer plans, kept as the baseline
+##
+
+def legacy_to_json(thing: Any):
+    if isinstance(thing, ObjectId):
+        return str(thing)
+    elif isinstance(thing, dict):
+        out = {}
+
+        for key, value in thing.items():
+            out[key] = legacy_to_json(value)
+
+        return out
+    elif isinstance(thing, list):
+        out = []
+
+        for item in thing:
+            out.append(legacy_to_json(item))
+
+        return out
+    elif isinstance(thing, tuple):
+        return legacy_to_json(list(thing))
+    elif isinstance(thing, (int, float, bool, str)) or thing is None:
+        return thing
+    elif isinstance(thing, Serializable):
+        return legacy_to_json(get_fields(thing))
+    else:
+        return str(thing)
+
+
+def legacy_to_dict(thing: Any):
+    if isinstance(thing, Serializable):
+        return legacy_to_dict(get_fields(thing))
+    elif isinstance(thing, dict):
+        out = {}
+
+        for key, value in thing.items():
+            out[key] = legacy_to_dict(value)
+
+        return out
+    elif isinstance(thing, list):
+        out = []
+
+        for item in thing:
+            out.append(legacy_to_dict(item))
+
+        return out
+    elif isinstance(thing, tuple):
+        return legacy_to_dict(list(thing))
+    else:
+        return thing
+
+
+def legacy_to_bson(thing: Any, ignore: Optional[List[str]] = None):
+    if isinstance(thing, ObjectId):
+        return thing
+    elif isinstance(thing, dict):
+        out = {}
+
+        for key, value in thing.items():
+            if ignore is not None and key in ignore:
+                continue
+            out[key] = legacy_to_bson(value)
+
+        return out
+    elif isinstance(thing, list):
+        out = []
+
+        for item in thing:
+            out.append(legacy_to_bson(item))
+
+        return out
+    elif isinstance(thing, tuple):
+        return legacy_to_bson(list(thing))
+    elif isinstance(thing, (int, float, bool, str, datetime)) or thing is None:
+        return thing
+    elif isinstance(thing, Serializable):
+        if ignore is None:
+            return legacy_to_bson(get_fields(thing))
+        variables = {key: value for key, value in get_fields(thing).items() if key not in ignore}
+        for key in variables:
+            if isinstance(variables[key], Serializable):
+                variables[key] = variables[key].to_bson()
+            else:
+                variables[key] = legacy_to_bson(variables[key])
+        return variables
+    else:
+        return str(thing)
+
+
+def best_of(function: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def run(documents: int, repeat: int) -> List[Dict[str, Any]]:
+    """Times every conversion of the legacy functions and the serializer plans on the same products
+
+    Args:
+        documents (int): number of products serialized per round
+        repeat (int): number of rounds
+
+    Returns:
+        List[Dict[str, Any]]: a result per conversion
+    """
+    products = [Product(**product_document(i)) for i in range(documents)]
+
+    # both implementations must agree before their timings mean anything
+    for product in products[:10]:
+        assert product.to_json() == legacy_to_json(product)
+        assert product.to_bson() == legacy_to_bson(product)
+        assert product.to_dict() == legacy_to_dict(product)
+
+    conversions = [
+        ("to_json", lambda: [legacy_to_json(p) for p in products], lambda: [p.to_json() for p in products]),
+        ("to_bson", lambda: [legacy_to_bson(p) for p in products], lambda: [p.to_bson() for p in products]),
+        ("to_dict", lambda: [legacy_to_dict(p) for p in products], lambda: [p.to_dict() for p in products]),
+        ("to_json(list)", lambda: legacy_to_json(products), lambda: db_utils.to_json(products)),
+    ]
+
+    results = []
+
+    for name, legacy, planned in conversions:
+        legacy_seconds = best_of(legacy, repeat)
+        planned_seconds = best_of(planned, repeat)
+
+        results.append({
+            "conversion": name,
+            "documents": documents,
+            "legacy_ms": legacy_seconds * 1000,
+            "planned_ms": planned_seconds * 1000,
+            "speedup": legacy_seconds / planned_seconds,
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    cli_parser = argparse.ArgumentParser(description='Serializer plans benchmark')
+    cli_parser.add_argument("-n", "--documents", type=int, default=1000, help="number of products, defaults to 1000")
+    cli_parser.add_argument("-r", "--repeat", type=int, default=5, help="number of rounds, defaults to 5")
+    args = cli_parser.parse_args()
+
+    print(f"{'conversion':<16}{'legacy, ms':>12}{'planned, ms':>14}{'speedup':>10}")
+    for result in run(args.documents, args.repeat):
+        print(
+            f"{result['conversion']:<16}{result['legacy_ms']:>12.2f}{result['planned_ms']:>14.2f}"
+            f"{result['speedup']:>9.2f}x"
+        )
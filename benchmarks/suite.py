@@ -0,0 +1,273 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Type
+
+from flask import Blueprint, Flask
+
+from app.configure_app import configure_app
+from app.models.affiliate_platform_products import AffiliatePlatformProduct
+from app.models.affiliate_reviews import AffiliateReview
+from app.models.affiliates import Affiliate
+from app.models.background_jobs import BackgroundJob
+from app.models.base import BaseDocument
+from app.models.operating_systems import OperatingSystem
+from app.models.platform_products import PlatformProduct
+from app.models.platforms import Platform
+from app.models.price import Price
+from app.models.product_cards import ProductCard
+from app.models.product_comments import ProductComment
+from app.models.product_replies import ProductReply
+from app.models.products import Product
+from app.models.profiles import Profile
+from app.models.promotions import Promotion
+from app.models.service_profiles import ServiceProfile
+from app.models.tags import Tag
+from lib.http_utils import respond_stream, respond_success
+
+from . import documents
+
+# Usage
+#
+# $ python -m benchmarks.suite [options]
+#
+# Options:
+#
+# -n, --documents - Number of documents per round, defaults to 1000
+# -r, --repeat    - Number of rounds, the best one is reported, defaults to 5
+# -m, --model     - Name of a document class to benchmark, can be repeated, defaults to all of them
+# -o, --output    - Path of the JSON file to write the results to
+# -c, --compare   - Path of the JSON file of an earlier run to compare the results with
+#
+# Times the construction, `to_json`, `to_bson` and `clone` of every document class of app.models,
+# and the full Flask responses that list them, both buffered and streamed. Documents are built
+# in memory, so no database is needed. Results are written as JSON together with the commit
+# they were measured at, so that runs of different commits can be compared:
+#
+# $ python -m benchmarks.suite -o before.json
+# $ git checkout my-branch
+# $ python -m benchmarks.suite -c before.json
+#
+# The suite also runs with testicles, see benchmarks/test_benchmarks.py.
+
+
+class ModelBenchmark(NamedTuple):
+    document: Type[BaseDocument]
+    build: Callable[[int], Dict[str, Any]]
+
+
+MODELS: Dict[str, ModelBenchmark] = {
+    benchmark.document.__name__: benchmark for benchmark in [
+        ModelBenchmark(Affiliate, documents.affiliate_document),
+        ModelBenchmark(AffiliatePlatformProduct, documents.affiliate_platform_product_document),
+        ModelBenchmark(AffiliateReview, documents.affiliate_review_document),
+        ModelBenchmark(BackgroundJob, documents.background_job_document),
+        ModelBenchmark(OperatingSystem, documents.operating_system_document),
+        ModelBenchmark(Platform, documents.platform_document),
+        ModelBenchmark(PlatformProduct, documents.platform_product_document),
+        ModelBenchmark(Price, documents.price_document),
+        ModelBenchmark(Product, documents.product_document),
+        ModelBenchmark(ProductCard, documents.product_card_document),
+        ModelBenchmark(ProductComment, documents.product_comment_document),
+        ModelBenchmark(ProductReply, documents.product_reply_document),
+        ModelBenchmark(Profile, documents.profile_document),
+        ModelBenchmark(Promotion, documents.promotion_document),
+        ModelBenchmark(ServiceProfile, documents.service_profile_document),
+        ModelBenchmark(Tag, documents.tag_document),
+    ]
+}
+
+OPERATIONS = ["construct", "to_json", "to_bson", "clone", "response", "response_stream"]
+
+
+def best_of(function: Callable[[], Any], repeat: int) -> float:
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+
+def create_app(held: Dict[str, List[BaseDocument]]) -> Flask:
+    """Creates an app configured like the real one, that lists the held documents
+
+    Args:
+        held (Dict[str, List[BaseDocument]]): documents by the name of their class
+
+    Returns:
+        Flask: the app
+    """
+    app = Flask(__name__)
+    configure_app(app)
+
+    controller = Blueprint("benchmarks", __name__)
+
+    @controller.route("/<string:model>", methods=["GET"])
+    def get_documents(model: str):
+        return respond_success(held[model])
+
+    @controller.route("/<string:model>/stream", methods=["GET"])
+    def stream_documents(model: str):
+        return respond_stream(iter(held[model]))
+
+    app.register_blueprint(controller)
+
+    return app
+
+
+def run(documents: int, repeat: int, models: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Times every operation for every model
+
+    Args:
+        documents (int): number of documents per round
+        repeat (int): number of rounds
+        models (Optional[List[str]]): names of the document classes, all of them if not specified
+
+    Returns:
+        List[Dict[str, Any]]: a result per model and operation
+    """
+    held: Dict[str, List[BaseDocument]] = {}
+    test_client = create_app(held).test_client()
+
+    results = []
+
+    for name in models or MODELS:
+        document, build = MODELS[name]
+        data = [build(i) for i in range(documents)]
+        held[name] = [document(**item) for item in data]
+
+        def get(path: str) -> bytes:
+            response = test_client.get(path)
+            assert response.status_code == 200, response.status_code
+            return response.get_data()
+
+        operations: Dict[str, Callable[[], Any]] = {
+            "construct": lambda: [document(**item) for item in data],
+            "to_json": lambda: [item.to_json() for item in held[name]],
+            "to_bson": lambda: [item.to_bson() for item in held[name]],
+            "clone": lambda: [item.clone() for item in held[name]],
+            "response": lambda: get(f"/{name}"),
+            "response_stream": lambda: get(f"/{name}/stream"),
+        }
+
+        # both responses must carry the same documents before their timings mean anything
+        assert json.loads(get(f"/{name}"))["data"] == json.loads(get(f"/{name}/stream"))["data"]
+
+        for operation in OPERATIONS:
+            seconds = best_of(operations[operation], repeat)
+
+            results.append({
+                "model": name,
+                "operation": operation,
+                "documents": documents,
+                "best_ms": seconds * 1000,
+                "per_document_us": seconds * 1_000_000 / documents,
+            })
+
+    return results
+
+
+def describe_environment() -> Dict[str, Any]:
+    """Describes the code and the interpreter that the results were measured with
+
+    Returns:
+        Dict[str, Any]: the commit, whether the tree had changes, the interpreter, the platform and the time
+    """
+
+    def git(*args: str) -> Optional[str]:
+        try:
+            return subprocess.check_output(["git", *args], stderr=subprocess.DEVNULL, text=True).strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    status = git("status", "--porcelain", "--untracked-files=no")
+
+    return {
+        "commit": git("rev-parse", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+
+
+def report(documents: int, repeat: int, models: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Runs the suite and returns its machine-readable report
+
+    Args:
+        documents (int): number of documents per round
+        repeat (int): number of rounds
+        models (Optional[List[str]]): names of the document classes, all of them if not specified
+
+    Returns:
+        Dict[str, Any]: the environment and the results of the run
+    """
+    return {
+        "environment": describe_environment(),
+        "settings": {"documents": documents, "repeat": repeat},
+        "results": run(documents, repeat, models),
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Matches the results of two reports by model and operation
+
+    Args:
+        baseline (Dict[str, Any]): the report of an earlier run
+        current (Dict[str, Any]): the report of this run
+
+    Returns:
+        List[Dict[str, Any]]: a comparison per result of this run that the baseline also has
+    """
+    before = {(r["model"], r["operation"]): r for r in baseline["results"]}
+    comparisons = []
+
+    for result in current["results"]:
+        earlier = before.get((result["model"], result["operation"]))
+        if earlier is None:
+            continue
+
+        comparisons.append({
+            "model": result["model"],
+            "operation": result["operation"],
+            "baseline_us": earlier["per_document_us"],
+            "current_us": result["per_document_us"],
+            "speedup": earlier["per_document_us"] / result["per_document_us"],
+        })
+
+    return comparisons
+
+
+if __name__ == "__main__":
+    cli_parser = argparse.ArgumentParser(description='Serialization and hydration benchmark suite')
+    cli_parser.add_argument("-n", "--documents", type=int, default=1000, help="number of documents, defaults to 1000")
+    cli_parser.add_argument("-r", "--repeat", type=int, default=5, help="number of rounds, defaults to 5")
+    cli_parser.add_argument("-m", "--model", action="append", choices=list(MODELS), help="document class to benchmark")
+    cli_parser.add_argument("-o", "--output", type=str, help="path of the JSON file to write the results to")
+    cli_parser.add_argument("-c", "--compare", type=str, help="path of the JSON file of an earlier run")
+    args = cli_parser.parse_args()
+
+    results = report(args.documents, args.repeat, args.model)
+
+    if args.output is not None:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as baseline:
+            comparisons = compare(json.load(baseline), results)
+
+        print(f"{'model':<26}{'operation':<18}{'baseline, us':>14}{'current, us':>14}{'speedup':>10}")
+        for c in comparisons:
+            print(
+                f"{c['model']:<26}{c['operation']:<18}{c['baseline_us']:>14.2f}{c['current_us']:>14.2f}"
+                f"{c['speedup']:>9.2f}x"
+            )
+    elif args.output is None:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print(f"{'model':<26}{'operation':<18}{'best, ms':>12}{'per document, us':>20}")
+        for r in results["results"]:
+            print(f"{r['model']:<26}{r['operation']:<18}{r['best_ms']:>12.2f}{r['per_document_us']:>20.2f}")
@@ -0,0 +1,57 @@
+import json
+from os import environ as env
+
+import testicles
+
+from . import catalog, search
+from .suite import MODELS, OPERATIONS, report
+
+# Runs the benchmark suite with testicles, the results are written to $BENCHMARK_OUTPUT if it is set
+#
+# $ BENCHMARK_OUTPUT=results.json python -m testicles.cli --start-dir benchmarks
+#
+# Sizes are small by default, so that the run only proves that every benchmark works.
+# Set $BENCHMARK_DOCUMENTS and $BENCHMARK_REPEAT for meaningful timings.
+
+
+class BenchmarksTestCase(testicles.UnitTest):
+    def test_suite(self):
+        # when
+        results = report(
+            documents=int(env.get("BENCHMARK_DOCUMENTS", 10)),
+            repeat=int(env.get("BENCHMARK_REPEAT", 1))
+        )
+
+        # then
+        measured = {(r["model"], r["operation"]) for r in results["results"]}
+        self.assertEqual(measured, {(model, operation) for model in MODELS for operation in OPERATIONS})
+
+        output = env.get("BENCHMARK_OUTPUT")
+        if output:
+            with open(output, "w") as file:
+                json.dump(results, file, indent=2)
+
+    def test_search(self):
+        # when
+        results = search.run([int(env.get("BENCHMARK_DOCUMENTS", 10))], repeat=int(env.get("BENCHMARK_REPEAT", 1)))
+
+        # then
+        self.assertEqual([r["query"] for r in results["search"]], list(search.QUERIES))
+        self.assertEqual(results["search"][-1]["matches"], results["search"][-1]["products"])
+        self.assertEqual([r["prefix"] for r in results["suggest"]], search.PREFIXES)
+
+    def test_catalog(self):
+        # given
+        size = int(env.get("BENCHMARK_DOCUMENTS", 10))
+        products = [catalog.product_document(i) for i in range(size)]
+
+        # when
+        results = catalog.run([size], repeat=int(env.get("BENCHMARK_REPEAT", 1)))
+
+        # then
+        self.assertEqual(
+            [(r["filter"], r["sort"], r["matches"]) for r in results["filters"]],
+            [(name, sort, len(catalog.scan(products, filters)))
+             for name, filters in catalog.FILTERS.items() for sort in catalog.SORTS]
+        )
+        self.assertEqual([r["products"] for r in results["writes"]], [size])
@@ -31,5 +31,14 @@ app_config = {
     "FB_NAMESPACE": env.get("FB_NAMESPACE"),
     "FB_SERVICE_ACCOUNT": get_fb_service_account(),
     "FB_API_KEY": env.get("FB_API_KEY"),
-    "FB_M2M_SECRET_KEY": env.get("FB_M2M_SECRET_KEY")
+    "FB_M2M_SECRET_KEY": env.get("FB_M2M_SECRET_KEY"),
+    "PRODUCTS_CACHE_SIZE": int(env.get("PRODUCTS_CACHE_SIZE", 1024)),
+    "PRODUCTS_CACHE_TTL": float(env.get("PRODUCTS_CACHE_TTL", 60)),
+    "PRODUCTS_IMPORT_CHUNK_SIZE": int(env.get("PRODUCTS_IMPORT_CHUNK_SIZE", 500)),
+    "SEARCH_COUNTS_CACHE_SIZE": int(env.get("SEARCH_COUNTS_CACHE_SIZE", 1024)),
+    "SEARCH_COUNTS_CACHE_TTL": float(env.get("SEARCH_COUNTS_CACHE_TTL", 30)),
+    "SEARCH_RESULTS_CACHE_SIZE": int(env.get("SEARCH_RESULTS_CACHE_SIZE", 1024)),
+    "SEARCH_RESULTS_CACHE_TTL": float(env.get("SEARCH_RESULTS_CACHE_TTL", 30)),
+    "PRODUCT_INDEX_MAX_AGE": float(env.get("PRODUCT_INDEX_MAX_AGE", 5)),
+    "PRODUCT_CATALOG_MAX_AGE": float(env.get("PRODUCT_CATALOG_MAX_AGE", 5))
 }
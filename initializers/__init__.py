@@ -2,9 +2,15 @@ from app.models import ModelsExtension
 from app.services import ServicesExtension
 
 from . import (
+    build_product_catalog,
+    build_product_index,
+    build_product_search,
     create_root_profile
 )
 
 
 def run(services: ServicesExtension, models: ModelsExtension):
     create_root_profile.run(models)
+    build_product_search.run(models)
+    build_product_index.run(models)
+    build_product_catalog.run(models)
@@ -0,0 +1,20 @@
+import time
+
+from app.models import ModelsExtension
+
+
+def run(models: ModelsExtension):
+    """Builds the in-memory filter catalog of the products, so that the first filtered search of a worker doesn't
+    wait for it
+
+    Args:
+        models (ModelsExtension): models
+    """
+    try:
+        started_at = time.monotonic()
+        models.product_catalog.refresh()
+
+        print(f"Product catalog built: {models.product_catalog.stats()['products']} products "
+              f"in {time.monotonic() - started_at:.1f}s")
+    except Exception as e:
+        print(f"Failed to build the product catalog: {e}")
@@ -0,0 +1,19 @@
+import time
+
+from app.models import ModelsExtension
+
+
+def run(models: ModelsExtension):
+    """Builds the in-memory search index of the products, so that the first search of a worker doesn't wait for it
+
+    Args:
+        models (ModelsExtension): models
+    """
+    try:
+        started_at = time.monotonic()
+        models.product_index.refresh()
+
+        print(f"Product index built: {models.product_index.stats()['products']} products "
+              f"in {time.monotonic() - started_at:.1f}s")
+    except Exception as e:
+        print(f"Failed to build the product index: {e}")
@@ -0,0 +1,23 @@
+import time
+
+from app.models import ModelsExtension
+
+
+def run(models: ModelsExtension):
+    """Writes the search entries of all products once they are behind the products, e.g. right after the
+    `product_search` collection was created, so that searches don't find nothing until a manual rebuild
+
+    Args:
+        models (ModelsExtension): models
+    """
+    try:
+        if not models.product_search.needs_rebuild():
+            return
+
+        started_at = time.monotonic()
+        result = models.product_search.rebuild()
+
+        print(f"Product search rebuilt: {result['written']} entries written, {result['deleted']} deleted "
+              f"in {time.monotonic() - started_at:.1f}s")
+    except Exception as e:
+        print(f"Failed to rebuild the product search: {e}")
@@ -0,0 +1,181 @@
+from typing import Dict, Generic, Hashable, Iterable, List, Tuple, TypeVar
+
+import numpy as np
+
+Value = TypeVar("Value", bound=Hashable)
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def word_count(rows: int) -> int:
+    """Counts the 64-bit words of a bitmap of rows
+
+    Args:
+        rows (int): number of rows
+
+    Returns:
+        int: number of words
+    """
+    return (rows + 63) // 64
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """Counts the set bits of every word of bitmaps
+
+    Args:
+        words (np.ndarray): words of bitmaps, of any shape
+
+    Returns:
+        np.ndarray: the number of set bits of every word, of the same shape
+    """
+    # the bits of every word are summed in pairs, then nibbles, then bytes, whose sum lands in the top byte
+    words = words - ((words >> np.uint64(1)) & _M1)
+    words = (words & _M2) + ((words >> np.uint64(2)) & _M2)
+    words = (words + (words >> np.uint64(4))) & _M4
+
+    return (words * _H01) >> np.uint64(56)
+
+
+def from_mask(mask: np.ndarray, words: int) -> np.ndarray:
+    """Packs a boolean mask of rows into a bitmap
+
+    Args:
+        mask (np.ndarray): whether every row is set
+        words (int): number of words of the bitmap, at least enough for the rows of the mask
+
+    Returns:
+        np.ndarray: the bitmap
+    """
+    packed = np.zeros(words * 8, dtype=np.uint8)
+    bits = np.packbits(mask, bitorder="little")
+    packed[:len(bits)] = bits
+
+    return packed.view(np.uint64)
+
+
+def to_rows(bitmap: np.ndarray, rows: int) -> np.ndarray:
+    """Lists the set rows of a bitmap
+
+    Args:
+        bitmap (np.ndarray): the bitmap
+        rows (int): number of rows, the bits beyond are ignored
+
+    Returns:
+        np.ndarray: the indexes of the set rows, ascending
+    """
+    return np.flatnonzero(np.unpackbits(bitmap.view(np.uint8), count=rows, bitorder="little"))
+
+
+class BitmapColumn(Generic[Value]):
+    """Bitmaps of the rows that have every value of a column, e.g. of every tag of products
+
+    A row has any number of values. The bitmaps are the rows of one matrix of 64-bit words, so that the unions of
+    values and the counts of the rows of every value within a set of rows are single vectorized operations.
+    Bits are set and cleared through a byte view of the words, so rows are numbered the same on every platform.
+
+    Args:
+        words (int): initial number of words of every bitmap, grown with `resize`
+    """
+
+    def __init__(self, words: int = 1) -> None:
+        self._indexes: Dict[Value, int] = {}
+        self._values: List[Value] = []
+        self._matrix = np.zeros((8, words), dtype=np.uint64)
+        # the values of every row, to clear its bits when its values change
+        self._rows: Dict[int, Tuple[Value, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def words(self) -> int:
+        return self._matrix.shape[1]
+
+    def resize(self, words: int) -> None:
+        """Grows the bitmaps to a number of words
+
+        Args:
+            words (int): number of words, ignored if they already have as many
+        """
+        if words > self.words:
+            matrix = np.zeros((self._matrix.shape[0], words), dtype=np.uint64)
+            matrix[:, :self.words] = self._matrix
+            self._matrix = matrix
+
+    def set(self, row: int, values: Iterable[Value]) -> None:
+        """Sets the values of a row, replacing the ones it had
+
+        Args:
+            row (int): the row, within the words of the bitmaps
+            values (Iterable[Value]): the values
+        """
+        values = tuple(dict.fromkeys(values))
+        previous = self._rows.get(row, ())
+
+        if values == previous:
+            return
+
+        bytes_ = self._matrix.view(np.uint8)
+        byte, bit = row >> 3, np.uint8(1 << (row & 7))
+
+        for value in previous:
+            bytes_[self._indexes[value], byte] &= ~bit
+
+        for value in values:
+            index = self._indexes.get(value)
+
+            if index is None:
+                index = self._add_value(value)
+                bytes_ = self._matrix.view(np.uint8)
+
+            bytes_[index, byte] |= bit
+
+        if values:
+            self._rows[row] = values
+        else:
+            self._rows.pop(row, None)
+
+    def union(self, values: Iterable[Value]) -> np.ndarray:
+        """Builds the bitmap of the rows that have any of some values
+
+        Args:
+            values (Iterable[Value]): the values, unknown ones match no row
+
+        Returns:
+            np.ndarray: the bitmap
+        """
+        indexes = [self._indexes[value] for value in values if value in self._indexes]
+
+        if not indexes:
+            return np.zeros(self.words, dtype=np.uint64)
+
+        return np.bitwise_or.reduce(self._matrix[indexes], axis=0)
+
+    def counts(self, bitmap: np.ndarray) -> Dict[Value, int]:
+        """Counts the rows of a bitmap that have every value
+
+        Args:
+            bitmap (np.ndarray): the rows to count, of as many words as the bitmaps
+
+        Returns:
+            Dict[Value, int]: the number of rows by value, without the values that none of the rows has
+        """
+        counts = popcount(self._matrix[:len(self._values)] & bitmap).sum(axis=1)
+
+        return {self._values[index]: int(counts[index]) for index in np.flatnonzero(counts)}
+
+    def _add_value(self, value: Value) -> int:
+        index = len(self._values)
+
+        if index == self._matrix.shape[0]:
+            matrix = np.zeros((index * 2, self.words), dtype=np.uint64)
+            matrix[:index] = self._matrix
+            self._matrix = matrix
+
+        self._indexes[value] = index
+        self._values.append(value)
+
+        return index
@@ -0,0 +1,151 @@
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+from cachetools import TTLCache
+
+Key = TypeVar("Key", bound=Hashable)
+Value = TypeVar("Value")
+
+_MISSING = object()
+
+
+class Cache(Generic[Key, Value]):
+    """Thread-safe bounded cache with LRU and TTL eviction, that counts its hits and misses.
+
+    Loads run outside of the lock, so a slow load doesn't block readers of other keys. A load that
+    was started before an invalidation is not stored, so that a write is never hidden by a value
+    that was read before it.
+
+    Args:
+        maxsize (int): maximum number of entries, the least recently used one is evicted first
+        ttl (float): seconds after which an entry expires
+        timer (Callable[[], float]): clock the expiry is measured with
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        self._lock = Lock()
+        self._generation = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.ttl > 0
+
+    def get(self, key: Key) -> Optional[Value]:
+        """Gets a cached value
+
+        Args:
+            key (Key): key of the value
+
+        Returns:
+            Optional[Value]: the value, None if it is not cached
+        """
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+
+            if value is _MISSING:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return value
+
+    def get_or_load(self, key: Key, load: Callable[[], Optional[Value]]) -> Optional[Value]:
+        """Gets a cached value, or loads and caches it on a miss. Values that load as None are not cached.
+
+        Args:
+            key (Key): key of the value
+            load (Callable[[], Optional[Value]]): loads the value
+
+        Returns:
+            Optional[Value]: the value
+        """
+        if not self.enabled:
+            return load()
+
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+
+            if value is not _MISSING:
+                self.hits += 1
+                return value
+
+            self.misses += 1
+            generation = self._generation
+
+        value = load()
+
+        if value is not None:
+            self.set(key, value, generation)
+
+        return value
+
+    def set(self, key: Key, value: Value, generation: Optional[int] = None) -> None:
+        """Caches a value
+
+        Args:
+            key (Key): key of the value
+            value (Value): the value
+            generation (Optional[int]): generation the value was loaded at, it is dropped if the cache was invalidated since
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            if generation is None or generation == self._generation:
+                self._entries[key] = value
+
+    def invalidate(self, *keys: Key) -> None:
+        """Drops cached values, and the values of loads that are in progress
+
+        Args:
+            *keys (Key): keys of the values
+        """
+        with self._lock:
+            self._generation += 1
+
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def invalidate_if(self, predicate: Callable[[Key, Value], bool]) -> None:
+        """Drops the cached values that match a predicate, and the values of loads that are in progress
+
+        Args:
+            predicate (Callable[[Key, Value], bool]): whether to drop an entry
+        """
+        with self._lock:
+            self._generation += 1
+
+            for key in [key for key, value in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drops all cached values"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Describes the cache and its effect
+
+        Returns:
+            Dict[str, Any]: size, limits, hits, misses and the ratio of hits
+        """
+        with self._lock:
+            self._entries.expire()
+            lookups = self.hits + self.misses
+
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+            }
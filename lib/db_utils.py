@@ -1,19 +1,32 @@
 from __future__ import annotations
 
+import typing
 from datetime import datetime
-from typing import Any, Dict, cast, Optional, List
+from typing import Any, Callable, Dict, cast, Optional, List, Tuple, Union
 
+import bson
 from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+Encoder = Callable[[Any], Any]
+
+NoneType = type(None)
+
+# Marks a field that has no value, e.g. an unset slot
+_UNSET = object()
 
 
 class Serializable(object):
+    # lets subclasses that declare their own slots drop the per-instance dict
+    __slots__ = ()
+
     def to_json(self):
         """Recursively converts types into JSON compatible
 
         Returns:
             Dict[str, Any]: A dict containing all of the fields from the original class
         """
-        return cast(Dict[str, Any], to_json(self))
+        return cast(Dict[str, Any], serializer_plan(type(self)).to_json(self))
 
     def to_dict(self):
         """Recursively unpacks serializable fields into a dict. Preserves the original type of each field.
@@ -21,7 +34,7 @@ class Serializable(object):
         Returns:
             Dict[str, Any]:  A dict containing all of the fields from the original class
         """
-        return cast(Dict[str, Any], to_dict(self))
+        return cast(Dict[str, Any], serializer_plan(type(self)).to_dict(self))
 
     def to_bson(self, ignore: Optional[List[str]] = None):
         """Recursively converts types into BSON compatible
@@ -30,94 +43,422 @@ class Serializable(object):
             Dict[str, Any]:  A dict containing all of the fields from the original class
         """
 
-        return cast(Dict[str, Any], to_bson(self, ignore=ignore))
+        return cast(Dict[str, Any], serializer_plan(type(self)).to_bson(self, ignore=ignore))
 
     def __eq__(self, other: Serializable) -> bool:
         return self.to_json() == other.to_json()
 
 
+##
+# Generic encoders
+#
+# Each conversion dispatches on the exact type of a value through a table that is filled lazily,
+# so the isinstance chain runs once per concrete type instead of once per value.
+##
+
+_JSON_ENCODERS: Dict[type, Encoder] = {}
+_DICT_ENCODERS: Dict[type, Encoder] = {}
+_BSON_ENCODERS: Dict[type, Encoder] = {}
+
+
+# Exact types that every conversion returns as they are
+_SCALARS = frozenset([str, int, float, bool, NoneType])
+
+
+def _identity(thing: Any):
+    return thing
+
+
+def _register(table: Dict[type, Encoder], kind: type, resolver: Callable[[type], Encoder]) -> Encoder:
+    encoder = table[kind] = resolver(kind)
+
+    return encoder
+
+
 def to_json(thing: Any):
-    if isinstance(thing, ObjectId):
-        return str(thing)
-    elif isinstance(thing, dict):
-        out = {}
+    kind = type(thing)
+    encoder = _JSON_ENCODERS.get(kind) or _register(_JSON_ENCODERS, kind, _resolve_json_encoder)
 
-        for key, value in thing.items():
-            out[key] = to_json(value)
+    return encoder(thing)
 
-        return out
-    elif isinstance(thing, list):
-        out = []
 
-        for item in thing:
-            out.append(to_json(item))
+def _json_dict(thing: dict):
+    out = {}
 
-        return out
-    elif isinstance(thing, tuple):
-        return to_json(list(thing))
-    elif isinstance(thing, (int, float, bool, str)) or thing is None:
-        return thing
-    elif isinstance(thing, Serializable):
-        return to_json(vars(thing))
+    for key, value in thing.items():
+        kind = type(value)
+        if kind in _SCALARS:
+            out[key] = value
+        else:
+            out[key] = (_JSON_ENCODERS.get(kind) or _register(_JSON_ENCODERS, kind, _resolve_json_encoder))(value)
+
+    return out
+
+
+def _json_raw(thing: RawBSONDocument):
+    # decoding the whole document at once is much cheaper than inflating it level by level
+    return _json_dict(bson.decode(thing.raw))
+
+
+def _json_list(thing: Union[list, tuple]):
+    out = []
+
+    for item in thing:
+        kind = type(item)
+        if kind in _SCALARS:
+            out.append(item)
+        else:
+            out.append((_JSON_ENCODERS.get(kind) or _register(_JSON_ENCODERS, kind, _resolve_json_encoder))(item))
+
+    return out
+
+
+def _resolve_json_encoder(kind: type) -> Encoder:
+    if issubclass(kind, ObjectId):
+        return str
+    elif issubclass(kind, dict):
+        return _json_dict
+    elif issubclass(kind, RawBSONDocument):
+        return _json_raw
+    elif issubclass(kind, (list, tuple)):
+        return _json_list
+    elif issubclass(kind, (int, float, bool, str, NoneType)):
+        return _identity
+    elif issubclass(kind, Serializable):
+        return lambda thing: serializer_plan(kind).to_json(thing)
     else:
-        return str(thing)
+        return str
 
 
 def to_dict(thing: Any):
-    if isinstance(thing, Serializable):
-        return to_dict(vars(thing))
-    elif isinstance(thing, dict):
-        out = {}
+    kind = type(thing)
+    encoder = _DICT_ENCODERS.get(kind) or _register(_DICT_ENCODERS, kind, _resolve_dict_encoder)
 
-        for key, value in thing.items():
-            out[key] = to_dict(value)
+    return encoder(thing)
 
-        return out
-    elif isinstance(thing, list):
-        out = []
 
-        for item in thing:
-            out.append(to_dict(item))
+def _dict_dict(thing: dict):
+    out = {}
 
-        return out
-    elif isinstance(thing, tuple):
-        return to_dict(list(thing))
+    for key, value in thing.items():
+        kind = type(value)
+        if kind in _SCALARS:
+            out[key] = value
+        else:
+            out[key] = (_DICT_ENCODERS.get(kind) or _register(_DICT_ENCODERS, kind, _resolve_dict_encoder))(value)
+
+    return out
+
+
+def _dict_list(thing: Union[list, tuple]):
+    out = []
+
+    for item in thing:
+        kind = type(item)
+        if kind in _SCALARS:
+            out.append(item)
+        else:
+            out.append((_DICT_ENCODERS.get(kind) or _register(_DICT_ENCODERS, kind, _resolve_dict_encoder))(item))
+
+    return out
+
+
+def _resolve_dict_encoder(kind: type) -> Encoder:
+    if issubclass(kind, Serializable):
+        return lambda thing: serializer_plan(kind).to_dict(thing)
+    elif issubclass(kind, dict):
+        return _dict_dict
+    elif issubclass(kind, (list, tuple)):
+        return _dict_list
     else:
-        return thing
+        return _identity
 
 
 def to_bson(thing: Any, ignore: Optional[List[str]] = None):
-    if isinstance(thing, ObjectId):
-        return thing
-    elif isinstance(thing, dict):
+    if ignore is not None:
+        if isinstance(thing, dict):
+            return {key: to_bson(value) for key, value in thing.items() if key not in ignore}
+        elif isinstance(thing, Serializable):
+            return serializer_plan(type(thing)).to_bson(thing, ignore=ignore)
+
+    kind = type(thing)
+    encoder = _BSON_ENCODERS.get(kind) or _register(_BSON_ENCODERS, kind, _resolve_bson_encoder)
+
+    return encoder(thing)
+
+
+def _bson_dict(thing: dict):
+    out = {}
+
+    for key, value in thing.items():
+        kind = type(value)
+        if kind in _SCALARS:
+            out[key] = value
+        else:
+            out[key] = (_BSON_ENCODERS.get(kind) or _register(_BSON_ENCODERS, kind, _resolve_bson_encoder))(value)
+
+    return out
+
+
+def _bson_list(thing: Union[list, tuple]):
+    out = []
+
+    for item in thing:
+        kind = type(item)
+        if kind in _SCALARS:
+            out.append(item)
+        else:
+            out.append((_BSON_ENCODERS.get(kind) or _register(_BSON_ENCODERS, kind, _resolve_bson_encoder))(item))
+
+    return out
+
+
+def _resolve_bson_encoder(kind: type) -> Encoder:
+    # raw documents are copied into the encoded document as they are, without being decoded
+    if issubclass(kind, (ObjectId, RawBSONDocument)):
+        return _identity
+    elif issubclass(kind, dict):
+        return _bson_dict
+    elif issubclass(kind, (list, tuple)):
+        return _bson_list
+    elif issubclass(kind, (int, float, bool, str, datetime, NoneType)):
+        return _identity
+    elif issubclass(kind, Serializable):
+        return lambda thing: serializer_plan(kind).to_bson(thing)
+    else:
+        return str
+
+
+##
+# Serializer plans
+##
+
+_JSON, _DICT, _BSON = "json", "dict", "bson"
+
+_GENERIC: Dict[str, Encoder] = {
+    _JSON: to_json,
+    _DICT: to_dict,
+    _BSON: to_bson,
+}
+
+_PLANS: Dict[type, SerializerPlan] = {}
+
+
+class SerializerPlan:
+    """Field encoders of a Serializable class, compiled once from its type annotations.
+
+    Every compiled encoder checks that a value has the exact type it was compiled for and otherwise
+    falls back to the generic encoder, so documents that carry raw Mongo dicts where a nested class
+    is annotated serialize exactly like before.
+    """
+
+    json_fields: Dict[str, Encoder]
+    dict_fields: Dict[str, Encoder]
+    bson_fields: Dict[str, Encoder]
+    slots: Tuple[str, ...]
+    has_dict: bool
+
+    def __init__(self, cls: type) -> None:
+        hints = _get_type_hints(cls)
+
+        self.json_fields = {name: _compile(hint, _JSON) for name, hint in hints.items()}
+        self.dict_fields = {name: _compile(hint, _DICT) for name, hint in hints.items()}
+        self.bson_fields = {name: _compile(hint, _BSON) for name, hint in hints.items()}
+
+        self.slots = _get_slots(cls)
+        self.has_dict = any("__dict__" in vars(kind) for kind in cls.__mro__)
+
+    def fields(self, thing: Serializable) -> Dict[str, Any]:
+        """Returns the fields of an instance, both slots and attributes of its `__dict__`. Unset slots are skipped.
+
+        Args:
+            thing (Serializable): an instance of the class of the plan
+
+        Returns:
+            Dict[str, Any]: values of the fields
+        """
+        if not self.slots:
+            return vars(thing)
+
         out = {}
 
-        for key, value in thing.items():
-            if ignore is not None and key in ignore:
-                continue
-            out[key] = to_bson(value)
+        for key in self.slots:
+            value = getattr(thing, key, _UNSET)
+            if value is not _UNSET:
+                out[key] = value
+
+        if self.has_dict:
+            out |= vars(thing)
 
         return out
-    elif isinstance(thing, list):
-        out = []
 
-        for item in thing:
-            out.append(to_bson(item))
+    def to_json(self, thing: Serializable) -> Dict[str, Any]:
+        if self.slots and not self.has_dict:
+            return _encode_slots(thing, self.slots, self.json_fields, to_json)
 
-        return out
-    elif isinstance(thing, tuple):
-        return to_bson(list(thing))
-    elif isinstance(thing, (int, float, bool, str, datetime)) or thing is None:
-        return thing
-    elif isinstance(thing, Serializable):
+        return _encode_fields(self.fields(thing), self.json_fields, to_json)
+
+    def to_dict(self, thing: Serializable) -> Dict[str, Any]:
+        if self.slots and not self.has_dict:
+            return _encode_slots(thing, self.slots, self.dict_fields, to_dict)
+
+        return _encode_fields(self.fields(thing), self.dict_fields, to_dict)
+
+    def to_bson(self, thing: Serializable, ignore: Optional[List[str]] = None) -> Dict[str, Any]:
         if ignore is None:
-            return to_bson(vars(thing))
-        variables = {key: value for key, value in vars(thing).items() if key not in ignore}
-        for key in variables:
-            if isinstance(variables[key], Serializable):
-                variables[key] = variables[key].to_bson()
+            if self.slots and not self.has_dict:
+                return _encode_slots(thing, self.slots, self.bson_fields, to_bson)
+
+            return _encode_fields(self.fields(thing), self.bson_fields, to_bson)
+
+        fields = self.bson_fields
+        out = {}
+
+        for key, value in self.fields(thing).items():
+            if key in ignore:
+                continue
+            # nested documents may customize their own BSON representation
+            if isinstance(value, Serializable):
+                out[key] = value.to_bson()
             else:
-                variables[key] = to_bson(variables[key])
-        return variables
+                out[key] = fields.get(key, to_bson)(value)
+
+        return out
+
+
+def _encode_fields(values: Dict[str, Any], fields: Dict[str, Encoder], generic: Encoder) -> Dict[str, Any]:
+    out = {}
+
+    for key, value in values.items():
+        if type(value) in _SCALARS:
+            out[key] = value
+        else:
+            out[key] = fields.get(key, generic)(value)
+
+    return out
+
+
+def _encode_slots(thing: Serializable, slots: Tuple[str, ...], fields: Dict[str, Encoder], generic: Encoder) -> Dict[str, Any]:
+    out = {}
+
+    for key in slots:
+        value = getattr(thing, key, _UNSET)
+        if value is _UNSET:
+            continue
+        if type(value) in _SCALARS:
+            out[key] = value
+        else:
+            out[key] = fields.get(key, generic)(value)
+
+    return out
+
+
+def _get_slots(cls: type) -> Tuple[str, ...]:
+    slots = []
+
+    for kind in reversed(cls.__mro__):
+        declared = vars(kind).get("__slots__", ())
+        for name in (declared,) if isinstance(declared, str) else declared:
+            if name not in ("__dict__", "__weakref__") and name not in slots:
+                slots.append(name)
+
+    return tuple(slots)
+
+
+def get_fields(thing: Serializable) -> Dict[str, Any]:
+    """Returns the fields of a Serializable, whether they are stored in slots or in its `__dict__`
+
+    Args:
+        thing (Serializable): the object
+
+    Returns:
+        Dict[str, Any]: values of the fields
+    """
+    return serializer_plan(type(thing)).fields(thing)
+
+
+def serializer_plan(cls: type) -> SerializerPlan:
+    """Returns the cached serializer plan of a class, compiling it on first use
+
+    Args:
+        cls (type): a Serializable subclass
+
+    Returns:
+        SerializerPlan: the plan
+    """
+    plan = _PLANS.get(cls)
+
+    if plan is None:
+        plan = _PLANS[cls] = SerializerPlan(cls)
+
+    return plan
+
+
+def _get_type_hints(cls: type) -> Dict[str, Any]:
+    try:
+        return typing.get_type_hints(cls)
+    except Exception:
+        # unresolvable annotations are serialized with the generic encoders
+        return {}
+
+
+def _compile(hint: Any, mode: str) -> Encoder:
+    generic = _GENERIC[mode]
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+
+    if origin is Union:
+        options = [arg for arg in args if arg is not NoneType]
+        if len(options) != 1:
+            return generic
+
+        encoder = _compile(options[0], mode)
+        if encoder is generic:
+            return generic
+
+        return lambda value: None if value is None else encoder(value)
+    elif origin is list:
+        item_encoder = _compile(args[0], mode) if args else generic
+        if item_encoder is generic:
+            return generic
+
+        return lambda value: [item_encoder(item) for item in value] if type(value) is list else generic(value)
+    elif origin is dict:
+        value_encoder = _compile(args[1], mode) if len(args) == 2 else generic
+        if value_encoder is generic:
+            return generic
+
+        return lambda value: (
+            {key: value_encoder(item) for key, item in value.items()} if type(value) is dict else generic(value)
+        )
+    elif isinstance(hint, type):
+        return _compile_type(hint, mode)
+    else:
+        return generic
+
+
+def _compile_type(kind: type, mode: str) -> Encoder:
+    generic = _GENERIC[mode]
+
+    if kind in (int, float, bool, str):
+        return lambda value: value if type(value) is kind else generic(value)
+    elif kind is ObjectId:
+        if mode == _JSON:
+            return lambda value: str(value) if type(value) is ObjectId else generic(value)
+
+        return lambda value: value if type(value) is ObjectId else generic(value)
+    elif kind is datetime:
+        if mode == _JSON:
+            return lambda value: str(value) if type(value) is datetime else generic(value)
+
+        return lambda value: value if type(value) is datetime else generic(value)
+    elif issubclass(kind, Serializable):
+        # plans are resolved at call time, so that self-referencing classes can be compiled
+        if mode == _JSON:
+            return lambda value: serializer_plan(kind).to_json(value) if type(value) is kind else generic(value)
+        elif mode == _DICT:
+            return lambda value: serializer_plan(kind).to_dict(value) if type(value) is kind else generic(value)
+
+        return lambda value: serializer_plan(kind).to_bson(value) if type(value) is kind else generic(value)
     else:
-        return str(thing)
+        return generic
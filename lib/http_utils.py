@@ -1,4 +1,15 @@
-from typing import Any, Dict, Optional
+import hashlib
+import itertools
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from flask import Response, current_app, request
+from werkzeug.http import http_date, is_resource_modified, quote_etag
+
+# Number of items serialized into a single chunk of a streamed response
+STREAM_CHUNK_SIZE = 100
+
+_END = object()
 
 
 def respond_success(data: Any, meta: Optional[Dict] = None, status_code: int = 200):
@@ -12,6 +23,135 @@ def respond_success(data: Any, meta: Optional[Dict] = None, status_code: int = 2
     return response_object, status_code
 
 
+def etag_of(*parts: Any) -> str:
+    """Creates a strong ETag from the parts that identify a version of a representation, e.g. IDs and timestamps
+
+    Args:
+        *parts (Any): parts of the version, their `repr` is hashed
+
+    Returns:
+        str: the unquoted ETag
+    """
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def respond_conditional(
+        data: Any,
+        etag: str,
+        last_modified: Optional[datetime] = None,
+        meta: Optional[Dict] = None,
+        status_code: int = 200
+):
+    """Conditional counterpart of `respond_success` for GET endpoints.
+
+    The validators are compared with the `If-None-Match` and `If-Modified-Since` headers of the request before
+    anything is serialized, so a client that already has the representation gets an empty 304 response.
+    Responses ask clients to revalidate every time, so they never show a stale representation.
+
+    Args:
+        data (Any): data of the response
+        etag (str): strong ETag of the representation, see `etag_of`
+        last_modified (Optional[datetime]): time of the last modification of the data, naive datetimes are UTC
+        meta (Optional[Dict]): optional meta of the response
+        status_code (int): status code of the response
+
+    Returns:
+        a 304 response without a body, or the response of `respond_success` with the validators
+    """
+    headers = {"ETag": quote_etag(etag), "Cache-Control": "no-cache"}
+
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return Response(status=304, headers=headers)
+
+    return *respond_success(data, meta, status_code), headers
+
+
+def respond_stream(data: Iterable[Any], meta: Optional[Dict] = None, status_code: int = 200):
+    """Streaming counterpart of `respond_success` for large lists.
+
+    The envelope is written in chunks while `data` is consumed, so a list backed by a database cursor
+    is never materialized. The first item is fetched before the response is returned, so failures
+    of the initial query are still reported as regular errors. Once streaming has started the status
+    code can't change anymore and a later error truncates the response.
+
+    Args:
+        data (Iterable[Any]): items of the list, e.g. documents yielded from a cursor
+        meta (Optional[Dict]): optional meta of the response
+        status_code (int): status code of the response
+
+    Returns:
+        Response: a streamed JSON response
+    """
+
+    # the generator outlives the app context of the request, so the provider is resolved up front
+    provider = current_app.json
+
+    def dumps(thing: Any) -> str:
+        return provider.dumps(thing, separators=(",", ":"))
+
+    items = iter(data)
+    first = next(items, _END)
+    if first is not _END:
+        items = itertools.chain((first,), items)
+
+    return Response(_stream_envelope(items, meta, dumps), status=status_code, mimetype="application/json")
+
+
+def respond_ndjson(data: Iterable[Any], status_code: int = 200):
+    """Streams a list as NDJSON, one item per line, for lists that clients process while they are received
+
+    Each item is written as soon as it is consumed from `data`, so it can be produced while the request
+    is still read. As with `respond_stream`, the first item is fetched before the response is returned.
+
+    Args:
+        data (Iterable[Any]): items of the list
+        status_code (int): status code of the response
+
+    Returns:
+        Response: a streamed NDJSON response
+    """
+
+    # the generator outlives the app context of the request, so the provider is resolved up front
+    provider = current_app.json
+
+    items = iter(data)
+    first = next(items, _END)
+    if first is not _END:
+        items = itertools.chain((first,), items)
+
+    lines = (provider.dumps(item, separators=(",", ":")) + "\n" for item in items)
+
+    return Response(lines, status=status_code, mimetype="application/x-ndjson")
+
+
+def _stream_envelope(data: Iterable[Any], meta: Optional[Dict], dumps: Callable[[Any], str]) -> Iterator[str]:
+    yield '{"data":['
+
+    chunk = []
+    separator = ""
+
+    for item in data:
+        chunk.append(dumps(item))
+
+        if len(chunk) == STREAM_CHUNK_SIZE:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+
+    if chunk:
+        yield separator + ",".join(chunk)
+
+    yield "]"
+
+    if meta is not None:
+        yield ',"meta":' + dumps(meta)
+
+    yield ',"status":"ok"}'
+
+
 def respond_error(error: str, status_code: int = 400):
     response_object = {
         "status": "error",
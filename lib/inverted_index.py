@@ -0,0 +1,257 @@
+import bisect
+import math
+from typing import Dict, Generic, Hashable, Iterable, List, Optional, Set, Tuple, TypeVar
+
+from lib.search import words
+
+Key = TypeVar("Key", bound=Hashable)
+
+
+class InvertedIndex(Generic[Key]):
+    """In-memory inverted index of weighted texts, ranked with BM25
+
+    Every document is a list of texts with a weight each, e.g. its name with a higher weight than its
+    description. A term counts as often in a document as the sum of the weights of the texts it occurs in,
+    and the length of a document is the weighted number of its words, so that BM25 favors the documents
+    whose heavier texts have the term.
+
+    Documents match a query if every word of the query is a term of the document, or the beginning of
+    one. A beginning scores the score of the term it expands to, scaled by the share of the term it covers.
+
+    The index is not thread-safe, its owner serializes writes and reads. To search while writing, writes are made
+    to a `copy`, which shares the postings of the index until it writes them, and the copy replaces the index once
+    it's complete, so the index itself is never written again.
+
+    Args:
+        k1 (float): saturation of the term frequency, higher values favor repeated terms more
+        b (float): normalization of the term frequency by the length of the document, from 0 to 1
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+
+        # term frequencies, by term, then by document
+        self._postings: Dict[str, Dict[Key, float]] = {}
+        # the term frequencies of every document, to remove it
+        self._documents: Dict[Key, Dict[str, float]] = {}
+        self._lengths: Dict[Key, float] = {}
+        self._total_length = 0.0
+        # all terms, sorted, to expand the beginnings of words, None once terms were added or removed since
+        self._terms: Optional[List[str]] = []
+        # the terms whose postings this index may write, the others are shared with the index it's a copy of
+        self._owned: Optional[Set[str]] = None
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._documents
+
+    def keys(self) -> Iterable[Key]:
+        return self._documents.keys()
+
+    def copy(self) -> "InvertedIndex[Key]":
+        """Copies the index, sharing the postings of every term until the copy writes them
+
+        Returns:
+            InvertedIndex[Key]: the copy
+        """
+        copy = InvertedIndex(self.k1, self.b)
+        copy._postings = dict(self._postings)
+        copy._documents = dict(self._documents)
+        copy._lengths = dict(self._lengths)
+        copy._total_length = self._total_length
+        copy._terms = self._terms
+        copy._owned = set()
+
+        return copy
+
+    def apply(self) -> None:
+        """Sorts the terms after a batch of writes, so that the next search doesn't wait for it"""
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+
+    def add(self, key: Key, texts: Iterable[Tuple[str, float]]) -> None:
+        """Adds a document, or replaces it if it's already indexed
+
+        Only the postings of the terms whose frequency changed are written, so that replacing a document with
+        a similar one writes few postings of a copy.
+
+        Args:
+            key (Key): the key of the document
+            texts (Iterable[Tuple[str, float]]): the texts of the document with their weights
+        """
+        frequencies, length = self._frequencies(texts)
+        previous = self._documents.get(key, {})
+
+        for term in previous.keys() - frequencies.keys():
+            self._remove_posting(term, key)
+
+        self._documents[key] = frequencies
+        self._total_length += length - self._lengths.get(key, 0.0)
+        self._lengths[key] = length
+
+        for term, frequency in frequencies.items():
+            if previous.get(term) == frequency:
+                continue
+
+            if term not in self._postings:
+                self._postings[term] = {}
+                self._terms = None
+                if self._owned is not None:
+                    self._owned.add(term)
+
+            self._own(term)[key] = frequency
+
+    def indexed(self, key: Key, texts: Iterable[Tuple[str, float]]) -> bool:
+        """Tells whether a document is indexed with the same terms as texts, so that adding it changes nothing
+
+        Args:
+            key (Key): the key of the document
+            texts (Iterable[Tuple[str, float]]): the texts of the document with their weights
+
+        Returns:
+            bool: whether the document is indexed with the same terms and length
+        """
+        return key in self._documents and self._frequencies(texts) == (self._documents[key], self._lengths[key])
+
+    def remove(self, key: Key) -> None:
+        """Removes a document, if it's indexed
+
+        Args:
+            key (Key): the key of the document
+        """
+        frequencies = self._documents.pop(key, None)
+
+        if frequencies is None:
+            return
+
+        self._total_length -= self._lengths.pop(key)
+
+        for term in frequencies:
+            self._remove_posting(term, key)
+
+    @staticmethod
+    def _frequencies(texts: Iterable[Tuple[str, float]]) -> Tuple[Dict[str, float], float]:
+        frequencies: Dict[str, float] = {}
+        length = 0.0
+
+        for text, weight in texts:
+            text_words = words(text)
+            length += weight * len(text_words)
+
+            for word in text_words:
+                frequencies[word] = frequencies.get(word, 0.0) + weight
+
+        return frequencies, length
+
+    def _remove_posting(self, term: str, key: Key) -> None:
+        postings = self._own(term)
+        del postings[key]
+
+        if not postings:
+            del self._postings[term]
+            self._terms = None
+
+    def _own(self, term: str) -> Dict[Key, float]:
+        postings = self._postings[term]
+
+        if self._owned is not None and term not in self._owned:
+            postings = self._postings[term] = dict(postings)
+            self._owned.add(term)
+
+        return postings
+
+    def expand(self, word: str) -> List[str]:
+        """Lists the terms that a word of a query matches: the word itself and the terms it's the beginning of
+
+        Args:
+            word (str): the normalized word
+
+        Returns:
+            List[str]: the terms, sorted
+        """
+        # sorted once after a batch of writes, rather than on every write
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+
+        terms = self._terms
+        start = bisect.bisect_left(terms, word)
+        end = start
+
+        while end < len(terms) and terms[end].startswith(word):
+            end += 1
+
+        return terms[start:end]
+
+    def search(self, query_words: List[str]) -> Dict[Key, float]:
+        """Scores the documents that match all of the words of a query
+
+        Args:
+            query_words (List[str]): the normalized words of the query
+
+        Returns:
+            Dict[Key, float]: the BM25 scores of the matching documents, by their keys
+        """
+        if not query_words or not self._documents:
+            return {}
+
+        count = len(self._documents)
+        lengths = self._lengths
+        # the normalization of the term frequency of a document is `base + scale * length`
+        base = self.k1 * (1 - self.b)
+        scale = self.k1 * self.b / (self._total_length / count or 1.0)
+        scores: Optional[Dict[Key, float]] = None
+
+        # the rarest words first, so that the candidates shrink as early as possible
+        expanded = sorted(
+            ((word, self.expand(word)) for word in set(query_words)),
+            key=lambda item: sum(len(self._postings[term]) for term in item[1])
+        )
+
+        for word, terms in expanded:
+            weights = []
+            for term in terms:
+                postings = self._postings[term]
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                weights.append((postings, len(word) / len(term) * idf * (self.k1 + 1)))
+
+            if scores is None and len(weights) == 1:
+                postings, weight = weights[0]
+                scores = {
+                    key: weight * frequency / (frequency + base + scale * lengths[key])
+                    for key, frequency in postings.items()
+                }
+            elif len(weights) == 1:
+                # the common case of a word that is a single term, scored and added to the matches in one pass
+                postings, weight = weights[0]
+                scores = {
+                    key: score + weight * frequency / (frequency + base + scale * lengths[key])
+                    for key, score in scores.items()
+                    if (frequency := postings.get(key)) is not None
+                }
+            else:
+                word_scores: Dict[Key, float] = {}
+
+                for postings, weight in weights:
+                    candidates = postings.items() if scores is None else (
+                        (key, postings[key]) for key in scores.keys() & postings.keys()
+                    )
+
+                    for key, frequency in candidates:
+                        score = weight * frequency / (frequency + base + scale * lengths[key])
+
+                        # a word counts once, with the best of the terms it expands to
+                        if score > word_scores.get(key, 0.0):
+                            word_scores[key] = score
+
+                if scores is None:
+                    scores = word_scores
+                else:
+                    scores = {key: scores[key] + score for key, score in word_scores.items()}
+
+            if not scores:
+                return {}
+
+        return scores or {}
@@ -0,0 +1,27 @@
+from typing import Any
+
+import bson
+from bson.raw_bson import RawBSONDocument
+from flask.json.provider import DefaultJSONProvider
+
+from lib.db_utils import Serializable, get_fields
+
+
+class BSONJSONProvider(DefaultJSONProvider):
+    """JSON provider that encodes documents while the response is written.
+
+    Serializable objects are encoded from their fields and raw BSON documents are decoded in a single
+    pass, instead of being inflated level by level. Every other type that JSON doesn't support
+    (ObjectId, datetime, nested dataclasses, ...) is encoded as its string, the same way
+    `lib.db_utils.to_json` does it. Controllers can return documents as they are, without converting
+    them beforehand.
+    """
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        if isinstance(o, Serializable):
+            return get_fields(o)
+        if isinstance(o, RawBSONDocument):
+            return bson.decode(o.raw)
+
+        return str(o)
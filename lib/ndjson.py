@@ -0,0 +1,59 @@
+import gzip
+import itertools
+import json
+import zlib
+from typing import Any, BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, TypeVar
+
+Item = TypeVar("Item")
+
+
+class Row(NamedTuple):
+    """A row of an NDJSON stream, either its decoded value or the reason it couldn't be decoded"""
+    line: int
+    value: Any
+    error: Optional[str]
+
+
+def read_ndjson(stream: BinaryIO, gzipped: bool = False) -> Iterator[Row]:
+    """Reads an NDJSON stream one line at a time, so that only the current line is held in memory
+
+    Blank lines are skipped. A line that is not valid JSON is reported as a row with an error and
+    reading goes on with the next line. A corrupt gzip stream ends the rows with an error.
+
+    Args:
+        stream (BinaryIO): the stream, e.g. the body of a request
+        gzipped (bool): whether the stream is gzip-compressed
+
+    Returns:
+        Iterator[Row]: the rows, numbered by their line from 1
+    """
+    lines = gzip.GzipFile(fileobj=stream, mode="rb") if gzipped else stream
+    number = 0
+
+    try:
+        for number, line in enumerate(lines, start=1):
+            if line.strip() == b"":
+                continue
+
+            try:
+                yield Row(number, json.loads(line), None)
+            except ValueError as error:
+                yield Row(number, None, f"Invalid JSON: {error}.")
+    except (OSError, EOFError, zlib.error):
+        yield Row(number + 1, None, "Invalid gzip stream.")
+
+
+def chunked(items: Iterable[Item], size: int) -> Iterator[List[Item]]:
+    """Splits items into lists of `size` items, the last one may be shorter
+
+    Args:
+        items (Iterable[Item]): the items, consumed lazily
+        size (int): the number of items of a chunk
+
+    Returns:
+        Iterator[List[Item]]: the chunks
+    """
+    iterator = iter(items)
+
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
@@ -0,0 +1,148 @@
+import bisect
+import heapq
+import sys
+from typing import Dict, Generic, Hashable, Iterable, List, Set, Tuple, TypeVar
+
+from cachetools import LRUCache
+
+Key = TypeVar("Key", bound=Hashable)
+
+# sorts after every character of normalized text, so that `prefix + _END` bounds the texts that start with the prefix
+_END = chr(sys.maxunicode)
+
+
+class PrefixIndex(Generic[Key]):
+    """Sorted array of normalized texts, that finds the best scored documents with a text that starts with a prefix
+
+    Every document has texts, e.g. its name and slug, and a score, e.g. its popularity. The texts of all documents
+    are kept in one sorted list, so the texts that start with a prefix are a slice of it, found by bisection.
+    The best documents of the recently looked up prefixes are cached, until a document with a text that starts
+    with the prefix changes, so that the short prefixes that match most texts are only ranked once.
+
+    Writes are applied to the sorted list by `apply`, or by the next lookup, one by one if they are few, by sorting
+    the whole list again otherwise. The index is not thread-safe, its owner serializes writes and reads.
+
+    Args:
+        cache_size (int): the number of prefixes whose best documents are cached, the least recently used are dropped
+        cached_count (int): the number of the best documents cached per prefix, lookups of more aren't cached
+    """
+
+    def __init__(self, cache_size: int = 10000, cached_count: int = 20) -> None:
+        self.cached_count = cached_count
+
+        self._texts: Dict[Key, List[str]] = {}
+        self._scores: Dict[Key, float] = {}
+        # the sorted (text, key) of every text of every document, as of the last lookup
+        self._sorted: List[Tuple[str, Key]] = []
+        # the texts of the documents in `_sorted`, by their keys
+        self._indexed: Dict[Key, List[str]] = {}
+        self._changed: Set[Key] = set()
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._texts
+
+    def set(self, key: Key, texts: Iterable[str], score: float) -> None:
+        """Adds a document, or replaces its texts and score if it's already indexed
+
+        Args:
+            key (Key): the key of the document
+            texts (Iterable[str]): the normalized texts of the document
+            score (float): the score of the document, higher is better
+        """
+        texts = sorted(set(text for text in texts if text))
+
+        if self._texts.get(key) == texts and self._scores.get(key) == score:
+            return
+
+        self._uncache(self._texts.get(key, []))
+        self._uncache(texts)
+        self._texts[key] = texts
+        self._scores[key] = score
+        self._changed.add(key)
+
+    def set_score(self, key: Key, score: float) -> None:
+        """Changes the score of an indexed document
+
+        Args:
+            key (Key): the key of the document
+            score (float): the score of the document, higher is better
+        """
+        if key in self._texts and self._scores[key] != score:
+            self._uncache(self._texts[key])
+            self._scores[key] = score
+
+    def remove(self, key: Key) -> None:
+        """Removes a document, if it's indexed
+
+        Args:
+            key (Key): the key of the document
+        """
+        texts = self._texts.pop(key, None)
+
+        if texts is not None:
+            self._uncache(texts)
+            del self._scores[key]
+            self._changed.add(key)
+
+    def top(self, prefix: str, count: int) -> List[Key]:
+        """Lists the best scored documents with a text that starts with a prefix
+
+        Args:
+            prefix (str): the normalized prefix
+            count (int): the maximum number of documents
+
+        Returns:
+            List[Key]: the keys of the documents, best first, the greatest key first among equally scored ones
+        """
+        self.apply()
+
+        if not prefix:
+            return []
+
+        if count > self.cached_count:
+            return self._rank(prefix, count)
+
+        cached = self._cache.get(prefix)
+        if cached is None:
+            cached = self._cache[prefix] = self._rank(prefix, self.cached_count)
+
+        return cached[:count]
+
+    def apply(self) -> None:
+        """Applies the writes since the last lookup to the sorted list, so that the next lookup doesn't wait for them"""
+        if not self._changed:
+            return
+
+        # a few changes are inserted one by one, many are cheaper to sort in with the whole list
+        if len(self._changed) * 64 > len(self._sorted):
+            self._sorted = sorted((text, key) for key, texts in self._texts.items() for text in texts)
+            self._indexed = dict(self._texts)
+        else:
+            for key in self._changed:
+                for text in self._indexed.pop(key, []):
+                    del self._sorted[bisect.bisect_left(self._sorted, (text, key))]
+
+                if key in self._texts:
+                    for text in self._texts[key]:
+                        bisect.insort(self._sorted, (text, key))
+
+                    self._indexed[key] = self._texts[key]
+
+        self._changed.clear()
+
+    def _rank(self, prefix: str, count: int) -> List[Key]:
+        start = bisect.bisect_left(self._sorted, (prefix,))
+        end = bisect.bisect_left(self._sorted, (prefix + _END,), start)
+        keys = {key for _, key in self._sorted[start:end]}
+        scores = self._scores
+
+        return heapq.nlargest(count, keys, key=lambda key: (scores[key], key))
+
+    def _uncache(self, texts: Iterable[str]) -> None:
+        for text in texts:
+            for length in range(1, len(text) + 1):
+                self._cache.pop(text[:length], None)
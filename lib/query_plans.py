@@ -0,0 +1,90 @@
+from typing import Any, Dict, Iterator, List, NamedTuple
+
+# A winning plan with one of these stages reads the whole collection
+SCAN_STAGES = {"COLLSCAN"}
+
+
+class PlanReport(NamedTuple):
+    """The winning plan of a query shape, what running it cost and what is wrong with it"""
+    name: str
+    stages: List[str]
+    keys_examined: int
+    docs_examined: int
+    returned: int
+    problems: List[str]
+
+
+def plan_stages(plan: Dict[str, Any]) -> Iterator[str]:
+    """Lists the stages of a plan, from the root to the leaves
+
+    Args:
+        plan (Dict[str, Any]): a plan of an explain output, e.g. its `winningPlan`
+
+    Returns:
+        Iterator[str]: the names of the stages, e.g. `FETCH` and `IXSCAN`
+    """
+    # the slot based engine nests the classic description of the plan
+    plan = plan.get("queryPlan", plan)
+
+    if "stage" in plan:
+        yield plan["stage"]
+
+    for name in ("inputStage", "outerStage", "innerStage"):
+        if name in plan:
+            yield from plan_stages(plan[name])
+
+    for stage in plan.get("inputStages", []):
+        yield from plan_stages(stage)
+
+    for shard in plan.get("shards", []):
+        yield from plan_stages(shard.get("winningPlan", shard))
+
+
+def _cursor_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    # an aggregation that isn't pushed down to the query layer as a whole explains its first stage as `$cursor`
+    for stage in explain.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"]
+
+    return explain
+
+
+def check_plan(
+        name: str,
+        explain: Dict[str, Any],
+        max_examined_ratio: int = 10,
+        min_examined: int = 100
+) -> PlanReport:
+    """Finds the problems of the winning plan of a query shape
+
+    A plan is a problem if it scans the whole collection, or if it examines more than `max_examined_ratio`
+    documents or index keys per document it returns. Plans that examine fewer than `min_examined`
+    documents are never too costly, so that small collections don't fail the check.
+
+    Args:
+        name (str): the name of the query shape
+        explain (Dict[str, Any]): the output of `explain` of the query, with the `executionStats` verbosity
+        max_examined_ratio (int): the number of documents examined per document returned that is still fine
+        min_examined (int): the number of documents examined that is fine, whatever is returned
+
+    Returns:
+        PlanReport: the report of the plan, without problems if the plan is fine
+    """
+    explain = _cursor_explain(explain)
+    stages = list(plan_stages(explain["queryPlanner"]["winningPlan"]))
+    stats: Dict[str, Any] = explain.get("executionStats", {})
+    execution_stages: Dict[str, Any] = stats.get("executionStages", {})
+
+    keys_examined = stats.get("totalKeysExamined", 0)
+    docs_examined = stats.get("totalDocsExamined", 0)
+    # counts return no documents, they return the number of documents they counted
+    returned = execution_stages.get("nCounted", stats.get("nReturned", 0))
+
+    problems = [f"{stage} of the whole collection" for stage in stages if stage in SCAN_STAGES]
+    allowed = max(min_examined, max_examined_ratio * returned)
+
+    for examined, what in ((docs_examined, "documents"), (keys_examined, "index keys")):
+        if examined > allowed:
+            problems.append(f"examined {examined} {what} to return {returned}")
+
+    return PlanReport(name, stages, keys_examined, docs_examined, returned, problems)
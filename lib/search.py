@@ -0,0 +1,90 @@
+import re
+import unicodedata
+from typing import List, Set
+
+# The length of the grams that words are matched by anywhere inside of them
+GRAM_SIZE = 3
+
+# Marks the grams of the beginning of a word, that words shorter than `GRAM_SIZE` are matched by
+PREFIX = "^"
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Normalizes text for search: lowercase, without accents, words separated by single spaces
+
+    Anything that is not a letter or a digit separates words, so that the text can be searched
+    without any escaping.
+
+    Args:
+        text (str): the text, e.g. the name of a product or a search query
+
+    Returns:
+        str: the normalized text
+    """
+    folded = text.casefold()
+
+    # ASCII text has no accents to strip, most names and descriptions are
+    if not folded.isascii():
+        decomposed = unicodedata.normalize("NFKD", folded)
+        folded = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return _SEPARATORS.sub(" ", folded).strip()
+
+
+def words(text: str) -> List[str]:
+    """Splits text into its normalized words
+
+    Args:
+        text (str): the text
+
+    Returns:
+        List[str]: the words, in the order of the text
+    """
+    return normalize(text).split()
+
+
+def index_grams(text: str) -> List[str]:
+    """Lists the grams of a text that the text is found by
+
+    Every word is indexed with the grams of its beginning, shorter than `GRAM_SIZE`, and with all of
+    its grams of `GRAM_SIZE`, so a query matches the beginning of a word or any part of it.
+
+    Args:
+        text (str): the text, e.g. the name and the description of a product
+
+    Returns:
+        List[str]: the distinct grams, sorted
+    """
+    grams: Set[str] = set()
+
+    for word in words(text):
+        grams.update(PREFIX + word[:size] for size in range(1, min(len(word), GRAM_SIZE - 1) + 1))
+        grams.update(word[i:i + GRAM_SIZE] for i in range(len(word) - GRAM_SIZE + 1))
+
+    return sorted(grams)
+
+
+def query_grams(query_words: List[str]) -> List[str]:
+    """Lists the grams that a text must have to match all of the words of a query
+
+    Words shorter than `GRAM_SIZE` must be the beginning of a word of the text, longer words may be
+    anywhere inside of one. Having all of the grams is necessary, not sufficient: the words themselves
+    are checked in the text afterwards.
+
+    Args:
+        query_words (List[str]): the normalized words of the query
+
+    Returns:
+        List[str]: the distinct grams, sorted
+    """
+    grams: Set[str] = set()
+
+    for word in query_words:
+        if len(word) < GRAM_SIZE:
+            grams.add(PREFIX + word)
+        else:
+            grams.update(word[i:i + GRAM_SIZE] for i in range(len(word) - GRAM_SIZE + 1))
+
+    return sorted(grams)
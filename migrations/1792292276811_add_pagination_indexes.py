@@ -0,0 +1,40 @@
+"""
+Add (sort key, _id) indexes for the keyset pagination of lists
+"""
+import pymongo.database
+
+name = '1792292276811_add_pagination_indexes'
+dependencies = ['1709495379766_add_profile_nickname_unique_index']
+
+# the sort fields of the models when the migration was written, lists sorted by _id use the default index
+SORT_FIELDS = {
+    "products": ["created_at", "name"],
+    "profiles": ["created_at", "nickname"],
+    "tags": ["name"],
+    "platforms": ["created_at", "name"],
+    "operating_systems": ["name"],
+    "affiliates": ["created_at", "name"],
+    "affiliate_reviews": ["created_at"],
+    "platform_products": ["created_at"],
+    "background_jobs": ["created_at"],
+}
+
+
+def index_name(field: str) -> str:
+    return f"{field}_id_pagination"
+
+
+def upgrade(db: pymongo.database.Database):
+    for collection, fields in SORT_FIELDS.items():
+        for field in fields:
+            # descending sorts walk the same index backwards
+            db.get_collection(collection).create_index(
+                [(field, pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+                name=index_name(field)
+            )
+
+
+def downgrade(db: pymongo.database.Database):
+    for collection, fields in SORT_FIELDS.items():
+        for field in fields:
+            db.get_collection(collection).drop_index(index_name(field))
@@ -0,0 +1,31 @@
+"""
+Add the indexes of the product_cards read model, and of the offers that cards are built from
+
+The cards themselves are written by `python -m scripts.product_cards rebuild`, after the upgrade.
+"""
+import pymongo.database
+
+name = '1792379076811_add_product_cards_indexes'
+dependencies = ['1792292276811_add_pagination_indexes']
+
+
+def upgrade(db: pymongo.database.Database):
+    cards = db.get_collection("product_cards")
+
+    # the cards to update after a write of a tag
+    cards.create_index([("genre_ids", pymongo.ASCENDING)], name="genre_ids")
+    cards.create_index([("category_ids", pymongo.ASCENDING)], name="category_ids")
+    # keyset pagination of listings and search, see ProductCardsModel.sort_fields
+    cards.create_index([("created_at", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], name="created_at_id_pagination")
+    cards.create_index([("name", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], name="name_id_pagination")
+
+    # the offers of a product, read after every write of one of them
+    db.get_collection("affiliate_platform_products").create_index(
+        [("product_id", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)],
+        name="product_id"
+    )
+
+
+def downgrade(db: pymongo.database.Database):
+    db.get_collection("affiliate_platform_products").drop_index("product_id")
+    db.drop_collection("product_cards")
@@ -0,0 +1,18 @@
+"""
+Add an index on the slugs of products
+
+Products are read by slug, and the bulk import looks up the slugs it is about to give out.
+Slugs are not unique yet in existing data, so the index isn't either.
+"""
+import pymongo.database
+
+name = '1792465476811_add_products_slug_index'
+dependencies = ['1792379076811_add_product_cards_indexes']
+
+
+def upgrade(db: pymongo.database.Database):
+    db.get_collection("products").create_index([("slug", pymongo.ASCENDING)], name="slug")
+
+
+def downgrade(db: pymongo.database.Database):
+    db.get_collection("products").drop_index("slug")
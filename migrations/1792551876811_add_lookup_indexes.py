@@ -0,0 +1,37 @@
+"""
+Add (foreign key, sort key) indexes for the documents read by the document they belong to
+
+Comments are read by product and replies by comment, in the order of their _id. Offers are read by
+affiliate, their reads by product are indexed since 1792379076811. Reviews are read by affiliate,
+newest first.
+
+Since MongoDB 4.2 an index is built without holding an exclusive lock for the whole build, and on a
+replica set all voting members build it at once, so the upgrade can run against a live deployment.
+Indexes that already exist are skipped, so an interrupted upgrade can be run again.
+"""
+import pymongo.database
+
+name = '1792551876811_add_lookup_indexes'
+dependencies = ['1792465476811_add_products_slug_index']
+
+INDEXES = {
+    "product_comments": ("product_id_id", [("product_id", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]),
+    "product_replies": ("comment_id_id", [("comment_id", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]),
+    "affiliate_platform_products": ("affiliate_id_id", [("affiliate_id", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)]),
+    # descending sorts walk the same index backwards
+    "affiliate_reviews": ("affiliate_id_created_at_id", [
+        ("affiliate_id", pymongo.ASCENDING), ("created_at", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)
+    ]),
+}
+
+
+def upgrade(db: pymongo.database.Database):
+    for collection, (index, keys) in INDEXES.items():
+        if index not in db.get_collection(collection).index_information():
+            db.get_collection(collection).create_index(keys, name=index)
+
+
+def downgrade(db: pymongo.database.Database):
+    for collection, (index, _) in INDEXES.items():
+        if index in db.get_collection(collection).index_information():
+            db.get_collection(collection).drop_index(index)
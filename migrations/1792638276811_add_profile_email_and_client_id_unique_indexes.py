@@ -0,0 +1,41 @@
+"""
+Add unique indexes for the profile email and the service profile client ID
+
+Both are read on every login. The upgrade looks for duplicates before it builds anything and fails
+with their values, instead of failing halfway through a unique index build on a live replica set.
+"""
+import pymongo.database
+
+name = '1792638276811_add_profile_email_and_client_id_unique_indexes'
+dependencies = ['1792551876811_add_lookup_indexes']
+
+INDEXES = {
+    "profiles": ("email", "email_unique"),
+    "service_profiles": ("client_id", "client_id_unique"),
+}
+
+
+def find_duplicates(db: pymongo.database.Database, collection: str, field: str) -> list:
+    return [group["_id"] for group in db.get_collection(collection).aggregate([
+        {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 10}
+    ], allowDiskUse=True)]
+
+
+def upgrade(db: pymongo.database.Database):
+    for collection, (field, _) in INDEXES.items():
+        duplicates = find_duplicates(db, collection, field)
+
+        if duplicates:
+            raise ValueError(f"Duplicate {collection}.{field} values, remove them before the upgrade: {duplicates}")
+
+    for collection, (field, index) in INDEXES.items():
+        if index not in db.get_collection(collection).index_information():
+            db.get_collection(collection).create_index(field, name=index, unique=True)
+
+
+def downgrade(db: pymongo.database.Database):
+    for collection, (_, index) in INDEXES.items():
+        if index in db.get_collection(collection).index_information():
+            db.get_collection(collection).drop_index(index)
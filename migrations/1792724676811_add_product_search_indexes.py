@@ -0,0 +1,23 @@
+"""
+Add the indexes of the product_search read model
+
+A search reads the entries that have all of the grams of the query through the multikey index on `grams`.
+The entries themselves are written on the next start of the app, by the build_product_search initializer.
+"""
+import pymongo.database
+
+name = '1792724676811_add_product_search_indexes'
+dependencies = ['1792638276811_add_profile_email_and_client_id_unique_indexes']
+
+
+def upgrade(db: pymongo.database.Database):
+    entries = db.get_collection("product_search")
+
+    entries.create_index([("grams", pymongo.ASCENDING)], name="grams")
+    # keyset pagination of search results, see ProductSearchModel.sort_fields
+    entries.create_index([("created_at", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], name="created_at_id_pagination")
+    entries.create_index([("name", pymongo.ASCENDING), ("_id", pymongo.ASCENDING)], name="name_id_pagination")
+
+
+def downgrade(db: pymongo.database.Database):
+    db.drop_collection("product_search")
@@ -0,0 +1,18 @@
+"""
+Add an index on the `updated_at` of products
+
+The in-memory search index reads the products written since its last refresh, by their `updated_at`,
+see ProductIndex.
+"""
+import pymongo.database
+
+name = '1792811076811_add_products_updated_at_index'
+dependencies = ['1792724676811_add_product_search_indexes']
+
+
+def upgrade(db: pymongo.database.Database):
+    db.get_collection("products").create_index([("updated_at", pymongo.ASCENDING)], name="updated_at")
+
+
+def downgrade(db: pymongo.database.Database):
+    db.get_collection("products").drop_index("updated_at")
@@ -0,0 +1,34 @@
+"""
+Add the indexes of the filters of the product_search read model
+
+Searches are filtered by the genres, categories, operating systems, languages, price, whether a product is free
+and the age it requires, see SearchFilters. Every list filter is answered through a multikey index, the price
+through a compound multikey index on the currency and the final price of the `prices` of an entry.
+The entries get these fields once they are written again on the next start of the app, by the build_product_search initializer.
+"""
+import pymongo.database
+
+name = '1792897476811_add_product_search_filter_indexes'
+dependencies = ['1792811076811_add_products_updated_at_index']
+
+LIST_FIELDS = ["genres", "categories", "platforms_os", "supported_languages"]
+
+
+def upgrade(db: pymongo.database.Database):
+    entries = db.get_collection("product_search")
+
+    for field in LIST_FIELDS:
+        entries.create_index([(field, pymongo.ASCENDING)], name=field)
+
+    entries.create_index(
+        [("prices.currency", pymongo.ASCENDING), ("prices.final", pymongo.ASCENDING)],
+        name="prices_currency_final"
+    )
+    entries.create_index([("is_free", pymongo.ASCENDING), ("required_age", pymongo.ASCENDING)], name="is_free_required_age")
+
+
+def downgrade(db: pymongo.database.Database):
+    entries = db.get_collection("product_search")
+
+    for index in [*LIST_FIELDS, "prices_currency_final", "is_free_required_age"]:
+        entries.drop_index(index)
@@ -0,0 +1,19 @@
+"""
+Add the index of the platforms filter of the product_search read model
+
+Searches are filtered by the stores a product is sold on, the keys of its `platforms`, see SearchFilters.
+The filter is answered through a multikey index, like the other list filters.
+The entries get the field once they are written again on the next start of the app, by the build_product_search initializer.
+"""
+import pymongo.database
+
+name = '1792983876811_add_product_search_platforms_index'
+dependencies = ['1792897476811_add_product_search_filter_indexes']
+
+
+def upgrade(db: pymongo.database.Database):
+    db.get_collection("product_search").create_index([("platforms", pymongo.ASCENDING)], name="platforms")
+
+
+def downgrade(db: pymongo.database.Database):
+    db.get_collection("product_search").drop_index("platforms")
@@ -0,0 +1,49 @@
+import argparse
+import sys
+
+from app.models.product_cards import ProductCardsModel
+from app.models.tags import TagNames, TagsModel
+from app.services import Database
+from config import app_config
+
+# Usage
+#
+# $ MONGO_URI=<uri> python -m scripts.product_cards <command>
+#
+# Commands:
+#
+# check   - Compare the cards with the products, tags and offers they are built from,
+#           exits with 1 if any card is missing, stale or orphaned
+# rebuild - Write the cards of all products again and delete the cards without a product
+#
+# Cards are kept up to date by the writes of the models. Run `rebuild` after the `product_cards`
+# collection is created, and whenever `check` reports differences, e.g. after a manual fix of the data.
+
+
+def tag_names(db: Database) -> TagNames:
+    return TagNames(lambda: {tag["_id"]: tag["name"] for tag in db.connection[TagsModel.collection].find({}, {"name": 1})})
+
+
+if __name__ == "__main__":
+    cli_parser = argparse.ArgumentParser(description='Checks and rebuilds the product_cards read model')
+    cli_parser.add_argument("command", choices=["check", "rebuild"], help="command to run")
+    args = cli_parser.parse_args()
+
+    # a rebuild reads and writes whole collections, far longer than a request may take
+    db = Database(app_config["MONGO_URI"], timeoutMS=60000)
+    cards = ProductCardsModel(db)
+    names = tag_names(db)
+
+    if args.command == "rebuild":
+        result = cards.rebuild(names.resolve)
+        print(f"Written {result['written']} cards, deleted {result['deleted']} cards without a product")
+    else:
+        report = cards.check(names.resolve)
+
+        for problem, product_ids in report.items():
+            print(f"{problem}: {len(product_ids)}")
+            for product_id in product_ids:
+                print(f"  {product_id}")
+
+        if any(report.values()):
+            sys.exit(1)
@@ -0,0 +1,21 @@
+from app.models.product_search import ProductSearchModel
+from app.services import Database
+from config import app_config
+
+# Usage
+#
+# $ MONGO_URI=<uri> python -m scripts.product_search
+#
+# Writes the search entries of all products again and deletes the entries without a product.
+#
+# Entries are kept up to date by the writes of the products model, and are written on start of the app while
+# they are behind the products, e.g. right after the `product_search` collection is created. Run it after products
+# were written around the model, e.g. by a manual fix of the data.
+
+
+if __name__ == "__main__":
+    # a rebuild reads and writes whole collections, far longer than a request may take
+    db = Database(app_config["MONGO_URI"], timeoutMS=60000)
+
+    result = ProductSearchModel(db).rebuild()
+    print(f"Written {result['written']} search entries, deleted {result['deleted']} entries without a product")
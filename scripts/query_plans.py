@@ -0,0 +1,253 @@
+import argparse
+import re
+import sys
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from benchmarks import documents
+from app.models.affiliate_platform_products import AffiliatePlatformProductsModel
+from app.models.affiliate_reviews import AffiliateReviewsModel
+from app.models.affiliates import AffiliatesModel
+from app.models.background_jobs import BackgroundJobsModel
+from app.models.operating_systems import OperatingSystemsModel
+from app.models.pagination import Pagination
+from app.models.platform_products import PlatformProductsModel
+from app.models.platforms import PlatformsModel
+from app.models.product_cards import ProductCardsModel
+from app.models.product_comments import ProductCommentsModel
+from app.models.product_index import ProductIndex
+from app.models.product_search import ProductSearchModel, SearchFilters, build_entry
+from app.models.product_replies import ProductRepliesModel
+from app.models.products import ProductsModel
+from app.models.profiles import ProfilesModel
+from app.models.service_profiles import ServiceProfilesModel
+from app.models.tags import TagsModel
+from app.services import Database
+from config import app_config
+from lib.query_plans import PlanReport, check_plan
+
+# Usage
+#
+# $ MONGO_URI=<uri> python -m scripts.query_plans <command>
+#
+# Commands:
+#
+# seed  - Insert generated documents into every collection of the models, run it against a local mongod
+#         with the migrations applied and nothing else in it, e.g. the database of `docker run mongo`
+# check - Explain every query shape of the models and of the search, exits with 1 if a winning plan
+#         scans a whole collection or examines far more documents than it returns
+#
+# Add the shape of every new query of a model to `query_shapes`, together with the index it needs.
+
+# the document whose fields the shapes look up, in the middle of the seeded ones
+SAMPLE = 42
+
+
+class QueryShape(NamedTuple):
+    """A query of a model, as the command to explain
+
+    `known_scan` tells why a shape scans a collection on purpose, it's reported but doesn't fail the check.
+    """
+    name: str
+    command: Dict[str, Any]
+    known_scan: Optional[str] = None
+
+
+SEEDS: Dict[str, Callable[[int], Dict[str, Any]]] = {
+    ProductsModel.collection: documents.product_document,
+    ProductCardsModel.collection: documents.product_card_document,
+    ProductSearchModel.collection: lambda index: build_entry(documents.product_document(index)),
+    TagsModel.collection: documents.tag_document,
+    ProfilesModel.collection: documents.profile_document,
+    ServiceProfilesModel.collection: documents.service_profile_document,
+    PlatformsModel.collection: documents.platform_document,
+    OperatingSystemsModel.collection: documents.operating_system_document,
+    PlatformProductsModel.collection: documents.platform_product_document,
+    AffiliatesModel.collection: documents.affiliate_document,
+    # offers are stored without the affiliate and the product they are joined with
+    AffiliatePlatformProductsModel.collection: lambda index: {
+        key: value for key, value in documents.affiliate_platform_product_document(index).items()
+        if key not in ("affiliate", "product")
+    },
+    AffiliateReviewsModel.collection: documents.affiliate_review_document,
+    ProductCommentsModel.collection: documents.product_comment_document,
+    ProductRepliesModel.collection: documents.product_reply_document,
+    BackgroundJobsModel.collection: documents.background_job_document,
+}
+
+PAGINATED = [
+    ProductsModel,
+    ProductCardsModel,
+    TagsModel,
+    ProfilesModel,
+    PlatformsModel,
+    OperatingSystemsModel,
+    PlatformProductsModel,
+    AffiliatesModel,
+    AffiliateReviewsModel,
+    BackgroundJobsModel,
+]
+
+
+def find(collection: str, query: Dict[str, Any], sort: Optional[List] = None, limit: int = 0) -> Dict[str, Any]:
+    command: Dict[str, Any] = {"find": collection, "filter": query, "limit": limit}
+
+    if sort:
+        command["sort"] = dict(sort)
+
+    return command
+
+
+def page(collection: str, pagination: Pagination, query: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # the same query as `find_page`, one more document than the limit tells whether there is a next page
+    position = pagination.to_query()
+    query = query or {}
+
+    return find(collection, {"$and": [query, position]} if query and position else query | position,
+                pagination.to_sort(), pagination.limit + 1)
+
+
+def pagination_shapes() -> List[QueryShape]:
+    shapes = []
+
+    for model in PAGINATED:
+        sample = SEEDS[model.collection](SAMPLE)
+
+        for field in ("_id", *model.sort_fields):
+            for sort in (field, f"-{field}"):
+                shapes.append(QueryShape(
+                    f"{model.__name__} page sorted by {sort}",
+                    page(model.collection, Pagination(20, sort, (sample[field], sample["_id"])))
+                ))
+
+    return shapes
+
+
+def query_shapes() -> List[QueryShape]:
+    """Lists the query shapes of the models, with values of the seeded documents"""
+    product = documents.product_document(SAMPLE)
+    offer = SEEDS[AffiliatePlatformProductsModel.collection](SAMPLE)
+    review = documents.affiliate_review_document(SAMPLE)
+    comment = documents.product_comment_document(SAMPLE)
+    reply = documents.product_reply_document(SAMPLE)
+    search = ProductSearchModel.match(["game", "42"])
+    filters = SearchFilters(genres=tuple(product["genres"][:1]), platforms_os=("linux",), price_max=1500)
+
+    return [
+        QueryShape("ProductsModel.get", find(ProductsModel.collection, {"_id": product["_id"]}, limit=1)),
+        QueryShape("ProductsModel.get_by_slug", find(ProductsModel.collection, {"slug": product["slug"]}, limit=1)),
+        QueryShape("ProductsModel.get_many", find(ProductsModel.collection, {"_id": {"$in": [product["_id"]]}})),
+        QueryShape("ProductsModel.unique_slugs", find(
+            ProductsModel.collection,
+            {"$or": [{"slug": {"$regex": f"^{re.escape(product['slug'])}-[0-9]+$"}}]}
+        )),
+        QueryShape("ProductCardsModel.save offers", find(
+            ProductCardsModel.offers_collection, {"product_id": offer["product_id"]}
+        )),
+        QueryShape("ProductCardsModel.update_tag", find(
+            ProductCardsModel.collection,
+            {"$or": [{"genre_ids": product["genres"][0]}, {"category_ids": product["genres"][0]}]}
+        )),
+        QueryShape("ProfilesModel.get_by_email", find(
+            ProfilesModel.collection, {"email": documents.profile_document(SAMPLE)["email"]}, limit=1
+        )),
+        QueryShape("ServiceProfilesModel.get_by_client_id", find(
+            ServiceProfilesModel.collection,
+            {"client_id": documents.service_profile_document(SAMPLE)["client_id"]},
+            limit=1
+        )),
+        QueryShape("AffiliatePlatformProductsModel.get", {
+            "aggregate": AffiliatePlatformProductsModel.collection,
+            "pipeline": [{"$match": {"_id": offer["_id"]}}],
+            "cursor": {}
+        }),
+        QueryShape("affiliate_platform_products by affiliate", find(
+            AffiliatePlatformProductsModel.collection, {"affiliate_id": offer["affiliate_id"]}
+        )),
+        QueryShape("affiliate_reviews by affiliate", find(
+            AffiliateReviewsModel.collection, {"affiliate_id": review["affiliate_id"]}, [("created_at", -1), ("_id", -1)]
+        )),
+        QueryShape("ProductCommentsModel.get_all", find(
+            ProductCommentsModel.collection, {"product_id": comment["product_id"]}
+        )),
+        QueryShape("ProductRepliesModel.get_all", find(
+            ProductRepliesModel.collection, {"comment_id": reply["comment_id"]}
+        )),
+        QueryShape("BackgroundJobsModel.patch", find(
+            BackgroundJobsModel.collection, {"_id": documents.background_job_document(SAMPLE)["_id"], "created_by": "service-2"}
+        )),
+        QueryShape("ProductIndex.refresh", find(
+            ProductIndex.collection, {"updated_at": {"$gte": product["updated_at"]}}
+        )),
+        QueryShape("ProductIndex popularity", {
+            "aggregate": ProductIndex.comments_collection,
+            "pipeline": [{"$group": {"_id": "$product_id", "count": {"$sum": 1}}}],
+            "cursor": {}
+        }, known_scan="counts the comments of every product, once per ProductIndex.popularity_max_age"),
+        QueryShape("/v1/search", {
+            "aggregate": ProductSearchModel.collection,
+            "pipeline": [{"$match": search}, {"$sort": {"created_at": 1, "_id": 1}}, {"$limit": 16}],
+            "cursor": {}
+        }),
+        QueryShape("/v1/search count", {"count": ProductSearchModel.collection, "query": search}),
+        *(QueryShape(f"/v1/search filtered by {name}", {
+            "count": ProductSearchModel.collection, "query": ProductSearchModel.match([], SearchFilters(**{name: value}))
+        }) for name, value in [
+            ("genres", tuple(product["genres"][:1])),
+            ("supported_languages", ("German",)),
+            ("price_max", 1000),
+            ("is_free", True),
+        ]),
+        QueryShape("/v1/search facets", {
+            "aggregate": ProductSearchModel.collection,
+            "pipeline": [
+                {"$match": {"$or": [filters.query(exclude=name) for name in filters.selected()]}},
+                {"$limit": ProductSearchModel.max_facet_entries},
+                {"$group": {"_id": "$is_free", "count": {"$sum": 1}}}
+            ],
+            "cursor": {}
+        }),
+        *pagination_shapes()
+    ]
+
+
+def seed(db: Database, count: int) -> None:
+    for collection, build in SEEDS.items():
+        db.connection[collection].insert_many([build(index) for index in range(count)], ordered=False)
+
+
+def check(db: Database, shapes: List[QueryShape]) -> List[PlanReport]:
+    reports = []
+
+    for shape in shapes:
+        explain = db.connection.command({"explain": shape.command, "verbosity": "executionStats"})
+        reports.append(check_plan(shape.name, explain))
+
+    return reports
+
+
+if __name__ == "__main__":
+    cli_parser = argparse.ArgumentParser(description='Explains the query shapes of the models and flags collection scans')
+    cli_parser.add_argument("command", choices=["seed", "check"], help="command to run")
+    cli_parser.add_argument("--count", type=int, default=10000, help="number of documents to seed per collection")
+    args = cli_parser.parse_args()
+
+    db = Database(app_config["MONGO_URI"], timeoutMS=60000)
+
+    if args.command == "seed":
+        seed(db, args.count)
+        print(f"Seeded {args.count} documents into {len(SEEDS)} collections")
+    else:
+        all_shapes = query_shapes()
+        failed = 0
+
+        for shape, report in zip(all_shapes, check(db, all_shapes)):
+            status = "ok" if not report.problems else "known" if shape.known_scan else "FAIL"
+            failed += status == "FAIL"
+
+            print(f"{status:5} {report.name}: {' > '.join(report.stages)}, "
+                  f"examined {report.docs_examined} documents to return {report.returned}")
+            for problem in report.problems:
+                print(f"      {problem}" + (f" ({shape.known_scan})" if shape.known_scan else ""))
+
+        if failed:
+            sys.exit(1)
@@ -0,0 +1,195 @@
+import gzip
+import json
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+from app.api.exceptions import BadRequestException
+from app.api.v1.admin.products import delete_products, import_products, update_products
+from app.models.products import Product, ProductCreate, ProductPatch
+from tests import UnitTest
+from tests.app.models.test_unit_products import product_data
+from tests.utils.jwt import create_test_token
+
+
+def product_line(name):
+    data = product_data() | {"name": name}
+    del data["_id"]
+
+    return json.dumps(data, default=str)
+
+
+class ProductsTestCase(UnitTest):
+
+    @patch("app.api.v1.admin.products.products.app_config")
+    @patch("app.api.v1.admin.products.products.get_models")
+    def test_import_products(self, get_models: MagicMock, app_config: MagicMock):
+        endpoint = "/products/bulk"
+        self.app.route(endpoint, methods=["POST"])(import_products)
+
+        app_config.__getitem__.side_effect = {"PRODUCTS_IMPORT_CHUNK_SIZE": 2}.__getitem__
+        create_many_mock = get_models.return_value.products.create_many
+
+        def create_many(inputs):
+            products = [Product(**(data.to_json() | {"slug": data.name.lower()})) for data in inputs]
+            return products, {i: "duplicate key" for i, data in enumerate(inputs) if data.name == "Duplicate"}
+
+        def call_api(lines, headers=None, query=None):
+            body = "\n".join(lines).encode()
+            if headers and headers.get("Content-Encoding") == "gzip":
+                body = gzip.compress(body)
+
+            return self.test_client.post(
+                endpoint,
+                data=body,
+                query_string=query,
+                content_type="application/x-ndjson",
+                headers={"Authorization": "Bearer " + create_test_token("", roles=["admin"])} | (headers or {})
+            )
+
+        def imports_products_in_chunks_and_reports_every_line():
+            # given
+            create_many_mock.side_effect = create_many
+
+            # when
+            response = call_api([
+                product_line("First"),
+                "{not json",
+                json.dumps({"name": "Incomplete"}),
+                product_line("Duplicate"),
+                product_line("Last")
+            ])
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, "application/x-ndjson")
+            reports = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            self.assertEqual([report["line"] for report in reports], [1, 2, 3, 4, 5])
+            self.assertEqual([report["status"] for report in reports], ["created", "failed", "failed", "failed", "created"])
+            self.assertEqual(reports[0]["slug"], "first")
+            self.assertTrue(reports[2]["error"].startswith("Not all required fields are present"))
+            self.assertEqual(reports[3]["error"], "duplicate key")
+            self.assertEqual(
+                [[data.name for data in call.args[0]] for call in create_many_mock.call_args_list],
+                [["First"], ["Duplicate"], ["Last"]]
+            )
+            self.assertIsInstance(create_many_mock.call_args.args[0][0], ProductCreate)
+
+        def reads_gzipped_body():
+            # given
+            create_many_mock.side_effect = create_many
+
+            # when
+            response = call_api([product_line("First")], headers={"Content-Encoding": "gzip"})
+
+            # then
+            self.assertEqual(json.loads(response.get_data(as_text=True).splitlines()[0])["status"], "created")
+
+        def fails_with_invalid_chunk_size():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api([], query={"chunk_size": "0"})
+
+        def reset():
+            create_many_mock.reset_mock(side_effect=True)
+
+        tests = [
+            imports_products_in_chunks_and_reports_every_line,
+            reads_gzipped_body,
+            fails_with_invalid_chunk_size
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    @patch("app.api.v1.admin.products.products.get_models")
+    def test_update_products(self, get_models: MagicMock):
+        endpoint = "/products/bulk"
+        self.app.route(endpoint, methods=["PATCH"])(update_products)
+
+        patch_many_mock = get_models.return_value.products.patch_many
+
+        def call_api(body):
+            return self.test_client.patch(
+                endpoint,
+                json=body,
+                headers={"Authorization": "Bearer " + create_test_token("", roles=["admin"])}
+            )
+
+        def reports_outcome_of_every_item():
+            # given
+            updated_id, missing_id, failed_id = str(ObjectId()), str(ObjectId()), str(ObjectId())
+            patch_many_mock.return_value = ([Product(**product_data()), None, None], {2: "write error"})
+
+            # when
+            response = call_api([
+                {"id": updated_id, "patch": {"name": "Renamed"}},
+                {"id": "invalid", "patch": {}},
+                {"id": missing_id, "patch": {"is_free": True}},
+                {"id": updated_id, "patch": {"secret": 1}},
+                {"id": failed_id, "patch": {"slug": "taken"}}
+            ])
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            reports = response.get_json()["data"]
+            self.assertEqual([report["status"] for report in reports], ["updated", "failed", "not_found", "failed", "failed"])
+            self.assertEqual(reports[3]["error"], 'The key "secret" is not allowed.')
+            self.assertEqual(reports[4], {"id": failed_id, "status": "failed", "error": "write error"})
+            updates, = patch_many_mock.call_args.args
+            self.assertEqual([product_id for product_id, _ in updates], [updated_id, missing_id, failed_id])
+            self.assertEqual(updates[0][1], ProductPatch(name="Renamed"))
+
+        def fails_without_array():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api({"id": str(ObjectId())})
+
+        tests = [
+            reports_outcome_of_every_item,
+            fails_without_array
+        ]
+
+        self.run_subtests(tests, after_each=patch_many_mock.reset_mock)
+
+    @patch("app.api.v1.admin.products.products.get_models")
+    def test_delete_products(self, get_models: MagicMock):
+        endpoint = "/products/bulk"
+        self.app.route(endpoint, methods=["DELETE"])(delete_products)
+
+        delete_many_mock = get_models.return_value.products.delete_many
+
+        def call_api(body):
+            return self.test_client.delete(
+                endpoint,
+                json=body,
+                headers={"Authorization": "Bearer " + create_test_token("", roles=["admin"])}
+            )
+
+        def reports_outcome_of_every_id():
+            # given
+            deleted_id, missing_id = str(ObjectId()), str(ObjectId())
+            delete_many_mock.return_value = [True, False]
+
+            # when
+            response = call_api([deleted_id, missing_id])
+
+            # then
+            self.assertEqual(response.get_json()["data"], [
+                {"id": deleted_id, "status": "deleted"},
+                {"id": missing_id, "status": "not_found"}
+            ])
+            delete_many_mock.assert_called_once_with([deleted_id, missing_id])
+
+        def fails_with_invalid_id():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api([str(ObjectId()), "invalid"])
+
+            delete_many_mock.assert_not_called()
+
+        tests = [
+            reports_outcome_of_every_id,
+            fails_with_invalid_id
+        ]
+
+        self.run_subtests(tests, after_each=delete_many_mock.reset_mock)
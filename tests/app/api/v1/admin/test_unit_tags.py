@@ -116,7 +116,7 @@ class TagsTestCase(UnitTest):
             # then
             self.assertEqual(response.get_json(), expected_response)
             self.assertEqual(response.status_code, 200)
-            get_tag_mock.assert_called_once_with(str(mock_tag._id))
+            get_tag_mock.assert_called_once_with(str(mock_tag._id), projection=None)
 
         def does_not_find_a_tag_and_returns_an_error():
             # given
@@ -134,7 +134,7 @@ class TagsTestCase(UnitTest):
             # then
             self.assertEqual(response.get_json(), expected_response)
             self.assertEqual(response.status_code, 404)
-            get_tag_mock.assert_called_once_with(mock_id)
+            get_tag_mock.assert_called_once_with(mock_id, projection=None)
 
         tests = [
             finds_and_returns_a_tag,
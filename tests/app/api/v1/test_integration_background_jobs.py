@@ -160,15 +160,17 @@ class BackgroundJobsTestCase(IntegrationTest):
         data = {
             "status": "pending"
         }
+        token = self.token
 
         # when
-        response = self.app.patch(
-            f'/v1/background_jobs/{background_job._id}',
-            json=data,
-            headers={
-                "Authorization": f"Bearer {self.token}"
-            }
-        )
+        with self.assert_commands(["findAndModify"]):
+            response = self.app.patch(
+                f'/v1/background_jobs/{background_job._id}',
+                json=data,
+                headers={
+                    "Authorization": f"Bearer {token}"
+                }
+            )
         response_json = response.get_json()
 
         # then
@@ -308,15 +310,17 @@ class BackgroundJobsTestCase(IntegrationTest):
             "type": "info",
             "message": "Test event"
         }
+        token = self.token
 
         # when
-        response = self.app.post(
-            f'/v1/background_jobs/{background_job._id}/events',
-            json=data,
-            headers={
-                "Authorization": f"Bearer {self.token}"
-            }
-        )
+        with self.assert_commands(["findAndModify"]):
+            response = self.app.post(
+                f'/v1/background_jobs/{background_job._id}/events',
+                json=data,
+                headers={
+                    "Authorization": f"Bearer {token}"
+                }
+            )
         response_json = response.get_json()
 
         # then
@@ -14,6 +14,29 @@ class ProductsTestCase(IntegrationTest):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(actual.get("name"), "Geometry Dash")
 
+    def test_get_product_fields_by_slug(self):
+        # when
+        response = self.app.get(
+            f'/v1/products/geometry-dash?fields=name,slug,media.header_url,genres'
+        )
+
+        actual = response.get_json().get("data")
+
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(actual), {"_id", "name", "slug", "media", "genres"})
+        self.assertEqual(set(actual.get("media")), {"header_url"})
+
+    def test_fails_to_get_unknown_product_fields(self):
+        # when
+        response = self.app.get(
+            f'/v1/products/geometry-dash?fields=name,secret'
+        )
+
+        # then
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json().get("error"), "Unknown field \"secret\" of Product.")
+
     def test_fails_to_get_a_nonexistent_product(self):
         # when
         response = self.app.get(
@@ -25,3 +48,20 @@ class ProductsTestCase(IntegrationTest):
         # then
         self.assertEqual(response.status_code, 404)
         self.assertEqual(actual.get("error"), "\"Product\" not found.")
+
+    def test_get_products_by_ids(self):
+        # given
+        product = self.app.get('/v1/products/geometry-dash?fields=name').get_json().get("data")
+        missing_id = "5f4c5c5e8f1a2b3c4d5e6f70"
+
+        # when
+        response = self.app.get(
+            f'/v1/products?ids={missing_id},{product["_id"]}&fields=name'
+        )
+
+        actual = response.get_json()
+
+        # then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(actual.get("data"), [product])
+        self.assertEqual(actual.get("meta").get("missing"), [missing_id])
@@ -43,3 +43,79 @@ class SearchTestCase(IntegrationTest):
                 data = json_data.get("data")
 
                 self.assertTrue(expect(data))
+
+    def test_search_in_memory(self):
+        # given
+        product = self.fixtures.product.clone()
+        product.name = 'Grand Theft Auto V'
+        product.developers = ['Rockstar North']
+        created, cleanup = self.factory.products.create(product)
+        self.addCleanup(cleanup)
+
+        # when
+        by_word = self.app.get('/v1/search?mode=memory&query=theft%20aut').get_json()
+        by_developer = self.app.get('/v1/search?mode=memory&query=rockstar').get_json()
+        missing = self.app.get('/v1/search?mode=memory&query=heft').get_json()
+
+        # then
+        self.assertEqual([item["name"] for item in by_word["data"]], [product.name])
+        self.assertEqual(by_word["meta"]["total_count"], 1)
+        self.assertEqual([item["_id"] for item in by_developer["data"]], [str(created._id)])
+        self.assertEqual(missing["data"], [])
+
+    def test_search_with_filters(self):
+        # given
+        product = self.fixtures.product.clone()
+        product.name = 'Grand Theft Auto V'
+        product.platforms_os = ['linux']
+        product.required_age = 18
+        created, cleanup = self.factory.products.create(product)
+        self.addCleanup(cleanup)
+
+        # when
+        by_os = self.app.get('/v1/search?platforms_os=linux&facets=platforms_os,required_age').get_json()
+        by_query_and_age = self.app.get('/v1/search?query=auto&required_age=16').get_json()
+
+        # then
+        self.assertEqual([item["_id"] for item in by_os["data"]], [str(created._id)])
+        self.assertIn({"value": "linux", "count": 1}, by_os["meta"]["facets"]["platforms_os"])
+        self.assertEqual(by_os["meta"]["facets"]["required_age"], [{"value": 18, "count": 1}])
+        self.assertTrue(by_os["meta"]["facet_counts_exact"])
+        self.assertEqual(by_query_and_age["data"], [])
+
+    def test_search_with_filters_in_memory(self):
+        # given
+        product = self.fixtures.product.clone()
+        product.name = 'Grand Theft Auto V'
+        product.platforms_os = ['linux']
+        product.required_age = 18
+        created, cleanup = self.factory.products.create(product)
+        self.addCleanup(cleanup)
+
+        # when
+        by_os = self.app.get('/v1/search?mode=memory&platforms_os=linux&facets=platforms_os,required_age').get_json()
+        by_query = self.app.get('/v1/search?mode=memory&query=auto&platforms_os=linux').get_json()
+        by_query_and_age = self.app.get('/v1/search?mode=memory&query=auto&required_age=16').get_json()
+
+        # then
+        self.assertEqual([item["_id"] for item in by_os["data"]], [str(created._id)])
+        self.assertIn({"value": "linux", "count": 1}, by_os["meta"]["facets"]["platforms_os"])
+        self.assertEqual(by_os["meta"]["facets"]["required_age"], [{"value": 18, "count": 1}])
+        self.assertTrue(by_os["meta"]["facet_counts_exact"])
+        self.assertEqual([item["_id"] for item in by_query["data"]], [str(created._id)])
+        self.assertEqual(by_query_and_age["data"], [])
+
+    def test_suggest(self):
+        # given
+        product = self.fixtures.product.clone()
+        product.name = 'Grand Theft Auto V'
+        created, cleanup = self.factory.products.create(product)
+        self.addCleanup(cleanup)
+
+        # when
+        by_name = self.app.get('/v1/search/suggest?prefix=grand%20the').get_json()
+        by_word = self.app.get('/v1/search/suggest?prefix=AUTO').get_json()
+
+        # then
+        self.assertEqual(by_name["data"], [{"_id": str(created._id), "name": product.name, "slug": created.slug}])
+        self.assertIn(str(created._id), [item["_id"] for item in by_word["data"]])
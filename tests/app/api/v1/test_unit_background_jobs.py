@@ -116,7 +116,7 @@ class BackgroundJobsTestCase(UnitTest):
         endpoint = "/background_jobs"
         self.app.route(endpoint, methods=["GET"])(get_all_background_jobs)
 
-        get_all_background_jobs_mock = get_models.return_value.background_jobs.get_all
+        get_all_background_jobs_mock = get_models.return_value.background_jobs.iter_all
 
         profile_id = str(ObjectId())
 
@@ -140,7 +140,7 @@ class BackgroundJobsTestCase(UnitTest):
                     status="running", created_by=profile_id, metadata={"match_query": "test"},
                     type="es_seeder")
             ]
-            get_all_background_jobs_mock.return_value = mock_background_jobs
+            get_all_background_jobs_mock.return_value = iter(mock_background_jobs)
 
             expected_response = {
                 "status": "ok",
@@ -296,7 +296,6 @@ class BackgroundJobsTestCase(UnitTest):
             mock_background_job = BackgroundJob(
                 status="running", created_by=profile_id, metadata={"match_query": "test"},
                 type="es_seeder")
-            get_background_job_mock.return_value = mock_background_job
             patch_background_job_mock.return_value = mock_background_job
             app_config_mock.__getitem__.side_effect = lambda key: TEST_AUTH_NAMESPACE if key == 'FB_NAMESPACE' else None
 
@@ -316,12 +315,11 @@ class BackgroundJobsTestCase(UnitTest):
             # then
             self.assertEqual(response.get_json(), expected_response)
             self.assertEqual(response.status_code, 200)
-            get_background_job_mock.assert_called_once_with(
-                str(mock_background_job._id)
-            )
+            get_background_job_mock.assert_not_called()
             patch_background_job_mock.assert_called_once_with(
                 str(mock_background_job._id),
-                expected_input
+                expected_input,
+                created_by=profile_id
             )
 
         def fails_to_update_a_background_job_when_no_valid_fields_are_present():
@@ -343,7 +341,7 @@ class BackgroundJobsTestCase(UnitTest):
         def fails_to_update_a_background_job_when_background_job_does_not_exist():
             # given
             mock_id = "1"
-            get_background_job_mock.return_value = None
+            patch_background_job_mock.return_value = None
 
             expected_response = {
                 "error": "\"BackgroundJob\" not found.",
@@ -364,7 +362,7 @@ class BackgroundJobsTestCase(UnitTest):
             mock_background_job = BackgroundJob(
                 status="running", created_by="someone_else", metadata={"match_query": "test"},
                 type="es_seeder")
-            get_background_job_mock.return_value = mock_background_job
+            patch_background_job_mock.side_effect = ForbiddenException()
 
             expected_response = {
                 "error": "Forbidden.",
@@ -394,7 +392,7 @@ class BackgroundJobsTestCase(UnitTest):
             with self.subTest(test.__name__):
                 test()
             get_background_job_mock.reset_mock()
-            patch_background_job_mock.reset_mock()
+            patch_background_job_mock.reset_mock(return_value=True, side_effect=True)
 
     @patch("app.api.v1.background_jobs.get_models")
     def test_create_background_job_event(self, get_models: MagicMock):
@@ -427,7 +425,6 @@ class BackgroundJobsTestCase(UnitTest):
                 type="es_seeder", events=[mock_event])
             app_config_mock.__getitem__.side_effect = lambda key: TEST_AUTH_NAMESPACE if key == 'FB_NAMESPACE' else None
 
-            get_background_job_mock.return_value = mock_background_job
             add_background_job_event_mock.return_value = mock_background_job
 
             expected_input = EventCreate(
@@ -446,9 +443,11 @@ class BackgroundJobsTestCase(UnitTest):
             # then
             self.assertEqual(response.get_json(), expected_response)
             self.assertEqual(response.status_code, 200)
+            get_background_job_mock.assert_not_called()
             add_background_job_event_mock.assert_called_once_with(
                 str(mock_background_job._id),
-                expected_input
+                expected_input,
+                created_by=profile_id
             )
 
         def fails_to_create_a_background_job_event_when_not_all_required_fields_are_present():
@@ -476,8 +475,7 @@ class BackgroundJobsTestCase(UnitTest):
                 status="running", created_by="someone_else", metadata={"match_query": "test"},
                 type="es_seeder", events=[mock_event])
 
-            get_background_job_mock.return_value = mock_background_job
-            add_background_job_event_mock.return_value = mock_background_job
+            add_background_job_event_mock.side_effect = ForbiddenException()
 
             expected_response = {
                 "error": "Forbidden.",
@@ -501,7 +499,7 @@ class BackgroundJobsTestCase(UnitTest):
         def fails_to_create_a_background_job_event_when_background_job_does_not_exist():
             # given
             mock_id = "1"
-            get_background_job_mock.return_value = None
+            add_background_job_event_mock.return_value = None
 
             expected_response = {
                 "error": "\"BackgroundJob\" not found.",
@@ -531,8 +529,6 @@ class BackgroundJobsTestCase(UnitTest):
                 type="es_seeder")
             app_config_mock.__getitem__.side_effect = lambda key: TEST_AUTH_NAMESPACE if key == 'FB_NAMESPACE' else None
 
-            get_background_job_mock.return_value = mock_background_job
-
             expected_response = {
                 "error": "Unsupported event type",
                 "status": "error"
@@ -549,10 +545,9 @@ class BackgroundJobsTestCase(UnitTest):
                 # then
                 self.assertEqual(response.get_json(), expected_response)
                 self.assertEqual(response.status_code, 400)
-                get_background_job_mock.assert_called_once_with(
-                    str(mock_background_job._id))
+                get_background_job_mock.assert_not_called()
                 add_background_job_event_mock.assert_called_once_with(
-                    str(mock_background_job._id), mock_event_create)
+                    str(mock_background_job._id), mock_event_create, created_by=profile_id)
 
         tests = [
             creates_and_returns_a_background_job_event,
@@ -566,4 +561,4 @@ class BackgroundJobsTestCase(UnitTest):
             with self.subTest(test.__name__):
                 test()
             get_background_job_mock.reset_mock()
-            add_background_job_event_mock.reset_mock()
+            add_background_job_event_mock.reset_mock(return_value=True, side_effect=True)
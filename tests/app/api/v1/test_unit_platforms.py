@@ -1,6 +1,7 @@
 from unittest.mock import patch, MagicMock
 from app.api.v1.platforms import get_platforms
 from app.models.platforms import Platform
+from lib.db_utils import to_json
 
 from tests import UnitTest
 
@@ -23,15 +24,15 @@ class PlatformsTestCase(UnitTest):
         def returns_list_of_platforms():
             # given
             mock_platforms = [
-                Platform(name="Test platform 1", base_url="www.test-platform1.com", enabled=True, icon_url="www.test-platform1.com/icon.svg").to_json(),
-                Platform(name="Test platform 2", base_url="www.test-platform2.com", enabled=False, icon_url="www.test-platform2.com/icon.svg").to_json(),
-                Platform(name="Test platform 3", base_url="www.test-platform3.com", enabled=True, icon_url="www.test-platform3.com/icon.svg").to_json()
+                Platform(name="Test platform 1", base_url="www.test-platform1.com", enabled=True, icon_url="www.test-platform1.com/icon.svg"),
+                Platform(name="Test platform 2", base_url="www.test-platform2.com", enabled=False, icon_url="www.test-platform2.com/icon.svg"),
+                Platform(name="Test platform 3", base_url="www.test-platform3.com", enabled=True, icon_url="www.test-platform3.com/icon.svg")
             ]
             get_all_platforms_mock.return_value = mock_platforms
 
             expected_response = {
                 "status": "ok",
-                "data": mock_platforms
+                "data": to_json(mock_platforms)
             }
 
             # when
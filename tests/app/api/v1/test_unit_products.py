@@ -0,0 +1,140 @@
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from bson import ObjectId
+
+from app.api.exceptions import BadRequestException
+from app.api.v1.products import get_product_by_slug, get_products
+from app.models.batch import Batch
+from app.models.exceptions import NotFoundException
+from app.models.products import Product
+from tests import UnitTest
+from tests.app.models.test_unit_products import product_data
+
+
+class ProductsTestCase(UnitTest):
+
+    @patch("app.api.v1.products.get_models")
+    def test_get_product_by_slug(self, get_models: MagicMock):
+        endpoint = "/products/<string:product_slug>"
+        self.app.route(endpoint, methods=["GET"])(get_product_by_slug)
+
+        get_by_slug_mock = get_models.return_value.products.get_by_slug
+
+        def call_api(headers=None):
+            return self.test_client.get("/products/test-game", headers=headers)
+
+        def returns_product_with_validators():
+            # given
+            product = Product(**(product_data() | {"genres": ["Indie"], "categories": ["Single-player"]}))
+            get_by_slug_mock.return_value = product
+
+            # when
+            response = call_api()
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["data"], product.to_json())
+            self.assertIn("ETag", response.headers)
+            # the names of the tags change without `updated_at`, so only the ETag tells
+            self.assertNotIn("Last-Modified", response.headers)
+
+        def returns_last_modified_without_tags():
+            # given
+            data = product_data()
+            get_by_slug_mock.return_value = Product.partial(
+                {"_id": data["_id"], "name": data["name"], "updated_at": datetime(2024, 1, 1, 12)}
+            )
+
+            # when
+            response = call_api()
+
+            # then
+            self.assertEqual(response.headers["Last-Modified"], "Mon, 01 Jan 2024 12:00:00 GMT")
+
+        def returns_not_modified_for_known_etag():
+            # given
+            get_by_slug_mock.return_value = Product(**product_data())
+            etag = call_api().headers["ETag"]
+
+            # when
+            response = call_api({"If-None-Match": etag})
+
+            # then
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b"")
+
+        def returns_product_when_tag_was_renamed():
+            # given
+            data = product_data() | {"genres": ["Indie"]}
+            get_by_slug_mock.return_value = Product(**data)
+            etag = call_api().headers["ETag"]
+            get_by_slug_mock.return_value = Product(**(data | {"genres": ["Independent"]}))
+
+            # when
+            response = call_api({"If-None-Match": etag})
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["data"]["genres"], ["Independent"])
+
+        def fails_to_return_missing_product():
+            # given
+            get_by_slug_mock.return_value = None
+
+            # when & then
+            with self.assertRaises(NotFoundException):
+                call_api()
+
+        tests = [
+            returns_product_with_validators,
+            returns_last_modified_without_tags,
+            returns_not_modified_for_known_etag,
+            returns_product_when_tag_was_renamed,
+            fails_to_return_missing_product
+        ]
+
+        self.run_subtests(tests, after_each=get_by_slug_mock.reset_mock)
+
+    @patch("app.api.v1.products.get_models")
+    def test_get_products(self, get_models: MagicMock):
+        endpoint = "/products"
+        self.app.route(endpoint, methods=["GET"])(get_products)
+
+        get_many_mock = get_models.return_value.products.get_many
+
+        def call_api(query):
+            return self.test_client.get(endpoint, query_string=query)
+
+        def returns_products_in_order_of_ids():
+            # given
+            first, second = Product(**product_data()), Product(**product_data())
+            missing_id = ObjectId()
+            get_many_mock.return_value = Batch([second, first], [missing_id])
+
+            # when
+            response = call_api({"ids": f"{second._id},{missing_id},{first._id}"})
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["data"], [second.to_json(), first.to_json()])
+            self.assertEqual(response.get_json()["meta"], {"items_found": 2, "missing": [str(missing_id)]})
+            self.assertEqual(get_many_mock.call_args.args[0], [second._id, missing_id, first._id])
+
+        def fails_without_ids():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api({})
+
+        def fails_with_invalid_id():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api({"ids": f"{ObjectId()},not-an-id"})
+
+        tests = [
+            returns_products_in_order_of_ids,
+            fails_without_ids,
+            fails_with_invalid_id
+        ]
+
+        self.run_subtests(tests, after_each=get_many_mock.reset_mock)
@@ -3,7 +3,9 @@ import json
 
 from bson import ObjectId
 
-from app.api.v1.profiles import create_profile, get_profile, update_profile, delete_profile, get_authenticated_profile
+from app.api.exceptions import BadRequestException
+from app.api.v1.profiles import create_profile, get_profile, get_profiles, update_profile, delete_profile, get_authenticated_profile
+from app.models.batch import Batch
 from app.models.exceptions import NotFoundException, ForbiddenException
 from config.constants import FirebaseRole
 
@@ -145,7 +147,7 @@ class ProfilesTestCase(UnitTest):
             # then
             self.assertEqual(response.get_json(), expected_response)
             self.assertEqual(response.status_code, 200)
-            get_profile_mock.assert_called_once_with(mock_profile_id_str)
+            get_profile_mock.assert_called_once_with(mock_profile_id_str, projection=None)
 
         def does_not_find_a_profile_and_returns_an_error():
             # given
@@ -157,7 +159,7 @@ class ProfilesTestCase(UnitTest):
                 call_api(mock_id)
 
             # then
-            get_profile_mock.assert_called_once_with(mock_id)
+            get_profile_mock.assert_called_once_with(mock_id, projection=None)
 
         tests = [
             finds_and_returns_a_profile,
@@ -169,6 +171,50 @@ class ProfilesTestCase(UnitTest):
 
         self.run_subtests(tests, after_each=after_each)
 
+    @patch("app.api.v1.profiles.get_models")
+    def test_get_profiles(self, get_models: MagicMock):
+        endpoint = "/profiles"
+        self.app.route(endpoint, methods=["GET"])(get_profiles)
+
+        get_many_mock = get_models.return_value.profiles.get_many
+
+        def call_api(query):
+            return self.test_client.get(endpoint, query_string=query)
+
+        def finds_and_returns_profiles_in_order_of_ids():
+            # given
+            profile = Profile(
+                _id=ObjectId(), idp_id="1", email="john.pork@test.com", nickname="johnny",
+                display_name="John Pork", photo_url="http://porkphoto.com", roles=[FirebaseRole.User.value])
+            missing_id = ObjectId()
+            get_many_mock.return_value = Batch([profile], [missing_id])
+
+            # when
+            response = call_api({"ids": f"{missing_id},{profile._id}", "fields": "nickname"})
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json(), {
+                "status": "ok",
+                "data": [profile.to_json()],
+                "meta": {"items_found": 1, "missing": [str(missing_id)]}
+            })
+            ids, = get_many_mock.call_args.args
+            self.assertEqual(ids, [missing_id, profile._id])
+            self.assertEqual(get_many_mock.call_args.kwargs["projection"].fields, ["nickname"])
+
+        def fails_with_too_many_ids():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api({"ids": ",".join(str(ObjectId()) for _ in range(101))})
+
+        tests = [
+            finds_and_returns_profiles_in_order_of_ids,
+            fails_with_too_many_ids
+        ]
+
+        self.run_subtests(tests, after_each=get_many_mock.reset_mock)
+
     @patch("app.api.v1.profiles.get_models")
     def test_patch_profile(self, get_models: MagicMock):
         self.skipTest("Fix when patch handler & model implemented")
@@ -1,52 +1,400 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from bson import ObjectId
 
-from app.api.v1.search import search
+from app.api.exceptions import BadRequestException
+from app.api.v1.search import search, suggest
+from app.models.batch import Batch
+from app.models.pagination import Page
+from app.models.product_cards import ProductCard
+from app.models.product_search import ProductSearchModel, SearchFilters
+from app.models.products import ProductsModel
+from app.models.search_results import SearchResults
+from app.models.tags import TagNames
+from lib.cache import Cache
 from tests import UnitTest
 
 
 class SearchTestCase(UnitTest):
 
+    @patch('app.api.v1.search.get_models')
     @patch('app.api.v1.search.get_services')
-    def test_search(self, get_services):
+    def test_search(self, get_services, get_models):
         # given
         endpoint = "/search"
         self.app.route(endpoint)(search)
 
         mock_client = get_services.return_value.db.connection
 
+        shooter_id = ObjectId()
+        tags = MagicMock()
+        tags.names = TagNames(lambda: {shooter_id: "Shooter"})
+        get_models.return_value.products = ProductsModel(MagicMock(), tags=tags, cards=MagicMock(), search=MagicMock())
+        get_models.return_value.product_search = ProductSearchModel(MagicMock())
+        get_models.return_value.search_results = SearchResults(tags.names)
+
         params1 = {"page": "1", "name": "Counter"}
         data1 = [
             {
                 "_id": ObjectId(),
-                "name": "Counter-Strike"
+                "name": "Counter-Strike",
+                "genres": [shooter_id]
             },
             {
                 "_id": ObjectId(),
-                "name": "Counter-Strike Global Offensive"
+                "name": "Counter-Strike Global Offensive",
+                "genres": [shooter_id]
             }
         ]
 
         meta1 = {
             "total_count": 2,
+            "total_count_exact": True,
             "items_on_page": 2,
             "items_per_page": 15,
             "page_count": 1,
-            "page": 1
+            "page": 1,
+            "next_cursor": None
         }
 
-        def aggregate_side_effect():
-            yield [{
-                'items': data1,
-                'count': [{"count": 2}]
-            }]
-
-        mock_client.__getitem__.return_value.aggregate.side_effect = aggregate_side_effect()
+        products_mock = mock_client.__getitem__.return_value
+        products_mock.find.return_value.sort.return_value.limit.return_value = iter(data1)
+        products_mock.estimated_document_count.return_value = 2
 
         # when
         response = self.test_client.get(endpoint, query_string=params1)
 
         # then
-        self.assertEqual(response.get_json()["data"], data1)
+        products_mock.find.return_value.sort.assert_called_once_with([("_id", 1)])
+        products_mock.find.return_value.sort.return_value.limit.assert_called_once_with(16)
+        self.assertEqual(response.get_json()["data"], [
+            {"_id": str(item["_id"]), "name": item["name"], "genres": ["Shooter"]} for item in data1
+        ])
         self.assertEqual(response.get_json()["meta"], meta1)
+
+    @patch('app.api.v1.search.get_models')
+    @patch('app.api.v1.search.get_services')
+    def test_search_cards(self, get_services, get_models):
+        # given
+        endpoint = "/search"
+        self.app.route(endpoint)(search)
+
+        cards_model = get_models.return_value.product_cards
+        card = ProductCard.partial({"_id": ObjectId(), "name": "Counter-Strike", "genres": ["Shooter"]})
+        cards_model.find_page.side_effect = lambda query, pagination, projection, skip: Page([card], None, pagination)
+        cards_model.count.return_value = 1
+        get_models.return_value.product_search = ProductSearchModel(MagicMock())
+        get_models.return_value.search_results = SearchResults(TagNames(dict))
+
+        # when
+        response = self.test_client.get(endpoint, query_string={"view": "cards", "sort": "name"})
+
+        # then
+        self.assertEqual(response.get_json()["data"], [card.to_json()])
+        self.assertEqual(response.get_json()["meta"]["total_count"], 1)
+        query, pagination, projection = cards_model.find_page.call_args.args
+        self.assertEqual(query, {})
+        self.assertEqual(pagination.sort, "name")
+        self.assertIsNone(projection)
+        get_services.return_value.db.connection.__getitem__.assert_not_called()
+
+    @patch('app.api.v1.search.get_models')
+    @patch('app.api.v1.search.get_services')
+    def test_search_query(self, get_services, get_models):
+        # given
+        endpoint = "/search"
+        self.app.route(endpoint)(search)
+
+        search_model = get_models.return_value.product_search
+        search_model.parse.side_effect = ProductSearchModel(MagicMock()).parse
+        search_model.approx_count_limit = 1000
+        get_models.return_value.search_results = SearchResults(TagNames(dict))
+        cards_model = get_models.return_value.product_cards
+        card = ProductCard.partial({"_id": ObjectId(), "name": "Counter-Strike"})
+
+        def reads_cards_of_matches_by_relevance():
+            # given
+            search_model.find_page.side_effect = lambda words, pagination, skip, filters: Page([card._id], "next", pagination)
+            search_model.count.return_value = 16
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            response = self.test_client.get(endpoint, query_string={"query": "Counter-Str[ike", "view": "cards"})
+
+            # then
+            self.assertEqual(response.get_json()["data"], [card.to_json()])
+            self.assertEqual(response.get_json()["meta"]["total_count"], 16)
+            self.assertEqual(response.get_json()["meta"]["next_cursor"], "next")
+            words, pagination = search_model.find_page.call_args.args
+            self.assertEqual(words, ["counter", "str", "ike"])
+            self.assertEqual(pagination.sort, "-score")
+            self.assertTrue(response.get_json()["meta"]["total_count_exact"])
+            search_model.count.assert_called_once_with(["counter", "str", "ike"], 0, SearchFilters())
+            cards_model.get_many.assert_called_once_with([card._id], None)
+            cards_model.find_page.assert_not_called()
+
+        def counts_matches_up_to_limit_with_approx_count():
+            # given
+            search_model.find_page.side_effect = lambda words, pagination, skip, filters: Page([card._id], "next", pagination)
+            search_model.count.return_value = 1000
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            response = self.test_client.get(endpoint, query_string={"query": "counter", "count": "approx"})
+
+            # then
+            meta = response.get_json()["meta"]
+            self.assertEqual(meta["total_count"], 1000)
+            self.assertFalse(meta["total_count_exact"])
+            self.assertEqual(meta["page_count"], 67)
+            search_model.count.assert_called_once_with(["counter"], 1000, SearchFilters())
+
+        def skips_count_with_no_count():
+            # given
+            search_model.find_page.side_effect = lambda words, pagination, skip, filters: Page([card._id], "next", pagination)
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            response = self.test_client.get(endpoint, query_string={"query": "counter", "count": "none"})
+
+            # then
+            meta = response.get_json()["meta"]
+            self.assertIsNone(meta["total_count"])
+            self.assertIsNone(meta["page_count"])
+            self.assertFalse(meta["total_count_exact"])
+            search_model.count.assert_not_called()
+
+        def searches_in_memory_index_with_memory_mode():
+            # given
+            index_model = get_models.return_value.product_index
+            index_model.search.side_effect = lambda words, pagination, skip, include: (Page([card._id], None, pagination), 1)
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            response = self.test_client.get(endpoint, query_string={"query": "counter", "view": "cards", "mode": "memory"})
+
+            # then
+            self.assertEqual(response.get_json()["data"], [card.to_json()])
+            self.assertEqual(response.get_json()["meta"]["total_count"], 1)
+            self.assertTrue(response.get_json()["meta"]["total_count_exact"])
+            words, pagination = index_model.search.call_args.args
+            self.assertEqual(words, ["counter"])
+            self.assertEqual(pagination.sort, "-score")
+            self.assertIsNone(index_model.search.call_args.kwargs["include"])
+            search_model.find_page.assert_not_called()
+            search_model.count.assert_not_called()
+
+        def filters_and_counts_facets_in_memory_catalog_with_memory_mode():
+            # given
+            catalog_model = get_models.return_value.product_catalog
+            catalog_model.find_page.side_effect = lambda filters, pagination, skip: (Page([card._id], None, pagination), 1)
+            catalog_model.facets.return_value = ({"platforms": [{"value": "steam", "count": 1}]}, True)
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            response = self.test_client.get(endpoint, query_string={
+                "view": "cards", "mode": "memory", "platforms": "steam", "required_age": "16", "facets": "platforms"
+            })
+
+            # then
+            filters = SearchFilters(platforms=("steam",), required_age=16)
+            meta = response.get_json()["meta"]
+            self.assertEqual(response.get_json()["data"], [card.to_json()])
+            self.assertEqual(meta["total_count"], 1)
+            self.assertEqual(meta["facets"], {"platforms": [{"value": "steam", "count": 1}]})
+            self.assertTrue(meta["facet_counts_exact"])
+            self.assertEqual(catalog_model.find_page.call_args.args[0], filters)
+            catalog_model.facets.assert_called_once_with(filters, ("platforms",), None)
+            search_model.find_page.assert_not_called()
+            search_model.facets.assert_not_called()
+
+        def filters_matches_of_memory_index_with_catalog():
+            # given
+            index_model = get_models.return_value.product_index
+            catalog_model = get_models.return_value.product_catalog
+            index_model.search.side_effect = lambda words, pagination, skip, include: (Page([card._id], None, pagination), 1)
+            index_model.match.return_value = [card._id.binary]
+            catalog_model.facets.return_value = ({"is_free": [{"value": True, "count": 1}]}, True)
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            response = self.test_client.get(endpoint, query_string={
+                "query": "counter", "view": "cards", "mode": "memory", "is_free": "true", "facets": "is_free"
+            })
+
+            # then
+            filters = SearchFilters(is_free=True)
+            self.assertEqual(response.get_json()["meta"]["facets"], {"is_free": [{"value": True, "count": 1}]})
+            catalog_model.matcher.assert_called_once_with(filters)
+            self.assertEqual(index_model.search.call_args.kwargs["include"], catalog_model.matcher.return_value)
+            index_model.match.assert_called_once_with(["counter"])
+            catalog_model.facets.assert_called_once_with(filters, ("is_free",), [card._id.binary])
+            search_model.find_page.assert_not_called()
+
+        def answers_repeated_query_from_cache():
+            # given
+            results = get_models.return_value.search_results = SearchResults(TagNames(dict), Cache(maxsize=16, ttl=30))
+            search_model.find_page.side_effect = lambda words, pagination, skip, filters: Page([card._id], "next", pagination)
+            search_model.count.return_value = 16
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            responses = [
+                self.test_client.get(endpoint, query_string={"query": query, "view": "cards"}).get_json()
+                for query in ("Counter Strike", "counter-strike", "COUNTER strike")
+            ]
+            other_page = self.test_client.get(endpoint, query_string={"query": "counter strike", "view": "cards", "page": 2})
+            results.invalidate()
+            self.test_client.get(endpoint, query_string={"query": "counter strike", "view": "cards"})
+
+            # then
+            self.assertEqual(responses, [responses[0]] * 3)
+            self.assertEqual(other_page.get_json()["meta"]["page"], 2)
+            self.assertEqual(search_model.find_page.call_count, 3)
+            self.assertEqual(results.stats()["queries"], [{"query": "counter strike", "hits": 2, "misses": 3}])
+
+        def filters_and_counts_facets_without_query():
+            # given
+            indie_id = ObjectId()
+            search_model.find_page.side_effect = lambda words, pagination, skip, filters: Page([card._id], None, pagination)
+            search_model.count.return_value = 1
+            search_model.facets.return_value = (
+                {"genres": [{"value": indie_id, "count": 1}], "is_free": [{"value": True, "count": 1}]}, True
+            )
+            get_models.return_value.tags.names.get.return_value = {indie_id: "Indie"}
+            cards_model.get_many.return_value = Batch([card], [])
+
+            # when
+            response = self.test_client.get(endpoint, query_string={
+                "view": "cards", "genres": str(indie_id), "platforms_os": "windows, linux", "is_free": "true",
+                "price_max": "1999", "currency": "eur", "facets": "genres,is_free"
+            })
+
+            # then
+            filters = SearchFilters(genres=(indie_id,), platforms_os=("windows", "linux"), is_free=True, price_max=1999,
+                                    currency="EUR")
+            self.assertEqual(response.get_json()["data"], [card.to_json()])
+            self.assertEqual(search_model.find_page.call_args.kwargs["filters"], filters)
+            self.assertEqual(search_model.find_page.call_args.args[1].sort, "_id")
+            search_model.count.assert_called_once_with([], 0, filters)
+            search_model.facets.assert_called_once_with([], filters, ("genres", "is_free"))
+            meta = response.get_json()["meta"]
+            self.assertEqual(meta["facets"], {
+                "genres": [{"value": str(indie_id), "name": "Indie", "count": 1}],
+                "is_free": [{"value": True, "count": 1}]
+            })
+            self.assertTrue(meta["facet_counts_exact"])
+            cards_model.find_page.assert_not_called()
+
+        def rejects_invalid_filters():
+            for query_string in (
+                {"is_free": "yes"},
+                {"genres": "shooter"},
+                {"price_min": "-1"},
+                {"required_age": "adult"},
+                {"facets": "genres,price_range"},
+            ):
+                # when
+                with self.assertRaises(BadRequestException):
+                    self.test_client.get(endpoint, query_string=query_string)
+
+            # then
+            search_model.find_page.assert_not_called()
+
+        def rejects_unknown_mode():
+            # when
+            with self.assertRaises(BadRequestException):
+                self.test_client.get(endpoint, query_string={"query": "counter", "mode": "index"})
+
+            # then
+            search_model.find_page.assert_not_called()
+
+        def rejects_unknown_count_mode():
+            # when
+            with self.assertRaises(BadRequestException):
+                self.test_client.get(endpoint, query_string={"query": "counter", "count": "some"})
+
+            # then
+            search_model.find_page.assert_not_called()
+
+        def rejects_pages_before_first():
+            for page in ("0", "-2"):
+                # when
+                with self.assertRaises(BadRequestException):
+                    self.test_client.get(endpoint, query_string={"query": "counter", "page": page})
+
+            # then
+            search_model.find_page.assert_not_called()
+
+        def rejects_sort_by_score_without_query():
+            # when
+            with self.assertRaises(BadRequestException):
+                self.test_client.get(endpoint, query_string={"query": "?!", "sort": "-score"})
+
+            # then
+            search_model.find_page.assert_not_called()
+
+        def reset():
+            search_model.reset_mock(return_value=True)
+            search_model.find_page.side_effect = None
+            cards_model.reset_mock(return_value=True)
+            get_models.return_value.product_index.reset_mock(return_value=True, side_effect=True)
+            get_models.return_value.product_catalog.reset_mock(return_value=True, side_effect=True)
+            get_models.return_value.search_results = SearchResults(TagNames(dict))
+
+        tests = [
+            reads_cards_of_matches_by_relevance,
+            counts_matches_up_to_limit_with_approx_count,
+            skips_count_with_no_count,
+            searches_in_memory_index_with_memory_mode,
+            filters_and_counts_facets_in_memory_catalog_with_memory_mode,
+            filters_matches_of_memory_index_with_catalog,
+            answers_repeated_query_from_cache,
+            filters_and_counts_facets_without_query,
+            rejects_invalid_filters,
+            rejects_unknown_mode,
+            rejects_unknown_count_mode,
+            rejects_pages_before_first,
+            rejects_sort_by_score_without_query
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    @patch('app.api.v1.search.get_models')
+    def test_suggest(self, get_models):
+        # given
+        endpoint = "/search/suggest"
+        self.app.route(endpoint)(suggest)
+
+        index_model = get_models.return_value.product_index
+        product_id = ObjectId()
+
+        def suggests_products_from_index():
+            # given
+            index_model.suggest.return_value = [{"_id": product_id, "name": "Grand Theft Auto V", "slug": "gta-5"}]
+
+            # when
+            response = self.test_client.get(endpoint, query_string={"prefix": "grand th", "limit": "5"})
+
+            # then
+            self.assertEqual(response.get_json()["data"], [
+                {"_id": str(product_id), "name": "Grand Theft Auto V", "slug": "gta-5"}
+            ])
+            index_model.suggest.assert_called_once_with("grand th", 5)
+
+        def rejects_invalid_limit():
+            for limit in ("0", "21", "ten"):
+                # when
+                with self.assertRaises(BadRequestException):
+                    self.test_client.get(endpoint, query_string={"prefix": "grand", "limit": limit})
+
+            # then
+            index_model.suggest.assert_not_called()
+
+        tests = [
+            suggests_products_from_index,
+            rejects_invalid_limit
+        ]
+
+        self.run_subtests(tests, after_each=index_model.reset_mock)
+
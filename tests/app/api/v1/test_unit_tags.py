@@ -1,6 +1,9 @@
+from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+from app.api.exceptions import BadRequestException
 from app.api.v1.tags import get_tags
+from app.models.pagination import Page, Pagination
 from app.models.tags import Tag
 from lib.db_utils import to_json
 from tests import UnitTest
@@ -13,9 +16,10 @@ class TagsTestCase(UnitTest):
         self.app.route(endpoint, methods=["GET"])(get_tags)
 
         get_all_tags_mock = get_models.return_value.tags.get_all
+        get_tags_page_mock = get_models.return_value.tags.get_page
 
-        def call_api():
-            return self.test_client.get(endpoint)
+        def call_api(query_string=None, headers=None):
+            return self.test_client.get(endpoint, query_string=query_string, headers=headers)
 
         def finds_and_returns_all_tags():
             # given
@@ -40,11 +44,106 @@ class TagsTestCase(UnitTest):
             self.assertEqual(response.content_type, "application/json")
             get_all_tags_mock.assert_called_once()
 
+        def returns_requested_fields():
+            # given
+            mock_tag = Tag(name="tag1")
+            get_all_tags_mock.return_value = [Tag.partial({"_id": mock_tag._id, "name": mock_tag.name})]
+
+            # when
+            response = call_api({"fields": "name"})
+
+            # then
+            self.assertEqual(response.get_json()["data"], [{"_id": str(mock_tag._id), "name": "tag1"}])
+            projection = get_all_tags_mock.call_args.kwargs["projection"]
+            self.assertEqual(projection.to_mongo(), {"name": 1})
+
+        def fails_to_return_unknown_fields():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api({"fields": "name,password"})
+
+            get_all_tags_mock.assert_not_called()
+
+        def returns_a_page_of_tags():
+            # given
+            mock_tags = [Tag(name="tag1"), Tag(name="tag2")]
+            get_tags_page_mock.side_effect = lambda pagination, projection: Page(mock_tags, "next", pagination)
+
+            # when
+            response = call_api({"limit": "2", "sort": "-name"})
+
+            # then
+            self.assertEqual(response.get_json()["data"], to_json(mock_tags))
+            self.assertEqual(response.get_json()["meta"], {
+                "limit": 2,
+                "sort": "-name",
+                "items_on_page": 2,
+                "next_cursor": "next"
+            })
+            pagination = get_tags_page_mock.call_args.args[0]
+            self.assertIsInstance(pagination, Pagination)
+            self.assertIsNone(pagination.after)
+            get_all_tags_mock.assert_not_called()
+
+        def fails_to_return_a_page_with_unknown_sort():
+            # when & then
+            with self.assertRaises(BadRequestException):
+                call_api({"sort": "created_at"})
+
+            get_tags_page_mock.assert_not_called()
+
+        def returns_not_modified_for_known_etag():
+            # given
+            get_all_tags_mock.return_value = [Tag(name="tag1")]
+            etag = call_api().headers["ETag"]
+
+            # when
+            response = call_api(headers={"If-None-Match": etag})
+
+            # then
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b"")
+            self.assertEqual(response.headers["ETag"], etag)
+
+        def returns_tags_when_one_was_updated():
+            # given
+            tag = Tag(name="tag1", updated_at=datetime(2024, 1, 1))
+            get_all_tags_mock.return_value = [tag]
+            etag = call_api().headers["ETag"]
+            get_all_tags_mock.return_value = [Tag(name="tag1", _id=tag._id, updated_at=datetime(2024, 1, 2))]
+
+            # when
+            response = call_api(headers={"If-None-Match": etag})
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response.headers["ETag"], etag)
+
+        def ignores_if_modified_since_for_lists():
+            # given
+            get_all_tags_mock.return_value = [Tag(name="tag1", updated_at=datetime(2024, 1, 1, 12))]
+
+            # when
+            response = call_api(headers={"If-Modified-Since": "Mon, 01 Jan 2024 12:00:00 GMT"})
+
+            # then
+            # a list also changes when one of its tags is deleted, which no `updated_at` tells
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("Last-Modified", response.headers)
+
         tests = [
-            finds_and_returns_all_tags
+            finds_and_returns_all_tags,
+            returns_not_modified_for_known_etag,
+            returns_tags_when_one_was_updated,
+            ignores_if_modified_since_for_lists,
+            returns_requested_fields,
+            fails_to_return_unknown_fields,
+            returns_a_page_of_tags,
+            fails_to_return_a_page_with_unknown_sort
         ]
 
         for test in tests:
             with self.subTest(test=test.__name__):
                 test()
             get_all_tags_mock.reset_mock()
+            get_tags_page_mock.reset_mock()
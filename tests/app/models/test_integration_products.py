@@ -17,6 +17,19 @@ class ProductsModelTestCase(IntegrationTest):
         self.assertIsNotNone(retrieved_product)
         self.assertEqual(product.name, retrieved_product.name)
 
+    def test_get_product_lazy(self):
+        products_model = self.models.products
+
+        # given
+        product = self.fixtures.product
+
+        # when
+        retrieved_product = products_model.get(str(product._id), lazy=True)
+
+        # then
+        self.assertIsNotNone(retrieved_product)
+        self.assertEqual(retrieved_product.to_json(), products_model.get(str(product._id)).to_json())
+
     def test_create_product(self):
         # given
         product = self.fixtures.product.clone()
@@ -0,0 +1,18 @@
+from scripts.query_plans import check, query_shapes
+from tests.integration_test import IntegrationTest
+
+
+class QueryPlansTestCase(IntegrationTest):
+
+    def test_query_shapes_use_indexes(self):
+        # given
+        shapes = query_shapes()
+
+        # when
+        reports = check(self.services.db, shapes)
+
+        # then
+        for shape, report in zip(shapes, reports):
+            if shape.known_scan is None:
+                with self.subTest(shape.name):
+                    self.assertEqual(report.problems, [], f"{shape.name}: {' > '.join(report.stages)}")
@@ -73,7 +73,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def creates_and_returns_an_affiliate_platform_product():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             mock_affiliate_platform_product = affiliate_platform_product_fixture.clone()
             collection_mock.insert_one.return_value = mock_affiliate_platform_product.to_json()
 
@@ -107,7 +107,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def gets_and_returns_affiliate_platform_product():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             affiliate_platform_product_id = ObjectId()
             mock_affiliate_platform_product = affiliate_platform_product_fixture.clone()
             collection_mock.aggregate.return_value = [mock_affiliate_platform_product.to_json()]
@@ -121,7 +121,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def fails_to_get_affiliate_platform_product_because_id_is_invalid():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             invalid_affiliate_platform_product_id = "invalid_id"
 
             # when & then
@@ -130,7 +130,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def fails_to_get_a_nonexistent_affiliate_platform_product():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             nonexistent_affiliate_platform_product_id = ObjectId()
             collection_mock.aggregate.return_value = None
 
@@ -155,7 +155,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def patches_and_returns_updated_affiliate_platform_product():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             affiliate_platform_product_id = ObjectId()
             updated_affiliate_platform_product = affiliate_platform_product_fixture.clone()
             updated_affiliate_platform_product.buy_page_url = "https://www.example.com/new"
@@ -170,10 +170,39 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
             # then
             self.assertEqual(result.buy_page_url, updated_affiliate_platform_product.buy_page_url)
+            collection_mock.find_one.assert_not_called()
+
+        def moves_offer_to_another_product():
+            # given
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
+            affiliate_platform_product_id = ObjectId()
+            previous_product_id, product_id = ObjectId(), ObjectId()
+            stored = affiliate_platform_product_fixture.to_bson() | {"product_id": product_id}
+            collection_mock.find_one.return_value = {
+                "_id": affiliate_platform_product_id, "product_id": previous_product_id
+            }
+            collection_mock.find_one_and_update.return_value = stored
+
+            # when
+            result = model.patch(
+                str(affiliate_platform_product_id), AffiliatePlatformProductPatch(product_id=product_id)
+            )
+
+            # then
+            self.assertEqual(result.product_id, product_id)
+            collection_mock.find_one_and_update.assert_called_once_with(
+                {"_id": affiliate_platform_product_id},
+                {"$set": {"product_id": product_id}},
+                return_document=ReturnDocument.AFTER
+            )
+            self.assertIsInstance(collection_mock.find_one_and_update.call_args.args[1]["$set"]["product_id"], ObjectId)
+            self.assertEqual(
+                [call.args[0] for call in model.cards.update_offers.call_args_list], [product_id, previous_product_id]
+            )
 
         def fails_to_patch_an_affiliate_platform_product_because_id_is_invalid():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             invalid_affiliate_platform_product_id = "invalid_id"
             update_data = affiliate_platform_product_fixture.clone()
 
@@ -183,7 +212,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def fails_to_patch_a_nonexistent_affiliate_platform_product():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             nonexistent_affiliate_platform_product_id = ObjectId()
             update_data = affiliate_platform_product_fixture.clone()
             collection_mock.find_one_and_update.return_value = None
@@ -194,6 +223,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         tests = [
             patches_and_returns_updated_affiliate_platform_product,
+            moves_offer_to_another_product,
             fails_to_patch_an_affiliate_platform_product_because_id_is_invalid,
             fails_to_patch_a_nonexistent_affiliate_platform_product
         ]
@@ -206,7 +236,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def deletes_and_confirms_deletion():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             affiliate_platform_product_id = ObjectId()
             mock_affiliate_platform_product = affiliate_platform_product_fixture.clone()
             collection_mock.find_one_and_delete.return_value = mock_affiliate_platform_product.to_json()
@@ -217,10 +247,11 @@ class AffiliatePlatformProductTestCase(UnitTest):
             # then
             self.assertEqual(result.buy_page_url, mock_affiliate_platform_product.buy_page_url)
             collection_mock.find_one_and_delete.assert_called_once_with({'_id': affiliate_platform_product_id})
+            model.cards.update_offers.assert_called_once_with(mock_affiliate_platform_product.product_id)
 
         def fails_to_delete_an_affiliate_platform_product_because_id_is_invalid():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             invalid_affiliate_platform_product_id = "invalid_id"
 
             # when & then
@@ -229,7 +260,7 @@ class AffiliatePlatformProductTestCase(UnitTest):
 
         def fails_to_delete_a_nonexistent_affiliate_platform_product():
             # given
-            model = AffiliatePlatformProductsModel(db)
+            model = AffiliatePlatformProductsModel(db, cards=MagicMock())
             nonexistent_affiliate_platform_product_id = ObjectId()
             collection_mock.find_one_and_delete.return_value = None
 
@@ -7,7 +7,9 @@ from pymongo.results import DeleteResult
 
 from app.models.background_jobs import BackgroundJobsModel, BackgroundJobCreate, BackgroundJobPatch, BackgroundJob, \
     EventCreate, Event
+from app.models.exceptions import ForbiddenException
 from tests import UnitTest
+from tests.utils.commands import collection_commands
 
 
 class BackgroundJobsModelTestCase(UnitTest):
@@ -100,6 +102,30 @@ class BackgroundJobsModelTestCase(UnitTest):
 
         self.run_subtests(tests, after_each=reset_mocks)
 
+    def test_iter_all_background_jobs(self):
+        def iterates_over_all_background_jobs():
+            # given
+            mock_background_jobs = [self.get_new_mock_background_job(), self.get_new_mock_background_job()]
+
+            self.mock_collection.find.return_value = iter(mock_background_jobs)
+
+            # when
+            result = self.model.iter_all()
+
+            # then
+            self.assertEqual([job._id for job in result], [job["_id"] for job in mock_background_jobs])
+            self.mock_collection.find.assert_called_once()
+
+        tests = [
+            iterates_over_all_background_jobs
+        ]
+
+        def reset_mocks():
+            self.mock_db.reset_mock()
+            self.mock_collection.reset_mock()
+
+        self.run_subtests(tests, after_each=reset_mocks)
+
     def test_create_background_job(self):
         def creates_and_returns_background_job():
             # given
@@ -149,10 +175,9 @@ class BackgroundJobsModelTestCase(UnitTest):
         self.run_subtests(tests, after_each=reset_mocks)
 
     def test_patch_background_job(self):
-        def finds_then_patches_and_returns_background_job():
+        def patches_and_returns_background_job_with_single_write():
             # given
             mock_background_job = self.get_new_mock_background_job()
-            self.mock_collection.find_one.return_value = mock_background_job
 
             mock_background_job_patch = BackgroundJobPatch(
                 status="success"
@@ -164,20 +189,55 @@ class BackgroundJobsModelTestCase(UnitTest):
 
             # when
             result = self.model.patch(
-                str(mock_background_job["_id"]), mock_background_job_patch)
+                str(mock_background_job["_id"]), mock_background_job_patch, created_by="test")
 
             # then
             self.assertEqual(result.to_json()[
                              "status"], mock_background_job_patch.to_json()["status"])
-            self.mock_collection.find_one.assert_called_with(
-                {"_id": ObjectId(mock_background_job["_id"])})
+            self.assertEqual(collection_commands(self.mock_collection), ["find_one_and_update"])
             self.mock_collection.find_one_and_update.assert_called_once_with(
-                {"_id": ObjectId(mock_background_job["_id"])},
+                {"_id": ObjectId(mock_background_job["_id"]), "created_by": "test"},
                 {"$set": {"status": "success"}},
                 return_document=ReturnDocument.AFTER)
 
+        def merges_metadata_into_stored_one():
+            # given
+            mock_background_job = self.get_new_mock_background_job()
+            self.mock_collection.find_one_and_update.return_value = mock_background_job
+
+            mock_background_job_patch = BackgroundJobPatch(
+                metadata={"match_query": "updated"}
+            )
+
+            # when
+            self.model.patch(str(mock_background_job["_id"]), mock_background_job_patch)
+
+            # then
+            self.mock_collection.find_one_and_update.assert_called_once_with(
+                {"_id": ObjectId(mock_background_job["_id"]), "type": {"$in": ["es_seeder"]}},
+                {"$set": {"metadata.match_query": "updated"}},
+                return_document=ReturnDocument.AFTER)
+
+        def fails_to_patch_metadata_unsupported_by_job_type():
+            # given
+            mock_background_job = self.get_new_mock_background_job()
+            self.mock_collection.find_one_and_update.return_value = None
+            self.mock_collection.find_one.return_value = mock_background_job
+
+            mock_background_job_patch = BackgroundJobPatch(
+                metadata={"unknown_field": "test"}
+            )
+
+            # when
+            with self.assertRaises(ValueError):
+                self.model.patch(str(mock_background_job["_id"]), mock_background_job_patch)
+
+            # then
+            self.mock_collection.find_one_and_update.assert_called_once()
+
         def does_not_find_background_job_and_returns_none():
             # given
+            self.mock_collection.find_one_and_update.return_value = None
             self.mock_collection.find_one.return_value = None
 
             mock_id = str(ObjectId())
@@ -190,15 +250,29 @@ class BackgroundJobsModelTestCase(UnitTest):
 
             # then
             self.assertIsNone(result)
-            self.mock_collection.find_one.assert_called_with(
-                {"_id": ObjectId(mock_id)})
-            self.mock_collection.find_one_and_update.assert_not_called()
+            self.assertEqual(collection_commands(self.mock_collection), ["find_one_and_update", "find_one"])
+            self.mock_collection.find_one.assert_called_once_with(
+                {"_id": ObjectId(mock_id)}, {"type": 1, "created_by": 1})
 
-        def fails_to_patch_background_job_with_invalid_status_and_returns_an_error():
+        def fails_to_patch_background_job_created_by_another_profile():
             # given
             mock_background_job = self.get_new_mock_background_job()
+            self.mock_collection.find_one_and_update.return_value = None
             self.mock_collection.find_one.return_value = mock_background_job
 
+            mock_background_job_patch = BackgroundJobPatch(
+                status="success"
+            )
+
+            # when
+            with self.assertRaises(ForbiddenException):
+                self.model.patch(
+                    str(mock_background_job["_id"]), mock_background_job_patch, created_by="another")
+
+        def fails_to_patch_background_job_with_invalid_status_and_returns_an_error():
+            # given
+            mock_background_job = self.get_new_mock_background_job()
+
             mock_background_job_patch = BackgroundJobPatch(
                 status="invalid_status"
             )
@@ -209,19 +283,21 @@ class BackgroundJobsModelTestCase(UnitTest):
                     str(mock_background_job["_id"]), mock_background_job_patch)
 
             # then
-            self.mock_collection.find_one.assert_called_with(
-                {"_id": ObjectId(mock_background_job["_id"])})
+            self.mock_collection.find_one.assert_not_called()
             self.mock_collection.find_one_and_update.assert_not_called()
 
         tests = [
-            finds_then_patches_and_returns_background_job,
+            patches_and_returns_background_job_with_single_write,
+            merges_metadata_into_stored_one,
+            fails_to_patch_metadata_unsupported_by_job_type,
             does_not_find_background_job_and_returns_none,
+            fails_to_patch_background_job_created_by_another_profile,
             fails_to_patch_background_job_with_invalid_status_and_returns_an_error
         ]
 
         def reset_mocks():
             self.mock_db.reset_mock()
-            self.mock_collection.reset_mock()
+            self.mock_collection.reset_mock(return_value=True)
 
         self.run_subtests(tests, after_each=reset_mocks)
 
@@ -354,6 +430,26 @@ class BackgroundJobsModelTestCase(UnitTest):
                              "events"][0]["type"], mock_event.type)
             self.mock_collection.find_one_and_update.assert_called_once()
 
+        def does_not_add_event_to_background_job_created_by_another_profile():
+            # given
+            mock_background_job = self.get_new_mock_background_job()
+            self.mock_collection.find_one_and_update.return_value = None
+            self.mock_collection.find_one.return_value = mock_background_job
+
+            mock_event = EventCreate(
+                type="info",
+                message="test info"
+            )
+
+            # when
+            with self.assertRaises(ForbiddenException):
+                self.model.add_event(
+                    str(mock_background_job["_id"]), mock_event, created_by="another")
+
+            # then
+            query, _ = self.mock_collection.find_one_and_update.call_args.args
+            self.assertEqual(query, {"_id": mock_background_job["_id"], "created_by": "another"})
+
         def fails_to_add_event_with_invalid_event_type_and_returns_an_error():
             # given
             mock_background_job = self.get_new_mock_background_job()
@@ -374,11 +470,12 @@ class BackgroundJobsModelTestCase(UnitTest):
 
         tests = [
             adds_event_and_returns_updated_background_job,
+            does_not_add_event_to_background_job_created_by_another_profile,
             fails_to_add_event_with_invalid_event_type_and_returns_an_error
         ]
 
         def reset_mocks():
             self.mock_db.reset_mock()
-            self.mock_collection.reset_mock()
+            self.mock_collection.reset_mock(return_value=True)
 
         self.run_subtests(tests, after_each=reset_mocks)
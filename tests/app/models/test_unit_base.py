@@ -0,0 +1,124 @@
+from typing import ClassVar, List, Optional
+
+from bson import ObjectId
+
+from app.models.base import BaseDocument
+from lib.db_utils import get_fields
+from tests import UnitTest
+
+
+class Game(BaseDocument):
+    collection: ClassVar[str] = "games"
+
+    name: str
+    genres: List[ObjectId]
+    rating: Optional[int] = None
+
+    def __init__(self, name: str, genres: List[ObjectId], **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.name = name
+        self.genres = genres
+
+
+class Expansion(Game):
+    base_game_id: ObjectId
+
+    def __init__(self, base_game_id: ObjectId, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.base_game_id = base_game_id
+
+
+class BaseDocumentTestCase(UnitTest):
+
+    def test_schema(self):
+        def generates_slots_from_fields():
+            # then
+            self.assertEqual(BaseDocument.__slots__, ("_id", "created_at", "updated_at"))
+            self.assertEqual(Game.__slots__, ("name", "genres", "rating"))
+            self.assertEqual(Expansion.__slots__, ("base_game_id",))
+            self.assertFalse(hasattr(Expansion(name="Game", genres=[], base_game_id=ObjectId()), "__dict__"))
+
+        def collects_fields_of_bases():
+            # then
+            self.assertEqual(
+                list(Expansion.__fields__),
+                ["_id", "created_at", "updated_at", "name", "genres", "rating", "base_game_id"]
+            )
+            self.assertEqual(Game.__fields__["genres"], List[ObjectId])
+
+        def keeps_class_variables():
+            # then
+            self.assertEqual(Game.collection, "games")
+            self.assertNotIn("collection", Game.__fields__)
+
+        tests = [
+            generates_slots_from_fields,
+            collects_fields_of_bases,
+            keeps_class_variables
+        ]
+
+        self.run_subtests(tests)
+
+    def test_document(self):
+        genre_id = ObjectId()
+
+        def applies_defaults():
+            # when
+            game = Game(name="Game", genres=[genre_id])
+
+            # then
+            self.assertIsNone(game.rating)
+
+        def serializes_slots():
+            # given
+            expansion = Expansion(name="Expansion", genres=[genre_id], base_game_id=genre_id)
+
+            # when
+            result = expansion.to_json()
+
+            # then
+            self.assertEqual(result, {
+                "_id": str(expansion._id),
+                "created_at": str(expansion.created_at),
+                "updated_at": str(expansion.updated_at),
+                "name": "Expansion",
+                "genres": [str(genre_id)],
+                "rating": None,
+                "base_game_id": str(genre_id)
+            })
+            self.assertEqual(expansion.to_bson(ignore=["rating"])["genres"], [genre_id])
+
+        def skips_unset_slots():
+            # given
+            game = Game.__new__(Game)
+            game.name = "Partial"
+
+            # when
+            result = game.to_json()
+
+            # then
+            self.assertEqual(result, {"name": "Partial"})
+            self.assertEqual(get_fields(game), {"name": "Partial"})
+
+        def clones():
+            # given
+            game = Game(name="Game", genres=[genre_id])
+
+            # when
+            clone = game.clone()
+
+            # then
+            self.assertNotEqual(clone._id, game._id)
+            self.assertEqual(clone.genres, game.genres)
+            self.assertIsNot(clone.genres, game.genres)
+
+        tests = [
+            applies_defaults,
+            serializes_slots,
+            skips_unset_slots,
+            clones
+        ]
+
+        self.run_subtests(tests)
@@ -0,0 +1,54 @@
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+from app.models.batch import find_many
+from app.models.projection import Projection
+from tests import UnitTest
+
+
+class BatchTestCase(UnitTest):
+
+    def test_find_many(self):
+        collection = MagicMock()
+        first, second, third = ObjectId(), ObjectId(), ObjectId()
+
+        def returns_documents_in_order_of_ids():
+            # given
+            collection.find.return_value = iter([{"_id": third}, {"_id": first}])
+
+            # when
+            batch = find_many(collection, [str(third), first, str(second)], lambda data: data["_id"])
+
+            # then
+            self.assertEqual(batch.items, [third, first])
+            self.assertEqual(batch.missing, [second])
+            self.assertEqual(batch.meta, {"items_found": 2, "missing": [str(second)]})
+            collection.find.assert_called_once_with({"_id": {"$in": [third, first, second]}})
+
+        def reads_repeated_ids_once():
+            # given
+            collection.find.return_value = iter([{"_id": first, "name": "First"}])
+
+            # when
+            batch = find_many(collection, [first, first], lambda data: data["name"], Projection(["name"]))
+
+            # then
+            self.assertEqual(batch.items, ["First"])
+            collection.find.assert_called_once_with({"_id": {"$in": [first]}}, {"name": 1})
+
+        def skips_query_without_ids():
+            # when
+            batch = find_many(collection, [], lambda data: data)
+
+            # then
+            self.assertEqual((batch.items, batch.missing), ([], []))
+            collection.find.assert_not_called()
+
+        tests = [
+            returns_documents_in_order_of_ids,
+            reads_repeated_ids_once,
+            skips_query_without_ids
+        ]
+
+        self.run_subtests(tests, after_each=lambda: collection.reset_mock(return_value=True))
@@ -0,0 +1,158 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+from app.models.pagination import Pagination, find_page
+from app.models.projection import Projection
+from tests import UnitTest
+
+
+def mock_find(documents):
+    collection = MagicMock()
+    collection.find.return_value.sort.return_value.limit.return_value = iter(documents)
+
+    return collection
+
+
+class PaginationTestCase(UnitTest):
+
+    def test_parse(self):
+        def parses_first_page():
+            # when
+            pagination = Pagination.parse("10", None, "-created_at", ["created_at"])
+
+            # then
+            self.assertEqual(pagination.limit, 10)
+            self.assertEqual(pagination.to_sort(), [("created_at", -1), ("_id", -1)])
+            self.assertEqual(pagination.to_query(), {})
+
+        def defaults_to_id():
+            # when
+            pagination = Pagination.parse(None, None, None, [])
+
+            # then
+            self.assertEqual(pagination.limit, Pagination.DEFAULT_LIMIT)
+            self.assertEqual(pagination.to_sort(), [("_id", 1)])
+
+        def parses_cursor_of_previous_page():
+            # given
+            last = {"_id": ObjectId(), "created_at": datetime(2024, 1, 1), "name": "Last"}
+            cursor = Pagination(5, "-created_at").cursor_of(last)
+
+            # when
+            pagination = Pagination.parse("5", cursor, "-created_at", ["created_at"])
+
+            # then
+            self.assertEqual(pagination.to_query(), {"$or": [
+                {"created_at": {"$lt": last["created_at"]}},
+                {"created_at": last["created_at"], "_id": {"$lt": last["_id"]}},
+                {"created_at": None}
+            ]})
+
+        def continues_after_null_sort_key():
+            # given
+            last = {"_id": ObjectId(), "name": "Last"}
+
+            for sort, query in [
+                ("nickname", {"$or": [
+                    {"nickname": {"$ne": None}},
+                    {"nickname": None, "_id": {"$gt": last["_id"]}}
+                ]}),
+                ("-nickname", {"nickname": None, "_id": {"$lt": last["_id"]}})
+            ]:
+                cursor = Pagination(5, sort).cursor_of(last)
+
+                # when
+                pagination = Pagination.parse("5", cursor, sort, ["nickname"])
+
+                # then
+                self.assertEqual(pagination.to_query(), query)
+
+        def rejects_invalid_parameters():
+            cursor = Pagination(5, "name").cursor_of({"_id": ObjectId(), "name": "Last"})
+
+            for limit, after, sort in [
+                ("0", None, None),
+                ("101", None, None),
+                ("ten", None, None),
+                (None, None, "password"),
+                (None, "not a cursor", None),
+                (None, cursor, "-name"),
+            ]:
+                with self.assertRaises(ValueError):
+                    Pagination.parse(limit, after, sort, ["name"])
+
+        tests = [
+            parses_first_page,
+            defaults_to_id,
+            parses_cursor_of_previous_page,
+            continues_after_null_sort_key,
+            rejects_invalid_parameters
+        ]
+
+        self.run_subtests(tests)
+
+    def test_find_page(self):
+        documents = [{"_id": ObjectId(), "name": f"Tag {i}"} for i in range(3)]
+
+        def reads_one_more_document_for_next_cursor():
+            # given
+            collection = mock_find(documents)
+            pagination = Pagination(2, "name")
+
+            # when
+            page = find_page(collection, {}, pagination, lambda item: item["name"])
+
+            # then
+            self.assertEqual(page.items, ["Tag 0", "Tag 1"])
+            self.assertEqual(Pagination.parse("2", page.next_cursor, "name", ["name"]).after,
+                             ("Tag 1", documents[1]["_id"]))
+            collection.find.assert_called_once_with({})
+            collection.find.return_value.sort.return_value.limit.assert_called_once_with(3)
+
+        def returns_last_page_without_next_cursor():
+            # given
+            collection = mock_find(documents)
+
+            # when
+            page = find_page(collection, {}, Pagination(3), lambda item: item)
+
+            # then
+            self.assertEqual(len(page.items), 3)
+            self.assertIsNone(page.next_cursor)
+            self.assertEqual(page.meta, {"limit": 3, "sort": "_id", "items_on_page": 3, "next_cursor": None})
+
+        def reads_after_previous_page():
+            # given
+            collection = mock_find([])
+            pagination = Pagination(2, "_id", (documents[1]["_id"], documents[1]["_id"]))
+
+            # when
+            find_page(collection, {"enabled": True}, pagination, lambda item: item)
+
+            # then
+            collection.find.assert_called_once_with(
+                {"$and": [{"enabled": True}, {"_id": {"$gt": documents[1]["_id"]}}]}
+            )
+
+        def reads_sort_key_with_projection():
+            # given
+            collection = mock_find([dict(document) for document in documents])
+
+            # when
+            page = find_page(collection, {}, Pagination(2, "name"), lambda item: item, Projection(["created_at"]))
+
+            # then
+            collection.find.assert_called_once_with({}, {"created_at": 1, "name": 1})
+            self.assertEqual(page.items, [{"_id": documents[0]["_id"]}, {"_id": documents[1]["_id"]}])
+            self.assertIsNotNone(page.next_cursor)
+
+        tests = [
+            reads_one_more_document_for_next_cursor,
+            returns_last_page_without_next_cursor,
+            reads_after_previous_page,
+            reads_sort_key_with_projection
+        ]
+
+        self.run_subtests(tests)
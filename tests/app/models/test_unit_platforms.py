@@ -127,7 +127,7 @@ class PlatformTestCase(UnitTest):
             self.assertEqual(result.name, updated_platform.name)
             collection_mock.find_one_and_update.assert_called_once_with(
                 {'_id': platform_id},
-                {'$set': update_data.to_bson()},
+                {'$set': update_data.to_bson(), '$currentDate': {'updated_at': True}},
                 return_document=ReturnDocument.AFTER
             )
 
@@ -0,0 +1,279 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.models.pagination import Pagination
+from app.models.product_cards import ProductCard, ProductCardsModel, build_card, find_best_offers
+from app.models.projection import Projection
+from tests import UnitTest
+from tests.app.models.test_unit_products import INDIE_ID, SINGLE_PLAYER_ID, TAG_NAMES, product_data
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+def resolve_names(tag_ids):
+    return [TAG_NAMES[tag_id] for tag_id in tag_ids if tag_id in TAG_NAMES]
+
+
+def offer_data(product_id, prices, promotions=()):
+    return {
+        "_id": ObjectId(),
+        "product_id": product_id,
+        "affiliate_id": ObjectId(),
+        "buy_page_url": "https://store.example.com/game",
+        "prices": [{"currency": currency, "value": value} for currency, value in prices],
+        "promotions": [
+            {"currency": currency, "value": value, "expires_at": expires_at} for currency, value, expires_at in promotions
+        ]
+    }
+
+
+def mock_db(*names):
+    db = MagicMock()
+    collections = {name: MagicMock() for name in names}
+    db.connection.__getitem__.side_effect = collections.__getitem__
+
+    return db, collections
+
+
+def cursor_of(documents):
+    cursor = MagicMock()
+    cursor.sort.return_value = iter(documents)
+
+    return cursor
+
+
+class ProductCardsTestCase(UnitTest):
+
+    def test_find_best_offers(self):
+        product_id = ObjectId()
+
+        def picks_lowest_price_of_every_currency():
+            # given
+            cheap = offer_data(product_id, [("USD", 9.99), ("EUR", 12.0)])
+            expensive = offer_data(product_id, [("USD", 19.99), ("EUR", 11.0)])
+
+            # when
+            best, expire_at = find_best_offers([cheap, expensive], NOW)
+
+            # then
+            self.assertEqual(best["USD"]["affiliate_platform_product_id"], cheap["_id"])
+            self.assertEqual(best["EUR"]["affiliate_platform_product_id"], expensive["_id"])
+            self.assertEqual(best["EUR"]["value"], 11.0)
+            self.assertIsNone(expire_at)
+
+        def counts_promotions_until_they_expire():
+            # given
+            ends = NOW + timedelta(days=1)
+            offer = offer_data(product_id, [("USD", 19.99)], [("USD", 4.99, ends), ("USD", 1.99, NOW)])
+
+            # when
+            best, expire_at = find_best_offers([offer], NOW)
+
+            # then
+            self.assertEqual(best["USD"]["value"], 4.99)
+            self.assertEqual(best["USD"]["expires_at"], ends)
+            self.assertEqual(expire_at, ends)
+
+        tests = [
+            picks_lowest_price_of_every_currency,
+            counts_promotions_until_they_expire
+        ]
+
+        self.run_subtests(tests)
+
+    def test_build_card(self):
+        # given
+        product = product_data()
+        offer = offer_data(product["_id"], [("USD", 9.99)])
+
+        # when
+        card = build_card(product, resolve_names, [offer], NOW)
+
+        # then
+        self.assertEqual(card["_id"], product["_id"])
+        self.assertEqual(card["header_url"], product["media"]["header_url"])
+        self.assertEqual(card["genres"], ["Indie"])
+        self.assertEqual(card["categories"], ["Single-player"])
+        self.assertEqual(card["genre_ids"], [INDIE_ID])
+        self.assertEqual(card["best_offers"]["USD"]["value"], 9.99)
+        self.assertEqual(ProductCard(**card).to_json()["genres"], ["Indie"])
+
+    def test_writes(self):
+        db, collections = mock_db("product_cards", "affiliate_platform_products")
+        cards_mock = collections["product_cards"]
+        offers_mock = collections["affiliate_platform_products"]
+
+        def saves_card_of_product():
+            # given
+            model = ProductCardsModel(db, clock=lambda: NOW)
+            product = product_data()
+            offers_mock.find.return_value = cursor_of([offer_data(product["_id"], [("USD", 9.99)])])
+
+            # when
+            model.save(product, resolve_names)
+
+            # then
+            offers_mock.find.assert_called_once_with({"product_id": product["_id"]}, model.offer_fields)
+            query, card = cards_mock.replace_one.call_args.args
+            self.assertEqual(query, {"_id": product["_id"]})
+            self.assertEqual(card["name"], product["name"])
+            self.assertEqual(card["updated_at"], NOW)
+            self.assertEqual(cards_mock.replace_one.call_args.kwargs, {"upsert": True})
+
+        def updates_names_of_cards_with_tag():
+            # given
+            model = ProductCardsModel(db, clock=lambda: NOW)
+            card_id = ObjectId()
+            cards_mock.find.return_value = iter([
+                {"_id": card_id, "genre_ids": [INDIE_ID], "category_ids": [SINGLE_PLAYER_ID, ObjectId()]}
+            ])
+
+            # when
+            updated = model.update_tag(INDIE_ID, resolve_names)
+
+            # then
+            self.assertEqual(updated, 1)
+            cards_mock.find.assert_called_once_with(
+                {"$or": [{"genre_ids": INDIE_ID}, {"category_ids": INDIE_ID}]},
+                {"genre_ids": 1, "category_ids": 1}
+            )
+            cards_mock.bulk_write.assert_called_once_with([UpdateOne({"_id": card_id}, {"$set": {
+                "genres": ["Indie"],
+                "categories": ["Single-player"],
+                "updated_at": NOW
+            }})], ordered=False)
+
+        def skips_bulk_write_without_cards_with_tag():
+            # given
+            model = ProductCardsModel(db, clock=lambda: NOW)
+            cards_mock.find.return_value = iter([])
+
+            # when
+            model.update_tag(INDIE_ID, resolve_names)
+
+            # then
+            cards_mock.bulk_write.assert_not_called()
+
+        def picks_best_offers_again_once_promotion_expired():
+            # given
+            model = ProductCardsModel(db, clock=lambda: NOW)
+            product = product_data()
+            offer = offer_data(product["_id"], [("USD", 19.99)], [("USD", 4.99, NOW - timedelta(hours=1))])
+            card = build_card(product, resolve_names, [offer], NOW - timedelta(hours=2))
+            cards_mock.find.return_value.sort.return_value.limit.return_value = iter([card])
+
+            # when
+            page = model.find_page({}, Pagination(10), Projection(["name", "best_offers"]))
+
+            # then
+            self.assertEqual(page.items[0].best_offers["USD"]["value"], 19.99)
+            self.assertNotIn("offers_expire_at", page.items[0].to_json())
+            self.assertNotIn("offer_candidates", page.items[0].to_json())
+            cards_mock.find.assert_called_once_with(
+                {}, {"name": 1, "best_offers": 1, "offers_expire_at": 1, "offer_candidates": 1, "_id": 1}
+            )
+            offers_mock.find.assert_not_called()
+            cards_mock.update_one.assert_not_called()
+
+        def drops_expired_best_offers_of_cards_without_candidates():
+            # given
+            model = ProductCardsModel(db, clock=lambda: NOW)
+            product = product_data()
+            offers = [offer_data(product["_id"], [("EUR", 9.99)], [("USD", 4.99, NOW - timedelta(hours=1))])]
+            card = build_card(product, resolve_names, offers, NOW - timedelta(hours=2))
+            del card["offer_candidates"]
+            cards_mock.find.return_value.sort.return_value.limit.return_value = iter([card])
+
+            # when
+            result = model.find_page({}, Pagination(10)).items[0]
+
+            # then
+            self.assertEqual(list(result.best_offers), ["EUR"])
+            self.assertIsNone(result.offers_expire_at)
+            cards_mock.update_one.assert_not_called()
+
+        def reset():
+            cards_mock.reset_mock(return_value=True)
+            offers_mock.reset_mock(return_value=True)
+
+        tests = [
+            saves_card_of_product,
+            updates_names_of_cards_with_tag,
+            skips_bulk_write_without_cards_with_tag,
+            picks_best_offers_again_once_promotion_expired,
+            drops_expired_best_offers_of_cards_without_candidates
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    def test_check(self):
+        db, collections = mock_db("product_cards", "affiliate_platform_products", "products")
+        products = [product_data() for _ in range(4)]
+        products.sort(key=lambda product: product["_id"])
+
+        def reports_missing_stale_and_orphaned_cards():
+            # given
+            model = ProductCardsModel(db, clock=lambda: NOW)
+            cards = [build_card(product, resolve_names, [], NOW) | {"updated_at": NOW} for product in products]
+            cards[2]["name"] = "Outdated name"
+            orphan = build_card(product_data() | {"_id": ObjectId()}, resolve_names, [], NOW)
+
+            collections["affiliate_platform_products"].find.return_value = cursor_of([])
+            collections["products"].find.return_value = cursor_of(products)
+            collections["product_cards"].find.return_value = cursor_of([cards[0], cards[2], cards[3], orphan])
+
+            # when
+            report = model.check(resolve_names)
+
+            # then
+            self.assertEqual(report, {
+                "missing": [products[1]["_id"]],
+                "stale": [products[2]["_id"]],
+                "orphaned": [orphan["_id"]]
+            })
+
+        def builds_cards_with_offers_of_their_products():
+            # given
+            model = ProductCardsModel(db, clock=lambda: NOW)
+            offers = [
+                offer_data(ObjectId("000000000000000000000000"), [("USD", 1.99)]),
+                offer_data(products[1]["_id"], [("USD", 19.99)]),
+                offer_data(products[1]["_id"], [("USD", 9.99)]),
+                offer_data(products[3]["_id"], [("USD", 4.99)]),
+            ]
+            cards = [
+                build_card(product, resolve_names, [offer for offer in offers if offer["product_id"] == product["_id"]],
+                           NOW)
+                for product in products
+            ]
+
+            collections["affiliate_platform_products"].find.return_value = cursor_of(offers)
+            collections["products"].find.return_value = cursor_of(products)
+            collections["product_cards"].find.return_value = cursor_of(cards)
+
+            # when
+            report = model.check(resolve_names)
+
+            # then
+            self.assertEqual(report, {"missing": [], "stale": [], "orphaned": []})
+            self.assertEqual(cards[1]["best_offers"]["USD"]["value"], 9.99)
+            collections["affiliate_platform_products"].find.assert_called_once_with(
+                {"product_id": {"$type": "objectId"}}, model.offer_fields
+            )
+            collections["affiliate_platform_products"].find.return_value.sort.assert_called_once_with(
+                [("product_id", 1), ("_id", 1)]
+            )
+
+        def reset():
+            for collection in collections.values():
+                collection.reset_mock(return_value=True)
+
+        tests = [
+            reports_missing_stale_and_orphaned_cards,
+            builds_cards_with_offers_of_their_products
+        ]
+
+        self.run_subtests(tests, after_each=reset)
@@ -0,0 +1,355 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+from app.models.pagination import Pagination
+from app.models.product_catalog import ProductCatalog
+from app.models.product_search import SearchFilters
+from tests import UnitTest
+
+NOW = datetime(2024, 1, 1, 12)
+INDIE_ID = ObjectId()
+RPG_ID = ObjectId()
+
+
+def product_data(name, minutes=0, **fields):
+    return {
+        "_id": ObjectId(),
+        "name": name,
+        "genres": [INDIE_ID],
+        "categories": [],
+        "platforms_os": ["windows"],
+        "supported_languages": ["English"],
+        "platforms": {"steam": "https://store.steampowered.com"},
+        "is_free": False,
+        "required_age": 0,
+        "price": {"USD": {"currency": "USD", "initial": 1999, "final": 1999}},
+        "created_at": NOW + timedelta(minutes=minutes),
+        "updated_at": NOW + timedelta(minutes=minutes),
+    } | fields
+
+
+class ProductCatalogTestCase(UnitTest):
+
+    def test_find_page(self):
+        db = MagicMock()
+        products = db.connection.__getitem__.return_value
+        data = [
+            product_data("Hades", 0, genres=[INDIE_ID, RPG_ID], platforms_os=["windows", "mac"]),
+            product_data("Celeste", 1, platforms_os=["linux"], price={"USD": {"final": 499}}),
+            product_data("Disco Elysium", 2, genres=[RPG_ID], required_age=18, platforms={"gog": "https://gog.com"}),
+            product_data("Dota 2", 3, genres=[], is_free=True, price={}),
+        ]
+        products.find.return_value = data
+        catalog = ProductCatalog(db, max_age=60, clock=lambda: 0)
+
+        def matches_any_value_of_every_filter():
+            # when
+            page, count = catalog.find_page(
+                SearchFilters(genres=(RPG_ID, INDIE_ID), platforms_os=("mac", "linux")), Pagination(10, "name")
+            )
+
+            # then
+            self.assertEqual(count, 2)
+            self.assertEqual(page.items, [data[1]["_id"], data[0]["_id"]])
+
+        def matches_ranges_of_age_and_price():
+            # when
+            by_age, _ = catalog.find_page(SearchFilters(required_age=16), Pagination(10, "created_at"))
+            by_price, _ = catalog.find_page(SearchFilters(price_min=100, price_max=1000), Pagination(10))
+            by_currency, _ = catalog.find_page(SearchFilters(price_max=1000, currency="EUR"), Pagination(10))
+
+            # then
+            self.assertEqual(by_age.items, [data[0]["_id"], data[1]["_id"], data[3]["_id"]])
+            self.assertEqual(by_price.items, [data[1]["_id"]])
+            self.assertEqual(by_currency.items, [])
+
+        def matches_stores_and_free_products():
+            # when
+            on_gog, _ = catalog.find_page(SearchFilters(platforms=("gog",)), Pagination(10))
+            free, _ = catalog.find_page(SearchFilters(is_free=True), Pagination(10))
+
+            # then
+            self.assertEqual(on_gog.items, [data[2]["_id"]])
+            self.assertEqual(free.items, [data[3]["_id"]])
+
+        def pages_through_matches_with_cursors():
+            # given
+            first, _ = catalog.find_page(SearchFilters(), Pagination(3, "-created_at"))
+            after = Pagination.parse("3", first.next_cursor, "-created_at", ProductCatalog.sort_fields)
+
+            # when
+            second, count = catalog.find_page(SearchFilters(), after)
+            skipped, _ = catalog.find_page(SearchFilters(), Pagination(2, "-created_at"), skip=2)
+
+            # then
+            self.assertEqual(first.items, [data[3]["_id"], data[2]["_id"], data[1]["_id"]])
+            self.assertEqual(second.items, [data[0]["_id"]])
+            self.assertIsNone(second.next_cursor)
+            self.assertEqual(count, 4)
+            self.assertEqual(skipped.items, [data[1]["_id"], data[0]["_id"]])
+
+        def reads_no_products_while_catalog_is_fresh():
+            # when
+            catalog.find_page(SearchFilters(), Pagination())
+
+            # then
+            products.find.assert_not_called()
+
+        tests = [
+            matches_any_value_of_every_filter,
+            matches_ranges_of_age_and_price,
+            matches_stores_and_free_products,
+            pages_through_matches_with_cursors,
+            reads_no_products_while_catalog_is_fresh
+        ]
+
+        self.run_subtests(tests, after_each=products.find.reset_mock)
+
+    def test_facets(self):
+        db = MagicMock()
+        products = db.connection.__getitem__.return_value
+        data = [
+            product_data("Hades", genres=[INDIE_ID, RPG_ID]),
+            product_data("Celeste", price={"USD": {"final": 499}}),
+            product_data("Disco Elysium", genres=[RPG_ID], required_age=18),
+            product_data("Dota 2", genres=[], is_free=True, price={"USD": {"final": 0}}),
+        ]
+        products.find.return_value = data
+        catalog = ProductCatalog(db, max_age=60, clock=lambda: 0)
+
+        def counts_values_without_own_filter():
+            # when
+            facets, exact = catalog.facets(
+                SearchFilters(genres=(RPG_ID,), required_age=16), ["genres", "required_age", "is_free"]
+            )
+
+            # then
+            self.assertTrue(exact)
+            self.assertEqual(facets["genres"], [{"value": INDIE_ID, "count": 2}, {"value": RPG_ID, "count": 1}])
+            self.assertEqual(facets["required_age"], [{"value": 0, "count": 1}, {"value": 18, "count": 1}])
+            self.assertEqual(facets["is_free"], [{"value": False, "count": 1}])
+
+        def counts_price_ranges():
+            # when
+            facets, _ = catalog.facets(SearchFilters(), ["price"])
+
+            # then
+            self.assertEqual(facets["price"], [
+                {"min": 0, "max": 1, "count": 1},
+                {"min": 1, "max": 500, "count": 1},
+                {"min": 1000, "max": 2000, "count": 2},
+            ])
+
+        def counts_within_matches_of_search():
+            # when
+            facets, _ = catalog.facets(SearchFilters(), ["genres"], [data[0]["_id"].binary, data[3]["_id"].binary])
+
+            # then
+            self.assertEqual(facets["genres"], [{"value": INDIE_ID, "count": 1}, {"value": RPG_ID, "count": 1}])
+
+        def matches_ids_of_search():
+            # when
+            matches = catalog.matcher(SearchFilters(genres=(RPG_ID,)))
+
+            # then
+            self.assertEqual([matches(product["_id"].binary) for product in data], [True, False, True, False])
+            self.assertFalse(matches(ObjectId().binary))
+
+        tests = [
+            counts_values_without_own_filter,
+            counts_price_ranges,
+            counts_within_matches_of_search,
+            matches_ids_of_search
+        ]
+
+        self.run_subtests(tests)
+
+    def test_writes(self):
+        db = MagicMock()
+        products = db.connection.__getitem__.return_value
+        hades = product_data("Hades")
+        celeste = product_data("Celeste", 1)
+
+        def patches_rows_of_written_products():
+            # given
+            catalog = ProductCatalog(db, max_age=60, clock=lambda: 0)
+            products.find.return_value = [hades]
+            catalog.refresh()
+
+            # when
+            catalog.save(hades | {"genres": [RPG_ID]})
+            catalog.save_many([celeste])
+            page, count = catalog.find_page(SearchFilters(genres=(RPG_ID,)), Pagination())
+
+            # then
+            self.assertEqual(page.items, [hades["_id"]])
+            self.assertEqual(count, 1)
+            self.assertEqual(catalog.stats()["products"], 2)
+
+        def clears_rows_of_deleted_products():
+            # given
+            catalog = ProductCatalog(db, max_age=60, clock=lambda: 0)
+            products.find.return_value = [hades, celeste]
+            catalog.refresh()
+
+            # when
+            catalog.delete(hades["_id"])
+            page, count = catalog.find_page(SearchFilters(genres=(INDIE_ID,)), Pagination())
+            facets, _ = catalog.facets(SearchFilters(), ["genres"])
+
+            # then
+            self.assertEqual(page.items, [celeste["_id"]])
+            self.assertEqual(count, 1)
+            self.assertEqual(facets["genres"], [{"value": INDIE_ID, "count": 1}])
+
+        def ignores_writes_until_built():
+            # given
+            catalog = ProductCatalog(db)
+
+            # when
+            catalog.save(hades)
+
+            # then
+            self.assertEqual(catalog.stats()["products"], 0)
+
+        def reads_products_written_since_last_refresh():
+            # given
+            catalog = ProductCatalog(db)
+            products.find.return_value = [hades, celeste]
+            catalog.refresh()
+            moved = celeste | {"platforms_os": ["linux"], "updated_at": NOW + timedelta(minutes=5)}
+            products.find.return_value = [moved]
+            products.estimated_document_count.return_value = 2
+
+            # when
+            catalog.refresh()
+
+            # then
+            products.find.assert_called_with({"updated_at": {"$gte": NOW + timedelta(minutes=1) - timedelta(seconds=5)}},
+                                             ProductCatalog.product_fields)
+            self.assertEqual(catalog.find_page(SearchFilters(platforms_os=("linux",)), Pagination())[1], 1)
+            self.assertEqual(catalog.stats()["updated_since"], NOW + timedelta(minutes=5))
+
+        def drops_deleted_products_once_counts_differ():
+            # given
+            catalog = ProductCatalog(db)
+            products.find.return_value = [hades, celeste]
+            catalog.refresh()
+            products.find.side_effect = [[], [{"_id": celeste["_id"]}]]
+            products.estimated_document_count.return_value = 1
+
+            # when
+            catalog.refresh()
+
+            # then
+            products.find.assert_called_with({}, {"_id": 1})
+            self.assertEqual(catalog.stats()["products"], 1)
+
+        def rebuilds_once_most_rows_are_deleted():
+            # given
+            catalog = ProductCatalog(db)
+            products.find.return_value = [hades, celeste]
+            catalog.refresh()
+            catalog.delete_many([hades["_id"], celeste["_id"]])
+            products.find.return_value = [celeste]
+
+            # when
+            catalog.refresh()
+
+            # then
+            products.find.assert_called_with({}, ProductCatalog.product_fields)
+            self.assertEqual(catalog.stats()["rows"], 1)
+
+        def keeps_watermark_of_refreshes_on_writes():
+            # given
+            catalog = ProductCatalog(db)
+            products.find.return_value = [hades, celeste]
+            catalog.refresh()
+
+            # when
+            catalog.save(hades | {"updated_at": NOW + timedelta(minutes=10)})
+
+            # then
+            self.assertEqual(catalog.stats()["updated_since"], celeste["updated_at"])
+
+        def keeps_later_writes_over_products_read_by_refresh():
+            # given
+            catalog = ProductCatalog(db)
+            products.find.return_value = [hades]
+            catalog.refresh()
+            catalog.save(hades | {"genres": [RPG_ID], "updated_at": NOW + timedelta(minutes=10)})
+            products.find.return_value = [hades | {"updated_at": NOW + timedelta(minutes=5)}]
+            products.estimated_document_count.return_value = 1
+
+            # when
+            catalog.refresh()
+
+            # then
+            self.assertEqual(catalog.find_page(SearchFilters(genres=(RPG_ID,)), Pagination())[1], 1)
+
+        def replays_writes_made_while_rebuilding():
+            # given
+            catalog = ProductCatalog(db)
+
+            def read_while_written(*args):
+                yield hades
+                catalog.save(celeste)
+                catalog.delete(hades["_id"])
+
+            products.find.side_effect = read_while_written
+
+            # when
+            catalog.refresh()
+
+            # then
+            page, count = catalog.find_page(SearchFilters(), Pagination())
+            self.assertEqual(page.items, [celeste["_id"]])
+            self.assertEqual(count, 1)
+
+        def reads_rows_while_refreshing_in_background():
+            # given
+            now = [0]
+            refreshes = []
+            catalog = ProductCatalog(db, max_age=60, clock=lambda: now[0], spawn=refreshes.append)
+            products.find.return_value = [hades]
+            catalog.refresh()
+            products.find.reset_mock()
+            now[0] = 60
+
+            # when
+            _, count = catalog.find_page(SearchFilters(), Pagination())
+            catalog.find_page(SearchFilters(), Pagination())
+
+            # then
+            self.assertEqual(count, 1)
+            self.assertEqual(len(refreshes), 1)
+            products.find.assert_not_called()
+
+            # when
+            products.find.return_value = [celeste]
+            products.estimated_document_count.return_value = 2
+            refreshes[0]()
+
+            # then
+            self.assertEqual(catalog.find_page(SearchFilters(), Pagination())[1], 2)
+            self.assertEqual(len(refreshes), 1)
+
+        def reset():
+            products.reset_mock(return_value=True, side_effect=True)
+
+        tests = [
+            patches_rows_of_written_products,
+            clears_rows_of_deleted_products,
+            ignores_writes_until_built,
+            reads_products_written_since_last_refresh,
+            drops_deleted_products_once_counts_differ,
+            rebuilds_once_most_rows_are_deleted,
+            keeps_watermark_of_refreshes_on_writes,
+            keeps_later_writes_over_products_read_by_refresh,
+            replays_writes_made_while_rebuilding,
+            reads_rows_while_refreshing_in_background
+        ]
+
+        self.run_subtests(tests, after_each=reset)
@@ -0,0 +1,301 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+from app.models.pagination import Pagination
+from app.models.product_index import ProductIndex
+from tests import UnitTest
+
+NOW = datetime(2024, 1, 1, 12)
+ROGUELIKE_ID = ObjectId()
+
+
+def product_data(name, minutes=0, **fields):
+    return {
+        "_id": ObjectId(),
+        "name": name,
+        "short_description": "",
+        "genres": [ROGUELIKE_ID],
+        "created_at": NOW + timedelta(minutes=minutes),
+        "updated_at": NOW + timedelta(minutes=minutes),
+    } | fields
+
+
+class ProductIndexTestCase(UnitTest):
+
+    def test_search(self):
+        db = MagicMock()
+        products = db.connection.__getitem__.return_value
+        tags = MagicMock()
+        tags.get.return_value = {ROGUELIKE_ID: "Roguelike"}
+        data = [
+            product_data("Hades", 0, short_description="Battle out of hell", developers=["Supergiant Games"]),
+            product_data("Hades II", 1),
+            product_data("Dead Cells", 2, short_description="A roguelike inspired by Hades"),
+            product_data("Celeste", 3, genres=[]),
+        ]
+        products.find.return_value = data
+        index = ProductIndex(db, tags, max_age=60, clock=lambda: 0)
+
+        def ranks_matches_with_bm25():
+            # when
+            page, count = index.search(["hades"], Pagination(10, "-score"))
+
+            # then
+            self.assertEqual(count, 3)
+            self.assertEqual(page.items[2], data[2]["_id"])
+            self.assertIsNone(page.next_cursor)
+
+        def indexes_developers_and_tag_names():
+            # when
+            by_developer, _ = index.search(["supergiant"], Pagination(10, "-score"))
+            by_tag, count = index.search(["roguelike"], Pagination(10, "name"))
+
+            # then
+            self.assertEqual(by_developer.items, [data[0]["_id"]])
+            self.assertEqual(count, 3)
+            self.assertEqual(by_tag.items, [data[2]["_id"], data[0]["_id"], data[1]["_id"]])
+
+        def pages_through_matches_with_cursors():
+            # given
+            first, _ = index.search(["hades"], Pagination(2, "-created_at"))
+            after = Pagination.parse("2", first.next_cursor, "-created_at", ProductIndex.sort_fields)
+
+            # when
+            second, count = index.search(["hades"], after)
+
+            # then
+            self.assertEqual(first.items, [data[2]["_id"], data[1]["_id"]])
+            self.assertEqual(second.items, [data[0]["_id"]])
+            self.assertIsNone(second.next_cursor)
+            self.assertEqual(count, 3)
+
+        def reads_no_products_while_index_is_fresh():
+            # when
+            index.search(["celeste"], Pagination(10, "-score"))
+
+            # then
+            products.find.assert_not_called()
+
+        tests = [
+            ranks_matches_with_bm25,
+            indexes_developers_and_tag_names,
+            pages_through_matches_with_cursors,
+            reads_no_products_while_index_is_fresh
+        ]
+
+        self.run_subtests(tests, after_each=products.find.reset_mock)
+
+    def test_refresh(self):
+        db = MagicMock()
+        products = db.connection.__getitem__.return_value
+        tags = MagicMock()
+        tags.get.return_value = {ROGUELIKE_ID: "Roguelike"}
+        hades = product_data("Hades")
+        celeste = product_data("Celeste", 1)
+
+        def reads_products_written_since_last_refresh():
+            # given
+            index = ProductIndex(db, tags)
+            products.find.return_value = [hades, celeste]
+            index.refresh()
+            renamed = celeste | {"name": "Celeste Classic", "updated_at": NOW + timedelta(minutes=5)}
+            products.find.return_value = [renamed]
+            products.estimated_document_count.return_value = 2
+
+            # when
+            index.refresh()
+
+            # then
+            products.find.assert_called_with({"updated_at": {"$gte": NOW + timedelta(minutes=1) - timedelta(seconds=5)}},
+                                             ProductIndex.product_fields)
+            self.assertEqual(index.search(["classic"], Pagination())[0].items, [celeste["_id"]])
+            self.assertEqual(index.stats()["products"], 2)
+            self.assertEqual(index.stats()["updated_since"], NOW + timedelta(minutes=5))
+
+        def drops_deleted_products_once_counts_differ():
+            # given
+            index = ProductIndex(db, tags)
+            products.find.return_value = [hades, celeste]
+            index.refresh()
+            products.find.side_effect = [[], [{"_id": celeste["_id"]}]]
+            products.estimated_document_count.return_value = 1
+
+            # when
+            index.refresh()
+
+            # then
+            products.find.assert_called_with({}, {"_id": 1})
+            self.assertEqual(index.stats()["products"], 1)
+
+        def indexes_products_of_renamed_tag_again():
+            # given
+            index = ProductIndex(db, tags)
+            products.find.return_value = [hades]
+            index.refresh()
+            tags.get.return_value = {ROGUELIKE_ID: "Roguelite"}
+            products.find.side_effect = [[], [hades]]
+            products.estimated_document_count.return_value = 1
+
+            # when
+            index.refresh()
+
+            # then
+            products.find.assert_called_with(
+                {"$or": [{"genres": {"$in": [ROGUELIKE_ID]}}, {"categories": {"$in": [ROGUELIKE_ID]}}]},
+                ProductIndex.product_fields
+            )
+            self.assertEqual(index.search(["roguelite"], Pagination())[0].items, [hades["_id"]])
+            self.assertEqual(index.search(["roguelike"], Pagination())[0].items, [])
+
+        def refreshes_on_search_once_too_old():
+            # given
+            now = [0]
+            index = ProductIndex(db, tags, max_age=5, clock=lambda: now[0], spawn=lambda refresh: refresh())
+            products.find.return_value = [hades]
+            products.estimated_document_count.return_value = 1
+            index.search(["hades"], Pagination())
+
+            # when
+            now[0] = 4
+            index.search(["hades"], Pagination())
+            calls_when_fresh = products.find.call_count
+            now[0] = 5
+            index.search(["hades"], Pagination())
+
+            # then
+            self.assertEqual(calls_when_fresh, 1)
+            self.assertEqual(products.find.call_count, 2)
+
+        def searches_snapshot_while_refreshing():
+            # given
+            now = [0]
+            refreshes = []
+            index = ProductIndex(db, tags, max_age=5, clock=lambda: now[0], spawn=refreshes.append)
+            products.find.return_value = [hades]
+            products.estimated_document_count.return_value = 2
+            index.search(["hades"], Pagination())
+            products.find.return_value = [hades, celeste]
+
+            # when
+            now[0] = 5
+            before, _ = index.search(["celeste"], Pagination())
+            index.search(["celeste"], Pagination())
+            refreshes[0]()
+            after, _ = index.search(["celeste"], Pagination())
+
+            # then
+            self.assertEqual(before.items, [])
+            self.assertEqual(len(refreshes), 1)
+            self.assertEqual(after.items, [celeste["_id"]])
+
+        def reset():
+            products.reset_mock(return_value=True, side_effect=True)
+            tags.get.return_value = {ROGUELIKE_ID: "Roguelike"}
+
+        def indexes_written_products_right_away():
+            # given
+            index = ProductIndex(db, tags, max_age=60, clock=lambda: 0)
+            products.find.return_value = [hades, celeste]
+            index.refresh()
+
+            # when
+            index.save(celeste | {"name": "Celeste Classic"})
+            index.delete(hades["_id"])
+
+            # then
+            self.assertEqual(index.search(["classic"], Pagination())[0].items, [celeste["_id"]])
+            self.assertEqual(index.search(["hades"], Pagination())[0].items, [])
+            self.assertEqual(index.suggest("hades", 10), [])
+            self.assertEqual(products.find.call_count, 1)
+
+        def keeps_watermark_of_refreshes_on_writes():
+            # given
+            index = ProductIndex(db, tags, max_age=60, clock=lambda: 0)
+            products.find.return_value = [hades, celeste]
+            index.refresh()
+
+            # when
+            index.save(celeste | {"updated_at": NOW + timedelta(minutes=10)})
+
+            # then
+            self.assertEqual(index.stats()["updated_since"], celeste["updated_at"])
+
+        def ignores_writes_until_built():
+            # given
+            index = ProductIndex(db, tags)
+
+            # when
+            index.save(hades)
+
+            # then
+            self.assertEqual(index.stats()["products"], 0)
+
+        tests = [
+            indexes_written_products_right_away,
+            keeps_watermark_of_refreshes_on_writes,
+            ignores_writes_until_built,
+            reads_products_written_since_last_refresh,
+            drops_deleted_products_once_counts_differ,
+            indexes_products_of_renamed_tag_again,
+            refreshes_on_search_once_too_old,
+            searches_snapshot_while_refreshing
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    def test_suggest(self):
+        db = MagicMock()
+        collections = {"products": MagicMock(), "product_comments": MagicMock()}
+        db.connection.__getitem__.side_effect = collections.__getitem__
+        tags = MagicMock()
+        tags.get.return_value = {}
+        gta = product_data("Grand Theft Auto V", slug="gta-5")
+        grandia = product_data("Grandia", 1, slug="grandia")
+        theft = product_data("Thief", 2, slug="thief")
+        collections["products"].find.return_value = [gta, grandia, theft]
+        collections["products"].estimated_document_count.return_value = 3
+        collections["product_comments"].aggregate.return_value = [
+            {"_id": gta["_id"], "count": 5}, {"_id": None, "count": 7}
+        ]
+        now = [0]
+        index = ProductIndex(db, tags, max_age=5, popularity_max_age=60, clock=lambda: now[0],
+                             spawn=lambda refresh: refresh())
+
+        def suggests_most_commented_products_first():
+            # when
+            suggestions = index.suggest("Grand", 10)
+
+            # then
+            self.assertEqual(suggestions, [
+                {"_id": gta["_id"], "name": "Grand Theft Auto V", "slug": "gta-5"},
+                {"_id": grandia["_id"], "name": "Grandia", "slug": "grandia"},
+            ])
+
+        def suggests_by_word_of_name_and_slug():
+            # then
+            self.assertEqual([item["_id"] for item in index.suggest("th", 10)], [gta["_id"], theft["_id"]])
+            self.assertEqual([item["_id"] for item in index.suggest("GTA 5", 10)], [gta["_id"]])
+            self.assertEqual(index.suggest("", 10), [])
+
+        def counts_popularity_again_once_too_old():
+            # given
+            collections["product_comments"].aggregate.return_value = [{"_id": grandia["_id"], "count": 9}]
+
+            # when
+            fresh = index.suggest("grand", 1)
+            now[0] = 60
+            counted = index.suggest("grand", 1)
+
+            # then
+            self.assertEqual(fresh[0]["_id"], gta["_id"])
+            self.assertEqual(counted[0]["_id"], grandia["_id"])
+
+        tests = [
+            suggests_most_commented_products_first,
+            suggests_by_word_of_name_and_slug,
+            counts_popularity_again_once_too_old
+        ]
+
+        self.run_subtests(tests)
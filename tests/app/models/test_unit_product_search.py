@@ -0,0 +1,349 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+from pymongo import ReplaceOne
+
+from app.models.pagination import Pagination
+from app.models.product_search import ProductSearchModel, SearchFilters, build_entry
+from lib.cache import Cache
+from tests import UnitTest
+
+NOW = datetime(2024, 1, 1, 12)
+
+
+class ProductSearchTestCase(UnitTest):
+
+    def test_build_entry(self):
+        # given
+        indie_id = ObjectId()
+        product = {"_id": ObjectId(), "name": "Hades", "short_description": "Defy the god of the dead!",
+                   "created_at": NOW, "genres": [indie_id], "platforms_os": ["windows"], "is_free": False,
+                   "platforms": {"steam": "https://store.steampowered.com/app/1145360"}, "required_age": 12, "price": {"USD": {"currency": "USD", "final": 2499}, "EUR": None}}
+
+        # when
+        entry = build_entry(product)
+
+        # then
+        self.assertEqual(entry["title"], " hades ")
+        self.assertEqual(entry["text"], " hades defy the god of the dead ")
+        self.assertIn("^go", entry["grams"])
+        self.assertIn("dea", entry["grams"])
+        self.assertEqual(entry["created_at"], NOW)
+        self.assertEqual(entry["genres"], [indie_id])
+        self.assertEqual(entry["categories"], [])
+        self.assertEqual(entry["platforms_os"], ["windows"])
+        self.assertEqual(entry["platforms"], ["steam"])
+        self.assertEqual([entry["is_free"], entry["required_age"]], [False, 12])
+        self.assertEqual(entry["prices"], [{"currency": "USD", "final": 2499}])
+
+    def test_filters(self):
+        indie_id = ObjectId()
+        filters = SearchFilters(genres=(indie_id,), platforms_os=("windows", "linux"), is_free=False, required_age=16,
+                                price_max=1999, currency="EUR")
+
+        def lists_selected_facets():
+            # when
+            selected = filters.selected()
+
+            # then
+            self.assertEqual(selected, ["genres", "platforms_os", "is_free", "required_age", "price"])
+            self.assertEqual(SearchFilters().selected(), [])
+
+        def matches_any_value_of_every_filter():
+            # when
+            query = filters.query()
+
+            # then
+            self.assertEqual(query, {
+                "genres": {"$in": [indie_id]},
+                "platforms_os": {"$in": ["windows", "linux"]},
+                "is_free": False,
+                "required_age": {"$lte": 16},
+                "prices": {"$elemMatch": {"currency": "EUR", "final": {"$lte": 1999}}}
+            })
+
+        def leaves_out_excluded_facet():
+            # when
+            query = filters.query(exclude="platforms_os")
+
+            # then
+            self.assertNotIn("platforms_os", query)
+            self.assertIn("genres", query)
+
+        def matches_filters_and_words():
+            # when
+            query = ProductSearchModel.match(["hades"], filters)
+
+            # then
+            self.assertEqual(query, filters.query() | ProductSearchModel.match(["hades"]))
+            self.assertEqual(ProductSearchModel.match([], filters), filters.query())
+
+        tests = [
+            lists_selected_facets,
+            matches_any_value_of_every_filter,
+            leaves_out_excluded_facet,
+            matches_filters_and_words
+        ]
+
+        self.run_subtests(tests)
+
+    def test_search(self):
+        db = MagicMock()
+        collection = db.connection.__getitem__.return_value
+        model = ProductSearchModel(db, clock=lambda: NOW)
+
+        def parses_and_caps_query_words():
+            # when
+            query_words = model.parse("Counter-Strike " + "go " * 20)
+
+            # then
+            self.assertEqual(query_words, ["counter", "strike"] + ["go"] * 8)
+
+        def matches_grams_then_words():
+            # when
+            query = model.match(["go", "dead"])
+
+            # then
+            self.assertEqual(query, {
+                "grams": {"$all": ["^go", "dea", "ead"]},
+                "$expr": {"$and": [
+                    {"$gte": [{"$indexOfCP": ["$text", " go"]}, 0]},
+                    {"$gte": [{"$indexOfCP": ["$text", "dead"]}, 0]}
+                ]}
+            })
+
+        def reads_page_sorted_by_relevance():
+            # given
+            ids = [ObjectId() for _ in range(3)]
+            collection.aggregate.return_value = [{"_id": ids[0], "score": 4}, {"_id": ids[1], "score": 2},
+                                                 {"_id": ids[2], "score": 2}]
+
+            # when
+            page = model.find_page(["hades"], Pagination(2, "-score"))
+
+            # then
+            self.assertEqual(page.items, ids[:2])
+            self.assertIsNotNone(page.next_cursor)
+            pipeline = collection.aggregate.call_args.args[0]
+            self.assertEqual(pipeline[0], {"$match": model.match(["hades"])})
+            self.assertEqual(pipeline[1], {"$addFields": {"score": model.score(["hades"])}})
+            self.assertEqual(pipeline[2:], [
+                {"$sort": {"score": -1, "_id": -1}},
+                {"$limit": 3},
+                {"$project": {"_id": 1, "score": 1}}
+            ])
+
+        def reads_page_sorted_by_field_without_score():
+            # given
+            collection.aggregate.return_value = []
+
+            # when
+            page = model.find_page(["hades"], Pagination(2, "created_at"))
+
+            # then
+            self.assertEqual(page.items, [])
+            self.assertIsNone(page.next_cursor)
+            pipeline = collection.aggregate.call_args.args[0]
+            self.assertNotIn("$addFields", [next(iter(stage)) for stage in pipeline])
+
+        def upserts_entries_of_products():
+            # given
+            product = {"_id": ObjectId(), "name": "Hades"}
+
+            # when
+            model.save_many([product])
+
+            # then
+            collection.bulk_write.assert_called_once_with(
+                [ReplaceOne({"_id": product["_id"]}, build_entry(product) | {"updated_at": NOW}, upsert=True)],
+                ordered=False
+            )
+
+        def reset():
+            collection.reset_mock(return_value=True, side_effect=True)
+
+        tests = [
+            parses_and_caps_query_words,
+            matches_grams_then_words,
+            reads_page_sorted_by_relevance,
+            reads_page_sorted_by_field_without_score,
+            upserts_entries_of_products
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    def test_count(self):
+        db = MagicMock()
+        collection = db.connection.__getitem__.return_value
+        model = ProductSearchModel(db, clock=lambda: NOW, counts=Cache(maxsize=16, ttl=30))
+
+        def counts_query_once_until_product_is_written():
+            # given
+            collection.count_documents.return_value = 42
+
+            # when
+            counts = [model.count(["counter", "strike"]) for _ in range(3)]
+            model.delete(ObjectId())
+            counts.append(model.count(["counter", "strike"]))
+
+            # then
+            self.assertEqual(counts, [42] * 4)
+            self.assertEqual(collection.count_documents.call_count, 2)
+            collection.count_documents.assert_called_with(model.match(["counter", "strike"]))
+
+        def counts_up_to_limit():
+            # given
+            collection.count_documents.return_value = 1000
+
+            # when
+            exact = model.count(["game"])
+            approx = model.count(["game"], 1000)
+
+            # then
+            self.assertEqual([exact, approx], [1000, 1000])
+            self.assertEqual(collection.count_documents.call_count, 2)
+            collection.count_documents.assert_called_with(model.match(["game"]), limit=1000)
+
+        def reset():
+            collection.reset_mock(return_value=True, side_effect=True)
+            model.counts.clear()
+
+        tests = [
+            counts_query_once_until_product_is_written,
+            counts_up_to_limit
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    def test_needs_rebuild(self):
+        db = MagicMock()
+        entries = MagicMock()
+        products = MagicMock()
+        db.connection.__getitem__.side_effect = lambda name: entries if name == "product_search" else products
+        model = ProductSearchModel(db, clock=lambda: NOW)
+
+        def needs_rebuild_while_entries_are_missing():
+            # given
+            entries.estimated_document_count.return_value = 0
+            products.estimated_document_count.return_value = 3
+
+            # when
+            result = model.needs_rebuild()
+
+            # then
+            self.assertTrue(result)
+            entries.find_one.assert_not_called()
+
+        def needs_rebuild_while_entries_miss_fields():
+            # given
+            entries.estimated_document_count.return_value = 3
+            products.estimated_document_count.return_value = 3
+            entries.find_one.return_value = {"_id": ObjectId()}
+
+            # when
+            result = model.needs_rebuild()
+
+            # then
+            self.assertTrue(result)
+            entries.find_one.assert_called_once_with({"platforms": {"$exists": False}}, {"_id": 1})
+
+        def needs_no_rebuild_once_entries_are_complete():
+            # given
+            entries.estimated_document_count.return_value = 3
+            products.estimated_document_count.return_value = 3
+            entries.find_one.return_value = None
+
+            # when
+            result = model.needs_rebuild()
+
+            # then
+            self.assertFalse(result)
+
+        def reset():
+            entries.reset_mock(return_value=True, side_effect=True)
+            products.reset_mock(return_value=True, side_effect=True)
+
+        tests = [
+            needs_rebuild_while_entries_are_missing,
+            needs_rebuild_while_entries_miss_fields,
+            needs_no_rebuild_once_entries_are_complete
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    def test_facets(self):
+        db = MagicMock()
+        collection = db.connection.__getitem__.return_value
+        model = ProductSearchModel(db, clock=lambda: NOW)
+        indie_id = ObjectId()
+
+        def counts_facets_with_single_aggregation():
+            # given
+            filters = SearchFilters(genres=(indie_id,), is_free=True)
+            collection.aggregate.return_value = iter([{
+                "scanned": [{"count": 12}],
+                "genres": [{"_id": indie_id, "count": 7}],
+                "is_free": [{"_id": True, "count": 12}, {"_id": False, "count": 3}],
+                "price": [{"_id": 0, "count": 12}, {"_id": 5000, "count": 1}],
+            }])
+
+            # when
+            facets, exact = model.facets(["hades"], filters, ["genres", "is_free", "price"])
+
+            # then
+            self.assertTrue(exact)
+            self.assertEqual(facets, {
+                "genres": [{"value": indie_id, "count": 7}],
+                "is_free": [{"value": True, "count": 12}, {"value": False, "count": 3}],
+                "price": [{"min": 0, "max": 1, "count": 12}, {"min": 5000, "max": None, "count": 1}],
+            })
+            collection.aggregate.assert_called_once()
+            pipeline = collection.aggregate.call_args.args[0]
+            # the entries that match at least all filters but the one of a facet
+            self.assertEqual(pipeline[0], {"$match": model.match(["hades"]) | {"$or": [
+                {"is_free": True}, {"genres": {"$in": [indie_id]}}, {"genres": {"$in": [indie_id]}, "is_free": True}
+            ]}})
+            self.assertEqual(pipeline[1], {"$limit": model.max_facet_entries})
+            branches = pipeline[2]["$facet"]
+            self.assertEqual(branches["genres"][0], {"$match": {"is_free": True}})
+            self.assertEqual(branches["is_free"][0], {"$match": {"genres": {"$in": [indie_id]}}})
+            self.assertEqual(branches["price"][0], {"$match": filters.query()})
+
+        def reports_approximate_counts_once_bound_is_reached():
+            # given
+            collection.aggregate.return_value = iter([{"scanned": [{"count": model.max_facet_entries}], "genres": []}])
+
+            # when
+            facets, exact = model.facets([], SearchFilters(), ["genres"])
+
+            # then
+            self.assertFalse(exact)
+            self.assertEqual(facets, {"genres": []})
+            pipeline = collection.aggregate.call_args.args[0]
+            self.assertEqual(pipeline[0], {"$match": {}})
+            self.assertEqual(pipeline[2]["$facet"]["genres"], [
+                {"$unwind": "$genres"},
+                {"$sortByCount": "$genres"},
+                {"$limit": model.max_facet_values}
+            ])
+
+        def skips_aggregation_without_facets():
+            # when
+            facets, exact = model.facets(["hades"], SearchFilters(), [])
+
+            # then
+            self.assertEqual(facets, {})
+            self.assertTrue(exact)
+            collection.aggregate.assert_not_called()
+
+        def reset():
+            collection.reset_mock(return_value=True, side_effect=True)
+
+        tests = [
+            counts_facets_with_single_aggregation,
+            reports_approximate_counts_once_bound_is_reached,
+            skips_aggregation_without_facets
+        ]
+
+        self.run_subtests(tests, after_each=reset)
@@ -0,0 +1,523 @@
+from unittest.mock import patch, MagicMock
+
+import bson
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from bson.raw_bson import RawBSONDocument
+
+from app.models.products import ProductsModel, Product, ProductCreate, ProductPatch
+from app.models.projection import Projection
+from app.models.tags import TagNames
+from lib.cache import Cache
+from tests import UnitTest
+from tests.mocks.database import mock_collection
+from tests.utils.commands import collection_commands
+
+INDIE_ID = ObjectId()
+SINGLE_PLAYER_ID = ObjectId()
+TAG_NAMES = {INDIE_ID: "Indie", SINGLE_PLAYER_ID: "Single-player"}
+
+
+def product_data():
+    return {
+        "_id": ObjectId(),
+        "type": "game",
+        "name": "Test Game",
+        "slug": "test-game",
+        "required_age": 0,
+        "short_description": "short",
+        "detailed_description": "detailed",
+        "is_free": False,
+        "platforms": {"steam": "https://store.steampowered.com/app/1/"},
+        "price": {"USD": {"currency": "USD", "initial": 1999, "final": 999, "final_formatted": "$9.99"}},
+        "supported_languages": ["English"],
+        "media": {
+            "header_url": "https://cdn.example.com/header.jpg",
+            "background_url": "https://cdn.example.com/background.jpg",
+            "screenshots": [{"thumbnail_url": "thumbnail.jpg", "full_url": "full.jpg"}],
+            "movies": []
+        },
+        "requirements": {"windows": {"minimum": {"minimum": "Windows 10"}, "recommended": None}},
+        "developers": ["Studio"],
+        "publishers": ["Publisher"],
+        "platforms_os": ["windows"],
+        "categories": [SINGLE_PLAYER_ID],
+        "genres": [INDIE_ID],
+        "release_date": {"date": "1 Jan, 2024", "coming_soon": False}
+    }
+
+
+def create_model(db: MagicMock, cache: Cache = None) -> ProductsModel:
+    tags = MagicMock()
+    tags.names = TagNames(lambda: TAG_NAMES)
+
+    return ProductsModel(db, tags=tags, cards=MagicMock(), search=MagicMock(), cache=cache)
+
+
+class ProductsTestCase(UnitTest):
+
+    @patch("app.models.products.Database")
+    def test_get_product(self, db: MagicMock):
+        collection_mock = mock_collection(db, 'products')
+        raw_collection_mock = db.raw_connection["products"]
+
+        def gets_and_returns_a_product():
+            # given
+            model = create_model(db)
+            data = product_data()
+            collection_mock.find_one.return_value = data
+
+            # when
+            result = model.get(str(data["_id"]))
+
+            # then
+            self.assertIsInstance(result, Product)
+            self.assertEqual(result.media, data["media"])
+            self.assertEqual(result.genres, ["Indie"])
+            self.assertEqual(result.categories, ["Single-player"])
+            collection_mock.find_one.assert_called_once_with({"_id": data["_id"]})
+            collection_mock.aggregate.assert_not_called()
+            raw_collection_mock.find_one.assert_not_called()
+
+        def reads_raw_documents_when_lazy():
+            # given
+            model = create_model(db)
+            data = product_data()
+            raw_collection_mock.find_one.return_value = RawBSONDocument(bson.encode(data))
+
+            # when
+            result = model.get(str(data["_id"]), lazy=True)
+
+            # then
+            self.assertIsInstance(result.media, RawBSONDocument)
+            self.assertEqual(result.media.raw, bson.encode(data["media"]))
+            self.assertEqual(result.genres, ["Indie"])
+            self.assertEqual(result.to_json(), Product(**(data | {"genres": ["Indie"], "categories": ["Single-player"]})).to_json())
+            self.assertEqual(result.to_bson()["media"].raw, bson.encode(data["media"]))
+            collection_mock.find_one.assert_not_called()
+
+        def returns_none_when_not_found():
+            # given
+            model = create_model(db)
+            raw_collection_mock.find_one.return_value = None
+
+            # when
+            result = model.get(str(ObjectId()), lazy=True)
+
+            # then
+            self.assertIsNone(result)
+
+        def reads_projected_fields():
+            # given
+            model = create_model(db)
+            data = product_data()
+            collection_mock.find_one.return_value = {"_id": data["_id"], "name": data["name"]}
+
+            # when
+            result = model.get(str(data["_id"]), projection=Projection(["name"]))
+
+            # then
+            collection_mock.find_one.assert_called_once_with({"_id": data["_id"]}, {"name": 1})
+            self.assertEqual(result.to_json(), {"_id": str(data["_id"]), "name": data["name"]})
+
+        def resolves_projected_tags():
+            # given
+            model = create_model(db)
+            data = product_data()
+            collection_mock.find_one.return_value = {"_id": data["_id"], "genres": data["genres"]}
+
+            # when
+            result = model.get(str(data["_id"]), projection=Projection(["genres"]))
+
+            # then
+            self.assertEqual(result.to_json(), {"_id": str(data["_id"]), "genres": ["Indie"]})
+
+        def reset():
+            collection_mock.reset_mock()
+            raw_collection_mock.reset_mock()
+
+        tests = [
+            gets_and_returns_a_product,
+            reads_raw_documents_when_lazy,
+            returns_none_when_not_found,
+            reads_projected_fields,
+            resolves_projected_tags
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    @patch("app.models.products.Database")
+    def test_get_many(self, db: MagicMock):
+        collection_mock = mock_collection(db, 'products')
+
+        def gets_products_in_order_of_ids():
+            # given
+            model = create_model(db)
+            first, second = product_data(), product_data()
+            missing_id = ObjectId()
+            collection_mock.find.return_value = iter([first, second])
+
+            # when
+            batch = model.get_many([str(second["_id"]), str(missing_id), str(first["_id"])])
+
+            # then
+            self.assertEqual([product._id for product in batch.items], [second["_id"], first["_id"]])
+            self.assertEqual(batch.items[0].genres, ["Indie"])
+            self.assertEqual(batch.missing, [missing_id])
+            collection_mock.find.assert_called_once_with({"_id": {"$in": [second["_id"], missing_id, first["_id"]]}})
+
+        def keeps_tag_ids_unless_resolved():
+            # given
+            model = create_model(db)
+            data = product_data()
+            collection_mock.find.return_value = iter([{"_id": data["_id"], "genres": data["genres"]}])
+
+            # when
+            batch = model.get_many([data["_id"]], projection=Projection(["genres"]), resolve_tags=False)
+
+            # then
+            self.assertEqual(batch.items[0].genres, [INDIE_ID])
+            collection_mock.find.assert_called_once_with({"_id": {"$in": [data["_id"]]}}, {"genres": 1})
+
+        tests = [
+            gets_products_in_order_of_ids,
+            keeps_tag_ids_unless_resolved
+        ]
+
+        self.run_subtests(tests, after_each=lambda: collection_mock.reset_mock(return_value=True))
+
+    @patch("app.models.products.Database")
+    def test_get_product_by_slug(self, db: MagicMock):
+        raw_collection_mock = db.raw_connection["products"]
+
+        def reads_raw_documents_when_lazy():
+            # given
+            model = create_model(db)
+            data = product_data()
+            raw_collection_mock.find_one.return_value = RawBSONDocument(bson.encode(data))
+
+            # when
+            result = model.get_by_slug(data["slug"], lazy=True)
+
+            # then
+            self.assertEqual(result.slug, data["slug"])
+            self.assertEqual(result.release_date.date, data["release_date"]["date"])
+            self.assertIsInstance(result.requirements, RawBSONDocument)
+            self.assertEqual(result.categories, ["Single-player"])
+            raw_collection_mock.find_one.assert_called_once_with({"slug": data["slug"]})
+
+        tests = [
+            reads_raw_documents_when_lazy
+        ]
+
+        self.run_subtests(tests, after_each=raw_collection_mock.reset_mock)
+
+    @patch("app.models.products.Database")
+    def test_cache(self, db: MagicMock):
+        collection_mock = mock_collection(db, 'products')
+
+        def reads_products_through_cache():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            data = product_data()
+            collection_mock.find_one.return_value = data
+
+            # when
+            first = model.get(str(data["_id"]))
+            second = model.get(str(data["_id"]))
+            by_slug = model.get_by_slug(data["slug"])
+            model.get_by_slug(data["slug"])
+
+            # then
+            self.assertIs(first, second)
+            self.assertEqual(by_slug.to_json(), first.to_json())
+            self.assertEqual(collection_mock.find_one.call_count, 2)
+            self.assertEqual(model.cache.stats()["hits"], 2)
+            self.assertEqual(model.cache.stats()["misses"], 2)
+
+        def skips_cache_for_projected_reads():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            data = product_data()
+            collection_mock.find_one.return_value = {"_id": data["_id"], "name": data["name"]}
+
+            # when
+            model.get(str(data["_id"]), projection=Projection(["name"]))
+            model.get(str(data["_id"]), projection=Projection(["name"]))
+
+            # then
+            self.assertEqual(collection_mock.find_one.call_count, 2)
+            self.assertEqual(model.cache.stats()["size"], 0)
+
+        def does_not_cache_missing_products():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            collection_mock.find_one.return_value = None
+
+            # when
+            model.get_by_slug("missing")
+            model.get_by_slug("missing")
+
+            # then
+            self.assertEqual(collection_mock.find_one.call_count, 2)
+
+        def invalidates_product_on_patch():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            data = product_data()
+            collection_mock.find_one.return_value = data
+            collection_mock.find_one_and_update.return_value = data
+            model.get(str(data["_id"]))
+            model.get_by_slug(data["slug"])
+
+            # when
+            model.patch(str(data["_id"]), ProductPatch(name="Renamed"))
+
+            # then
+            self.assertEqual(model.cache.stats()["size"], 0)
+
+        def invalidates_product_on_delete():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            data = product_data()
+            collection_mock.find_one.return_value = data
+            model.get_by_slug(data["slug"])
+
+            # when
+            model.delete(str(data["_id"]))
+
+            # then
+            self.assertEqual(model.cache.stats()["size"], 0)
+
+        def invalidates_cached_miss_of_slug_on_create():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            data = product_data()
+            cached = Product(**(data | {"_id": ObjectId()}))
+            model.cache.set(("slug", data["slug"]), cached)
+
+            # when
+            model.put(Product(**data))
+
+            # then
+            self.assertIsNone(model.cache.get(("slug", data["slug"])))
+
+        def clears_cache_when_tags_change():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            data = product_data()
+            collection_mock.find_one.return_value = data
+            model.get(str(data["_id"]))
+
+            # when
+            model.tags.names.invalidate()
+            model.get(str(data["_id"]))
+
+            # then
+            self.assertEqual(collection_mock.find_one.call_count, 2)
+
+        tests = [
+            reads_products_through_cache,
+            skips_cache_for_projected_reads,
+            does_not_cache_missing_products,
+            invalidates_product_on_patch,
+            invalidates_product_on_delete,
+            invalidates_cached_miss_of_slug_on_create,
+            clears_cache_when_tags_change
+        ]
+
+        self.run_subtests(tests, after_each=collection_mock.reset_mock)
+
+    @patch("app.models.products.Database")
+    def test_update_cards(self, db: MagicMock):
+        collection_mock = mock_collection(db, 'products')
+
+        def updates_card_on_write():
+            # given
+            model = create_model(db)
+            model.results = MagicMock()
+            model.catalog = MagicMock()
+            model.index = MagicMock()
+            data = product_data()
+            collection_mock.find_one_and_update.return_value = data
+
+            # when
+            product = model.patch(str(data["_id"]), ProductPatch(name="Renamed"))
+            model.delete(str(data["_id"]))
+
+            # then
+            self.assertEqual(product.genres, ["Indie"])
+            self.assertEqual(collection_commands(collection_mock), ["find_one_and_update", "delete_one"])
+            model.cards.save_many.assert_called_once_with([data], model.tags.names.resolve)
+            model.cards.delete_many.assert_called_once_with([data["_id"]])
+            model.search.save_many.assert_called_once_with([data])
+            model.search.delete_many.assert_called_once_with([data["_id"]])
+            model.catalog.save_many.assert_called_once_with([data])
+            model.catalog.delete_many.assert_called_once_with([data["_id"]])
+            model.index.save_many.assert_called_once_with([data])
+            model.index.delete_many.assert_called_once_with([data["_id"]])
+            self.assertEqual(model.results.invalidate.call_count, 2)
+
+        def writes_without_in_memory_models():
+            # given
+            model = create_model(db)
+            data = product_data()
+            collection_mock.find_one_and_update.return_value = data
+
+            # when
+            model.patch(str(data["_id"]), ProductPatch(name="Renamed"))
+
+            # then
+            self.assertIsNone(model.catalog)
+            self.assertIsNone(model.index)
+            model.cards.save_many.assert_called_once_with([data], model.tags.names.resolve)
+
+        tests = [
+            updates_card_on_write,
+            writes_without_in_memory_models
+        ]
+
+        self.run_subtests(tests)
+
+    @patch("app.models.products.Database")
+    def test_create_many(self, db: MagicMock):
+        collection_mock = mock_collection(db, 'products')
+
+        def product_create(name):
+            data = product_data() | {"name": name, "slug": ""}
+            del data["_id"]
+            return ProductCreate(**data)
+
+        def creates_products_with_unique_slugs():
+            # given
+            model = create_model(db)
+            collection_mock.find.side_effect = [
+                iter([{"slug": "test-game"}]),
+                iter([{"slug": "test-game-2"}])
+            ]
+
+            # when
+            products, errors = model.create_many([product_create("Test Game"), product_create("Other"), product_create("Test Game")])
+
+            # then
+            self.assertEqual([product.slug for product in products], ["test-game-3", "other", "test-game-4"])
+            self.assertEqual(errors, {})
+            self.assertEqual(collection_mock.find.call_args_list[1].args[0], {"$or": [{"slug": {"$regex": "^test\\-game-[0-9]+$"}}]})
+            documents = collection_mock.insert_many.call_args.args[0]
+            self.assertEqual([document["slug"] for document in documents], ["test-game-3", "other", "test-game-4"])
+            self.assertEqual(collection_mock.insert_many.call_args.kwargs, {"ordered": False})
+            model.cards.save_many.assert_called_once_with(documents, model.tags.names.resolve)
+
+        def reports_products_that_failed_to_insert():
+            # given
+            model = create_model(db)
+            collection_mock.find.return_value = iter([])
+            collection_mock.insert_many.side_effect = BulkWriteError({
+                "writeErrors": [{"index": 1, "code": 11000, "errmsg": "duplicate key"}]
+            })
+
+            # when
+            products, errors = model.create_many([product_create("First"), product_create("Second")])
+
+            # then
+            self.assertEqual(errors, {1: "duplicate key"})
+            written, _ = model.cards.save_many.call_args.args
+            self.assertEqual([document["slug"] for document in written], ["first"])
+
+        def reset():
+            collection_mock.reset_mock(return_value=True, side_effect=True)
+
+        tests = [
+            creates_products_with_unique_slugs,
+            reports_products_that_failed_to_insert
+        ]
+
+        self.run_subtests(tests, after_each=reset)
+
+    @patch("app.models.products.Database")
+    def test_bulk_writes(self, db: MagicMock):
+        collection_mock = mock_collection(db, 'products')
+
+        def patches_products_with_one_bulk_write():
+            # given
+            model = create_model(db, Cache(maxsize=8, ttl=60))
+            data = product_data()
+            missing_id = ObjectId()
+            model.cache.set(("id", data["_id"]), Product(**data))
+            collection_mock.find.return_value = iter([data | {"name": "Renamed"}])
+
+            # when
+            products, errors = model.patch_many([
+                (str(data["_id"]), ProductPatch(name="Renamed")),
+                (str(missing_id), ProductPatch(is_free=True))
+            ])
+
+            # then
+            self.assertEqual(products[0].name, "Renamed")
+            self.assertEqual(products[0].genres, ["Indie"])
+            self.assertEqual(products[0].categories, ["Single-player"])
+            self.assertIsNone(products[1])
+            self.assertEqual(errors, {})
+            collection_mock.bulk_write.assert_called_once_with([
+                UpdateOne({"_id": data["_id"]}, {"$set": {"name": "Renamed"}, "$currentDate": {"updated_at": True}}),
+                UpdateOne({"_id": missing_id}, {"$set": {"is_free": True}, "$currentDate": {"updated_at": True}})
+            ], ordered=False)
+            collection_mock.find.assert_called_once_with({"_id": {"$in": [data["_id"], missing_id]}})
+            collection_mock.update_one.assert_not_called()
+            self.assertIsNone(model.cache.get(("id", data["_id"])))
+            model.cards.save_many.assert_called_once_with([data | {"name": "Renamed"}], model.tags.names.resolve)
+
+        def patches_in_batches():
+            # given
+            model = create_model(db)
+            model.batch_size = 2
+            collection_mock.find.side_effect = lambda *args: iter([])
+
+            # when
+            products, _ = model.patch_many([(str(ObjectId()), ProductPatch(name=str(i))) for i in range(3)])
+
+            # then
+            self.assertEqual(products, [None, None, None])
+            self.assertEqual(collection_mock.bulk_write.call_count, 2)
+
+        def deletes_existing_products():
+            # given
+            model = create_model(db)
+            existing_id, missing_id = ObjectId(), ObjectId()
+            collection_mock.find.return_value = iter([{"_id": existing_id}])
+            collection_mock.delete_many.return_value.deleted_count = 1
+
+            # when
+            deleted = model.delete_many([str(existing_id), str(missing_id)])
+
+            # then
+            self.assertEqual(deleted, [True, False])
+            collection_mock.delete_many.assert_called_once_with({"_id": {"$in": [existing_id]}})
+            model.cards.delete_many.assert_called_once_with([existing_id])
+
+        def reports_products_deleted_in_between_as_not_deleted():
+            # given
+            model = create_model(db)
+            first_id, second_id = ObjectId(), ObjectId()
+            collection_mock.find.return_value = iter([{"_id": first_id}, {"_id": second_id}])
+            collection_mock.delete_many.return_value.deleted_count = 1
+
+            # when
+            deleted = model.delete_many([str(first_id), str(second_id)])
+
+            # then
+            self.assertEqual(deleted, [False, False])
+            model.cards.delete_many.assert_called_once_with([first_id, second_id])
+
+        def reset():
+            collection_mock.reset_mock(return_value=True, side_effect=True)
+
+        tests = [
+            patches_products_with_one_bulk_write,
+            patches_in_batches,
+            deletes_existing_products,
+            reports_products_deleted_in_between_as_not_deleted
+        ]
+
+        self.run_subtests(tests, after_each=reset)
@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+from bson import ObjectId
+
+from app.models.products import Product
+from app.models.projection import Projection, build_document, find, find_one
+from app.models.tags import Tag
+from tests import UnitTest
+
+
+class ProjectionTestCase(UnitTest):
+
+    def test_parse(self):
+        def parses_fields():
+            # when
+            projection = Projection.parse("name, slug,media.header_url", Product)
+
+            # then
+            self.assertEqual(projection.to_mongo(), {"name": 1, "slug": 1, "media.header_url": 1})
+            self.assertTrue(projection.includes("media"))
+            self.assertTrue(projection.includes("_id"))
+            self.assertFalse(projection.includes("genres"))
+
+        def returns_none_without_fields():
+            # then
+            self.assertIsNone(Projection.parse(None, Product))
+            self.assertIsNone(Projection.parse(" , ", Product))
+
+        def drops_colliding_paths():
+            # when
+            projection = Projection.parse("media.header_url,media,name,name", Product)
+
+            # then
+            self.assertEqual(projection.to_mongo(), {"name": 1, "media": 1})
+
+        def rejects_unknown_fields():
+            # then
+            for value in ["password", "name,email", "media..header_url", "media.$", "$where"]:
+                with self.assertRaises(ValueError):
+                    Projection.parse(value, Product)
+
+        tests = [
+            parses_fields,
+            returns_none_without_fields,
+            drops_colliding_paths,
+            rejects_unknown_fields
+        ]
+
+        self.run_subtests(tests)
+
+    def test_build_document(self):
+        data = {"_id": ObjectId(), "name": "tag"}
+
+        def builds_full_documents_without_projection():
+            # when
+            tag = build_document(Tag, data, None)
+
+            # then
+            self.assertEqual(tag.to_json()["name"], "tag")
+            self.assertIn("created_at", tag.to_json())
+
+        def builds_partial_documents_with_projection():
+            # when
+            tag = build_document(Tag, data, Projection(["name"]))
+
+            # then
+            self.assertEqual(tag.to_json(), {"_id": str(data["_id"]), "name": "tag"})
+
+        tests = [
+            builds_full_documents_without_projection,
+            builds_partial_documents_with_projection
+        ]
+
+        self.run_subtests(tests)
+
+    def test_find(self):
+        collection = MagicMock()
+        query = {"name": "tag"}
+
+        def reads_all_fields_without_projection():
+            # when
+            find(collection, query, None)
+            find_one(collection, query, None)
+
+            # then
+            collection.find.assert_called_once_with(query)
+            collection.find_one.assert_called_once_with(query)
+
+        def reads_projected_fields():
+            # when
+            find(collection, query, Projection(["name"]))
+            find_one(collection, query, Projection(["name"]))
+
+            # then
+            collection.find.assert_called_once_with(query, {"name": 1})
+            collection.find_one.assert_called_once_with(query, {"name": 1})
+
+        tests = [
+            reads_all_fields_without_projection,
+            reads_projected_fields
+        ]
+
+        self.run_subtests(tests, after_each=collection.reset_mock)
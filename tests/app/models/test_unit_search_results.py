@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+from app.models.search_results import SearchResults
+from app.models.tags import TagNames
+from lib.cache import Cache
+from tests import UnitTest
+
+
+class SearchResultsTestCase(UnitTest):
+
+    def test_get_or_load(self):
+        tags = TagNames(dict)
+        results = SearchResults(tags, Cache(maxsize=16, ttl=30))
+        load = MagicMock()
+
+        def searches_once_until_invalidated():
+            # given
+            load.return_value = (["Counter-Strike"], {"total_count": 1})
+
+            # when
+            found = [results.get_or_load("counter", ("counter", 1), load) for _ in range(3)]
+            results.invalidate()
+            found.append(results.get_or_load("counter", ("counter", 1), load))
+
+            # then
+            self.assertEqual(found, [load.return_value] * 4)
+            self.assertEqual(load.call_count, 2)
+
+        def searches_again_once_tags_change():
+            # given
+            load.return_value = (["Counter-Strike"], {"total_count": 1})
+            results.get_or_load("counter", ("counter", 1), load)
+
+            # when
+            tags.invalidate()
+            results.get_or_load("counter", ("counter", 1), load)
+
+            # then
+            self.assertEqual(load.call_count, 2)
+
+        def does_not_cache_search_started_before_write():
+            # given
+            def search_during_write():
+                results.invalidate()
+                return ["Counter-Strike"], {"total_count": 1}
+
+            load.side_effect = search_during_write
+
+            # when
+            results.get_or_load("counter", ("counter", 1), load)
+            results.get_or_load("counter", ("counter", 1), load)
+
+            # then
+            self.assertEqual(load.call_count, 2)
+
+        def counts_hits_and_misses_of_most_searched_queries():
+            # given
+            counted = SearchResults(tags, Cache(maxsize=16, ttl=30), tracked_queries=2)
+            load.return_value = ([], {"total_count": 0})
+
+            # when
+            for page in (1, 1, 1, 2):
+                counted.get_or_load("rpg", ("rpg", page), load)
+            for query in ("", "", "roguelike", "zelda", "mario"):
+                counted.get_or_load(query, (query, 1), load)
+            stats = counted.stats()
+
+            # then
+            self.assertEqual(stats["queries"], [
+                {"query": "rpg", "hits": 2, "misses": 2},
+                {"query": "", "hits": 1, "misses": 1},
+            ])
+            self.assertEqual([stats["hits"], stats["misses"]], [3, 6])
+
+        def searches_every_time_when_disabled():
+            # given
+            disabled = SearchResults(tags)
+            load.return_value = ([], {"total_count": 0})
+
+            # when
+            for _ in range(2):
+                disabled.get_or_load("rpg", ("rpg", 1), load)
+
+            # then
+            self.assertEqual(load.call_count, 2)
+            self.assertEqual(disabled.stats()["queries"], [])
+
+        def reset():
+            load.reset_mock(return_value=True, side_effect=True)
+            results.cache.clear()
+
+        tests = [
+            searches_once_until_invalidated,
+            searches_again_once_tags_change,
+            does_not_cache_search_started_before_write,
+            counts_hits_and_misses_of_most_searched_queries,
+            searches_every_time_when_disabled
+        ]
+
+        self.run_subtests(tests, after_each=reset)
@@ -8,7 +8,7 @@ from app.models.tags import TagsModel
 
 from tests import UnitTest
 from tests.mocks.database import mock_collection
-from app.models.tags import TagCreate, Tag, TagPatch
+from app.models.tags import TagCreate, Tag, TagNames, TagPatch
 
 
 class TagsTestCase(UnitTest):
@@ -19,7 +19,7 @@ class TagsTestCase(UnitTest):
 
         def creates_and_returns_a_tag():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             mock_tag = Tag(name="Test tag")
 
             collection_mock.insert_one.return_value = mock_tag.to_json()
@@ -49,7 +49,7 @@ class TagsTestCase(UnitTest):
 
         def gets_and_returns_tag():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             tag_id = ObjectId()
             mock_tag = Tag(name="Test tag")
             collection_mock.find_one.return_value = mock_tag.to_json()
@@ -63,7 +63,7 @@ class TagsTestCase(UnitTest):
 
         def fails_to_get_tag_because_id_is_invalid():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             invalid_tag_id = "invalid_id"
 
             # when & then
@@ -72,7 +72,7 @@ class TagsTestCase(UnitTest):
 
         def fails_to_get_a_nonexistent_tag():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             nonexistent_tag_id = ObjectId()
             collection_mock.find_one.return_value = None
 
@@ -97,7 +97,7 @@ class TagsTestCase(UnitTest):
 
         def patches_and_returns_updated_tag():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             tag_id = ObjectId()
             updated_tag = Tag(name="Updated tag")
             collection_mock.find_one_and_update.return_value = updated_tag.to_json()
@@ -113,13 +113,14 @@ class TagsTestCase(UnitTest):
             self.assertEqual(result.name, updated_tag.name)
             collection_mock.find_one_and_update.assert_called_once_with(
                 {'_id': tag_id},
-                {'$set': update_data.to_bson()},
+                {'$set': update_data.to_bson(), '$currentDate': {'updated_at': True}},
                 return_document=ReturnDocument.AFTER
             )
+            model.cards.update_tag.assert_called_once_with(tag_id, model.names.resolve)
 
         def fails_to_patch_a_tag_because_id_is_invalid():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             invalid_tag_id = "invalid_id"
             update_data = TagPatch(name="Updated tag")
 
@@ -129,7 +130,7 @@ class TagsTestCase(UnitTest):
 
         def fails_to_patch_a_nonexistent_tag():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             nonexistent_tag_id = ObjectId()
             update_data = TagPatch(name="Updated tag")
             collection_mock.find_one_and_update.return_value = None
@@ -152,7 +153,7 @@ class TagsTestCase(UnitTest):
 
         def deletes_and_confirms_deletion():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             tag_id = ObjectId()
             mock_tag = Tag(name="Test tag")
             collection_mock.find_one_and_delete.return_value = mock_tag.to_json()
@@ -166,7 +167,7 @@ class TagsTestCase(UnitTest):
 
         def fails_to_delete_a_tag_because_id_is_invalid():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             invalid_tag_id = "invalid_id"
 
             # when & then
@@ -175,7 +176,7 @@ class TagsTestCase(UnitTest):
 
         def fails_to_delete_a_nonexistent_tag():
             # given
-            model = TagsModel(db)
+            model = TagsModel(db, cards=MagicMock())
             nonexistent_tag_id = ObjectId()
             collection_mock.find_one_and_delete.return_value = None
 
@@ -190,3 +191,88 @@ class TagsTestCase(UnitTest):
         ]
 
         self.run_subtests(tests, after_each=collection_mock.reset_mock)
+
+    @patch("app.models.tags.Database")
+    def test_tag_names(self, db: MagicMock):
+        collection_mock = mock_collection(db, 'tags')
+        action, indie = ObjectId(), ObjectId()
+
+        def resolves_names_in_order_of_ids():
+            # given
+            model = TagsModel(db, cards=MagicMock())
+            collection_mock.find.return_value = [{"_id": action, "name": "Action"}, {"_id": indie, "name": "Indie"}]
+
+            # when
+            result = model.names.resolve([indie, action])
+
+            # then
+            self.assertEqual(result, ["Indie", "Action"])
+            collection_mock.find.assert_called_once_with({}, {"name": 1})
+
+        def loads_names_once():
+            # given
+            model = TagsModel(db, cards=MagicMock())
+            collection_mock.find.return_value = [{"_id": action, "name": "Action"}]
+
+            # when
+            model.names.resolve([action])
+            model.names.resolve([action])
+
+            # then
+            collection_mock.find.assert_called_once()
+
+        def reloads_names_after_writes():
+            # given
+            model = TagsModel(db, cards=MagicMock())
+            collection_mock.find.return_value = [{"_id": action, "name": "Action"}]
+            model.names.resolve([action])
+            collection_mock.find_one_and_update.return_value = {"_id": action, "name": "Arcade"}
+            collection_mock.find.return_value = [{"_id": action, "name": "Arcade"}]
+
+            # when
+            model.patch(str(action), TagPatch(name="Arcade"))
+            result = model.names.resolve([action])
+
+            # then
+            self.assertEqual(result, ["Arcade"])
+            self.assertEqual(model.names.version, 1)
+            self.assertEqual(collection_mock.find.call_count, 2)
+
+        def reloads_names_when_expired():
+            # given
+            now = [0.0]
+            loads = [{action: "Action"}, {action: "Arcade"}]
+            names = TagNames(lambda: loads.pop(0), max_age=60, clock=lambda: now[0])
+            names.resolve([action])
+
+            # when
+            now[0] = 61
+            result = names.resolve([action])
+
+            # then
+            self.assertEqual(result, ["Arcade"])
+
+        def reloads_names_of_unknown_tags_at_most_once_per_min_age():
+            # given
+            now = [0.0]
+            loads = [{}, {indie: "Indie"}]
+            names = TagNames(lambda: loads.pop(0), min_age=1, clock=lambda: now[0])
+
+            # when
+            skipped = names.resolve([indie])
+            now[0] = 1
+            result = names.resolve([indie])
+
+            # then
+            self.assertEqual(skipped, [])
+            self.assertEqual(result, ["Indie"])
+
+        tests = [
+            resolves_names_in_order_of_ids,
+            loads_names_once,
+            reloads_names_after_writes,
+            reloads_names_when_expired,
+            reloads_names_of_unknown_tags_at_most_once_per_min_age
+        ]
+
+        self.run_subtests(tests, after_each=lambda: self.reset_mock(collection_mock))
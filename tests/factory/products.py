@@ -13,8 +13,8 @@ class ProductsFactory:
         self.models = models
 
     def cleanup(self, product_id: ObjectId):
-        self.db.connection[self.models.products.collection].delete_one({
-                                                                       "_id": product_id})
+        # deleted through the model, so that the product is dropped from its cache
+        self.models.products.delete(str(product_id))
 
     def create(self, input_data: Union[Product, ProductCreate]):
         if isinstance(input_data, Product):
@@ -1,5 +1,6 @@
 import traceback
 import typing
+from contextlib import contextmanager
 from datetime import datetime
 
 from bson import ObjectId
@@ -11,8 +12,8 @@ from app.main import app
 from app.middlewares.requires_auth import RequiresAuthExtension
 from app.middlewares.requires_role import RequiresRoleExtension
 from app.models import (LoginsModel, ModelsExtension, OperatingSystemsModel,
-                        PlatformsModel, ProductsModel, ProfilesModel,
-                        ServiceProfilesModel, TagsModel, AffiliatesModel, AffiliateReviewsModel)
+                        PlatformsModel, ProductsModel, ProductCardsModel, ProductIndex, ProductCatalog, ProductSearchModel, ProfilesModel,
+                        SearchResults, ServiceProfilesModel, TagsModel, AffiliatesModel, AffiliateReviewsModel)
 from app.models.affiliate_reviews import AffiliateReviewCreate
 from app.models.affiliates import AffiliateCreate
 from app.models.background_jobs import BackgroundJobCreate, BackgroundJobsModel
@@ -32,6 +33,7 @@ from app.register_routes import register_routes
 from app.services import Database, Firebase, ServicesExtension
 from config import app_config
 from config.constants import FirebaseRole
+from lib.cache import Cache
 from tests.factory import (BackgroundJobsFactory, Factory, LoginsFactory,
                            OperatingSystemsFactory, PlatformsFactory,
                            ProductsFactory, ProductCommentsFactory, ProfilesFactory,
@@ -39,11 +41,13 @@ from tests.factory import (BackgroundJobsFactory, Factory, LoginsFactory,
                            PlatformProductsFactory, AffiliatePlatformProductsFactory)
 from tests.factory.product_replies import ProductRepliesFactory
 from tests.fixtures import Fixtures
+from tests.utils.commands import CommandCounter
 
 
 class IntegrationTest(testicles.IntegrationTest):
     _test_cases: list[testicles.IntegrationTest] = []
     _cleanup: typing.Union[typing.Callable, None] = None
+    commands = CommandCounter()
 
     def __init__(self, methodName: str = "runTest") -> None:
         super().__init__(methodName)
@@ -98,6 +102,16 @@ class IntegrationTest(testicles.IntegrationTest):
         self.factory = factory
         self.fixtures = fixtures
 
+    @contextmanager
+    def assert_commands(self, expected: list[str]):
+        """Asserts the MongoDB commands sent within the block, e.g. `["findAndModify"]` for a single round trip
+        """
+        IntegrationTest.commands.reset()
+
+        yield
+
+        self.assertEqual(IntegrationTest.commands.commands, expected)
+
     def setUp(self) -> None:
         app.testing = True
         self.app = app.test_client()
@@ -113,7 +127,7 @@ class IntegrationTest(testicles.IntegrationTest):
             register_routes(app)
             register_middlewares(app)
 
-            db = Database(app_config["MONGO_URI"], timeoutMS=3000)
+            db = Database(app_config["MONGO_URI"], timeoutMS=3000, event_listeners=[IntegrationTest.commands])
             firebase = Firebase(
                 app_config["FB_SERVICE_ACCOUNT"], app_config["FB_API_KEY"])
 
@@ -129,6 +143,13 @@ class IntegrationTest(testicles.IntegrationTest):
             profiles_model = ProfilesModel(firebase=firebase, db=db)
             service_profiles_model = ServiceProfilesModel(
                 firebase=firebase, db=db)
+            product_cards_model = ProductCardsModel(db=db)
+            product_search_model = ProductSearchModel(db=db)
+            tags_model = TagsModel(db=db, cards=product_cards_model)
+            # refreshed on every filter, so that tests find the products that other processes have just written
+            product_catalog = ProductCatalog(db=db, max_age=0, spawn=lambda refresh: refresh())
+            # refreshed before every search, so that tests find the products that other processes have just written
+            product_index = ProductIndex(db=db, tags=tags_model.names, max_age=0, spawn=lambda refresh: refresh())
             models = ModelsExtension(
                 affiliates=AffiliatesModel(db=db),
                 affiliate_reviews=AffiliateReviewsModel(db=db),
@@ -140,12 +161,26 @@ class IntegrationTest(testicles.IntegrationTest):
                     profiles=profiles_model,
                     service_profiles=service_profiles_model
                 ),
-                products=ProductsModel(db=db),
+                products=ProductsModel(
+                    db=db,
+                    tags=tags_model,
+                    cards=product_cards_model,
+                    search=product_search_model,
+                    cache=Cache(app_config["PRODUCTS_CACHE_SIZE"], app_config["PRODUCTS_CACHE_TTL"]),
+                    catalog=product_catalog,
+                    index=product_index
+                ),
+                product_cards=product_cards_model,
+                product_search=product_search_model,
+                product_index=product_index,
+                product_catalog=product_catalog,
+                # not cached, so that searches see the offers that tests write right before them
+                search_results=SearchResults(tags=tags_model.names),
                 product_comments=ProductCommentsModel(db=db),
                 product_replies=ProductRepliesModel(db=db),
                 platform_products=PlatformProductsModel(db=db),
-                affiliate_platform_products=AffiliatePlatformProductsModel(db=db),
-                tags=TagsModel(db=db),
+                affiliate_platform_products=AffiliatePlatformProductsModel(db=db, cards=product_cards_model),
+                tags=tags_model,
                 background_jobs=BackgroundJobsModel(db=db),
                 service_profiles=service_profiles_model
             )
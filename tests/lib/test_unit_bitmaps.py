@@ -0,0 +1,86 @@
+import numpy as np
+
+from lib.bitmaps import BitmapColumn, from_mask, popcount, to_rows, word_count
+from tests import UnitTest
+
+
+class BitmapsTestCase(UnitTest):
+
+    def test_bitmaps(self):
+        def packs_and_lists_rows():
+            # given
+            mask = np.zeros(130, dtype=bool)
+            mask[[0, 63, 64, 129]] = True
+
+            # when
+            bitmap = from_mask(mask, word_count(130))
+
+            # then
+            self.assertEqual(len(bitmap), 3)
+            self.assertEqual(to_rows(bitmap, 130).tolist(), [0, 63, 64, 129])
+            self.assertEqual(to_rows(bitmap, 64).tolist(), [0, 63])
+
+        def counts_set_bits_of_words():
+            # when
+            counts = popcount(np.array([0, 1, 3, 2 ** 64 - 1], dtype=np.uint64))
+
+            # then
+            self.assertEqual(counts.tolist(), [0, 1, 2, 64])
+
+        tests = [
+            packs_and_lists_rows,
+            counts_set_bits_of_words
+        ]
+
+        self.run_subtests(tests)
+
+    def test_column(self):
+        column = BitmapColumn(words=1)
+        column.set(0, ["indie", "rpg"])
+        column.set(1, ["rpg"])
+        column.set(2, ["action"])
+
+        def unites_rows_of_values():
+            # then
+            self.assertEqual(to_rows(column.union(["indie", "action"]), 64).tolist(), [0, 2])
+            self.assertEqual(to_rows(column.union(["zelda"]), 64).tolist(), [])
+
+        def counts_rows_of_values_within_bitmap():
+            # given
+            within = from_mask(np.array([True, True, False]), column.words)
+
+            # then
+            self.assertEqual(column.counts(within), {"indie": 1, "rpg": 2})
+
+        def replaces_values_of_row():
+            # when
+            column.set(0, ["action"])
+
+            # then
+            self.assertEqual(to_rows(column.union(["indie"]), 64).tolist(), [])
+            self.assertEqual(to_rows(column.union(["action"]), 64).tolist(), [0, 2])
+            column.set(0, ["indie", "rpg"])
+
+        def grows_rows_and_values():
+            # given
+            grown = BitmapColumn(words=1)
+
+            # when
+            grown.resize(2)
+            for value in range(20):
+                grown.set(100, [value])
+            grown.set(3, [19])
+
+            # then
+            self.assertEqual(len(grown), 20)
+            self.assertEqual(to_rows(grown.union([19]), 128).tolist(), [3, 100])
+            self.assertEqual(grown.counts(from_mask(np.ones(128, dtype=bool), 2)), {19: 2})
+
+        tests = [
+            unites_rows_of_values,
+            counts_rows_of_values_within_bitmap,
+            replaces_values_of_row,
+            grows_rows_and_values
+        ]
+
+        self.run_subtests(tests)
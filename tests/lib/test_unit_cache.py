@@ -0,0 +1,110 @@
+from lib.cache import Cache
+from tests import UnitTest
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class CacheTestCase(UnitTest):
+
+    def test_get_or_load(self):
+        def loads_once_and_counts_hits():
+            # given
+            cache = Cache(maxsize=2, ttl=60)
+            loads = []
+
+            # when
+            first = cache.get_or_load("a", lambda: loads.append("a") or 1)
+            second = cache.get_or_load("a", lambda: loads.append("a") or 2)
+
+            # then
+            self.assertEqual((first, second), (1, 1))
+            self.assertEqual(loads, ["a"])
+            self.assertEqual(cache.stats(), {
+                "size": 1, "maxsize": 2, "ttl": 60, "hits": 1, "misses": 1, "hit_ratio": 0.5
+            })
+
+        def evicts_least_recently_used():
+            # given
+            cache = Cache(maxsize=2, ttl=60)
+            cache.set("a", 1)
+            cache.set("b", 2)
+            cache.get("a")
+
+            # when
+            cache.set("c", 3)
+
+            # then
+            self.assertEqual(cache.get("a"), 1)
+            self.assertIsNone(cache.get("b"))
+
+        def expires_after_ttl():
+            # given
+            clock = Clock()
+            cache = Cache(maxsize=2, ttl=10, timer=clock)
+            cache.set("a", 1)
+
+            # when
+            clock.now = 11
+
+            # then
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(cache.stats()["size"], 0)
+
+        def drops_loads_started_before_invalidation():
+            # given
+            cache = Cache(maxsize=2, ttl=60)
+
+            def load():
+                # a write lands while the value is being read
+                cache.invalidate("a")
+                return "stale"
+
+            # when
+            value = cache.get_or_load("a", load)
+
+            # then
+            self.assertEqual(value, "stale")
+            self.assertIsNone(cache.get("a"))
+
+        def invalidates_matching_entries():
+            # given
+            cache = Cache(maxsize=4, ttl=60)
+            cache.set("a", 1)
+            cache.set("b", 2)
+
+            # when
+            cache.invalidate_if(lambda key, value: value == 2)
+
+            # then
+            self.assertEqual(cache.get("a"), 1)
+            self.assertIsNone(cache.get("b"))
+
+        def loads_every_time_when_disabled():
+            # given
+            cache = Cache(maxsize=0, ttl=0)
+            loads = []
+
+            # when
+            cache.get_or_load("a", lambda: loads.append("a") or 1)
+            cache.get_or_load("a", lambda: loads.append("a") or 1)
+
+            # then
+            self.assertFalse(cache.enabled)
+            self.assertEqual(loads, ["a", "a"])
+
+        tests = [
+            loads_once_and_counts_hits,
+            evicts_least_recently_used,
+            expires_after_ttl,
+            drops_loads_started_before_invalidation,
+            invalidates_matching_entries,
+            loads_every_time_when_disabled
+        ]
+
+        self.run_subtests(tests)
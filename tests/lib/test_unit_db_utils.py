@@ -0,0 +1,216 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from app.models.base import BaseDocument
+from lib import db_utils
+from lib.db_utils import Serializable, serializer_plan
+from tests import UnitTest
+
+
+@dataclass
+class Nested(Serializable):
+    label: str
+    refs: List[ObjectId]
+
+
+class Document(BaseDocument):
+    title: str
+    count: int
+    tags: List[ObjectId]
+    nested: Optional[Nested]
+    extra: Dict[str, Nested]
+
+    def __init__(self, title: str, count: int, tags: List[ObjectId], nested, extra, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.title = title
+        self.count = count
+        self.tags = tags
+        self.nested = nested
+        self.extra = extra
+
+
+class Bare(Serializable):
+    def __init__(self, value) -> None:
+        self.value = value
+
+
+class CustomBson(Serializable):
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def to_bson(self, ignore: Optional[List[str]] = None):
+        return {"custom": self.value}
+
+
+class SerializerPlansTestCase(UnitTest):
+
+    def test_to_json(self):
+        created_at = datetime(2024, 1, 2, 3, 4, 5)
+        tag_id = ObjectId()
+        nested_id = ObjectId()
+
+        def converts_annotated_fields():
+            # given
+            document = Document(
+                title="Title",
+                count=3,
+                tags=[tag_id],
+                nested=Nested(label="nested", refs=[nested_id]),
+                extra={"key": Nested(label="extra", refs=[])},
+                created_at=created_at,
+                updated_at=created_at
+            )
+
+            # when
+            result = document.to_json()
+
+            # then
+            self.assertEqual(result, {
+                "_id": str(document._id),
+                "created_at": str(created_at),
+                "updated_at": str(created_at),
+                "title": "Title",
+                "count": 3,
+                "tags": [str(tag_id)],
+                "nested": {"label": "nested", "refs": [str(nested_id)]},
+                "extra": {"key": {"label": "extra", "refs": []}},
+            })
+
+        def converts_values_that_do_not_match_annotations():
+            # given
+            document = Document(
+                title=("a", tag_id),
+                count=None,
+                tags={"raw": tag_id},
+                nested={"label": "raw", "refs": [nested_id]},
+                extra=[Bare(value=created_at)],
+                created_at=created_at,
+                updated_at=created_at
+            )
+
+            # when
+            result = document.to_json()
+
+            # then
+            self.assertEqual(result["title"], ["a", str(tag_id)])
+            self.assertIsNone(result["count"])
+            self.assertEqual(result["tags"], {"raw": str(tag_id)})
+            self.assertEqual(result["nested"], {"label": "raw", "refs": [str(nested_id)]})
+            self.assertEqual(result["extra"], [{"value": str(created_at)}])
+
+        def converts_unannotated_attributes():
+            # given
+            thing = Bare(value=[1, 2.5, True, "s", None, {"x": (ObjectId("65022c86878d0eb09c1b7dae"),)}])
+
+            # when
+            result = thing.to_json()
+
+            # then
+            self.assertEqual(result, {"value": [1, 2.5, True, "s", None, {"x": ["65022c86878d0eb09c1b7dae"]}]})
+
+        def converts_raw_documents():
+            # given
+            raw = RawBSONDocument(bson.encode({"ref": tag_id, "nested": {"refs": [nested_id]}}))
+            thing = Bare(value=raw)
+
+            # when
+            result = thing.to_json()
+
+            # then
+            self.assertEqual(result, {"value": {"ref": str(tag_id), "nested": {"refs": [str(nested_id)]}}})
+
+        tests = [
+            converts_annotated_fields,
+            converts_values_that_do_not_match_annotations,
+            converts_unannotated_attributes,
+            converts_raw_documents
+        ]
+
+        self.run_subtests(tests)
+
+    def test_to_bson(self):
+        created_at = datetime(2024, 1, 2, 3, 4, 5)
+        tag_id = ObjectId()
+
+        def preserves_bson_types():
+            # given
+            document = Document(
+                title="Title",
+                count=3,
+                tags=[tag_id],
+                nested=Nested(label="nested", refs=[tag_id]),
+                extra={},
+                created_at=created_at,
+                updated_at=created_at
+            )
+
+            # when
+            result = document.to_bson()
+
+            # then
+            self.assertEqual(result["_id"], document._id)
+            self.assertEqual(result["created_at"], created_at)
+            self.assertEqual(result["tags"], [tag_id])
+            self.assertEqual(result["nested"], {"label": "nested", "refs": [tag_id]})
+
+        def ignores_fields_and_respects_nested_overrides():
+            # given
+            thing = Bare(value=CustomBson(value=1))
+            thing.skipped = "skipped"
+
+            # when
+            result = thing.to_bson(ignore=["skipped"])
+
+            # then
+            self.assertEqual(result, {"value": {"custom": 1}})
+
+        def stringifies_unknown_types():
+            # given
+            thing = Bare(value={1, 2})
+
+            # when
+            result = db_utils.to_bson(thing)
+
+            # then
+            self.assertEqual(result, {"value": "{1, 2}"})
+
+        def passes_raw_documents_through():
+            # given
+            raw = RawBSONDocument(bson.encode({"ref": tag_id}))
+            thing = Bare(value=raw)
+
+            # when
+            result = thing.to_bson()
+
+            # then
+            self.assertIs(result["value"], raw)
+
+        tests = [
+            preserves_bson_types,
+            passes_raw_documents_through,
+            ignores_fields_and_respects_nested_overrides,
+            stringifies_unknown_types
+        ]
+
+        self.run_subtests(tests)
+
+    def test_to_dict(self):
+        # given
+        nested = Nested(label="nested", refs=[ObjectId()])
+        thing = Bare(value=(nested, {"datetime": datetime(2024, 1, 1)}))
+
+        # when
+        result = thing.to_dict()
+
+        # then
+        self.assertEqual(result, {"value": [{"label": "nested", "refs": nested.refs}, {"datetime": datetime(2024, 1, 1)}]})
+
+    def test_serializer_plan_is_cached(self):
+        self.assertIs(serializer_plan(Document), serializer_plan(Document))
+        self.assertIsNot(serializer_plan(Document), serializer_plan(Nested))
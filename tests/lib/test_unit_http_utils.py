@@ -0,0 +1,139 @@
+import json
+from datetime import datetime
+
+from bson import ObjectId
+
+from app.models.tags import Tag
+from lib.db_utils import to_json
+from lib.http_utils import etag_of, respond_conditional, respond_ndjson, respond_stream, STREAM_CHUNK_SIZE
+from tests import UnitTest
+
+
+class HttpUtilsTestCase(UnitTest):
+
+    def test_respond_stream(self):
+        def streams_items_in_chunks():
+            # given
+            tags = [Tag(name=f"tag{i}") for i in range(STREAM_CHUNK_SIZE * 2 + 1)]
+
+            # when
+            response = respond_stream(iter(tags), meta={"count": len(tags)})
+            chunks = list(response.response)
+
+            # then
+            self.assertEqual(json.loads("".join(chunks)), {
+                "status": "ok",
+                "data": to_json(tags),
+                "meta": {"count": len(tags)}
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, "application/json")
+            # envelope opening, 3 chunks of items, array closing, meta, envelope closing
+            self.assertEqual(len(chunks), 7)
+
+        def streams_an_empty_list():
+            # when
+            response = respond_stream(iter([]))
+
+            # then
+            self.assertEqual(json.loads(response.get_data()), {"status": "ok", "data": []})
+
+        def fetches_the_first_item_eagerly():
+            # given
+            def failing_cursor():
+                raise Exception("BANG!")
+                yield ObjectId()
+
+            # when & then
+            with self.assertRaises(Exception) as context:
+                respond_stream(failing_cursor())
+
+            self.assertEqual(str(context.exception), "BANG!")
+
+        tests = [
+            streams_items_in_chunks,
+            streams_an_empty_list,
+            fetches_the_first_item_eagerly
+        ]
+
+        with self.app.app_context():
+            self.run_subtests(tests)
+
+    def test_respond_ndjson(self):
+        def streams_an_item_per_line():
+            # given
+            tags = [Tag(name=f"tag{i}") for i in range(3)]
+
+            # when
+            response = respond_ndjson(iter(tags))
+            lines = list(response.response)
+
+            # then
+            self.assertEqual([json.loads(line) for line in lines], to_json(tags))
+            self.assertTrue(all(line.endswith("\n") for line in lines))
+            self.assertEqual(response.mimetype, "application/x-ndjson")
+
+        def streams_an_empty_list():
+            # when
+            response = respond_ndjson(iter([]))
+
+            # then
+            self.assertEqual(response.get_data(), b"")
+
+        tests = [
+            streams_an_item_per_line,
+            streams_an_empty_list
+        ]
+
+        with self.app.app_context():
+            self.run_subtests(tests)
+
+    def test_respond_conditional(self):
+        etag = etag_of(ObjectId(), datetime(2024, 1, 1))
+        last_modified = datetime(2024, 1, 1, 12)
+
+        def respond(headers=None):
+            with self.app.test_request_context(headers=headers):
+                return self.app.make_response(respond_conditional({"name": "tag"}, etag, last_modified))
+
+        def responds_with_validators():
+            # when
+            response = respond()
+
+            # then
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.get_json()["data"], {"name": "tag"})
+            self.assertEqual(response.headers["ETag"], f'"{etag}"')
+            self.assertEqual(response.headers["Last-Modified"], "Mon, 01 Jan 2024 12:00:00 GMT")
+            self.assertEqual(response.headers["Cache-Control"], "no-cache")
+
+        def responds_not_modified_to_matching_etag():
+            # when
+            response = respond({"If-None-Match": f'"other", "{etag}"'})
+
+            # then
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response.get_data(), b"")
+
+        def prefers_etag_over_modification_time():
+            # when
+            response = respond({"If-None-Match": '"other"', "If-Modified-Since": "Mon, 01 Jan 2024 12:00:00 GMT"})
+
+            # then
+            self.assertEqual(response.status_code, 200)
+
+        def responds_to_modification_after_known_time():
+            # when
+            response = respond({"If-Modified-Since": "Mon, 01 Jan 2024 11:59:59 GMT"})
+
+            # then
+            self.assertEqual(response.status_code, 200)
+
+        tests = [
+            responds_with_validators,
+            responds_not_modified_to_matching_etag,
+            prefers_etag_over_modification_time,
+            responds_to_modification_after_known_time
+        ]
+
+        self.run_subtests(tests)
@@ -0,0 +1,110 @@
+from lib.inverted_index import InvertedIndex
+from tests import UnitTest
+
+
+class InvertedIndexTestCase(UnitTest):
+
+    def test_search(self):
+        index = InvertedIndex()
+        index.add("hades", [("Hades", 3), ("Defy the god of the dead", 1)])
+        index.add("dead-cells", [("Dead Cells", 3), ("A roguelite action platformer", 1)])
+        index.add("celeste", [("Celeste", 3), ("Help Madeline survive her inner demons", 1)])
+
+        def matches_documents_with_all_words():
+            # when
+            scores = index.search(["dead", "cells"])
+
+            # then
+            self.assertEqual(list(scores), ["dead-cells"])
+
+        def ranks_terms_of_heavier_texts_higher():
+            # when
+            scores = index.search(["dead"])
+
+            # then
+            self.assertEqual(set(scores), {"hades", "dead-cells"})
+            self.assertGreater(scores["dead-cells"], scores["hades"])
+
+        def matches_beginnings_of_words_lower_than_words():
+            # when
+            prefix = index.search(["cel"])
+            word = index.search(["celeste"])
+
+            # then
+            self.assertEqual(set(prefix), {"dead-cells", "celeste"})
+            self.assertEqual(index.expand("cel"), ["celeste", "cells"])
+            self.assertLess(prefix["celeste"], word["celeste"])
+
+        def finds_nothing_without_match():
+            # then
+            self.assertEqual(index.search(["hades", "celeste"]), {})
+            self.assertEqual(index.search(["zelda"]), {})
+            self.assertEqual(index.search([]), {})
+
+        tests = [
+            matches_documents_with_all_words,
+            ranks_terms_of_heavier_texts_higher,
+            matches_beginnings_of_words_lower_than_words,
+            finds_nothing_without_match
+        ]
+
+        self.run_subtests(tests)
+
+    def test_writes(self):
+        def replaces_document_with_same_key():
+            # given
+            index = InvertedIndex()
+            index.add("game", [("Hades", 1)])
+
+            # when
+            index.add("game", [("Hades II", 1)])
+
+            # then
+            self.assertEqual(len(index), 1)
+            self.assertEqual(set(index.search(["ii"])), {"game"})
+
+        def drops_terms_of_removed_documents():
+            # given
+            index = InvertedIndex()
+            index.add("hades", [("Hades", 1)])
+            index.add("celeste", [("Celeste", 1)])
+
+            # when
+            index.remove("hades")
+            index.remove("unknown")
+
+            # then
+            self.assertNotIn("hades", index)
+            self.assertEqual(index.search(["hades"]), {})
+            self.assertEqual(index.expand("h"), [])
+            self.assertEqual(set(index.search(["celeste"])), {"celeste"})
+
+        def writes_copy_without_changing_index():
+            # given
+            index = InvertedIndex()
+            index.add("hades", [("Hades", 1)])
+            index.add("hades-ii", [("Hades II", 1)])
+            index.apply()
+
+            # when
+            copy = index.copy()
+            copy.add("hades-ii", [("Hades II Early Access", 1)])
+            copy.remove("hades")
+            copy.add("celeste", [("Celeste", 1)])
+            copy.apply()
+
+            # then
+            self.assertEqual(set(index.search(["hades"])), {"hades", "hades-ii"})
+            self.assertEqual(index.search(["early"]), {})
+            self.assertEqual(index.expand("c"), [])
+            self.assertEqual(set(copy.search(["hades"])), {"hades-ii"})
+            self.assertEqual(set(copy.search(["early"])), {"hades-ii"})
+            self.assertEqual(copy.expand("c"), ["celeste"])
+
+        tests = [
+            replaces_document_with_same_key,
+            drops_terms_of_removed_documents,
+            writes_copy_without_changing_index
+        ]
+
+        self.run_subtests(tests)
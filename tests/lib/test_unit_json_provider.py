@@ -0,0 +1,100 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+
+import bson
+from bson import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from app.models.products import Media, Product
+from app.models.tags import Tag
+from lib.db_utils import to_json
+from tests import UnitTest
+
+
+@dataclass
+class Plain:
+    value: int
+
+
+class BSONJSONProviderTestCase(UnitTest):
+
+    def test_dumps(self):
+        def encodes_like_to_json():
+            # given
+            created_at = datetime(2024, 1, 2, 3, 4, 5)
+            data = {
+                "tags": [Tag(name="tag", created_at=created_at, updated_at=created_at)],
+                "id": ObjectId(),
+                "created_at": created_at,
+                "plain": Plain(value=1),
+                "tuple": (1, "2")
+            }
+
+            # when
+            result = json.loads(self.app.json.dumps(data))
+
+            # then
+            self.assertEqual(result, to_json(data))
+
+        def encodes_documents_with_nested_dataclasses():
+            # given
+            product = Product(
+                type="game",
+                name="Game",
+                slug="game",
+                required_age=0,
+                short_description="",
+                detailed_description="",
+                is_free=True,
+                platforms={},
+                price={},
+                supported_languages=[],
+                media=Media(background_url="", header_url="", movies=[], screenshots=[]),
+                requirements={},
+                developers=[],
+                publishers=[],
+                platforms_os=[],
+                categories=[],
+                genres=[ObjectId()],
+                release_date={"date": None, "coming_soon": False}
+            )
+
+            # when
+            result = json.loads(self.app.json.dumps(product))
+
+            # then
+            self.assertEqual(result, product.to_json())
+
+        def encodes_raw_documents():
+            # given
+            data = {"_id": ObjectId(), "media": {"screenshots": [{"url": "a.jpg"}]}, "created_at": datetime(2024, 1, 1)}
+            raw = RawBSONDocument(bson.encode(data))
+
+            # when
+            result = json.loads(self.app.json.dumps(raw))
+
+            # then
+            self.assertEqual(result, to_json(data))
+
+        tests = [
+            encodes_like_to_json,
+            encodes_documents_with_nested_dataclasses,
+            encodes_raw_documents
+        ]
+
+        self.run_subtests(tests)
+
+    def test_response(self):
+        # given
+        tag = Tag(name="tag")
+
+        @self.app.route("/tag")
+        def get_tag():
+            return {"status": "ok", "data": tag}
+
+        # when
+        response = self.test_client.get("/tag")
+
+        # then
+        self.assertEqual(response.get_json(), {"status": "ok", "data": tag.to_json()})
@@ -0,0 +1,50 @@
+import gzip
+import io
+
+from lib.ndjson import Row, chunked, read_ndjson
+from tests import UnitTest
+
+
+class NdjsonTestCase(UnitTest):
+
+    def test_read_ndjson(self):
+        body = b'{"name": "First"}\n\n{"name": \n[1, 2]\n'
+
+        def reads_rows_by_line():
+            # when
+            rows = list(read_ndjson(io.BytesIO(body)))
+
+            # then
+            self.assertEqual(rows[0], Row(1, {"name": "First"}, None))
+            self.assertEqual((rows[1].line, rows[1].value), (3, None))
+            self.assertTrue(rows[1].error.startswith("Invalid JSON"))
+            self.assertEqual(rows[2], Row(4, [1, 2], None))
+
+        def reads_gzipped_rows():
+            # when
+            rows = list(read_ndjson(io.BytesIO(gzip.compress(body)), gzipped=True))
+
+            # then
+            self.assertEqual([row.line for row in rows], [1, 3, 4])
+
+        def stops_at_corrupt_gzip_stream():
+            # when
+            rows = list(read_ndjson(io.BytesIO(b"not gzip"), gzipped=True))
+
+            # then
+            self.assertEqual(rows, [Row(1, None, "Invalid gzip stream.")])
+
+        tests = [
+            reads_rows_by_line,
+            reads_gzipped_rows,
+            stops_at_corrupt_gzip_stream
+        ]
+
+        self.run_subtests(tests)
+
+    def test_chunked(self):
+        # when
+        chunks = list(chunked(iter(range(5)), 2))
+
+        # then
+        self.assertEqual(chunks, [[0, 1], [2, 3], [4]])
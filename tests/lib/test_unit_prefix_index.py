@@ -0,0 +1,84 @@
+from lib.prefix_index import PrefixIndex
+from tests import UnitTest
+
+
+class PrefixIndexTestCase(UnitTest):
+
+    def test_top(self):
+        index = PrefixIndex(cached_count=2)
+        index.set(1, ["hades", "hades ii"], 10)
+        index.set(2, ["hades ii", "ii"], 30)
+        index.set(3, ["hollow knight", "knight"], 20)
+        index.set(4, ["celeste"], 20)
+
+        def ranks_documents_with_prefix_by_score():
+            # then
+            self.assertEqual(index.top("h", 3), [2, 3, 1])
+            self.assertEqual(index.top("hades", 5), [2, 1])
+            self.assertEqual(index.top("k", 1), [3])
+
+        def breaks_ties_with_greatest_key():
+            # given
+            index.set(5, ["hotline miami"], 20)
+
+            # then
+            self.assertEqual(index.top("h", 2), [2, 5])
+
+        def finds_nothing_without_prefix_or_match():
+            # then
+            self.assertEqual(index.top("", 5), [])
+            self.assertEqual(index.top("zelda", 5), [])
+
+        tests = [
+            ranks_documents_with_prefix_by_score,
+            breaks_ties_with_greatest_key,
+            finds_nothing_without_prefix_or_match
+        ]
+
+        self.run_subtests(tests)
+
+    def test_writes(self):
+        def drops_cached_prefixes_of_changed_documents():
+            # given
+            index = PrefixIndex()
+            index.set(1, ["hades"], 10)
+            index.set(2, ["hollow knight"], 20)
+            self.assertEqual(index.top("h", 5), [2, 1])
+
+            # when
+            index.set_score(1, 30)
+            by_score = index.top("h", 5)
+            index.set(2, ["silksong"], 20)
+            by_text = index.top("h", 5)
+
+            # then
+            self.assertEqual(by_score, [1, 2])
+            self.assertEqual(by_text, [1])
+            self.assertEqual(index.top("s", 5), [2])
+
+        def applies_few_changes_one_by_one():
+            # given
+            index = PrefixIndex()
+            for key in range(200):
+                index.set(key, [f"game {key}"], key)
+            index.top("game", 1)
+
+            # when
+            index.remove(150)
+            index.set(199, ["other game"], 199)
+            index.set(200, ["game 200"], 200)
+
+            # then
+            self.assertEqual(index.top("game 15", 3), [159, 158, 157])
+            self.assertEqual(index.top("game 150", 3), [])
+            self.assertEqual(index.top("game", 2), [200, 198])
+            self.assertEqual(index.top("other", 2), [199])
+            self.assertEqual(len(index), 200)
+            self.assertNotIn(150, index)
+
+        tests = [
+            drops_cached_prefixes_of_changed_documents,
+            applies_few_changes_one_by_one
+        ]
+
+        self.run_subtests(tests)
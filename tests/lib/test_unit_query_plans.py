@@ -0,0 +1,102 @@
+from lib.query_plans import check_plan, plan_stages
+from tests import UnitTest
+
+
+def explain_of(plan, returned, docs_examined, keys_examined=0, **execution_stages):
+    return {
+        "queryPlanner": {"winningPlan": plan},
+        "executionStats": {
+            "nReturned": returned,
+            "totalDocsExamined": docs_examined,
+            "totalKeysExamined": keys_examined,
+            "executionStages": execution_stages
+        }
+    }
+
+
+INDEX_PLAN = {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}}}
+SCAN_PLAN = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+
+
+class QueryPlansTestCase(UnitTest):
+
+    def test_plan_stages(self):
+        def lists_stages_from_root_to_leaves():
+            # when
+            stages = list(plan_stages(INDEX_PLAN))
+
+            # then
+            self.assertEqual(stages, ["LIMIT", "FETCH", "IXSCAN"])
+
+        def lists_stages_of_slot_based_and_sharded_plans():
+            # given
+            plan = {"stage": "SHARD_MERGE", "shards": [
+                {"winningPlan": {"queryPlan": {"stage": "OR", "inputStages": [{"stage": "IXSCAN"}, {"stage": "COLLSCAN"}]}}}
+            ]}
+
+            # when
+            stages = list(plan_stages(plan))
+
+            # then
+            self.assertEqual(stages, ["SHARD_MERGE", "OR", "IXSCAN", "COLLSCAN"])
+
+        tests = [
+            lists_stages_from_root_to_leaves,
+            lists_stages_of_slot_based_and_sharded_plans
+        ]
+
+        self.run_subtests(tests)
+
+    def test_check_plan(self):
+        def passes_index_scan():
+            # when
+            report = check_plan("by slug", explain_of(INDEX_PLAN, returned=1, docs_examined=1, keys_examined=1))
+
+            # then
+            self.assertEqual(report.problems, [])
+            self.assertEqual(report.stages, ["LIMIT", "FETCH", "IXSCAN"])
+
+        def flags_collection_scan():
+            # when
+            report = check_plan("by email", explain_of(SCAN_PLAN, returned=1, docs_examined=5))
+
+            # then
+            self.assertEqual(report.problems, ["COLLSCAN of the whole collection"])
+
+        def flags_plan_examining_far_more_than_it_returns():
+            # when
+            report = check_plan("page", explain_of(INDEX_PLAN, returned=20, docs_examined=5000, keys_examined=150))
+
+            # then
+            self.assertEqual(report.problems, ["examined 5000 documents to return 20"])
+
+        def compares_counts_with_counted_documents():
+            # given
+            plan = {"stage": "COUNT", "inputStage": {"stage": "COUNT_SCAN"}}
+
+            # when
+            report = check_plan("count", explain_of(plan, returned=0, docs_examined=0, keys_examined=900, nCounted=900))
+
+            # then
+            self.assertEqual(report.returned, 900)
+            self.assertEqual(report.problems, [])
+
+        def reads_plan_of_aggregation_cursor():
+            # given
+            explain = {"stages": [{"$cursor": explain_of(SCAN_PLAN, returned=1, docs_examined=1)}, {"$lookup": {}}]}
+
+            # when
+            report = check_plan("aggregate", explain)
+
+            # then
+            self.assertEqual(report.stages, ["SORT", "COLLSCAN"])
+
+        tests = [
+            passes_index_scan,
+            flags_collection_scan,
+            flags_plan_examining_far_more_than_it_returns,
+            compares_counts_with_counted_documents,
+            reads_plan_of_aggregation_cursor
+        ]
+
+        self.run_subtests(tests)
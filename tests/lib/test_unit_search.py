@@ -0,0 +1,59 @@
+from lib.search import index_grams, normalize, query_grams, words
+from tests import UnitTest
+
+
+class SearchTestCase(UnitTest):
+
+    def test_normalize(self):
+        def lowercases_and_strips_accents():
+            # when
+            text = normalize("Pokémon ÉDITION")
+
+            # then
+            self.assertEqual(text, "pokemon edition")
+
+        def replaces_symbols_with_single_spaces():
+            # when
+            text = normalize("  Counter-Strike: [Global]_Offensive.*  ")
+
+            # then
+            self.assertEqual(text, "counter strike global offensive")
+            self.assertEqual(words("(S.T.A.L.K.E.R.)"), ["s", "t", "a", "l", "k", "e", "r"])
+
+        tests = [
+            lowercases_and_strips_accents,
+            replaces_symbols_with_single_spaces
+        ]
+
+        self.run_subtests(tests)
+
+    def test_grams(self):
+        def indexes_word_beginnings_and_trigrams():
+            # when
+            grams = index_grams("Hades II")
+
+            # then
+            self.assertEqual(grams, ["^h", "^ha", "^i", "^ii", "ade", "des", "had"])
+
+        def queries_trigrams_of_long_words_and_beginnings_of_short_ones():
+            # when
+            grams = query_grams(["go", "dead"])
+
+            # then
+            self.assertEqual(grams, ["^go", "dea", "ead"])
+
+        def matches_every_query_gram_of_indexed_word():
+            # given
+            grams = set(index_grams("Stardew Valley"))
+
+            # then
+            for query in ("st", "dew", "valley", "star"):
+                self.assertTrue(set(query_grams(words(query))) <= grams, query)
+
+        tests = [
+            indexes_word_beginnings_and_trigrams,
+            queries_trigrams_of_long_words_and_beginnings_of_short_ones,
+            matches_every_query_gram_of_indexed_word
+        ]
+
+        self.run_subtests(tests)
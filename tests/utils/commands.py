@@ -0,0 +1,54 @@
+import threading
+import typing
+from unittest.mock import MagicMock
+
+from pymongo import monitoring
+
+# Commands a client sends on its own, to open and monitor connections, not on behalf of the code under test
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "buildInfo", "endSessions", "saslStart",
+                    "saslContinue", "authenticate", "getnonce"}
+
+# Methods of a collection that are answered by the database, each one costs a round trip
+COLLECTION_COMMANDS = {"find", "find_one", "find_one_and_update", "find_one_and_replace", "find_one_and_delete",
+                       "insert_one", "insert_many", "update_one", "update_many", "replace_one", "delete_one",
+                       "delete_many", "bulk_write", "aggregate", "count_documents", "estimated_document_count",
+                       "distinct"}
+
+
+class CommandCounter(monitoring.CommandListener):
+    """Records the names of the commands sent to MongoDB, to assert how many round trips an endpoint costs
+
+    Register it with the client, e.g. `Database(uri, event_listeners=[counter])`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.commands: list[str] = []
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name in IGNORED_COMMANDS:
+            return
+
+        with self._lock:
+            self.commands.append(event.command_name)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        pass
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        pass
+
+    def reset(self) -> None:
+        with self._lock:
+            self.commands = []
+
+
+def collection_commands(*collection_mocks: MagicMock) -> list[str]:
+    """Lists the methods called on mocked collections that reach the database, in the order of the calls
+
+    Calls on the results, e.g. `sort` of a cursor, are not counted.
+    """
+    return [
+        name for collection_mock in collection_mocks for name, _, _ in collection_mock.mock_calls
+        if typing.cast(str, name) in COLLECTION_COMMANDS
+    ]